@@ -1,4 +1,5 @@
 import asyncio
+import heapq
 import json
 import logging
 import os
@@ -6,13 +7,20 @@ import random
 import re
 import traceback
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta, timezone, time
+from functools import partial
+from datetime import date, datetime, timedelta, timezone, time
 
 import pytz
 
 # Platform
 from src.platforms import get_platform
 from src.platforms.base import ChatMessage
+from src.platforms.inbound import InboundDispatcher
+from src.platforms.outbound import OutboundDispatcher, INTERACTIVE
+from src.platforms.workers import (
+    INBOUND_QUEUE, OUTBOUND_QUEUE, JobWorker, OutboxRelay, QueuedOutbound, bot_queue, message_to_payload,
+    spawn_workers, wait_for_job,
+)
 
 # Providers
 from src.providers import claude, gpt, grok, groq, openrouter, perplexity
@@ -20,20 +28,22 @@ from src.providers import split_for_discord
 
 # Tools
 from src.tools import calculator, ToolDispatcher, ToolResult
-from src.tools.definitions import tool_list, search_url_history_tool, catch_up_tool, twitter_search_tool, set_reminder_tool, manage_memories_tool, search_discogs_tool, explore_discogs_artist_tool, get_news_bulletins_tool, get_music_profile_tool
+from src.tools.definitions import tool_list, search_url_history_tool, catch_up_tool, twitter_search_tool, set_reminder_tool, manage_memories_tool, search_discogs_tool, explore_discogs_artist_tool, get_news_bulletins_tool, get_music_profile_tool, compare_music_taste_tool
 
 # Media
 from src.media import image_prompt_corpse, replicate, sora, vlm, get_image_model
 
 # Content
-from src.content import summary, weather, sentry, discogs, news, music
+from src.content import summary, weather, sentry, discogs, news, music, music_taste
 
 # Tasks
 from src.tasks import birthdays
 from src.tasks import memories as memory_tasks
+from src.tasks import catch_up as catch_up_tasks
+from src.tasks.reminders import ReminderTimer
 
 # Persistence
-from src.persistence import ImageStore, MemoryStore, UrlStore, ActivityStore, ReminderStore, NewsStore, MusicStore
+from src.persistence import ImageStore, MemoryStore, UrlStore, ActivityStore, ReminderStore, NewsStore, MusicStore, DiscogsStore, ArtistGraphStore, BackfillStore, MessageArchiveStore, DigestStore, ServerConfigStore, ServerConfig, JobQueueStore, ScheduleStore, RateLimitStore, DailyCounterStore
 from src.persistence.url_store import rerank
 
 # Embeddings
@@ -50,9 +60,15 @@ from src.utils.constants import (
     ART_CRITIC_PROBABILITY, MIN_MESSAGES_FOR_CHAT_IMAGE,
     DAY_START_HOUR, DAY_END_HOUR,
     UK_HOLIDAYS, ABUSIVE_RESPONSES,
-    CATCH_UP_MAX_HOURS, CATCH_UP_MAX_MESSAGES, CATCH_UP_BUSY_THRESHOLD,
+    CATCH_UP_MAX_HOURS, CATCH_UP_MAX_MESSAGES, CATCH_UP_FETCH_CONCURRENCY,
+    CATCH_UP_DIGEST_MINUTES, CATCH_UP_DIGEST_BACKFILL_HOURS, CATCH_UP_DIGEST_ROLLUP_HOURS,
     URL_SEARCH_RECENCY_DAYS, URL_SEARCH_RECENCY_TIERS,
     MAX_REMINDERS_PER_USER, REMINDER_PRUNE_DAYS,
+    ARTIST_GRAPH_MAX_HOPS, ARTIST_GRAPH_EXPLORE_TOP_ARTISTS,
+    MESSAGE_ARCHIVE_RETENTION_DAYS, MESSAGE_ARCHIVE_MAX_PER_CHANNEL, MESSAGE_ARCHIVE_BACKFILL_DAYS,
+    MESSAGE_ARCHIVE_FILL_MINUTES, MESSAGE_ARCHIVE_FILL_BATCH, MESSAGE_ARCHIVE_JOB_MAX_LOOKBACK_DAYS,
+    INBOUND_MAX_CONCURRENT, INBOUND_QUEUE_POLICY, INBOUND_METRICS_MINUTES, JOB_QUEUE_KEEP_HOURS,
+    GUARD_MAX_CHANNEL_MENTIONS, GUARD_MAX_GLOBAL_MENTIONS,
 )
 from src.utils.helpers import (
     format_date_with_suffix,
@@ -109,7 +125,7 @@ def get_system_prompt(system_prompt=None, bot_name="Assistant"):
         persona += "\n\nYou have access to the Discogs music database. When users ask for music recommendations, ask about bands/musicians, or want to discover new music, you MUST use the search_discogs and explore_discogs_artist tools to ground your suggestions in real data. Search first, then explore the artist to find their members, side-projects, genres, and styles. Use that data to make your recommendations interesting and non-obvious - don't just list the usual suspects."
 
     if ENABLE_MUSIC_PROFILE:
-        persona += "\n\nYou can also build playlists and per-user music recommendations from the server's music channel history. When a user asks for a playlist, what music they or someone else might like, or what their (or another user's) musical taste or profile is, you MUST call get_music_profile first and anchor your answer in the profile it returns, using the included artist network data for adjacent discoveries. Present tracks with their URLs wrapped in <angle brackets> so Discord does not spam the channel with embeds."
+        persona += "\n\nYou can also build playlists and per-user music recommendations from the server's music channel history. When a user asks for a playlist, what music they or someone else might like, or what their (or another user's) musical taste or profile is, you MUST call get_music_profile first and anchor your answer in the profile it returns, using the included artist network data for adjacent discoveries. Present tracks with their URLs wrapped in <angle brackets> so Discord does not spam the channel with embeds. For questions about whose taste is similar, or a playlist for several people at once, call compare_music_taste."
 
     return persona
 
@@ -133,6 +149,15 @@ logger = logging.getLogger('discord')
 
 # Fetch environment variables
 server_id = os.getenv("DISCORD_SERVER_ID", "not_set")
+# "all" runs everything in this process; "gateway" holds the platform
+# connection and hands answering to "worker" processes (src/platforms/workers.py)
+BOT_ROLE = os.getenv("BOT_ROLE", "all").lower()
+if BOT_ROLE not in ("all", "gateway", "worker"):
+    raise ValueError(f"Unknown BOT_ROLE: {BOT_ROLE}")
+# run.sh mounts the same ./data/gepetto.db into every bot's container: the
+# bot's name keeps its job queues apart from the others' (chatbot.name is
+# the same value, but chatbot is only created further down)
+BOT_NAME = os.getenv("BOT_NAME", "Base")
 
 
 @dataclass
@@ -143,11 +168,12 @@ class BotState:
     previous_image_prompt: str = "Dunno"
     previous_image_themes: str = ""
     previous_reasoning_content: str = ""
-    horror_history: list = field(default_factory=list)
-    daily_image_count: int = 0
+    horror_history: dict = field(default_factory=dict)  # server_id -> recent horror lines
 
 
 bot_state = BotState()
+# In SQLite rather than bot_state, so worker processes share one image budget
+daily_counters = DailyCounterStore()
 image_store = ImageStore()
 memory_store = MemoryStore()
 url_store = UrlStore()
@@ -155,10 +181,21 @@ music_store = MusicStore()
 activity_store = ActivityStore()
 reminder_store = ReminderStore()
 news_store = NewsStore()
+discogs_store = DiscogsStore()
+artist_graph = ArtistGraphStore()
+backfill_store = BackfillStore()
+message_archive = MessageArchiveStore()
+digest_store = DigestStore()
+job_queue = JobQueueStore()
+outbound = QueuedOutbound(job_queue, BOT_NAME) if BOT_ROLE == "worker" else OutboundDispatcher()
+# As the gateway, each running dispatcher job is a message a worker is
+# answering: allow enough of them to keep every worker's slots busy
+answering_processes = max(1, int(os.getenv("BOT_WORKERS", "0"))) if BOT_ROLE == "gateway" else 1
+inbound = InboundDispatcher(max_concurrent=INBOUND_MAX_CONCURRENT * answering_processes,
+                            policy=os.getenv("INBOUND_QUEUE_POLICY", INBOUND_QUEUE_POLICY))
 
 # Reminders feature
 ENABLE_REMINDERS = os.getenv("ENABLE_REMINDERS", "false").lower() == "true"
-REMINDER_FREQUENCY = int(os.getenv("REMINDER_FREQUENCY", "5"))
 
 # User memory feature
 ENABLE_USER_MEMORY = os.getenv("ENABLE_USER_MEMORY", "false").lower() == "true"
@@ -191,6 +228,13 @@ elif ENABLE_URL_HISTORY:
 # Catch-up feature (reuses URL_HISTORY_CHANNELS for monitored channels)
 ENABLE_CATCH_UP = os.getenv("ENABLE_CATCH_UP", "false").lower() == "true"
 ENABLE_CATCH_UP_TRACKING = os.getenv("ENABLE_CATCH_UP_TRACKING", "false").lower() == "true"
+ENABLE_CATCH_UP_DIGESTS = os.getenv("ENABLE_CATCH_UP_DIGESTS", "false").lower() == "true"
+catch_up_digest_lock = asyncio.Lock()
+
+# Local message archive for batch jobs (only one bot instance should do this)
+ENABLE_MESSAGE_ARCHIVE = os.getenv("ENABLE_MESSAGE_ARCHIVE", "false").lower() == "true"
+archive_synced_channels: set = set()  # channels gap-filled since the last (re)connect
+message_archive_lock = asyncio.Lock()
 
 # Twitter/X search feature (uses Grok via OpenRouter)
 ENABLE_TWITTER_SEARCH = os.getenv("ENABLE_TWITTER_SEARCH", "false").lower() == "true"
@@ -200,9 +244,96 @@ ENABLE_DISCOGS = os.getenv("DISCOGS_TOKEN", "") != ""
 
 # Music history / taste profiles (see ait epic gepetto-discord-bot-UkLWZ.2)
 MUSIC_HISTORY_CHANNELS = os.getenv("MUSIC_HISTORY_CHANNELS", "")  # Comma-separated channel IDs
-ENABLE_MUSIC_PROFILE = MUSIC_HISTORY_CHANNELS != ""
 music_history_hour = int(os.getenv("MUSIC_HISTORY_HOUR", "5"))
 MUSIC_BACKFILL_CHUNK_SIZE = 40  # links per batched LLM parse call
+MUSIC_BACKFILL_PAGE_SIZE = 200  # messages per batched existence check while streaming a backfill
+MUSIC_BACKFILL_PROGRESS_EVERY = 5  # chunks between progress messages in the channel
+music_backfill_lock = asyncio.Lock()
+
+# Servers: DISCORD_SERVER_ID configured from the env vars above, plus any
+# others with a row in server_config (a row for the env server overrides it)
+server_config_store = ServerConfigStore()
+db_server_configs: dict = {}
+
+
+def home_config() -> ServerConfig:
+    """The env-configured server."""
+    return ServerConfig.from_env(server_id, os.getenv("DISCORD_BOT_CHANNEL_ID", ""),
+                                 URL_HISTORY_CHANNELS, MUSIC_HISTORY_CHANNELS)
+
+
+def refresh_server_configs() -> None:
+    """Reload the DB server configs (at startup and on every (re)connect)."""
+    global db_server_configs
+    db_server_configs = {c.server_id: c for c in server_config_store.get_all(include_disabled=True)}
+
+
+def server_config(guild_id: str) -> ServerConfig | None:
+    """Config for a server the bot serves, or None if it doesn't serve it."""
+    config = db_server_configs.get(guild_id)
+    if config is None and guild_id and guild_id == server_id:
+        config = home_config()
+    return config if config is not None and config.enabled else None
+
+
+def server_configs() -> list:
+    """Every server the bot serves."""
+    guild_ids = [server_id, *db_server_configs]
+    return [config for config in map(server_config, dict.fromkeys(guild_ids)) if config is not None]
+
+
+def served_server_ids() -> set:
+    return {config.server_id for config in server_configs()}
+
+
+def local_server_configs() -> list:
+    """Served servers this process is connected to. With sharding, the
+    others are on another process's shards: their channels can't be seen
+    here, so scheduled work for them belongs to that process."""
+    return [config for config in server_configs() if platform.has_server(config.server_id)]
+
+
+def local_server_ids() -> set:
+    return {config.server_id for config in local_server_configs()}
+
+
+# One lock per per-server job, so e.g. the servers' chat images are made one
+# at a time and nightly LLM work doesn't multiply
+server_job_locks: dict = {}
+
+
+def server_job(job, guild_id: str, lock: asyncio.Lock):
+    """One server's run of a per-server scheduled job. Skipped if the server
+    has since stopped being served, or moved to another shard."""
+    async def run_for_server():
+        config = server_config(guild_id)
+        if config is None or not platform.has_server(guild_id):
+            return
+        async with lock:
+            await job(config)
+    run_for_server.__name__ = job.__name__
+    return run_for_server
+
+
+def schedule_per_server(schedule, name: str, job, **timing) -> None:
+    """Register a per-server job once for each served server this process can
+    see, as "<name>:<server id>", so each server's run time and lease are its
+    own. schedule is platform.schedule_daily or platform.schedule_interval."""
+    lock = server_job_locks.setdefault(name, asyncio.Lock())
+    for config in local_server_configs():
+        schedule(f"{name}:{config.server_id}", server_job(job, config.server_id, lock), **timing)
+
+
+def process_job(name: str) -> str:
+    """Name for a job about this process's own in-memory state (such as the
+    inbound queue stats): with DISCORD_SHARD_IDS each shard process keeps
+    its own run time and lease rather than sharing one with the others."""
+    shard_ids = os.getenv("DISCORD_SHARD_IDS", "").replace(" ", "")
+    return f"{name}:shards {shard_ids}" if shard_ids else name
+
+
+refresh_server_configs()
+ENABLE_MUSIC_PROFILE = any(config.music_history_channels for config in server_configs())
 
 # Build the active tool list based on feature flags
 active_tool_list = tool_list.copy()
@@ -221,6 +352,7 @@ if ENABLE_DISCOGS:
     active_tool_list.append(explore_discogs_artist_tool)
 if ENABLE_MUSIC_PROFILE:
     active_tool_list.append(get_music_profile_tool)
+    active_tool_list.append(compare_music_taste_tool)
 active_tool_list.append(get_news_bulletins_tool)
 
 location = os.getenv('BOT_LOCATION', 'dunno')
@@ -230,6 +362,16 @@ CHAT_IMAGE_MODEL = os.getenv("CHAT_IMAGE_MODEL", None) or IMAGE_MODEL
 
 # Create platform instance
 platform = get_platform()
+# Scheduled jobs keep their next run time and run history in SQLite
+platform.scheduler.store = ScheduleStore()
+platform.scheduler.namespace = BOT_NAME  # bots sharing the database keep their own schedules
+def reminder_added(event: dict) -> None:
+    """A worker saved a reminder: have this gateway's timer deliver it."""
+    reminder_timer.add(event["reminder_id"], datetime.fromisoformat(event["remind_at"]))
+
+
+outbox_relay = OutboxRelay(job_queue, platform, outbound, BOT_NAME, events={"reminder_added": reminder_added})
+outbox_relay_task: asyncio.Task | None = None
 
 def get_chatbot():
     chatbot = None
@@ -245,6 +387,105 @@ def get_chatbot():
         chatbot = gpt.GPTModel()
     return chatbot
 
+def _archive_covers(channel, after) -> bool:
+    """True if the message archive can answer a read of this channel from `after` to now."""
+    return (ENABLE_MESSAGE_ARCHIVE
+            and after is not None
+            and channel.id in archive_synced_channels
+            and message_archive.covers(channel.id, after))
+
+
+async def iter_channel_history(channel, limit=None, after=None, before=None, oldest_first=None):
+    """channel.iter_history(), served from the local message archive when it
+    holds the whole window."""
+    if _archive_covers(channel, after):
+        if oldest_first is None:
+            oldest_first = True
+        for msg in await asyncio.to_thread(message_archive.messages, channel.id, after, before, limit, oldest_first):
+            yield msg
+        return
+    async for msg in channel.iter_history(limit=limit, after=after, before=before, oldest_first=oldest_first):
+        yield msg
+
+
+async def channel_history(channel, limit, after=None, before=None, oldest_first=None) -> list:
+    """channel.history(), served from the local message archive when it
+    holds the whole window."""
+    if _archive_covers(channel, after):
+        return [msg async for msg in iter_channel_history(channel, limit, after, before, oldest_first)]
+    return await channel.history(limit=limit, after=after, before=before, oldest_first=oldest_first)
+
+
+def _job_window_start(job: str, channel_id: str, default: datetime) -> datetime:
+    """Where a daily job's scan of a channel starts: `default`, or with the
+    archive enabled, wherever its last run stopped (within
+    MESSAGE_ARCHIVE_JOB_MAX_LOOKBACK_DAYS)."""
+    if not ENABLE_MESSAGE_ARCHIVE:
+        return default
+    cursor = message_archive.job_cursor(job, channel_id)
+    if cursor is None:
+        return default
+    return max(cursor, datetime.now(timezone.utc) - timedelta(days=MESSAGE_ARCHIVE_JOB_MAX_LOOKBACK_DAYS))
+
+
+def _advance_job_cursor(job: str, channel_id: str, last_seen) -> None:
+    """Record how far a daily job got through a channel (archive only)."""
+    if ENABLE_MESSAGE_ARCHIVE and last_seen is not None:
+        message_archive.set_job_cursor(job, channel_id, last_seen)
+
+
+async def fill_message_archive(config: ServerConfig | None = None) -> None:
+    """
+    Bring the message archive up to date: for each readable channel of the
+    server (or of every served server this process can see), fetch
+    everything after its high_water (or MESSAGE_ARCHIVE_BACKFILL_DAYS for a
+    new channel), then prune to the retention limits. Runs for every server
+    on each (re)connect to repair gaps from downtime, and per server on an
+    interval.
+    """
+    if not ENABLE_MESSAGE_ARCHIVE or message_archive_lock.locked():
+        return
+    async with message_archive_lock:
+        filled = 0
+        channel_count = 0
+        for guild_id in [config.server_id] if config else local_server_ids():
+            filled_here, channels = await _fill_server_archive(guild_id)
+            filled += filled_here
+            channel_count += channels
+        message_archive.prune(MESSAGE_ARCHIVE_RETENTION_DAYS, MESSAGE_ARCHIVE_MAX_PER_CHANNEL)
+        logger.info(f"Message archive filled: {filled} messages added across {channel_count} channels")
+
+
+async def _fill_server_archive(guild_id: str) -> tuple:
+    """Fill the archive for one server's readable channels. Returns (messages added, channels)."""
+    channels = await platform.get_readable_channels(guild_id)
+    filled = 0
+    for ch in channels:
+        started = datetime.now(timezone.utc)
+        coverage = message_archive.coverage(ch.id)
+        since = coverage["high_water"] if coverage else started - timedelta(days=MESSAGE_ARCHIVE_BACKFILL_DAYS)
+        batch = []
+        try:
+            async for msg in ch.iter_history(after=since, oldest_first=True):
+                batch.append(msg)
+                if len(batch) >= MESSAGE_ARCHIVE_FILL_BATCH:
+                    filled += message_archive.record_many(batch)
+                    message_archive.mark_filled(ch.id, guild_id, since, batch[-1].created_at)
+                    batch = []
+        except Exception as e:
+            logger.warning(f"Could not fill message archive for channel {ch.name}: {e}")
+            if batch:
+                filled += message_archive.record_many(batch)
+                message_archive.mark_filled(ch.id, guild_id, since, batch[-1].created_at)
+            continue
+        filled += message_archive.record_many(batch)
+        # Live messages from during the fetch are recorded by handle_message,
+        # so the channel is complete up to when we started reading it
+        message_archive.mark_filled(ch.id, guild_id, since, started)
+        archive_synced_channels.add(ch.id)
+    return filled, len(channels)
+
+
 async def get_history_as_openai_messages(
     channel,
     include_bot_messages=True,
@@ -254,17 +495,21 @@ async def get_history_as_openai_messages(
     max_length=1000,
     include_timestamps=True,
     before=None,
+    use_archive=False,
 ):
     messages = []
     total_length = 0
     history_hours = HISTORY_HOURS if since_hours is None else since_hours
     after_time = datetime.now(timezone.utc) - timedelta(hours=history_hours)
-    history_msgs = await channel.history(
-        limit=limit,
-        after=after_time,
-        before=before,
-        oldest_first=False,
-    )
+    if use_archive:
+        history_msgs = await channel_history(channel, limit, after=after_time, before=before, oldest_first=False)
+    else:
+        history_msgs = await channel.history(
+            limit=limit,
+            after=after_time,
+            before=before,
+            oldest_first=False,
+        )
     history_msgs = sorted(history_msgs, key=lambda msg: msg.created_at)
     for msg in history_msgs:
         if (not include_bot_messages) and msg.author_is_bot:
@@ -322,43 +567,89 @@ async def reply_to_message(message: ChatMessage, response):
     chunks = split_for_discord(response)
     for i, chunk in enumerate(chunks):
         if i == 0:
-            await message.reply(f'{message.author_mention} {chunk}')
+            await outbound.reply(message, f'{message.author_mention} {chunk}')
         else:
-            await message.reply(f'{chunk}')
-        await asyncio.sleep(0.1)
+            await outbound.reply(message, f'{chunk}')
 
 async def handle_ready():
     logger.info(f"Starting discord bot - date time in python is {datetime.now()}")
+    refresh_server_configs()
+    logger.info(f"Serving {len(server_configs())} server(s): {', '.join(sorted(served_server_ids()))}")
     uk_tz = pytz.timezone('Europe/London')
-    if os.getenv("DISCORD_BOT_BIRTHDAYS", None):
+    if os.getenv("DISCORD_BOT_BIRTHDAYS", None) and platform.has_server(server_id):
         logger.info("Starting say_happy_birthday task")
         platform.schedule_daily("birthday", say_happy_birthday, hour=11, tz=uk_tz)
     if os.getenv("CHAT_IMAGE_ENABLED", False):
         logger.info(f"Starting make_chat_image task with hour {chat_image_hour}")
-        platform.schedule_daily("chat_image", make_chat_image, hour=chat_image_hour, tz=uk_tz)
+        schedule_per_server(platform.schedule_daily, "chat_image", make_chat_image, hour=chat_image_hour, tz=uk_tz)
     if os.getenv("CHAT_VIDEO_ENABLED", False):
         logger.info(f"Starting make_chat_video task")
-        platform.schedule_daily("chat_video", make_chat_video, hour=chat_image_hour, minute=15, tz=uk_tz)
+        schedule_per_server(platform.schedule_daily, "chat_video", make_chat_video, hour=chat_image_hour, minute=15, tz=uk_tz)
     if os.getenv("FEATURE_HORROR_CHAT", False):
         logger.info("Starting horror_chat task")
-        platform.schedule_interval("horror", horror_chat, minutes=60)
+        schedule_per_server(platform.schedule_interval, "horror", horror_chat, minutes=60)
     if ENABLE_USER_MEMORY_EXTRACTION:
         logger.info(f"Starting extract_user_memories task at hour {memory_extraction_hour}")
-        platform.schedule_daily("memories", extract_user_memories, hour=memory_extraction_hour, tz=uk_tz)
+        schedule_per_server(platform.schedule_daily, "memories", extract_user_memories, hour=memory_extraction_hour, tz=uk_tz)
     if ENABLE_URL_HISTORY_EXTRACTION:
         logger.info(f"Starting extract_url_history task at hour {url_history_extraction_hour}")
-        platform.schedule_daily("url_history", extract_url_history, hour=url_history_extraction_hour, tz=uk_tz)
+        schedule_per_server(platform.schedule_daily, "url_history", extract_url_history, hour=url_history_extraction_hour, tz=uk_tz)
     if ENABLE_MUSIC_PROFILE:
         logger.info(f"Starting extract_music_history task at hour {music_history_hour}")
-        platform.schedule_daily("music_history", extract_music_history, hour=music_history_hour, tz=uk_tz)
+        schedule_per_server(platform.schedule_daily, "music_history", extract_music_history, hour=music_history_hour, tz=uk_tz)
     if ENABLE_REMINDERS:
-        logger.info(f"Starting check_reminders task (every {REMINDER_FREQUENCY} minutes)")
-        platform.schedule_interval("reminders", check_reminders, minutes=REMINDER_FREQUENCY)
+        loaded = reminder_timer.load(local_server_ids())
+        reminder_timer.start()
+        logger.info(f"Reminder timer started with {loaded} pending reminders")
+        platform.schedule_daily("reminder_prune", prune_reminders, hour=4, minute=30, tz=uk_tz)
+    if ENABLE_CATCH_UP_DIGESTS:
+        logger.info(f"Starting build_channel_digests task (every {CATCH_UP_DIGEST_MINUTES} minutes)")
+        schedule_per_server(platform.schedule_interval, "catch_up_digests", build_channel_digests,
+                            minutes=CATCH_UP_DIGEST_MINUTES)
+    platform.schedule_interval(process_job("inbound_metrics"), log_inbound_metrics, minutes=INBOUND_METRICS_MINUTES)
+    if bot_guard.store is not None:
+        platform.schedule_interval("rate_limit_prune", prune_rate_limits, minutes=60)
+    if BOT_ROLE == "gateway":
+        global outbox_relay_task
+        if outbox_relay_task is None or outbox_relay_task.done():
+            outbox_relay_task = asyncio.create_task(outbox_relay.run())
+        platform.schedule_interval("job_queue_prune", prune_job_queue, minutes=60)
+    if ENABLE_MESSAGE_ARCHIVE:
+        # Messages may have been missed while disconnected: re-fill before
+        # trusting live recording to keep channels complete
+        archive_synced_channels.clear()
+        asyncio.create_task(fill_message_archive())
+        logger.info(f"Starting fill_message_archive task (every {MESSAGE_ARCHIVE_FILL_MINUTES} minutes)")
+        schedule_per_server(platform.schedule_interval, "message_archive", fill_message_archive,
+                            minutes=MESSAGE_ARCHIVE_FILL_MINUTES)
     platform.start_schedules()
     logger.info(f"Using model type : {type(chatbot)}")
 
 platform.on_ready(handle_ready)
 
+
+async def log_inbound_metrics():
+    stats = inbound.snapshot()
+    logger.info(
+        f"Inbound queue: {stats['queued']} queued, {stats['running']} running; "
+        f"{stats['submitted']} submitted, {stats['dropped']} dropped, {stats['collapsed']} collapsed, "
+        f"{stats['failed']} failed; wait avg {stats['wait_avg_s']:.2f}s max {stats['wait_max_s']:.2f}s"
+    )
+    if BOT_ROLE == "gateway":
+        logger.info(f"Job queue: {job_queue.depth(bot_queue(INBOUND_QUEUE, BOT_NAME))} to answer, "
+                    f"{job_queue.depth(bot_queue(OUTBOUND_QUEUE, BOT_NAME))} replies to send")
+
+
+async def prune_job_queue():
+    pruned = job_queue.prune(JOB_QUEUE_KEEP_HOURS)
+    if pruned:
+        logger.info(f"Pruned {pruned} failed jobs from the job queue")
+
+async def prune_rate_limits():
+    pruned = bot_guard.prune()
+    if pruned:
+        logger.info(f"Pruned {pruned} expired rate limit hits")
+
 async def websearch(message: ChatMessage, prompt: str) -> None:
     response = await perplexity.search(prompt)
     response = "🌍" + response
@@ -375,8 +666,7 @@ async def twitter_search(message: ChatMessage, query: str) -> None:
 async def create_image(message: ChatMessage, prompt: str) -> None:
     logger.info(f"Creating image with prompt: {prompt}")
 
-    bot_state.daily_image_count += 1
-    if bot_state.daily_image_count > MAX_DAILY_IMAGES:
+    if daily_counters.increment(f"images:{BOT_NAME}", date.today()) > MAX_DAILY_IMAGES:
         logger.info("Not creating image because daily image count is too high")
         await message.reply(f'Due to budget cuts, I can only generate {MAX_DAILY_IMAGES} images per day.', mention_author=True)
         return
@@ -558,7 +848,7 @@ def process_set_reminder(message: ChatMessage, reminder_text: str, remind_at: st
     if remind_at_dt <= datetime.now():
         return "Error: The specified time is in the past."
 
-    reminder_store.save(
+    reminder_id = reminder_store.save(
         server_id=guild_id,
         user_id=user_id,
         user_name=message.author_name,
@@ -567,9 +857,14 @@ def process_set_reminder(message: ChatMessage, reminder_text: str, remind_at: st
         remind_at=remind_at_dt,
         created_by=chatbot.name,
     )
+    if BOT_ROLE == "worker":
+        # The gateway's timer delivers reminders: tell it about this one now
+        outbound.notify("reminder_added", reminder_id=reminder_id, remind_at=remind_at_dt.isoformat())
+    else:
+        reminder_timer.add(reminder_id, remind_at_dt)
 
     formatted_time = remind_at_dt.strftime("%-d %B %Y at %H:%M")
-    return f"Reminder saved. Will remind on {formatted_time}: \"{reminder_text}\". Note: reminders are checked every {REMINDER_FREQUENCY} minutes, so the actual reminder may be up to {REMINDER_FREQUENCY} minutes late."
+    return f"Reminder saved. Will remind on {formatted_time}: \"{reminder_text}\"."
 
 
 async def handle_set_reminder(message: ChatMessage, tool_call, arguments: dict, messages: list) -> None:
@@ -674,7 +969,7 @@ async def handle_discogs_search(message: ChatMessage, tool_call, arguments: dict
     channel = platform.get_channel(message.channel_id)
     async with channel.typing():
         search_result = await discogs.search_artist(arguments.get('query', ''))
-        explore_result = await discogs.explore_artist(arguments.get('query', ''))
+        explore_result = await discogs.explore_artist(arguments.get('query', ''), discogs_store=discogs_store)
         messages.append({'role': 'user', 'content': f'[Discogs data — recommend specific artists, side-projects, and releases from this data. Include artists the user is unlikely to already know.]\n\n{search_result}\n\n{explore_result}'})
         followup = await chatbot.chat(messages, tools=[])
         await reply_to_message(message, followup.message + '\n' + followup.usage_short)
@@ -684,7 +979,7 @@ async def handle_discogs_explore(message: ChatMessage, tool_call, arguments: dic
     """Handle explore_discogs_artist: fetch artist network, then let the LLM synthesise."""
     channel = platform.get_channel(message.channel_id)
     async with channel.typing():
-        explore_result = await discogs.explore_artist(arguments.get('artist', ''))
+        explore_result = await discogs.explore_artist(arguments.get('artist', ''), discogs_store=discogs_store)
         messages.append({'role': 'user', 'content': f'[Discogs data — recommend specific artists, side-projects, and releases from this data. Include artists the user is unlikely to already know.]\n\n{explore_result}'})
         followup = await chatbot.chat(messages, tools=[])
         await reply_to_message(message, followup.message + '\n' + followup.usage_short)
@@ -717,45 +1012,86 @@ def format_music_profile(name: str, counts: dict, entries: list) -> str:
     return "\n".join(lines)
 
 
+def format_artist_network(neighbours: list, posted: set) -> str:
+    """Render artist-graph neighbours for the LLM, strongest first, each with
+    the path that links it to the user's artists."""
+    lines = ["Artist network (from the local artist graph; higher score = closer to their taste):"]
+    for neighbour in neighbours:
+        path = neighbour["via"][0][0] + "".join(f" → {name} ({kind})" for name, kind in neighbour["via"][1:])
+        already = " [already posted by them]" if neighbour["name"].lower() in posted else ""
+        lines.append(f"- {neighbour['name']} {neighbour['score']:.2f}{already}: {path}")
+    return "\n".join(lines)
+
+
+def _resolve_music_user(message: ChatMessage, user_name: str) -> tuple:
+    """Map a tool's user_name argument to (user_id, display_name).
+
+    Empty means the requester; a raw <@id> mention is taken as-is; anything
+    else is looked up by display name (user_id None if nobody matches).
+    """
+    user_name = user_name.strip()
+    if not user_name:
+        return message.author_id, message.author_display_name or message.author_name
+    display_name = user_name.lstrip('@').strip()
+    mention = DISCORD_MENTION_RE.fullmatch(user_name)
+    if mention:
+        return mention.group(1), display_name
+    return music_store.resolve_user_name(message.server_id or server_id, display_name), display_name
+
+
 async def handle_get_music_profile(message: ChatMessage, tool_call, arguments: dict, messages: list) -> None:
     """Handle get_music_profile: profile + artist network data, then let the LLM synthesise.
 
     The follow-up call deliberately passes tools=[] — main.py dispatches tool
     calls once per message, so a tool call in the follow-up would be silently
-    dropped. Expansion material (explore_artist for the top artists) is
-    pre-fetched here instead.
+    dropped. Expansion material is pre-fetched here instead: a multi-hop
+    walk of the local artist graph out from their top artists (no Discogs
+    requests — members/groups come from the Discogs cache, which the nightly
+    music scan fills for each poster's top artists; collaborators from
+    music_history).
     """
     channel = platform.get_channel(message.channel_id)
     async with channel.typing():
-        user_name = (arguments.get('user_name') or '').strip()
-        if user_name:
-            display_name = user_name.lstrip('@').strip()
-            mention = DISCORD_MENTION_RE.fullmatch(user_name)
-            if mention:
-                user_id = mention.group(1)
-            else:
-                user_id = music_store.resolve_user_name(server_id, display_name)
-        else:
-            user_id = message.author_id
-            display_name = message.author_display_name or message.author_name
-
-        entries = music_store.get_user_history(server_id, user_id, limit=100) if user_id else []
+        user_id, display_name = _resolve_music_user(message, arguments.get('user_name') or '')
+        entries = music_store.get_user_history(message.server_id or server_id, user_id, limit=100) if user_id else []
         if not entries:
             tool_result = f"No music history found for {display_name}."
         else:
-            counts = music_store.profile_counts(server_id, user_id)
+            counts = music_store.profile_counts(message.server_id or server_id, user_id)
             tool_result = format_music_profile(display_name, counts, entries)
-            if ENABLE_DISCOGS:
-                top_artists = [a for a, _ in counts["artists"].most_common(2)]
-                explores = [await discogs.explore_artist(a) for a in top_artists]
-                if explores:
-                    tool_result += "\n\nArtist network data (for adjacent discoveries):\n\n" + "\n\n".join(explores)
+            top_artists = counts["artists"].most_common(5)
+            if top_artists:
+                seeds = {artist: count / top_artists[0][1] for artist, count in top_artists}
+                neighbours = await asyncio.to_thread(
+                    artist_graph.neighbourhood, seeds, max_hops=ARTIST_GRAPH_MAX_HOPS, limit=20
+                )
+                if neighbours:
+                    posted = {a.lower() for a in counts["artists"]}
+                    tool_result += "\n\n" + format_artist_network(neighbours, posted)
 
         messages.append({'role': 'user', 'content': f'[Music profile data — build the playlist or recommendation from this. Wrap every URL in <angle brackets>.]\n\n{tool_result}'})
         followup = await chatbot.chat(messages, tools=[])
         await reply_to_message(message, followup.message + '\n' + followup.usage_short)
 
 
+async def handle_compare_music_taste(message: ChatMessage, tool_call, arguments: dict, messages: list) -> None:
+    """Handle compare_music_taste: taste-similarity data, then let the LLM synthesise."""
+    channel = platform.get_channel(message.channel_id)
+    async with channel.typing():
+        names = [n for n in (arguments.get('user_names') or []) if isinstance(n, str) and n.strip()]
+        resolved = [_resolve_music_user(message, n) for n in names] or [_resolve_music_user(message, '')]
+        matrix = await asyncio.to_thread(music_taste.get_taste_matrix, music_store, message.server_id or server_id)
+        known = [user_id for user_id, _ in resolved if user_id in matrix.vectors]
+        unknown = [name for user_id, name in resolved if user_id not in matrix.vectors]
+        tool_result = music_taste.format_taste_matches(matrix, known) if known else ""
+        if unknown:
+            tool_result = f"No music history found for: {', '.join(unknown)}\n{tool_result}".strip()
+
+        messages.append({'role': 'user', 'content': f'[Music taste comparison data — answer from this; scores are cosine similarity, 0 = nothing in common, 1 = identical.]\n\n{tool_result}'})
+        followup = await chatbot.chat(messages, tools=[])
+        await reply_to_message(message, followup.message + '\n' + followup.usage_short)
+
+
 async def handle_get_news_bulletins(message: ChatMessage, messages: list) -> None:
     """Fetch today's news bulletins, then let the LLM relay them in its own
     voice — by appending to the existing `messages` list, the bot's persona
@@ -795,6 +1131,95 @@ async def handle_get_news_bulletins(message: ChatMessage, messages: list) -> Non
         await reply_to_message(message, followup.message + '\n' + followup.usage_short)
 
 
+async def _fetch_catch_up_messages(guild_id: str, since: datetime, tail_after: dict | None = None) -> list:
+    """
+    Non-bot messages since `since` from every readable channel, as
+    (channel_name, msg) in chronological order. `tail_after` maps channel
+    IDs to a later start (where their digests end).
+
+    Channels are read concurrently (CATCH_UP_FETCH_CONCURRENCY at a time);
+    ones whose newest message predates their start aren't read at all. Each
+    channel's history arrives oldest first, so the streams are heap-merged
+    rather than sorted.
+    """
+    readable_channels = await platform.get_readable_channels(guild_id)
+    since_utc = since.astimezone(timezone.utc)
+    tail_after = tail_after or {}
+    starts = {ch.id: max(since_utc, tail_after.get(ch.id, since_utc)) for ch in readable_channels}
+    active = [ch for ch in readable_channels
+              if (last := ch.last_message_at()) is None or last > starts[ch.id]]
+    semaphore = asyncio.Semaphore(CATCH_UP_FETCH_CONCURRENCY)
+
+    async def fetch(ch) -> list:
+        async with semaphore:
+            try:
+                return [(ch.name, msg)
+                        async for msg in iter_channel_history(ch, limit=CATCH_UP_MAX_MESSAGES, after=starts[ch.id])
+                        if not msg.author_is_bot]
+            except Exception as e:
+                logger.warning(f"Could not fetch history from channel {ch.name}: {e}")
+                return []
+
+    streams = await asyncio.gather(*(fetch(ch) for ch in active))
+    return list(heapq.merge(*streams, key=lambda m: m[1].created_at))
+
+
+async def build_channel_digests(config: ServerConfig | None = None) -> None:
+    """
+    Interval task: digest the server's (or every local served server's)
+    readable channels up to the last whole hour, from where its digests end
+    (or CATCH_UP_DIGEST_BACKFILL_HOURS back), so catch-ups can reuse them. A
+    channel whose digesting fails is left for the next run.
+    """
+    if not ENABLE_CATCH_UP_DIGESTS or catch_up_digest_lock.locked():
+        return
+    async with catch_up_digest_lock:
+        through = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        floor = through - timedelta(hours=CATCH_UP_DIGEST_BACKFILL_HOURS)
+        digested = 0
+        for guild_id in [config.server_id] if config else local_server_ids():
+            digested += await _digest_server_channels(guild_id, floor, through)
+            await _roll_up_server_digests(guild_id, through)
+        digest_store.prune(through - timedelta(hours=CATCH_UP_MAX_HOURS))
+        logger.info(f"Channel digests built: {digested} messages digested up to {through:%H:%M}")
+
+
+async def _digest_server_channels(guild_id: str, floor: datetime, through: datetime) -> int:
+    """Digest one server's readable channels up to `through`. Returns messages digested."""
+    coverage = digest_store.coverage(guild_id)
+    digested = 0
+    for ch in await platform.get_readable_channels(guild_id):
+        start = max(coverage[ch.id]["through"], floor) if ch.id in coverage else floor
+        if start >= through:
+            continue
+        try:
+            messages = []
+            if (last := ch.last_message_at()) is None or last > start:
+                messages = [msg async for msg in iter_channel_history(ch, after=start, before=through)
+                            if not msg.author_is_bot]
+            digests = await catch_up_tasks.digest_channel(chatbot, ch.name, messages)
+        except Exception as e:
+            logger.warning(f"Could not digest channel {ch.name}: {e}")
+            continue
+        digest_store.save(guild_id, ch.id, ch.name, digests, since=start, through=through)
+        digested += len(messages)
+    return digested
+
+
+async def _roll_up_server_digests(guild_id: str, through: datetime) -> None:
+    """Merge each channel's digests from blocks of CATCH_UP_DIGEST_ROLLUP_HOURS
+    that ended by `through`, finest blocks first. A failed merge leaves its
+    digests for the next run."""
+    for block_hours in CATCH_UP_DIGEST_ROLLUP_HOURS:
+        for group in digest_store.rollup_groups(guild_id, block_hours, through):
+            try:
+                merged = await catch_up_tasks.merge_digests(chatbot, group)
+            except Exception as e:
+                logger.warning(f"Could not roll up digests for #{group[0]['channel_name']}: {e}")
+                continue
+            digest_store.roll_up(guild_id, group, merged)
+
+
 async def handle_catch_up(message: ChatMessage, hours: int = None) -> None:
     """Handle 'catch me up' requests by summarising missed messages."""
     user_id = message.author_id
@@ -815,69 +1240,40 @@ async def handle_catch_up(message: ChatMessage, hours: int = None) -> None:
         # Cap at CATCH_UP_MAX_HOURS
         since = max(last_activity.last_message_at, datetime.now() - timedelta(hours=CATCH_UP_MAX_HOURS))
 
-    # Fetch messages from all readable channels since then
-    readable_channels = await platform.get_readable_channels(guild_id)
-    all_messages = []
-    for ch in readable_channels:
-        try:
-            msgs = await ch.history(limit=CATCH_UP_MAX_MESSAGES, after=since)
-            for msg in msgs:
-                if not msg.author_is_bot:
-                    all_messages.append((ch.name, msg))
-        except Exception as e:
-            logger.warning(f"Could not fetch history from channel {ch.name}: {e}")
+    # Channels with digests back to `since` only need their live tail read
+    digests = []
+    tail_after = {}
+    if ENABLE_CATCH_UP_DIGESTS:
+        since_utc = since.astimezone(timezone.utc)
+        tail_after = {
+            channel_id: cov["through"]
+            for channel_id, cov in digest_store.coverage(guild_id).items()
+            if cov["covered_from"] <= since_utc
+        }
+        digests = digest_store.digests(guild_id, list(tail_after), since)
 
-    if not all_messages:
+    all_messages = await _fetch_catch_up_messages(guild_id, since, tail_after)
+
+    if not all_messages and not digests:
         await message.reply("Nothing much happened while you were away!")
         return
 
-    # Sort chronologically and format for LLM
-    all_messages.sort(key=lambda m: m[1].created_at)
-
-    # Format messages for the summary
-    chat_lines = []
-    for channel_name, msg in all_messages:
-        timestamp = msg.created_at.strftime("%H:%M")
-        chat_lines.append(f"[#{channel_name} {timestamp}] {msg.author_name}: {msg.content[:300]}")
-
-    chat_text = "\n".join(chat_lines[-100:])  # Last 100 messages max
-
-    # Generate summary with volume-adaptive prompt
-    message_count = len(chat_lines)
-
-    if message_count <= CATCH_UP_BUSY_THRESHOLD:
-        catch_up_prompt = """Summarise what happened in this Discord chat. Keep it to ONE Discord message (~1500 characters max).
-Use brief bullet points. Mention key topics, decisions, interesting links, and who was involved.
-Messages come from multiple channels (shown as #channel-name). Cover the full timespan.
-Wrap any URLs in angle brackets like <https://example.com> to prevent Discord previews.
-Keep your personality - if the chat was mundane, say so dismissively. If it was dramatic, be appropriately sardonic."""
-    else:
-        catch_up_prompt = f"""Summarise what happened in this Discord chat. There were {message_count} messages.
-Your ENTIRE summary MUST fit in one Discord message (~1500 characters). This is a hard limit — be ruthless.
-Group by theme, NOT by channel. Use terse bullet points.
-Routine chat (meetings, greetings, banter, work moaning) gets ONE bullet max. Don't quote messages or list every URL.
-Only expand on things that are genuinely unusual, funny, or surprising.
-Mention who was involved. Wrap any URLs in angle brackets like <https://example.com>.
-Keep your personality - if the chat was mundane, say so dismissively. If it was dramatic, be appropriately sardonic."""
-
-    llm_messages = [
-        {'role': 'system', 'content': catch_up_prompt},
-        {'role': 'user', 'content': f"Summarise this chat for {message.author_name}:\n\n{chat_text}"}
-    ]
-
     channel = platform.get_channel(message.channel_id)
     async with channel.typing():
-        response = await chatbot.chat(llm_messages, tools=[])
-        summary_text = wrap_urls_for_discord(response.message.strip())
-        await reply_to_message(message, summary_text)
+        summary_text = await catch_up_tasks.summarise(chatbot, all_messages, message.author_name, digests=digests)
+        await reply_to_message(message, wrap_urls_for_discord(summary_text))
 
 
 async def handle_message(message: ChatMessage):
+    served = server_config(message.server_id) is not None
+    if ENABLE_MESSAGE_ARCHIVE and served:
+        message_archive.record(message, advance=message.channel_id in archive_synced_channels)
+
     # Track activity in monitored channels (before bot mention check)
-    if ENABLE_CATCH_UP_TRACKING and message.server_id == server_id:
+    if ENABLE_CATCH_UP_TRACKING and served:
         if not message.author_is_bot:
             activity_store.record_activity(
-                server_id,
+                message.server_id,
                 message.author_id,
                 message.author_name,
                 message.channel_id,
@@ -886,28 +1282,59 @@ async def handle_message(message: ChatMessage):
 
     # Random drive-by chat - small chance to chime in on any message
     if (not message.author_is_bot
-            and message.server_id == server_id
+            and served
             and os.getenv("FEATURE_RANDOM_CHAT", False)
             and platform.bot_user_id not in message.content
             and message.reply_to_author_id != platform.bot_user_id
             and random.random() < RANDOM_CHAT_PROBABILITY):
-        await random_chat(message)
+        queue_answer(message, "random_chat", partial(random_chat, message),
+                     collapse_key=("random_chat", message.channel_id))
 
-    message_blocked, abusive_reply = bot_guard.should_block(message, platform.bot_user_id, server_id, chatbot)
+    message_blocked, abusive_reply = bot_guard.should_block(message, platform.bot_user_id, served_server_ids(), chatbot)
     if message_blocked:
         if abusive_reply:
             logger.info("Blocked message from: " + message.author_name + " and abusing them")
             channel = platform.get_channel(message.channel_id)
-            await channel.send(f"{random.choice(ABUSIVE_RESPONSES)}.")
+            await outbound.send(channel, f"{random.choice(ABUSIVE_RESPONSES)}.", priority=INTERACTIVE)
         return
 
     question = extract_question(message.content, platform.bot_user_id)
     logger.info(f'Question: {question}')
     if not any(char.isalpha() for char in question):
         channel = platform.get_channel(message.channel_id)
-        await channel.send(f'{message.author_mention} {random.choice(ABUSIVE_RESPONSES)}.')
+        await outbound.send(channel, f'{message.author_mention} {random.choice(ABUSIVE_RESPONSES)}.', priority=INTERACTIVE)
         return
 
+    # The answer (history fetch, LLM and tool calls) waits its turn in the
+    # inbound queue; this handler returns straight away
+    queue_answer(message, "answer", partial(answer_message, message, question), question=question)
+
+
+def queue_answer(message: ChatMessage, kind: str, handler, collapse_key=None, **job_args) -> None:
+    """Queue work on a message with the inbound dispatcher. As the gateway, the
+    work is handed to a worker process, still under the dispatcher's bounds."""
+    if BOT_ROLE == "gateway":
+        handler = partial(answer_in_worker, message, kind, job_args)
+    inbound.submit(message.author_id, message.channel_id, handler, collapse_key=collapse_key)
+
+
+async def answer_in_worker(message: ChatMessage, kind: str, job_args: dict) -> None:
+    """Gateway: queue a message for a worker process and wait until it's answered."""
+    outbox_relay.remember(message)
+    job_id = job_queue.enqueue(bot_queue(INBOUND_QUEUE, BOT_NAME),
+                               {"kind": kind, "message": message_to_payload(message), **job_args})
+    await wait_for_job(job_queue, job_id)
+
+
+# What a worker process runs for each kind of job queue_answer() enqueues
+WORKER_JOBS = {
+    "answer": lambda message, job: answer_message(message, job["question"]),
+    "random_chat": lambda message, job: random_chat(message),
+}
+
+
+async def answer_message(message: ChatMessage, question: str):
+    """Answer a message addressed to the bot. Runs from the inbound queue."""
     try:
         lq = question.lower().strip()
         channel = platform.get_channel(message.channel_id)
@@ -929,13 +1356,13 @@ async def handle_message(message: ChatMessage):
             if message.author_is_bot:
                 question = question + ". Please be very concise, curt and to the point.  The user in this case is a discord bot."
             if lq.startswith("!image"):
-                await make_chat_image()
+                await make_chat_image(server_config(message.server_id))
                 return
             if lq.startswith("!video"):
-                await make_chat_video()
+                await make_chat_video(server_config(message.server_id))
                 return
             if lq.startswith("!urls"):
-                await extract_url_history()
+                await extract_url_history(server_config(message.server_id))
                 return
             if lq.startswith("!reindex"):
                 await reindex_url_history(message)
@@ -944,7 +1371,10 @@ async def handle_message(message: ChatMessage):
                 await backfill_music_history(message, question)
                 return
             if lq.startswith("!musichistory"):
-                await extract_music_history()
+                await extract_music_history(server_config(message.server_id))
+                return
+            if lq.startswith("!musicrebuild"):
+                await rebuild_music_profiles(message)
                 return
             if '--reasoning' in lq:
                 # Try in-memory state first (current session), fall back to database.
@@ -955,7 +1385,7 @@ async def handle_message(message: ChatMessage):
                 themes = bot_state.previous_image_themes
 
                 if reasoning == 'Dunno':
-                    latest = image_store.get_latest(server_id)
+                    latest = image_store.get_latest(message.server_id)
                     if latest:
                         reasoning = latest.reasoning
                         themes = str(latest.themes)
@@ -988,7 +1418,7 @@ async def handle_message(message: ChatMessage):
 
             user_bio = None
             if ENABLE_USER_MEMORY:
-                bio = memory_store.get_user_bio(server_id, message.author_id)
+                bio = memory_store.get_user_bio(message.server_id, message.author_id)
                 if bio:
                     user_bio = bio.bio
 
@@ -1028,6 +1458,8 @@ async def handle_message(message: ChatMessage):
                     await handle_discogs_explore(message, tool_call, arguments, messages)
                 elif fname == 'get_music_profile':
                     await handle_get_music_profile(message, tool_call, arguments, messages)
+                elif fname == 'compare_music_taste':
+                    await handle_compare_music_taste(message, tool_call, arguments, messages)
                 elif fname == 'get_news_bulletins':
                     await handle_get_news_bulletins(message, messages)
                 else:
@@ -1047,8 +1479,10 @@ platform.on_message(handle_message)
 
 
 async def say_happy_birthday():
+    if not platform.has_server(server_id):
+        return  # the home server is on another shard's process
     logger.info("In say_happy_birthday")
-    await birthdays.get_birthday_message(platform, chatbot)
+    await birthdays.get_birthday_message(platform, chatbot, outbound)
 
 async def random_chat(trigger_message: ChatMessage):
     """Chime in to the conversation as if the bot is a regular user."""
@@ -1069,13 +1503,15 @@ async def random_chat(trigger_message: ChatMessage):
     if 'SKIP' in response_text.upper() and len(response_text) < 10:
         logger.info("Random chat chose to skip")
         return
-    await channel.send(f"{response_text[:DISCORD_MESSAGE_LIMIT]}")
+    await outbound.send(channel, f"{response_text[:DISCORD_MESSAGE_LIMIT]}")
 
-async def horror_chat():
+async def horror_chat(config: ServerConfig | None = None):
+    config = config or home_config()
+    horror_history = bot_state.horror_history.setdefault(config.server_id, [])
     # Check cooldown using stored timestamp
-    if bot_state.horror_history:
+    if horror_history:
         try:
-            last_timestamp = bot_state.horror_history[-1]['timestamp']
+            last_timestamp = horror_history[-1]['timestamp']
             last_time = datetime.strptime(last_timestamp, "%B %dth, %Y %I:%M %p")
             if (datetime.now() - last_time).total_seconds() < HORROR_CHAT_COOLDOWN_HOURS * 60 * 60:
                 logger.info("Not doing horror chat because we did it recently")
@@ -1100,9 +1536,9 @@ async def horror_chat():
         logger.info("Not doing horror chat because it is day time")
         return
 
-    channel = platform.get_channel(os.getenv('DISCORD_BOT_CHANNEL_ID', 'Invalid').strip())
+    channel = platform.get_channel(config.bot_channel_id or 'Invalid')
     system_prompt = "You are an AI bot who lurks in a Discord server for UK adult horror novelists. Your task is to write one or two short sentences that are creepy, scary or unsettling and convey the sense of an out-of-context line from a horror film. You will be given the date and time and you can use that to add a sense of timeliness and season to your response. You should ONLY respond with those sentences, no other text. <example>I'm scared.</example> <example>I think I can hear someone outside. In the dark.</example> <example>There's something in the shadows.</example> <example>I think the bleeding has stopped now. But he deserved it.</example> <example>That's not the first time I've had to bury a body.</example>"
-    previous_horror_history_messages = [x['message'] for x in bot_state.horror_history]
+    previous_horror_history_messages = [x['message'] for x in horror_history]
     context = [
         {
             'role': 'system',
@@ -1114,27 +1550,28 @@ async def horror_chat():
         }
     ]
     response = await chatbot.chat(context)
-    bot_state.horror_history.append({
+    horror_history.append({
         "message": response.message,
         "timestamp": formatted_date_time
     })
-    if len(bot_state.horror_history) > MAX_HORROR_HISTORY:
-        bot_state.horror_history = bot_state.horror_history[-MAX_HORROR_HISTORY:]
-    await channel.send(f"{response.message[:DISCORD_MESSAGE_LIMIT]}\n{response.usage_short}")
+    del horror_history[:-MAX_HORROR_HISTORY]
+    await outbound.send(channel, f"{response.message[:DISCORD_MESSAGE_LIMIT]}\n{response.usage_short}")
 
 
-async def make_chat_image():
+async def make_chat_image(config: ServerConfig | None = None):
     logger.info("In make_chat_image")
 
     if not os.getenv("CHAT_IMAGE_ENABLED", False):
         logger.info("Not making chat image because CHAT_IMAGE_ENABLED is not set")
         return
 
-    channel = platform.get_channel(os.getenv('DISCORD_BOT_CHANNEL_ID', 'Invalid').strip())
+    config = config or home_config()
+    guild_id = config.server_id
+    channel = platform.get_channel(config.bot_channel_id or 'Invalid')
     async with channel.typing():
         # Fetch and prepare chat history
         history, chat_text = await fetch_chat_history(
-            channel, get_history_as_openai_messages, include_bot_messages=True
+            channel, partial(get_history_as_openai_messages, use_archive=True), include_bot_messages=True
         )
 
         # Handle quiet chat days
@@ -1143,15 +1580,15 @@ async def make_chat_image():
                 logger.info("Not making chat image because today is a weekend or obvious holiday")
                 return
             quiet_message = await generate_quiet_chat_message(chatbot)
-            await channel.send(quiet_message)
+            await outbound.send(channel, quiet_message)
 
         # Build prompt with previous themes context
-        previous_themes = image_store.get_previous_themes(server_id)
+        previous_themes = image_store.get_previous_themes(guild_id)
         previous_themes_text = ""
         if previous_themes:
             previous_themes_text = f"Please try and avoid repeating themes from the previous image themes. Previously used themes are:\n{previous_themes}\n\n"
 
-        all_bios = memory_store.get_all_bios(server_id)
+        all_bios = memory_store.get_all_bios(guild_id)
         bios_text = "; ".join(f"{b.user_name}: {b.bio}" for b in all_bios) if all_bios else ""
         quiet_day = len(history) < MIN_MESSAGES_FOR_CHAT_IMAGE
 
@@ -1162,7 +1599,7 @@ async def make_chat_image():
         # get_occasion resolves the most specific match for today across this
         # server and any global occasions; None on an ordinary day.
         # See ant gepettodiscordbot-VXQvH.
-        occasion = image_store.get_occasion(server_id, datetime.now())
+        occasion = image_store.get_occasion(guild_id, datetime.now())
         if occasion:
             logger.info("Chat image occasion active: %r", occasion[:120])
 
@@ -1174,7 +1611,7 @@ async def make_chat_image():
             # See ant gepettodiscordbot-mjBCN for the news-on-quiet-days decision.
             all_memories = []
             for bio in all_bios:
-                all_memories.extend(memory_store.get_user_memories(server_id, bio.user_id))
+                all_memories.extend(memory_store.get_user_memories(guild_id, bio.user_id))
 
             try:
                 news_bulletins = await news.get_news_bulletins(chatbot, news_store=news_store)
@@ -1192,7 +1629,7 @@ async def make_chat_image():
                     bios_text=bios_text,
                     user_locations=os.getenv("USER_LOCATIONS", "").strip(),
                     cat_descriptions=os.getenv("CAT_DESCRIPTIONS", "").strip(),
-                    server_id=server_id,
+                    server_id=guild_id,
                     image_store=image_store,
                     chatbot=chatbot,
                     occasion=occasion,
@@ -1222,7 +1659,7 @@ async def make_chat_image():
                 bios_text=bios_text,
                 user_locations=os.getenv("USER_LOCATIONS", "").strip(),
                 cat_descriptions=os.getenv("CAT_DESCRIPTIONS", "").strip(),
-                server_id=server_id,
+                server_id=guild_id,
                 image_store=image_store,
                 chatbot=chatbot,
                 occasion=occasion,
@@ -1239,7 +1676,7 @@ async def make_chat_image():
 
         if not image_url:
             logger.info('We did not get a file from API')
-            await channel.send("Sorry, I tried to make an image but I failed (probably because of naughty words - tsk).")
+            await outbound.send(channel, "Sorry, I tried to make an image but I failed (probably because of naughty words - tsk).")
             return
 
         bot_state.previous_image_prompt = display_prompt
@@ -1251,7 +1688,7 @@ async def make_chat_image():
     await channel.send_file(send_message[:DISCORD_MESSAGE_LIMIT], image_url, f'channel_summary_{today_string}.png')
 
     image_store.save(
-        server_id=server_id,
+        server_id=guild_id,
         themes=llm_chat_themes if isinstance(llm_chat_themes, list) else [llm_chat_themes],
         reasoning=llm_chat_reasoning,
         prompt=display_prompt,
@@ -1264,21 +1701,22 @@ async def make_chat_image():
     if random.random() < ART_CRITIC_PROBABILITY:
         critique = await vlm.critique_image(image_url)
         if critique:
-            await channel.send(f'_An art critic opines:_\n\n{critique}'[:DISCORD_MESSAGE_LIMIT])
+            await outbound.send(channel, f'_An art critic opines:_\n\n{critique}'[:DISCORD_MESSAGE_LIMIT])
 
 
-async def make_chat_video():
+async def make_chat_video(config: ServerConfig | None = None):
     logger.info("In make_chat_video")
 
     if not os.getenv("CHAT_VIDEO_ENABLED", False):
         logger.info("Not making chat video because CHAT_VIDEO_ENABLED is not set")
         return
 
-    channel = platform.get_channel(os.getenv('DISCORD_BOT_CHANNEL_ID', 'Invalid').strip())
+    config = config or home_config()
+    channel = platform.get_channel(config.bot_channel_id or 'Invalid')
 
     # Fetch and prepare chat history
     history, chat_text = await fetch_chat_history(
-        channel, get_history_as_openai_messages, include_bot_messages=False
+        channel, partial(get_history_as_openai_messages, use_archive=True), include_bot_messages=False
     )
 
     # Handle quiet chat days
@@ -1287,7 +1725,7 @@ async def make_chat_video():
             logger.info("Not making chat video because today is a weekend or obvious holiday")
             return
         quiet_message = await generate_quiet_chat_message(chatbot)
-        await channel.send(quiet_message)
+        await outbound.send(channel, quiet_message)
         return
 
     # Build video prompt from template
@@ -1313,7 +1751,7 @@ async def make_chat_video():
         send_message = f'{response.message}\n_Model: {model_name}] / Estimated cost: US${cost:.3f}_'
         await channel.send_file(send_message, video_url, f'channel_summary_{today_string}.mp4')
 
-async def extract_user_memories():
+async def extract_user_memories(config: ServerConfig | None = None):
     """Daily task to extract memories from chat history."""
     logger.info("In extract_user_memories")
 
@@ -1322,17 +1760,20 @@ async def extract_user_memories():
         return
 
     try:
-        channel = platform.get_channel(os.getenv("DISCORD_BOT_CHANNEL_ID", "Invalid").strip())
+        config = config or home_config()
+        channel = platform.get_channel(config.bot_channel_id or "Invalid")
         if not channel:
             logger.warning("Could not get channel for memory extraction")
             return
 
-        extraction_server_id = os.getenv("DISCORD_SERVER_ID")
+        extraction_server_id = config.server_id
 
-        # Get recent chat history (last 24 hours)
+        # Get chat history since the last run (last 24 hours without the archive)
+        after = _job_window_start("memories", channel.id, datetime.now() - timedelta(days=1))
         messages = []
-        history_msgs = await channel.history(limit=500, after=datetime.now() - timedelta(days=1))
-        for msg in history_msgs:
+        last_seen = None
+        async for msg in iter_channel_history(channel, limit=500, after=after):
+            last_seen = msg.created_at
             if not msg.author_is_bot:
                 messages.append({
                     'author_id': msg.author_id,
@@ -1342,6 +1783,7 @@ async def extract_user_memories():
 
         if not messages:
             logger.info("No messages to extract memories from")
+            _advance_job_cursor("memories", channel.id, last_seen)
             return
 
         # Collect existing bios for users in the chat so extraction can avoid duplicates
@@ -1389,6 +1831,7 @@ async def extract_user_memories():
             )
             logger.info(f"Updated bio for {info['name']}")
 
+        _advance_job_cursor("memories", channel.id, last_seen)
         memories_count = len(result.get('memories', []))
         bio_count = len(result.get('bio_updates', []))
 
@@ -1406,7 +1849,7 @@ async def extract_user_memories():
         logger.error(f"Error in memory extraction: {e}")
 
 
-async def extract_url_history():
+async def extract_url_history(config: ServerConfig | None = None):
     """Daily task to extract and summarise URLs from chat history."""
     logger.info("In extract_url_history")
 
@@ -1414,15 +1857,12 @@ async def extract_url_history():
         logger.info("URL history extraction disabled, skipping")
         return
 
-    if not URL_HISTORY_CHANNELS:
-        logger.info("No URL_HISTORY_CHANNELS configured, skipping")
-        return
-
-    extraction_server_id = os.getenv("DISCORD_SERVER_ID")
-    channel_ids = [ch.strip().strip('"\'') for ch in URL_HISTORY_CHANNELS.strip('"\'').split(",") if ch.strip()]
+    config = config or home_config()
+    extraction_server_id = config.server_id
+    channel_ids = config.url_history_channels
 
     if not channel_ids:
-        logger.info("No valid channel IDs in URL_HISTORY_CHANNELS, skipping")
+        logger.info(f"No URL history channels configured for server {extraction_server_id}, skipping")
         return
 
     # Regex to find URLs in messages
@@ -1444,9 +1884,12 @@ async def extract_url_history():
 
             logger.info(f"Scanning channel {channel.name} ({channel_id}) for URLs")
 
-            # Get messages from last 24 hours
-            history_msgs = await channel.history(limit=500, after=datetime.now() - timedelta(days=1))
-            for msg in history_msgs:
+            # Get messages since the last run (last 24 hours without the archive)
+            after = _job_window_start("url_history", channel_id, datetime.now() - timedelta(days=1))
+            candidates = []
+            last_seen = None
+            async for msg in iter_channel_history(channel, limit=500, after=after):
+                last_seen = msg.created_at
                 if msg.author_is_bot:
                     continue
 
@@ -1467,12 +1910,19 @@ async def extract_url_history():
                         logger.info(f"  [FILTERED] {url[:80]}")
                         urls_filtered += 1
                         continue
+                    candidates.append((url, msg))
 
-                    # Skip if we already have this URL
-                    if url_store.url_exists(extraction_server_id, url):
+            # One existence check for the whole channel rather than one per URL
+            known = url_store.urls_exist(extraction_server_id, [url for url, _ in candidates])
+            records = []
+            try:
+                for url, msg in candidates:
+                    # Skip if we already have this URL (or it appeared earlier in this scan)
+                    if url in known:
                         logger.info(f"  [DUPLICATE] {url[:80]}")
                         urls_duplicate += 1
                         continue
+                    known.add(url)
 
                     urls_processed += 1
                     logger.info(f"  [PROCESSING {urls_processed}] {url[:80]}")
@@ -1531,8 +1981,7 @@ Content:
                         except Exception as embed_error:
                             logger.warning(f"Failed to generate embedding for {url}: {embed_error}")
 
-                        # Save to database
-                        saved_id = url_store.save(
+                        records.append(dict(
                             server_id=extraction_server_id,
                             channel_id=channel_id,
                             url=url,
@@ -1542,15 +1991,18 @@ Content:
                             posted_by_name=msg.author_display_name,
                             posted_at=msg.created_at,
                             embedding=embedding
-                        )
-
-                        if saved_id:
-                            urls_saved += 1
-                            logger.info(f"Saved URL: {url[:50]}... - {url_summary[:50]}...")
+                        ))
+                        logger.info(f"Summarised URL: {url[:50]}... - {url_summary[:50]}...")
 
                     except Exception as url_error:
                         logger.error(f"Error processing URL {url}: {url_error}")
                         continue
+            finally:
+                # Save everything summarised so far in one transaction, even if
+                # the channel scan blew up part-way
+                if records:
+                    urls_saved += url_store.save_many(records)["inserted"]
+            _advance_job_cursor("url_history", channel_id, last_seen)
 
         except Exception as channel_error:
             logger.error(f"Error processing channel {channel_id}: {channel_error}")
@@ -1559,30 +2011,33 @@ Content:
     logger.info(f"URL extraction complete: {urls_total} found, {urls_filtered} filtered, {urls_duplicate} duplicates, {urls_processed} processed, {urls_saved} saved")
 
 
-def _music_channel_ids() -> list:
-    """Parse MUSIC_HISTORY_CHANNELS into a list of channel IDs."""
-    return [ch.strip().strip('"\'') for ch in MUSIC_HISTORY_CHANNELS.strip('"\'').split(",") if ch.strip()]
-
+async def _collect_music_links(guild_id: str, channel_id: str, after: datetime, limit: int) -> tuple:
+    """Scan one channel for YouTube links not already in music_history
+    (or known to be dead).
 
-async def _collect_music_links(channel_id: str, after: datetime, limit: int) -> list:
-    """Scan one channel for YouTube links not already in music_history.
-
-    Returns link dicts ready for music.enrich_links(), carrying poster
-    attribution for the eventual save.
+    Returns (links, last_seen): link dicts ready for music.enrich_links(),
+    carrying poster attribution for the eventual save, and the time of the
+    last message scanned (None if there were none).
     """
     channel = platform.get_channel(channel_id)
     if not channel:
         logger.warning(f"Could not get channel {channel_id} for music extraction")
-        return []
+        return [], None
+
+    history_msgs = [msg async for msg in iter_channel_history(channel, limit=limit, after=after)]
+    last_seen = history_msgs[-1].created_at if history_msgs else None
+    return _new_music_links(guild_id, channel_id, history_msgs, set()), last_seen
+
 
+def _new_music_links(guild_id: str, channel_id: str, history_msgs: list, seen: set) -> list:
+    """YouTube links in these messages that aren't in music_history, known
+    dead, or already in `seen` (updated in place), in message order."""
     links = []
-    seen = set()
-    history_msgs = await channel.history(limit=limit, after=after)
     for msg in history_msgs:
         if msg.author_is_bot:
             continue
         for url in music.YOUTUBE_URL_RE.findall(msg.content):
-            if url in seen or music_store.url_exists(server_id, url):
+            if url in seen:
                 continue
             seen.add(url)
             links.append({
@@ -1592,16 +2047,55 @@ async def _collect_music_links(channel_id: str, after: datetime, limit: int) ->
                 "posted_by_name": msg.author_display_name,
                 "posted_at": msg.created_at,
             })
-    return links
+    urls = [link["url"] for link in links]
+    known = music_store.urls_exist(guild_id, urls)
+    dead = music_store.dead_links(urls)
+    if dead:
+        logger.info(f"Skipping {len(dead)} known-dead links in channel {channel_id}")
+    return [link for link in links if link["url"] not in known and link["url"] not in dead]
+
 
+async def _stream_music_chunks(guild_id: str, channel, channel_id: str, after: datetime):
+    """Yield chunks of new links from a channel's history, oldest first,
+    as the history streams in. Existence checks run per
+    MUSIC_BACKFILL_PAGE_SIZE messages rather than per message.
 
-def _save_music_links(links: list) -> tuple:
+    One message's links never straddle two chunks, so the last posted_at
+    in a finished chunk is a safe resume cursor.
+    """
+    seen = set()
+    batch = []
+    pending = []
+    async for msg in channel.iter_history(after=after, oldest_first=True):
+        batch.append(msg)
+        if len(batch) < MUSIC_BACKFILL_PAGE_SIZE:
+            continue
+        pending.extend(_new_music_links(guild_id, channel_id, batch, seen))
+        batch = []
+        while len(pending) >= MUSIC_BACKFILL_CHUNK_SIZE:
+            chunk, pending = _take_music_chunk(pending)
+            yield chunk
+    pending.extend(_new_music_links(guild_id, channel_id, batch, seen))
+    while pending:
+        chunk, pending = _take_music_chunk(pending)
+        yield chunk
+
+
+def _take_music_chunk(pending: list) -> tuple:
+    """Split off up to MUSIC_BACKFILL_CHUNK_SIZE links, extended so the
+    last message's links stay together. Returns (chunk, rest)."""
+    size = MUSIC_BACKFILL_CHUNK_SIZE
+    while size < len(pending) and pending[size]["posted_at"] == pending[size - 1]["posted_at"]:
+        size += 1
+    return pending[:size], pending[size:]
+
+
+def _save_music_links(guild_id: str, links: list) -> tuple:
     """Save enriched links to music_store. Returns (music_count, non_music_count)."""
-    saved_music = 0
-    saved_other = 0
+    records = []
     for link in links:
-        result = music_store.save(
-            server_id=server_id,
+        records.append(dict(
+            server_id=guild_id,
             channel_id=link["channel_id"],
             url=link["url"],
             video_title=link.get("title", ""),
@@ -1615,16 +2109,35 @@ def _save_music_links(links: list) -> tuple:
             genres=link.get("genres"),
             styles=link.get("styles"),
             is_music=bool(link.get("is_music")),
-        )
-        if result is not None:
-            if link.get("is_music"):
-                saved_music += 1
-            else:
-                saved_other += 1
-    return saved_music, saved_other
+        ))
+    result = music_store.save_many(records)
+    artist_graph.add_collaborations(
+        (record["artist"], record["collaborators"])
+        for record in records if record["is_music"] and record["artist"] and record["collaborators"]
+    )
+    return result["inserted_music"], result["inserted"] - result["inserted_music"]
+
+
+async def _explore_top_artists(guild_id: str, user_ids) -> None:
+    """Explore these posters' top artists on Discogs as background traffic,
+    caching their members/groups for the artist graph. Artists already in
+    the Discogs cache cost no requests."""
+    if not ENABLE_DISCOGS or not user_ids:
+        return
+    counts = music_store.profile_counts_many(guild_id, list(user_ids))
+    artists = list(dict.fromkeys(
+        artist for profile in counts.values()
+        for artist, _ in profile["artists"].most_common(ARTIST_GRAPH_EXPLORE_TOP_ARTISTS)
+    ))
+    with discogs.background_priority():
+        for artist in artists:
+            try:
+                await discogs.explore_artist(artist, discogs_store=discogs_store)
+            except Exception as e:
+                logger.warning(f"Discogs explore of '{artist}' for the artist graph failed: {e}")
 
 
-async def extract_music_history():
+async def extract_music_history(config: ServerConfig | None = None):
     """Daily scan of the music channel(s) into music_history.
 
     Mirrors extract_url_history. On a failed LLM parse, saves NOTHING from
@@ -1632,88 +2145,198 @@ async def extract_music_history():
     is_music=0 rows that url_exists() then makes permanent.
     """
     logger.info("In extract_music_history")
-    if not ENABLE_MUSIC_PROFILE:
+    config = config or home_config()
+    if not ENABLE_MUSIC_PROFILE or not config.music_history_channels:
         logger.info("No MUSIC_HISTORY_CHANNELS configured, skipping")
         return
 
     total_new = 0
     saved_music = 0
     saved_other = 0
-    for channel_id in _music_channel_ids():
+    posters = set()
+    for channel_id in config.music_history_channels:
         try:
-            links = await _collect_music_links(channel_id, after=datetime.now() - timedelta(days=1), limit=500)
+            after = _job_window_start("music_history", channel_id, datetime.now() - timedelta(days=1))
+            links, last_seen = await _collect_music_links(config.server_id, channel_id, after=after, limit=500)
             total_new += len(links)
             if not links:
+                _advance_job_cursor("music_history", channel_id, last_seen)
                 continue
             try:
-                await music.enrich_links(links, chatbot)
+                await music.enrich_links(links, chatbot, discogs_store=discogs_store, music_store=music_store)
             except music.MusicParseError as e:
                 logger.error(f"Music parse failed for channel {channel_id}, saving nothing from this scan: {e}")
                 continue
-            music_count, other_count = _save_music_links(links)
+            music_count, other_count = _save_music_links(config.server_id, links)
+            _advance_job_cursor("music_history", channel_id, last_seen)
+            posters.update(link["posted_by_id"] for link in links if link.get("is_music"))
             saved_music += music_count
             saved_other += other_count
         except Exception as channel_error:
             logger.error(f"Error processing music channel {channel_id}: {channel_error}")
             continue
 
+    # Pick up members/groups cached since yesterday, by explore_artist tool
+    # calls and by exploring today's posters' top artists
+    await _explore_top_artists(config.server_id, posters)
+    await asyncio.to_thread(artist_graph.sync_from_discogs, discogs_store)
     logger.info(f"Music extraction complete: {total_new} new links, {saved_music} music, {saved_other} non-music saved")
 
 
 async def backfill_music_history(message: ChatMessage, command_text: str) -> None:
-    """!musicbackfill [days] — load historical music-channel links.
-
-    Idempotent via url_exists(); the LLM parse is chunked so one bad
-    response only skips that chunk (skipped links stay unsaved and are
-    picked up on a re-run).
+    """!musicbackfill [days] | resume — load historical music-channel links.
+
+    History is streamed a page at a time and parsed in chunks. Progress is
+    checkpointed in backfill_store after every chunk (a per-channel cursor,
+    plus the links of any chunk whose LLM parse failed), so after a restart
+    `!musicbackfill resume` retries the failed chunks and carries on from
+    each channel's cursor instead of rescanning everything. Re-running from
+    scratch is still safe: url_exists() keeps it idempotent.
     """
-    if not ENABLE_MUSIC_PROFILE:
+    guild_id = message.server_id or server_id
+    config = server_config(guild_id)
+    if not ENABLE_MUSIC_PROFILE or config is None or not config.music_history_channels:
         await message.reply("No MUSIC_HISTORY_CHANNELS configured.")
         return
+    if music_backfill_lock.locked():
+        await message.reply("A music backfill is already running.")
+        return
 
-    days = 365
-    parts = command_text.split()
-    if len(parts) > 1:
-        try:
-            days = int(parts[1])
-        except ValueError:
-            pass
-
-    await message.reply(f"Starting music backfill over the last {days} days — this may take a few minutes.")
-
-    total_new = 0
-    saved_music = 0
-    saved_other = 0
-    failed_chunks = 0
-    for channel_id in _music_channel_ids():
+    async with music_backfill_lock:
+        parts = command_text.split()
+        if len(parts) > 1 and parts[1].lower() == "resume":
+            job = backfill_store.get_resumable_job(guild_id, "music")
+            if not job:
+                await message.reply("No interrupted music backfill to resume — start one with !musicbackfill [days].")
+                return
+            await message.reply(f"Resuming the music backfill from {job['since']:%Y-%m-%d}.")
+        else:
+            days = 365
+            if len(parts) > 1:
+                try:
+                    days = int(parts[1])
+                except ValueError:
+                    pass
+            backfill_store.start_job(guild_id, "music", datetime.now() - timedelta(days=days),
+                                     config.music_history_channels)
+            job = backfill_store.get_resumable_job(guild_id, "music")
+            await message.reply(f"Starting music backfill over the last {days} days — this may take a few minutes.")
+
+        await _run_music_backfill(message, job, guild_id)
+
+
+async def _run_music_backfill(message: ChatMessage, job: dict, guild_id: str) -> None:
+    """Retry a job's failed chunks, then stream each unfinished channel from its cursor."""
+    job_id = job["id"]
+    for failed in backfill_store.failed_chunks(job_id):
+        links = [{**item, "posted_at": datetime.fromisoformat(item["posted_at"])} for item in failed["items"]]
+        stats = await _enrich_and_save_music_chunk(guild_id, links)
+        if stats:
+            backfill_store.mark_chunk_done(failed["id"], {**stats, "failed": -1})
+
+    progress = {"chunks": 0, "links": 0}
+    unfinished = 0
+    for channel_id, state in job["channels"].items():
+        if state["done"]:
+            continue
+        channel = platform.get_channel(channel_id)
+        if not channel:
+            logger.warning(f"Could not get channel {channel_id} for music backfill")
+            unfinished += 1
+            continue
         try:
-            links = await _collect_music_links(channel_id, after=datetime.now() - timedelta(days=days), limit=5000)
+            await _backfill_music_channel(message, guild_id, job_id, channel, channel_id,
+                                          state["cursor"] or job["since"], progress)
         except Exception as channel_error:
-            logger.error(f"Error scanning music channel {channel_id} for backfill: {channel_error}")
+            logger.error(f"Error backfilling music channel {channel_id}: {channel_error}")
+            unfinished += 1
             continue
-        total_new += len(links)
-        for start in range(0, len(links), MUSIC_BACKFILL_CHUNK_SIZE):
-            chunk = links[start:start + MUSIC_BACKFILL_CHUNK_SIZE]
-            try:
-                await music.enrich_links(chunk, chatbot)
-            except music.MusicParseError as e:
-                failed_chunks += 1
-                logger.error(f"Music parse failed for backfill chunk at offset {start}, skipping chunk: {e}")
-                continue
-            music_count, other_count = _save_music_links(chunk)
-            saved_music += music_count
-            saved_other += other_count
-            logger.info(f"Music backfill progress: {min(start + MUSIC_BACKFILL_CHUNK_SIZE, len(links))}/{len(links)} links in channel {channel_id}")
+        backfill_store.checkpoint(job_id, channel_id, done=True)
+
+    stats = backfill_store.stats(job_id)
+    failed_chunks = stats.get("failed", 0)
+    if not failed_chunks and not unfinished:
+        backfill_store.finish_job(job_id)
 
-    summary_text = f"Music backfill complete: {total_new} new links found, {saved_music} music and {saved_other} non-music saved."
+    summary_text = (f"Music backfill complete: {stats.get('found', 0)} new links found, "
+                    f"{stats.get('music', 0)} music and {stats.get('other', 0)} non-music saved.")
     if failed_chunks:
-        summary_text += f" {failed_chunks} chunk(s) failed parsing and will be picked up on a re-run."
+        summary_text += f" {failed_chunks} chunk(s) failed parsing — `!musicbackfill resume` retries them."
+    if unfinished:
+        summary_text += f" {unfinished} channel(s) could not be finished — `!musicbackfill resume` carries on from where they stopped."
     await message.reply(summary_text)
 
 
+async def _backfill_music_channel(message: ChatMessage, guild_id: str, job_id: int, channel, channel_id: str,
+                                  after: datetime, progress: dict) -> None:
+    """Stream one channel's links in chunks, checkpointing after each."""
+    chunks = _stream_music_chunks(guild_id, channel, channel_id, after)
+    current = await anext(chunks, None)
+    # Pipelined: chunk N+1's oEmbed lookups run while chunk N is with the LLM.
+    prefetch = asyncio.create_task(music.resolve_links(current, music_store=music_store)) if current else None
+    try:
+        while current:
+            await prefetch
+            upcoming = await anext(chunks, None)
+            prefetch = asyncio.create_task(music.resolve_links(upcoming, music_store=music_store)) if upcoming else None
+
+            found = len(current)
+            cursor = current[-1]["posted_at"]
+            stats = await _enrich_and_save_music_chunk(guild_id, current)
+            if stats is None:
+                backfill_store.record_failed_chunk(
+                    job_id, channel_id, [{**link, "posted_at": link["posted_at"].isoformat()} for link in current]
+                )
+                stats = {"failed": 1}
+            backfill_store.checkpoint(job_id, channel_id, cursor=cursor, stats={"found": found, **stats})
+
+            progress["chunks"] += 1
+            progress["links"] += found
+            logger.info(f"Music backfill progress: {progress['links']} links, channel {channel_id} up to {cursor}")
+            if progress["chunks"] % MUSIC_BACKFILL_PROGRESS_EVERY == 0:
+                await message.reply(
+                    f"Music backfill: {progress['links']} links processed so far; "
+                    f"#{channel.name} is done up to {cursor:%Y-%m-%d}.",
+                    mention_author=False
+                )
+            current = upcoming
+    finally:
+        if prefetch:
+            prefetch.cancel()
+        await chunks.aclose()
+
+
+async def _enrich_and_save_music_chunk(guild_id: str, links: list) -> dict | None:
+    """Enrich and save one chunk. Returns {"music", "other"} saved, or None
+    if the LLM parse failed (nothing from the chunk is saved)."""
+    try:
+        await music.enrich_links(links, chatbot, discogs_store=discogs_store, music_store=music_store)
+    except music.MusicParseError as e:
+        logger.error(f"Music parse failed for a backfill chunk of {len(links)} links, skipping chunk: {e}")
+        return None
+    music_count, other_count = _save_music_links(guild_id, links)
+    return {"music": music_count, "other": other_count}
+
+
+async def rebuild_music_profiles(message: ChatMessage) -> None:
+    """!musicrebuild — recompute the per-user taste aggregates and the artist
+    graph from music_history (plus the Discogs cache for band memberships).
+
+    They're maintained on every save; this is the repair path if they ever
+    drift (a hand-edited database, say), and how a pre-existing history gets
+    its collaborator edges.
+    """
+    rows = await asyncio.to_thread(music_store.rebuild_profile_counts, message.server_id or server_id)
+    edges = await asyncio.to_thread(artist_graph.rebuild, music_store, discogs_store)
+    await message.reply(
+        f"Rebuilt music profiles from {rows} music links; artist graph has "
+        f"{edges['collab']} collaboration and {edges['member']} membership links."
+    )
+
+
 async def reindex_url_history(message: ChatMessage) -> None:
     """Re-summarise and re-embed all existing URL history entries."""
-    reindex_server_id = os.getenv("DISCORD_SERVER_ID")
+    reindex_server_id = message.server_id or server_id
     entries = url_store.get_all(reindex_server_id)
     logger.info(f"Reindexing {len(entries)} URL history entries")
     await message.reply(f"Reindexing {len(entries)} URL entries...", mention_author=False)
@@ -1778,53 +2401,66 @@ Content:
     await message.reply(f"Reindex complete: {updated} updated, {failed} failed.", mention_author=False)
 
 
-async def check_reminders():
-    """Periodic task to check for due reminders and send them."""
-    logger.info("Checking for due reminders")
-    try:
-        due = reminder_store.get_due_reminders(server_id, bot_name=chatbot.name)
-        for reminder in due:
-            try:
-                channel = platform.get_channel(reminder.channel_id)
-                if channel:
-                    try:
-                        delay = datetime.now() - reminder.remind_at
-                        delay_minutes = int(delay.total_seconds() / 60)
-                        delay_note = f" The reminder was due {delay_minutes} minutes ago.  Don't apologise for the delay - this is just to help you in your response." if delay_minutes > 1 else ""
-                        remind_messages = [
-                            {'role': 'system', 'content': get_system_prompt(bot_name=chatbot.name)},
-                            {'role': 'user', 'content': f'You previously set a reminder for a user and it is now due. Deliver this reminder to them in your own voice and style: "{reminder.reminder_text}".{delay_note}'}
-                        ]
-                        llm_response = await chatbot.chat(remind_messages, tools=[])
-                        reminder_text = llm_response.message.strip()[:DISCORD_MESSAGE_LIMIT]
-                    except Exception as e:
-                        logger.warning(f"LLM reminder delivery failed, using fallback: {e}")
-                        reminder_text = f"Reminder: {reminder.reminder_text}"
-                    await channel.send(f"<@{reminder.user_id}> {reminder_text}")
-                reminder_store.mark_reminded(reminder.id)
-            except Exception as e:
-                logger.error(f"Error sending reminder {reminder.id}: {e}")
+async def deliver_reminder(reminder):
+    """Send a due reminder in the bot's own words. Called by reminder_timer."""
+    channel = platform.get_channel(reminder.channel_id)
+    if channel:
+        try:
+            delay = datetime.now() - reminder.remind_at
+            delay_minutes = int(delay.total_seconds() / 60)
+            delay_note = f" The reminder was due {delay_minutes} minutes ago.  Don't apologise for the delay - this is just to help you in your response." if delay_minutes > 1 else ""
+            remind_messages = [
+                {'role': 'system', 'content': get_system_prompt(bot_name=chatbot.name)},
+                {'role': 'user', 'content': f'You previously set a reminder for a user and it is now due. Deliver this reminder to them in your own voice and style: "{reminder.reminder_text}".{delay_note}'}
+            ]
+            llm_response = await chatbot.chat(remind_messages, tools=[])
+            reminder_text = llm_response.message.strip()[:DISCORD_MESSAGE_LIMIT]
+        except Exception as e:
+            logger.warning(f"LLM reminder delivery failed, using fallback: {e}")
+            reminder_text = f"Reminder: {reminder.reminder_text}"
+        await outbound.send(channel, f"<@{reminder.user_id}> {reminder_text}")
+    reminder_store.mark_reminded(reminder.id)
 
-        # Prune old sent reminders
-        pruned = reminder_store.prune(days=REMINDER_PRUNE_DAYS)
-        if pruned:
-            logger.info(f"Pruned {pruned} old reminders")
-    except Exception as e:
-        logger.error(f"Error checking reminders: {e}")
 
+async def prune_reminders():
+    pruned = reminder_store.prune(days=REMINDER_PRUNE_DAYS)
+    if pruned:
+        logger.info(f"Pruned {pruned} old reminders")
 
-async def reset_daily_image_count():
-    logger.info("In reset_daily_image_count")
-    bot_state.daily_image_count = 0
 
 chatbot = get_chatbot()
 if os.getenv("BOT_NAME", None):
     chatbot.name = os.getenv("BOT_NAME")
-bot_guard = BotGuard()
+bot_guard = BotGuard(
+    max_channel_mentions=int(os.getenv("GUARD_MAX_CHANNEL_MENTIONS", GUARD_MAX_CHANNEL_MENTIONS)),
+    max_global_mentions=int(os.getenv("GUARD_MAX_GLOBAL_MENTIONS", GUARD_MAX_GLOBAL_MENTIONS)),
+    # Workers never see inbound messages, so only the gateway keeps limits
+    store=RateLimitStore() if os.getenv("GUARD_PERSIST", "false").lower() == "true" and BOT_ROLE != "worker" else None,
+    namespace=BOT_NAME,
+)
+reminder_timer = ReminderTimer(reminder_store, deliver_reminder, bot_name=chatbot.name)
+
+
+async def run_worker(token: str) -> None:
+    """Answer messages the gateway process queues, until stopped."""
+    await platform.connect_rest(token)
+    worker = JobWorker(job_queue, WORKER_JOBS, outbound, BOT_NAME, prepare=lambda message: platform.fetch_channel(message.channel_id))
+    logger.info(f"Worker process {os.getpid()} waiting for jobs")
+    try:
+        await worker.run()
+    finally:
+        await platform.close()
 
 
 def main():
     backend = os.getenv("BOT_BACKEND", "discord")
+    if BOT_ROLE != "all" and backend != "discord":
+        raise ValueError("BOT_ROLE=gateway/worker needs BOT_BACKEND=discord")
+    if BOT_ROLE == "worker":
+        asyncio.run(run_worker(os.getenv("DISCORD_BOT_TOKEN", "not_set")))
+        return
+    if BOT_ROLE == "gateway":
+        spawn_workers(int(os.getenv("BOT_WORKERS", "0")), os.path.abspath(__file__))
     if backend == "matrix":
         platform.run(os.getenv("MATRIX_PASSWORD", ""))
     else:
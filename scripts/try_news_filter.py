@@ -283,7 +283,7 @@ async def main() -> int:
     for name in feeds_to_fetch:
         url = FEEDS[name]
         emit(f"[fetch] {name}: {url}")
-        items = fetch_feed(name, url, per_feed=args.per_feed)
+        items = fetch_feed(name, url, per_feed=args.per_feed).items
         emit(f"        {len(items)} entries (capped at {args.per_feed})")
         all_items.extend(items)
 
@@ -6,22 +6,144 @@ used as LLM tools so the bot can make grounded music recommendations.
 """
 
 import asyncio
+import contextvars
 import logging
 import os
+import threading
+import time
+from contextlib import contextmanager
 from functools import lru_cache
 
 import discogs_client
 
+from src.utils.constants import DISCOGS_BACKGROUND_RESERVE, DISCOGS_RATE_LIMIT_PER_MINUTE
+from src.utils.singleflight import single_flight
+
 logger = logging.getLogger('discord')
 
 USER_AGENT = "GepettoDiscordBot/1.0"
 
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Which kind of caller the current Discogs work is for. asyncio.to_thread
+# copies the context, so the fetcher running in the worker thread sees it.
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("discogs_priority", default=INTERACTIVE)
+
+
+class DiscogsRateLimiter:
+    """
+    Process-wide token bucket for Discogs HTTP requests.
+
+    Discogs allows `limit` requests per moving minute per token, and reports
+    what's left in X-Discogs-Ratelimit-Remaining. The bucket mirrors that
+    window: capacity = limit, refilled at limit/60 per second, and re-synced
+    to the server's count after every response so other processes using the
+    same token (or our own drift) are accounted for.
+
+    Background callers (music backfill) only take a token while more than
+    `background_reserve` remain, so a tool call arriving mid-backfill still
+    finds headroom instead of queueing behind it.
+
+    Requests happen inside worker threads (the client is synchronous), so
+    acquire() blocks its thread, never the event loop.
+    """
+
+    def __init__(self, per_minute: int = DISCOGS_RATE_LIMIT_PER_MINUTE,
+                 background_reserve: int = DISCOGS_BACKGROUND_RESERVE,
+                 clock=time.monotonic, sleep=time.sleep):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+        self.background_reserve = background_reserve
+        self._set_limit(per_minute)
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+
+    def _set_limit(self, per_minute: int) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, priority: str = INTERACTIVE) -> float:
+        """Take a token if one is available to this priority; returns 0.
+        Otherwise returns how many seconds to wait before trying again."""
+        needed = 1 + (self.background_reserve if priority == BACKGROUND else 0)
+        with self._lock:
+            self._refill()
+            if self._tokens >= needed:
+                self._tokens -= 1
+                return 0.0
+            return (needed - self._tokens) / self.rate
+
+    def acquire(self, priority: str = INTERACTIVE) -> None:
+        """Block the calling thread until a token is available."""
+        while (wait := self.try_acquire(priority)) > 0:
+            logger.debug(f"[discogs] rate limit: {priority} request waiting {wait:.1f}s")
+            self._sleep(wait)
+
+    def observe(self, limit, remaining) -> None:
+        """Sync the bucket to the X-Discogs-Ratelimit(-Remaining) headers."""
+        with self._lock:
+            try:
+                if limit is not None and int(limit) > 0 and int(limit) != self.capacity:
+                    self._set_limit(int(limit))
+                if remaining is not None:
+                    self._refill()
+                    self._tokens = min(self._tokens, float(remaining))
+            except (TypeError, ValueError):
+                pass
+
+
+_limiter = DiscogsRateLimiter()
+
+
+@contextmanager
+def background_priority():
+    """Mark Discogs work started inside this block as background traffic."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _ThrottledFetcher:
+    """Wraps the client's fetcher so every HTTP request — including the lazy
+    ones triggered by attribute access on models — goes through _limiter."""
+
+    def __init__(self, fetcher, limiter: DiscogsRateLimiter):
+        self._fetcher = fetcher
+        self._limiter = limiter
+
+    def fetch(self, *args, **kwargs):
+        self._limiter.acquire(_priority.get())
+        result = self._fetcher.fetch(*args, **kwargs)
+        self._limiter.observe(getattr(self._fetcher, "rate_limit", None),
+                              getattr(self._fetcher, "rate_limit_remaining", None))
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._fetcher, name)
+
+    def __setattr__(self, name, value):
+        if name in ("_fetcher", "_limiter"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._fetcher, name, value)
+
 
 def _get_client() -> discogs_client.Client | None:
     token = os.getenv("DISCOGS_TOKEN")
     if not token:
         return None
-    return discogs_client.Client(USER_AGENT, user_token=token)
+    client = discogs_client.Client(USER_AGENT, user_token=token)
+    client._fetcher = _ThrottledFetcher(client._fetcher, _limiter)
+    return client
 
 
 def _search_artist_sync(query: str, limit: int = 5) -> str:
@@ -56,82 +178,65 @@ def _search_artist_sync(query: str, limit: int = 5) -> str:
     return output
 
 
-def _explore_artist_sync(artist_query: str) -> str:
-    """
-    Explore an artist's network on Discogs: members, side-projects, genres, key releases.
-    Accepts an artist name (searched) or numeric ID.
-    """
-    client = _get_client()
-    if not client:
-        return "Discogs is not configured (missing DISCOGS_TOKEN)."
-
-    logger.info(f"Discogs explore: artist_query='{artist_query}'")
+def _resolve_artist(client, artist_query: str):
+    """Turn a name or numeric ID into a full artist object.
 
-    # Resolve artist - by ID if numeric, otherwise search
-    artist = None
+    Returns (artist, error_message); artist is None when nothing matched
+    (error_message None) or the lookup failed (error_message set).
+    """
     if artist_query.strip().isdigit():
         logger.info(f"Discogs explore: looking up by ID {artist_query}")
         try:
             artist = client.artist(int(artist_query.strip()))
             _ = artist.name  # force fetch
+            return artist, None
         except Exception as e:
             logger.warning(f"Discogs artist lookup by ID failed: {e}")
-            return f"Could not find artist with ID {artist_query}."
-    else:
-        logger.info(f"Discogs explore: searching for '{artist_query}'")
-        try:
-            results = client.search(artist_query, type="artist")
-            if results and results.count > 0:
-                artist = results[0]
-                # Fetch the full artist object
-                artist = client.artist(artist.id)
-                logger.info(f"Discogs explore: resolved '{artist_query}' to '{artist.name}' (ID: {artist.id})")
-        except Exception as e:
-            logger.warning(f"Discogs artist search failed: {e}")
-            return f"Discogs search failed: {e}"
+            return None, f"Could not find artist with ID {artist_query}."
 
-    if not artist:
-        logger.info(f"Discogs explore: no artist found for '{artist_query}'")
-        return f"No artist found on Discogs matching '{artist_query}'."
-
-    sections = [f"## {artist.name}"]
+    logger.info(f"Discogs explore: searching for '{artist_query}'")
+    try:
+        results = client.search(artist_query, type="artist")
+        if results and results.count > 0:
+            artist = results[0]
+            # Fetch the full artist object
+            artist = client.artist(artist.id)
+            logger.info(f"Discogs explore: resolved '{artist_query}' to '{artist.name}' (ID: {artist.id})")
+            return artist, None
+    except Exception as e:
+        logger.warning(f"Discogs artist search failed: {e}")
+        return None, f"Discogs search failed: {e}"
+    return None, None
 
-    # Profile / bio
-    if hasattr(artist, "profile") and artist.profile:
-        profile = artist.profile[:500]
-        if len(artist.profile) > 500:
-            profile += "..."
-        sections.append(f"**Bio:** {profile}")
 
-    # Members (for bands) - reveals side-project potential
+def _load_profile(artist) -> str | None:
+    """The artist's bio ("" if it has none). None if Discogs errored; with a
+    cached resolve this is the first attribute read, so the first HTTP call."""
     try:
-        members = artist.members
-        if members:
-            member_names = []
-            for i, m in enumerate(members):
-                if i >= 15:
-                    break
-                name = m.name if hasattr(m, "name") else str(m)
-                member_names.append(f"{name} (ID: {m.id})")
-            sections.append("**Members:** " + ", ".join(member_names))
+        return getattr(artist, "profile", None) or ""
     except Exception:
-        pass
+        return None
 
-    # Groups this artist is in (for solo artists)
+
+def _load_related(artist, attr: str, limit: int) -> list[dict] | None:
+    """Members or groups as [{"id", "name"}]. None if Discogs errored, so a
+    transient failure isn't cached as "has no members"."""
     try:
-        groups = artist.groups
-        if groups:
-            group_names = []
-            for i, g in enumerate(groups):
-                if i >= 10:
-                    break
-                name = g.name if hasattr(g, "name") else str(g)
-                group_names.append(f"{name} (ID: {g.id})")
-            sections.append("**Also in:** " + ", ".join(group_names))
+        related = getattr(artist, attr)
+        out = []
+        for i, r in enumerate(related or []):
+            if i >= limit:
+                break
+            name = r.name if hasattr(r, "name") else str(r)
+            out.append({"id": r.id, "name": name})
+        return out
     except Exception:
-        pass
+        return None
+
 
-    # Key releases - get genres and styles from their discography
+def _load_releases(artist) -> dict | None:
+    """Genres, styles and notable releases from the first page of the
+    discography. None if the discography couldn't be fetched at all."""
     genres = set()
     styles = set()
     notable_releases = []
@@ -152,31 +257,122 @@ def _explore_artist_sync(artist_query: str) -> str:
                     title = release.title if hasattr(release, "title") else str(release)
                     year = getattr(release, "year", "")
                     year_str = f" ({year})" if year else ""
-                    # Get other artists on this release for collaboration info
                     notable_releases.append(f"{title}{year_str}")
             except Exception:
                 continue
     except Exception as e:
         logger.debug(f"Could not fetch releases for {artist.name}: {e}")
+        return None
+    return {"genres": sorted(genres), "styles": sorted(styles), "notable": notable_releases}
+
+
+# Each cached field of an artist, with its loader and the value to show when
+# the loader fails. Members/groups limits match what explore prints.
+_ARTIST_FIELDS = {
+    "profile": (_load_profile, ""),
+    "members": (lambda a: _load_related(a, "members", 15), []),
+    "groups": (lambda a: _load_related(a, "groups", 10), []),
+    "releases": (_load_releases, {"genres": [], "styles": [], "notable": []}),
+}
+
+
+def _format_artist(name: str, fields: dict) -> str:
+    sections = [f"## {name}"]
 
-    if genres:
-        sections.append("**Genres:** " + ", ".join(sorted(genres)))
-    if styles:
-        sections.append("**Styles:** " + ", ".join(sorted(styles)))
-    if notable_releases:
-        sections.append("**Key releases:** " + " | ".join(notable_releases))
+    # Profile / bio
+    profile = fields["profile"]
+    if profile:
+        short = profile[:500]
+        if len(profile) > 500:
+            short += "..."
+        sections.append(f"**Bio:** {short}")
+
+    # Members (for bands) - reveals side-project potential
+    if fields["members"]:
+        sections.append("**Members:** " + ", ".join(f"{m['name']} (ID: {m['id']})" for m in fields["members"]))
+
+    # Groups this artist is in (for solo artists)
+    if fields["groups"]:
+        sections.append("**Also in:** " + ", ".join(f"{g['name']} (ID: {g['id']})" for g in fields["groups"]))
 
-    output = "\n\n".join(sections)
-    logger.info(f"Discogs explore: returning data for '{artist.name}' — {len(sections)} sections (genres={genres}, styles={styles})")
+    releases = fields["releases"]
+    if releases["genres"]:
+        sections.append("**Genres:** " + ", ".join(releases["genres"]))
+    if releases["styles"]:
+        sections.append("**Styles:** " + ", ".join(releases["styles"]))
+    if releases["notable"]:
+        sections.append("**Key releases:** " + " | ".join(releases["notable"]))
+
+    return "\n\n".join(sections)
+
+
+def _explore_artist_sync(artist_query: str, discogs_store=None) -> str:
+    """
+    Explore an artist's network on Discogs: members, side-projects, genres, key releases.
+    Accepts an artist name (searched) or numeric ID.
+
+    With a DiscogsStore, each field is read from the cache and only the stale
+    or missing ones hit the API — a fully cached artist costs no requests.
+    """
+    client = _get_client()
+    if not client:
+        return "Discogs is not configured (missing DISCOGS_TOKEN)."
+
+    logger.info(f"Discogs explore: artist_query='{artist_query}'")
+    query_key = _query_key(artist_query)
+
+    # Resolve artist - from cache, by ID if numeric, otherwise search
+    artist = None
+    resolved = discogs_store.get("resolve", query_key) if discogs_store else None
+    if resolved is None:
+        if discogs_store and discogs_store.get("miss", query_key):
+            logger.info(f"Discogs explore: cached miss for '{artist_query}'")
+            return f"No artist found on Discogs matching '{artist_query}'."
+
+        artist, error = _resolve_artist(client, artist_query)
+        if error:
+            return error
+        if not artist:
+            logger.info(f"Discogs explore: no artist found for '{artist_query}'")
+            if discogs_store:
+                discogs_store.put("miss", query_key, True)
+            return f"No artist found on Discogs matching '{artist_query}'."
+        resolved = {"id": artist.id, "name": artist.name}
+        if discogs_store:
+            discogs_store.put("resolve", query_key, resolved)
+
+    fields = {}
+    for kind, (loader, fallback) in _ARTIST_FIELDS.items():
+        value = discogs_store.get(kind, str(resolved["id"])) if discogs_store else None
+        if value is None:
+            if artist is None:
+                artist = client.artist(resolved["id"])  # lazy; fetched on first attribute
+            value = loader(artist)
+            if value is None:
+                value = fallback
+            elif discogs_store:
+                discogs_store.put(kind, str(resolved["id"]), value)
+        fields[kind] = value
+
+    output = _format_artist(resolved["name"], fields)
+    source = "API" if artist is not None else "cache"
+    logger.info(f"Discogs explore: returning data for '{resolved['name']}' from {source} (genres={fields['releases']['genres']}, styles={fields['releases']['styles']})")
     logger.debug(f"Discogs explore response:\n{output}")
     return output
 
 
+def _query_key(query: str) -> str:
+    return query.strip().lower()
+
+
+@single_flight(key=_query_key, name="discogs:search")
 async def search_artist(query: str) -> str:
-    """Async wrapper for artist search."""
+    """Async wrapper for artist search. Concurrent identical queries share one call."""
     return await asyncio.to_thread(_search_artist_sync, query)
 
 
-async def explore_artist(artist_query: str) -> str:
-    """Async wrapper for artist exploration."""
-    return await asyncio.to_thread(_explore_artist_sync, artist_query)
+@single_flight(key=lambda q, discogs_store=None: _query_key(q), name="discogs:explore")
+async def explore_artist(artist_query: str, discogs_store=None) -> str:
+    """Async wrapper for artist exploration. Concurrent identical queries share
+    one call — explore lazily loads ~30 releases, so overlap is expensive."""
+    return await asyncio.to_thread(_explore_artist_sync, artist_query, discogs_store)
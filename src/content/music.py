@@ -16,10 +16,12 @@ import json
 import logging
 import os
 import re
+import threading
 
 import requests
 
-from src.content.discogs import USER_AGENT, _get_client
+from src.content.discogs import USER_AGENT, _get_client, background_priority
+from src.utils.constants import MUSIC_OEMBED_CONCURRENCY
 
 logger = logging.getLogger('discord')
 
@@ -51,29 +53,82 @@ class MusicParseError(Exception):
     """
 
 
-def _fetch_oembed_sync(url: str) -> dict | None:
-    """Fetch title + channel for a YouTube URL via the free oEmbed endpoint."""
+# oEmbed statuses that mean the video itself is gone or unembeddable
+# (deleted, private, bad ID) - permanent, so the URL is recorded as dead.
+OEMBED_DEAD_STATUSES = {400, 401, 403, 404}
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _oembed_session() -> requests.Session:
+    """Shared keep-alive session for oEmbed, pooled for concurrent lookups."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=MUSIC_OEMBED_CONCURRENCY)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+
+def _fetch_oembed_sync(url: str) -> tuple[dict | None, int | None]:
+    """Fetch title + channel for a YouTube URL via the free oEmbed endpoint.
+
+    Returns (metadata, status); metadata is None on any failure and status
+    is None when the request never got a response.
+    """
     try:
-        response = requests.get(
+        response = _oembed_session().get(
             "https://www.youtube.com/oembed",
             params={"url": url, "format": "json"},
-            headers={"User-Agent": USER_AGENT},
             timeout=10,
         )
     except requests.RequestException as e:
         logger.info(f"oEmbed request failed for {url}: {e}")
-        return None
+        return None, None
     if response.status_code != 200:
         # 400 = dead/private video; skip the link, it's not an error
         logger.info(f"oEmbed returned {response.status_code} for {url}")
-        return None
+        return None, response.status_code
     data = response.json()
-    return {"title": data.get("title", ""), "channel": data.get("author_name", "")}
+    return {"title": data.get("title", ""), "channel": data.get("author_name", "")}, 200
+
+
+async def fetch_oembed(url: str, music_store=None) -> dict | None:
+    """Async wrapper for the oEmbed fetch. With a MusicStore, a dead video
+    is recorded so later scans skip it."""
+    meta, status = await asyncio.to_thread(_fetch_oembed_sync, url)
+    if music_store and status in OEMBED_DEAD_STATUSES:
+        music_store.mark_dead_link(url, status)
+    return meta
+
+
+async def resolve_links(links: list[dict], music_store=None,
+                        concurrency: int = MUSIC_OEMBED_CONCURRENCY) -> None:
+    """Fetch oEmbed title/channel for a batch of link dicts, in place.
+
+    Up to `concurrency` requests run at once over the shared session. Links
+    that already carry a title (resolved ahead of time) are left alone;
+    dead/unfetchable ones are dropped from the list.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
 
+    async def resolve(link):
+        if "title" in link:
+            return True
+        async with semaphore:
+            meta = await fetch_oembed(link["url"], music_store=music_store)
+        if meta is None:
+            logger.info(f"Dropping dead/unfetchable link {link['url']}")
+            return False
+        link.update(meta)
+        return True
 
-async def fetch_oembed(url: str) -> dict | None:
-    """Async wrapper for the oEmbed fetch."""
-    return await asyncio.to_thread(_fetch_oembed_sync, url)
+    keep = await asyncio.gather(*(resolve(link) for link in links))
+    links[:] = [link for link, kept in zip(links, keep) if kept]
 
 
 async def parse_titles(links: list[dict], chatbot) -> None:
@@ -174,30 +229,36 @@ def _artist_genres_sync(artist: str, sample_releases: int = 8) -> dict:
     }
 
 
-async def artist_genres(artist: str) -> dict:
-    """Async wrapper for the Discogs genre lookup."""
-    return await asyncio.to_thread(_artist_genres_sync, artist)
+async def artist_genres(artist: str, discogs_store=None) -> dict:
+    """Async wrapper for the Discogs genre lookup.
+
+    With a DiscogsStore, found results (and "no releases found" misses) are
+    cached by lowercased artist name. Errors and a missing token are not
+    cached — they say nothing about the artist.
+    """
+    key = artist.strip().lower()
+    if discogs_store:
+        cached = discogs_store.get("genres", key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+    result = await asyncio.to_thread(_artist_genres_sync, artist)
+    if discogs_store and (result["found"] or result.get("error") == "no releases found"):
+        discogs_store.put("genres", key, result)
+    return result
 
 
-async def enrich_links(links: list[dict], chatbot, throttle_seconds: float = 1.2) -> None:
+async def enrich_links(links: list[dict], chatbot, discogs_store=None, music_store=None) -> None:
     """Run the full pipeline over a batch of link dicts, in place.
 
     Input: dicts with at least a "url" key; caller-owned keys (poster,
     timestamps) are left untouched. Adds title/channel/is_music/artist/
     collaborators/track/genres/styles. Dead links (no oEmbed) are dropped
-    from the list. Raises MusicParseError if the LLM parse fails — callers
+    from the list; links already resolved by resolve_links() are not
+    fetched again. Raises MusicParseError if the LLM parse fails — callers
     must not save anything from the batch.
     """
-    kept = []
-    for link in links:
-        meta = await fetch_oembed(link["url"])
-        if meta is None:
-            logger.info(f"Dropping dead/unfetchable link {link['url']}")
-            continue
-        link.update(meta)
-        kept.append(link)
-    links[:] = kept
-
+    await resolve_links(links, music_store=music_store)
     if not links:
         return
 
@@ -209,12 +270,15 @@ async def enrich_links(links: list[dict], chatbot, throttle_seconds: float = 1.2
         if link.get("is_music") and artist and artist not in artists:
             artists.append(artist)
 
+    # Pacing is the Discogs rate limiter's job; marking these as background
+    # lets an interactive tool call overtake a long backfill.
     lookups = {}
-    for artist in artists:
-        lookups[artist] = await artist_genres(artist)
-        status = "ok" if lookups[artist]["found"] else f"miss ({lookups[artist].get('error')})"
-        logger.info(f"Discogs genre lookup for '{artist}': {status}")
-        await asyncio.sleep(throttle_seconds)
+    with background_priority():
+        for artist in artists:
+            lookups[artist] = await artist_genres(artist, discogs_store=discogs_store)
+            status = "ok" if lookups[artist]["found"] else f"miss ({lookups[artist].get('error')})"
+            cached = " (cached)" if lookups[artist].get("cached") else ""
+            logger.info(f"Discogs genre lookup for '{artist}': {status}{cached}")
 
     for link in links:
         lookup = lookups.get(link.get("artist"), {})
@@ -0,0 +1,182 @@
+"""
+Server-wide music taste similarity.
+
+Every user who has posted music becomes a sparse TF-IDF vector over their
+artists, genres and styles (from MusicStore's materialised profile counts).
+Vectors are L2-normalised up front, so cosine similarity between two users —
+or between a user and a group's centroid — is a sparse dot product. Pure
+Python like src/embeddings: a server has tens of posters and a few thousand
+features, which is milliseconds without numpy.
+
+Weighting: tf = 1 + log(count) so one obsessive artist doesn't swamp the
+vector; smoothed idf so "Rock" (everyone) counts for less than "Slowcore".
+
+The matrix is cached per server and refreshed from per-user signatures
+(row count, max id): only users who posted since the last refresh have
+their counts re-read, then the (cheap) weighting is recomputed.
+"""
+
+import logging
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('discord')
+
+# Feature-key prefixes; also how features are shown to the LLM
+KINDS = {"artists": "artist", "genres": "genre", "styles": "style"}
+
+
+def _dot(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(feature, 0.0) for feature, weight in a.items())
+
+
+def _normalise(vector: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    if norm == 0:
+        return {}
+    return {feature: w / norm for feature, w in vector.items()}
+
+
+class TasteMatrix:
+    """User x feature TF-IDF matrix for one server, kept in sync with MusicStore."""
+
+    def __init__(self, music_store, server_id: str):
+        self.music_store = music_store
+        self.server_id = server_id
+        self._signatures: Dict[str, tuple] = {}
+        self._raw: Dict[str, Counter] = {}
+        self.vectors: Dict[str, Dict[str, float]] = {}
+        self.names: Dict[str, str] = {}
+
+    def refresh(self) -> int:
+        """Re-read users whose music rows changed and re-weight. Returns the
+        number of users re-read (0 means the cached matrix was current)."""
+        signatures = self.music_store.profile_signatures(self.server_id)
+        changed = [u for u, sig in signatures.items() if self._signatures.get(u) != sig]
+        removed = set(self._signatures) - set(signatures)
+        if not changed and not removed:
+            return 0
+
+        for user_id in removed:
+            self._raw.pop(user_id, None)
+        for user_id, counts in self.music_store.profile_counts_many(self.server_id, changed).items():
+            raw = Counter()
+            for kind, prefix in KINDS.items():
+                for value, count in counts[kind].items():
+                    raw[f"{prefix}:{value}"] = count
+            self._raw[user_id] = raw
+
+        self._signatures = signatures
+        self.names = self.music_store.user_names(self.server_id)
+        self._reweight()
+        logger.info(f"[music_taste] refreshed {len(changed)} user(s); {len(self.vectors)} users in matrix")
+        return len(changed)
+
+    def _reweight(self) -> None:
+        df: Counter = Counter()
+        for raw in self._raw.values():
+            df.update(raw.keys())
+        n = len(self._raw)
+        idf = {feature: math.log((1 + n) / (1 + count)) + 1 for feature, count in df.items()}
+        self.vectors = {
+            user_id: _normalise({f: (1 + math.log(c)) * idf[f] for f, c in raw.items() if c > 0})
+            for user_id, raw in self._raw.items()
+        }
+
+    def similarity(self, a: str, b: str) -> float:
+        """Cosine similarity between two users (0.0 if either is unknown)."""
+        return _dot(self.vectors.get(a, {}), self.vectors.get(b, {}))
+
+    def centroid(self, user_ids: List[str]) -> Dict[str, float]:
+        """Normalised mean of the given users' vectors."""
+        total: Counter = Counter()
+        for user_id in user_ids:
+            total.update(self.vectors.get(user_id, {}))
+        return _normalise(dict(total))
+
+    def nearest(self, vector: Dict[str, float], exclude: Optional[set] = None,
+                limit: int = 5) -> List[Tuple[str, float]]:
+        """Users most similar to a vector, best first."""
+        exclude = exclude or set()
+        scored = [(u, _dot(vector, v)) for u, v in self.vectors.items() if u not in exclude]
+        scored = [(u, score) for u, score in scored if score > 0]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:limit]
+
+    def shared_features(self, user_ids: List[str], limit: int = 10) -> List[str]:
+        """Features every one of the users has, strongest (by centroid weight) first."""
+        vectors = [self.vectors.get(u, {}) for u in user_ids]
+        if not vectors or not all(vectors):
+            return []
+        common = set(vectors[0]).intersection(*vectors[1:])
+        centroid = self.centroid(user_ids)
+        return sorted(common, key=lambda f: centroid.get(f, 0.0), reverse=True)[:limit]
+
+    @staticmethod
+    def top_features(vector: Dict[str, float], limit: int = 10) -> List[str]:
+        return [f for f, _ in sorted(vector.items(), key=lambda item: item[1], reverse=True)[:limit]]
+
+
+_matrices: Dict[tuple, TasteMatrix] = {}
+
+
+def get_taste_matrix(music_store, server_id: str) -> TasteMatrix:
+    """The cached matrix for a server, refreshed against the store."""
+    key = (music_store.db_path, server_id)
+    matrix = _matrices.get(key)
+    if matrix is None or matrix.music_store is not music_store:
+        matrix = _matrices[key] = TasteMatrix(music_store, server_id)
+    matrix.refresh()
+    return matrix
+
+
+def _name(matrix: TasteMatrix, user_id: str) -> str:
+    return matrix.names.get(user_id, user_id)
+
+
+def format_taste_matches(matrix: TasteMatrix, user_ids: List[str], limit: int = 5) -> str:
+    """
+    Render taste-similarity data for the LLM.
+
+    One user: their closest matches on the server, with what they share.
+    Several users: how well each fits the group's centroid, the pairwise
+    scores, the features they all share, and other posters near the group.
+    """
+    known = [u for u in user_ids if matrix.vectors.get(u)]
+    missing = [u for u in user_ids if u not in known]
+    lines = []
+    if missing:
+        lines.append("No music history for: " + ", ".join(_name(matrix, u) for u in missing))
+    if not known:
+        return "\n".join(lines) or "No music history found."
+
+    if len(known) == 1:
+        user_id = known[0]
+        lines.append(f"Closest music taste to {_name(matrix, user_id)} (cosine similarity, 0-1):")
+        matches = matrix.nearest(matrix.vectors[user_id], exclude={user_id}, limit=limit)
+        if not matches:
+            lines.append("- Nobody else on the server shares any of their artists, genres or styles.")
+        for other, score in matches:
+            shared = ", ".join(matrix.shared_features([user_id, other], limit=5)) or "nothing specific"
+            lines.append(f"- {_name(matrix, other)}: {score:.2f} (shared: {shared})")
+        return "\n".join(lines)
+
+    names = ", ".join(_name(matrix, u) for u in known)
+    centroid = matrix.centroid(known)
+    lines.append(f"Group taste for {names}:")
+    lines.append("Fit to the group centre (cosine, 0-1): " + ", ".join(
+        f"{_name(matrix, u)} {_dot(matrix.vectors[u], centroid):.2f}" for u in known))
+    pairs = [(a, b) for i, a in enumerate(known) for b in known[i + 1:]]
+    lines.append("Pairwise: " + ", ".join(
+        f"{_name(matrix, a)}/{_name(matrix, b)} {matrix.similarity(a, b):.2f}" for a, b in pairs))
+    shared = matrix.shared_features(known)
+    lines.append("Shared by everyone: " + (", ".join(shared) if shared else "nothing in common"))
+    lines.append("Centre of the group's taste: " + ", ".join(matrix.top_features(centroid)))
+    nearby = matrix.nearest(centroid, exclude=set(known), limit=limit)
+    if nearby:
+        lines.append("Other posters near the group: " + ", ".join(
+            f"{_name(matrix, u)} {score:.2f}" for u, score in nearby))
+    return "\n".join(lines)
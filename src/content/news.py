@@ -17,6 +17,8 @@ The debugging/iteration script is at scripts/try_news_filter.py.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
 import re
@@ -24,10 +26,15 @@ from dataclasses import dataclass
 
 import feedparser
 
-from src.utils.constants import DISCORD_MESSAGE_LIMIT, NEWS_CACHE_TTL_HOURS
+from src.utils.constants import DISCORD_MESSAGE_LIMIT, NEWS_CACHE_TTL_HOURS, NEWS_RESYNTH_SIMILARITY
+from src.utils.singleflight import single_flight
 
 logger = logging.getLogger("discord")
 
+# Process-lifetime tally of cache refreshes vs. synthesis calls skipped
+# because the headline set hadn't meaningfully changed.
+_resynth_stats = {"refreshes": 0, "skipped": 0}
+
 
 FEEDS = {
     "uk": "http://feeds.bbci.co.uk/news/uk/rss.xml",
@@ -60,6 +67,16 @@ class Item:
     categories: list[str]
 
 
+@dataclass
+class FeedFetch:
+    """One conditional-GET result. `not_modified` means the server answered
+    304 and `items` is empty — the caller should reuse what it cached."""
+    items: list[Item]
+    etag: str | None = None
+    modified: str | None = None
+    not_modified: bool = False
+
+
 @dataclass
 class Bulletin:
     heading: str
@@ -74,9 +91,33 @@ def clean_summary(raw: str) -> str:
     return " ".join(text.split())
 
 
-def fetch_feed(name: str, url: str, *, per_feed: int) -> list[Item]:
-    """Pull up to `per_feed` entries from a single RSS feed."""
-    parsed = feedparser.parse(url)
+def fetch_feed(
+    name: str,
+    url: str,
+    *,
+    per_feed: int,
+    etag: str | None = None,
+    modified: str | None = None,
+) -> FeedFetch:
+    """Pull up to `per_feed` entries from a single RSS feed.
+
+    Blocking (feedparser does its own HTTP) — call it via asyncio.to_thread.
+    `etag`/`modified` are the validators from the previous fetch; when the
+    feed hasn't changed the BBC answers 304 with no body.
+
+    feedparser doesn't raise on network or HTTP errors: it sets `bozo` and
+    returns no entries. That is raised here as an error, so the caller falls
+    back to the stored items instead of taking it for an empty feed.
+    """
+    parsed = feedparser.parse(url, etag=etag, modified=modified)
+    validators = {"etag": parsed.get("etag"), "modified": parsed.get("modified")}
+    if parsed.get("status") == 304:
+        return FeedFetch(items=[], not_modified=True, **validators)
+    if parsed.get("bozo") and not parsed.get("entries"):
+        exc = parsed.get("bozo_exception")
+        if isinstance(exc, Exception):
+            raise exc
+        raise RuntimeError(f"feed {name} returned no entries (status {parsed.get('status')})")
     items: list[Item] = []
     for entry in parsed.entries[:per_feed]:
         categories = [t.get("term", "") for t in entry.get("tags", []) if t.get("term")]
@@ -88,7 +129,34 @@ def fetch_feed(name: str, url: str, *, per_feed: int) -> list[Item]:
                 categories=categories,
             )
         )
-    return items
+    return FeedFetch(items=items, **validators)
+
+
+async def _fetch_feed_cached(name: str, url: str, *, per_feed: int, news_store=None) -> list[Item]:
+    """Conditional GET for one feed, off the event loop.
+
+    With a news_store, the last fetch's ETag/Last-Modified are sent and a 304
+    is answered from the stored items. A failed fetch also falls back to the
+    stored items — stale headlines beat no headlines.
+    """
+    state = news_store.get_feed_state(name) if news_store is not None else None
+    etag = state["etag"] if state else None
+    modified = state["modified"] if state else None
+    try:
+        result = await asyncio.to_thread(
+            fetch_feed, name, url, per_feed=per_feed, etag=etag, modified=modified
+        )
+    except Exception as exc:
+        logger.warning("[news:fetch] %s failed (%s)%s", name, exc, " — using stored items" if state else "")
+        return state["items"][:per_feed] if state else []
+
+    if result.not_modified and state:
+        logger.info("[news:fetch] %s not modified (304) — reusing %d stored item(s)", name, len(state["items"]))
+        return state["items"][:per_feed]
+
+    if news_store is not None and result.items:
+        news_store.save_feed_state(name, etag=result.etag, modified=result.modified, items=result.items)
+    return result.items
 
 
 def dedupe(items: list[Item]) -> list[Item]:
@@ -104,6 +172,26 @@ def dedupe(items: list[Item]) -> list[Item]:
     return out
 
 
+def fingerprint_items(items: list[Item]) -> list[str]:
+    """Order-independent fingerprint of a headline set: sorted short hashes
+    of the case-folded titles. Summaries are left out — the BBC re-words
+    standfirsts through the day without the story changing."""
+    hashes = {
+        hashlib.sha1(item.title.lower().encode("utf-8")).hexdigest()[:16]
+        for item in items
+        if item.title
+    }
+    return sorted(hashes)
+
+
+def fingerprint_similarity(a: list[str], b: list[str]) -> float:
+    """Jaccard similarity of two fingerprints. 1.0 = identical sets."""
+    set_a, set_b = set(a), set(b)
+    if not set_a and not set_b:
+        return 1.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
 def grim_match(item: Item) -> str | None:
     """Return the matched keyword if any GRIM_KEYWORD hits the item's title,
     summary, or category tags. Returns None for clean items."""
@@ -235,6 +323,29 @@ async def synthesise_bulletins(
     return bulletins
 
 
+def _news_flight_key(
+    chatbot,
+    *,
+    feeds: list[str] | None = None,
+    per_feed: int = 10,
+    max_bulletins: int = 5,
+    model: str | None = None,
+    news_store=None,
+    max_age_hours: float = NEWS_CACHE_TTL_HOURS,
+):
+    """Request identity for get_news_bulletins. The chatbot is left out —
+    bulletins are global, so it doesn't matter whose LLM client asks."""
+    return (
+        tuple(feeds) if feeds is not None else None,
+        per_feed,
+        max_bulletins,
+        model,
+        getattr(news_store, "db_path", None),
+        max_age_hours,
+    )
+
+
+@single_flight(key=_news_flight_key, name="news")
 async def get_news_bulletins(
     chatbot,
     *,
@@ -255,10 +366,18 @@ async def get_news_bulletins(
         model: optional model override passed through to chatbot.chat().
         news_store: optional NewsStore. When passed, the cache is consulted
             first and a fresh fetch is only made on miss (or stale cache).
+            The feeds are then fetched with conditional GETs, and a 304
+            reuses the items stored from the previous fetch. If the culled
+            headline set is (nearly) the one the cached bulletins were built
+            from, those bulletins are re-stamped instead of re-synthesised.
             When omitted, every call fetches fresh.
         max_age_hours: TTL passed to the store's freshness check. Ignored
             when news_store is None.
 
+    Concurrent calls with the same arguments share one fetch + synthesis
+    (single-flight), so a cold cache hit by the daily image and a tool call
+    at once costs one LLM call, not two.
+
     Returns themed bulletins in a 30-second-radio-slot voice. See ant
     gepettodiscordbot-Ed6UZ for the design context and ait
     gepetto-discord-bot-YHETx for the cache.
@@ -269,13 +388,15 @@ async def get_news_bulletins(
             return cached
 
     feed_names = feeds if feeds is not None else list(FEEDS.keys())
-    all_items: list[Item] = []
+    fetches = []
     for name in feed_names:
         url = FEEDS.get(name)
         if not url:
             logger.warning("[news:fetch] unknown feed name %r — skipping", name)
             continue
-        all_items.extend(fetch_feed(name, url, per_feed=per_feed))
+        fetches.append(_fetch_feed_cached(name, url, per_feed=per_feed, news_store=news_store))
+    # All feeds in flight at once: the refresh costs one round trip, not four.
+    all_items: list[Item] = [item for items in await asyncio.gather(*fetches) for item in items]
 
     deduped = dedupe(all_items)
     survivors = [item for item in deduped if grim_match(item) is None]
@@ -283,6 +404,25 @@ async def get_news_bulletins(
         "[news:cull] fetched=%d deduped=%d survivors=%d culled=%d",
         len(all_items), len(deduped), len(survivors), len(deduped) - len(survivors),
     )
+
+    fingerprint = fingerprint_items(survivors)
+    if news_store is not None and survivors:
+        _resynth_stats["refreshes"] += 1
+        previous = news_store.get_fingerprinted_bulletins()
+        if previous is not None:
+            cached_bulletins, cached_fingerprint = previous
+            similarity = fingerprint_similarity(fingerprint, cached_fingerprint)
+            if cached_bulletins and similarity >= NEWS_RESYNTH_SIMILARITY:
+                news_store.extend_validity()
+                _resynth_stats["skipped"] += 1
+                logger.info(
+                    "[news:synth] headlines unchanged (similarity %.2f) — extended cached bulletins; "
+                    "skipped %d/%d refreshes (%.0f%%)",
+                    similarity, _resynth_stats["skipped"], _resynth_stats["refreshes"],
+                    100 * _resynth_stats["skipped"] / _resynth_stats["refreshes"],
+                )
+                return cached_bulletins
+
     bulletins = await synthesise_bulletins(
         survivors, chatbot, max_bulletins=max_bulletins, model=model
     )
@@ -290,7 +430,11 @@ async def get_news_bulletins(
     if news_store is not None and bulletins:
         # Only cache non-empty results — a transient fetch failure (zero
         # survivors, empty LLM reply) shouldn't poison the cache.
-        news_store.save_bulletins(bulletins)
+        news_store.save_bulletins(bulletins, fingerprint=fingerprint)
+        logger.info(
+            "[news:synth] resynthesised; skipped %d/%d refreshes so far",
+            _resynth_stats["skipped"], _resynth_stats["refreshes"],
+        )
 
     return bulletins
 
@@ -1,6 +1,7 @@
 import os
 import re
 import io
+import asyncio
 import requests
 from youtube_transcript_api import YouTubeTranscriptApi
 import PyPDF2
@@ -10,6 +11,7 @@ from copy import deepcopy
 import logging
 from litellm import acompletion
 from src.utils.constants import MIN_TEXT_LENGTH_FOR_SUMMARY
+from src.utils.singleflight import single_flight
 logger = logging.getLogger('discord')  # Get the discord logger
 
 GEMINI_SCRAPER_MODEL = os.getenv("GEMINI_SCRAPER_MODEL", "openrouter/google/gemini-3-flash-preview")
@@ -112,7 +114,17 @@ def extract_video_id_and_trailing_text(input_string):
     logger.info(f"Video ID: {video_id} - Trailing text: {trailing_text}")
     return video_id, trailing_text
 
+@single_flight(name="summary:get_text")
 async def get_text(url: str) -> str:
+    """Fetch the text behind a URL (YouTube transcript, PDF or web page).
+
+    The fetch is blocking, so it runs in a worker thread; concurrent requests
+    for the same URL (a 👀 summary racing the nightly URL scan) share one.
+    """
+    return await asyncio.to_thread(_get_text_sync, url)
+
+
+def _get_text_sync(url: str) -> str:
     page_text = ""
     if is_youtube_url(url):
         video_id, trailing_text = extract_video_id_and_trailing_text(url.strip("<>"))
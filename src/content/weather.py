@@ -1,11 +1,14 @@
 import requests
 import os
+import asyncio
 import datetime
 import random
 import logging
 import json
 from zoneinfo import ZoneInfo
 
+from src.utils.singleflight import single_flight
+
 logger = logging.getLogger('discord')
 
 UK_TZ = ZoneInfo("Europe/London")
@@ -99,14 +102,7 @@ async def get_details_from_prompt(question, chatbot):
     return arguments.get("locations"), arguments.get("start_date") or today, arguments.get("end_date") or today
 
 
-async def find_lat_long_from_location(location: str) -> tuple[float, float] | None:
-    try:
-        with open("geocode_cache.json", "r") as f:
-            geocode_cache = json.load(f)
-    except FileNotFoundError:
-        geocode_cache = {}
-    if location in geocode_cache:
-        return geocode_cache[location]
+def _geocode_sync(location: str) -> tuple[float, float] | None:
     headers = {
         "User-Agent": "gepetto-discord-bot/1.0"
     }
@@ -115,19 +111,41 @@ async def find_lat_long_from_location(location: str) -> tuple[float, float] | No
     decoded = response.json()
     if len(decoded) == 0:
         return None
-    latitude = decoded[0]["lat"]
-    longitude = decoded[0]["lon"]
+    return decoded[0]["lat"], decoded[0]["lon"]
+
+
+def _load_geocode_cache() -> dict:
+    try:
+        with open("geocode_cache.json", "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+@single_flight(key=lambda location: location.strip().lower(), name="geocode")
+async def find_lat_long_from_location(location: str) -> tuple[float, float] | None:
+    geocode_cache = _load_geocode_cache()
+    if location in geocode_cache:
+        return geocode_cache[location]
+    result = await asyncio.to_thread(_geocode_sync, location)
+    if result is None:
+        return None
+    latitude, longitude = result
+    # Re-read: another location may have been geocoded while we were waiting.
+    geocode_cache = _load_geocode_cache()
     geocode_cache[location] = (latitude, longitude)
     with open("geocode_cache.json", "w") as f:
         json.dump(geocode_cache, f)
     return latitude, longitude
 
 
+@single_flight(name="met_office")
 async def get_forecast_met_office(lat: float, long: float, period: str = "daily") -> dict | None:
     """Fetch a site-specific forecast. `period` is 'daily' or 'hourly'.
 
     The hourly endpoint returns ~49 entries starting at the current hour,
-    so it covers today and tomorrow but no further.
+    so it covers today and tomorrow but no further. Concurrent requests for
+    the same point and period share one call.
     """
     api_key = os.getenv("MET_OFFICE_API_KEY")
     if not api_key:
@@ -140,7 +158,7 @@ async def get_forecast_met_office(lat: float, long: float, period: str = "daily"
     )
     headers = {"accept": "application/json", "apikey": api_key}
     try:
-        response = requests.get(url, headers=headers)
+        response = await asyncio.to_thread(requests.get, url, headers=headers)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
@@ -428,15 +446,19 @@ async def build_met_office_forecast(lat: float, long: float, dates: list[datetim
     return "\n\n".join(sections)
 
 
+@single_flight(key=lambda lat, long, dates: (lat, long), name="openweathermap")
 async def get_forecast_openweathermap(lat: float, long: float, dates: list[datetime.date]) -> dict:
     """
     https://api.openweathermap.org/data/2.5/forecast?lat=44.34&lon=10.99&appid={API key}
+
+    The 5-day payload doesn't depend on `dates`, so concurrent requests for
+    the same point share one call.
     """
     api_key = os.getenv("OPENWEATHERMAP_API_KEY")
     if api_key is None:
         raise ValueError("OPENWEATHERMAP_API_KEY is not set")
     url = f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={long}&appid={api_key}"
-    response = requests.get(url)
+    response = await asyncio.to_thread(requests.get, url)
     logger.info(f"Response: {response}")
     return response.json()
 
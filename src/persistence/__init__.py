@@ -6,8 +6,18 @@ from .activity_store import ActivityStore, UserActivity
 from .reminder_store import ReminderStore, Reminder
 from .news_store import NewsStore
 from .music_store import MusicStore, MusicEntry
+from .discogs_store import DiscogsStore
+from .artist_graph_store import ArtistGraphStore
+from .backfill_store import BackfillStore
+from .message_archive_store import MessageArchiveStore, ArchivedMessage
+from .digest_store import DigestStore
+from .server_config_store import ServerConfigStore, ServerConfig
+from .job_queue_store import JobQueueStore
+from .schedule_store import ScheduleStore, ScheduleState, ScheduleRun
+from .rate_limit_store import RateLimitStore
+from .daily_counter_store import DailyCounterStore
 
-__all__ = ['JSONStore', 'ImageStore', 'ImageEntry', 'GLOBAL_SERVER_ID', 'MemoryStore', 'Memory', 'UserBio', 'UrlStore', 'UrlEntry', 'ActivityStore', 'UserActivity', 'ReminderStore', 'Reminder', 'NewsStore', 'MusicStore', 'MusicEntry', 'get_backup_stores']
+__all__ = ['JSONStore', 'ImageStore', 'ImageEntry', 'GLOBAL_SERVER_ID', 'MemoryStore', 'Memory', 'UserBio', 'UrlStore', 'UrlEntry', 'ActivityStore', 'UserActivity', 'ReminderStore', 'Reminder', 'NewsStore', 'MusicStore', 'MusicEntry', 'DiscogsStore', 'ArtistGraphStore', 'BackfillStore', 'MessageArchiveStore', 'ArchivedMessage', 'DigestStore', 'ServerConfigStore', 'ServerConfig', 'JobQueueStore', 'ScheduleStore', 'ScheduleState', 'ScheduleRun', 'RateLimitStore', 'DailyCounterStore', 'get_backup_stores']
 
 
 def get_backup_stores(db_path: str = './data/gepetto.db') -> list:
@@ -0,0 +1,246 @@
+"""
+SQLite-backed artist relationship graph for music discovery.
+
+Nodes are artists (keyed by lowercased name, Discogs "(2)" disambiguation
+suffixes stripped); edges are undirected, stored in both directions:
+
+- "member":  band <-> member, from cached Discogs members/groups data
+- "collab":  artists credited together on a posted track (the artist +
+             collaborators parse_titles extracts); count = times seen
+
+Neighbourhood queries walk out a few hops from seed artists, one indexed
+lookup per hop, scoring candidates by edge weight with a per-hop decay —
+so a playlist request gets dozens of adjacent artists without touching
+the Discogs API.
+
+Global (server-agnostic), like the Discogs cache: who's in which band is
+the same everywhere. Derived data, so no backup support — rebuild() fills
+it from music_history and the Discogs cache.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.constants import ARTIST_GRAPH_EDGE_WEIGHTS, ARTIST_GRAPH_HOP_DECAY
+
+logger = logging.getLogger(__name__)
+
+_DISAMBIGUATION_RE = re.compile(r"\s+\(\d+\)$")
+
+
+def clean_artist_name(name: str) -> str:
+    """Strip Discogs' "Low (3)" disambiguation suffix and whitespace."""
+    return _DISAMBIGUATION_RE.sub("", (name or "").strip())
+
+
+def artist_key(name: str) -> str:
+    return clean_artist_name(name).lower()
+
+
+class ArtistGraphStore:
+    """SQLite-based artist graph: members, groups and collaborators."""
+
+    def __init__(self, db_path: str = './data/gepetto.db'):
+        parent = os.path.dirname(db_path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create tables and indexes if they do not exist."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS artist_nodes (
+                    key TEXT PRIMARY KEY,
+                    name TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS artist_edges (
+                    a TEXT NOT NULL,
+                    b TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (a, b, kind)
+                )
+            """)
+            conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection."""
+        return sqlite3.connect(self.db_path)
+
+    def _add_edges(self, conn: sqlite3.Connection, pairs: Iterable[Tuple[str, str]], kind: str,
+                   accumulate: bool) -> int:
+        """Write undirected edges inside the caller's transaction.
+
+        accumulate=True bumps the count on repeat sightings (collabs);
+        otherwise a repeat is a no-op (membership is a fact, not a tally).
+        """
+        nodes = {}
+        rows = []
+        for a, b in pairs:
+            a, b = clean_artist_name(a), clean_artist_name(b)
+            if not a or not b or a.lower() == b.lower():
+                continue
+            nodes[a.lower()] = a
+            nodes[b.lower()] = b
+            rows.append((a.lower(), b.lower(), kind))
+            rows.append((b.lower(), a.lower(), kind))
+        if not rows:
+            return 0
+
+        conn.executemany("INSERT OR IGNORE INTO artist_nodes (key, name) VALUES (?, ?)", nodes.items())
+        if accumulate:
+            conn.executemany(
+                """
+                INSERT INTO artist_edges (a, b, kind, count) VALUES (?, ?, ?, 1)
+                ON CONFLICT (a, b, kind) DO UPDATE SET count = count + 1
+                """,
+                rows
+            )
+        else:
+            conn.executemany("INSERT OR IGNORE INTO artist_edges (a, b, kind) VALUES (?, ?, ?)", rows)
+        return len(rows) // 2
+
+    def add_collaborations(self, credits: Iterable[Tuple[Optional[str], List[str]]]) -> int:
+        """
+        Record artists credited together. Each item is (artist, collaborators)
+        for one track; every pair among them gets a collab edge.
+        Returns the number of pairs recorded.
+        """
+        pairs = []
+        for artist, collaborators in credits:
+            names = [n for n in [artist, *(collaborators or [])] if n]
+            pairs.extend((x, y) for i, x in enumerate(names) for y in names[i + 1:])
+        with self._get_connection() as conn:
+            added = self._add_edges(conn, pairs, "collab", accumulate=True)
+            conn.commit()
+        return added
+
+    def add_memberships(self, memberships: Iterable[Tuple[str, str]]) -> int:
+        """Record (band, member) pairs. Returns the number of pairs given."""
+        with self._get_connection() as conn:
+            added = self._add_edges(conn, memberships, "member", accumulate=False)
+            conn.commit()
+        return added
+
+    def sync_from_discogs(self, discogs_store) -> int:
+        """
+        Add member edges for every artist whose members or groups are in the
+        Discogs cache. Idempotent; returns the number of pairs seen.
+        """
+        names = {str(v["id"]): v["name"] for _, v in discogs_store.items("resolve")}
+        pairs = []
+        for artist_id, members in discogs_store.items("members"):
+            if artist_id in names:
+                pairs.extend((names[artist_id], m["name"]) for m in members)
+        for artist_id, groups in discogs_store.items("groups"):
+            if artist_id in names:
+                pairs.extend((g["name"], names[artist_id]) for g in groups)
+        return self.add_memberships(pairs)
+
+    def rebuild(self, music_store, discogs_store=None) -> Dict[str, int]:
+        """Recreate the graph from music_history collaborators and the Discogs cache."""
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM artist_edges")
+            conn.execute("DELETE FROM artist_nodes")
+            conn.commit()
+        collabs = self.add_collaborations(music_store.all_credits())
+        members = self.sync_from_discogs(discogs_store) if discogs_store else 0
+        logger.info(f"Rebuilt artist graph: {collabs} collab pairs, {members} member pairs")
+        return {"collab": collabs, "member": members}
+
+    def neighbourhood(self, seeds: Dict[str, float], max_hops: int = 2,
+                      limit: int = 25) -> List[dict]:
+        """
+        Artists near the seeds, best first.
+
+        seeds maps artist name -> importance (e.g. how often the user posted
+        them). A path's weight is seed importance x the product of its edge
+        weights x ARTIST_GRAPH_HOP_DECAY per hop beyond the first; a
+        candidate's score sums every shortest path reaching it, so an artist
+        linked to several of the seeds outranks one linked to a single seed.
+
+        Returns [{"name", "score", "hops", "via": [(name, kind), ...]}] where
+        via is the strongest path from a seed (seed first).
+        """
+        seed_keys = {artist_key(name): weight for name, weight in seeds.items() if artist_key(name)}
+        if not seed_keys:
+            return []
+
+        # frontier: key -> (path weight, path) for the strongest path found
+        frontier = {key: (weight, [(key, "seed")]) for key, weight in seed_keys.items()}
+        visited = set(seed_keys)
+        scores: Dict[str, float] = {}
+        best: Dict[str, Tuple[float, list]] = {}
+
+        with self._get_connection() as conn:
+            for hop in range(1, max_hops + 1):
+                if not frontier:
+                    break
+                # frontier weights already carry the earlier hops' decay
+                decay = 1.0 if hop == 1 else ARTIST_GRAPH_HOP_DECAY
+                keys = list(frontier)
+                edges = []
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    cursor = conn.execute(
+                        f"SELECT a, b, kind, count FROM artist_edges WHERE a IN ({placeholders})",
+                        chunk
+                    )
+                    edges.extend(cursor.fetchall())
+
+                next_frontier: Dict[str, Tuple[float, list]] = {}
+                for a, b, kind, count in edges:
+                    # edges run both ways; don't walk back to (and re-score)
+                    # seeds or artists already reached at an earlier hop
+                    if b in visited:
+                        continue
+                    weight, path = frontier[a]
+                    w = weight * self._edge_weight(kind, count) * decay
+                    scores[b] = scores.get(b, 0.0) + w
+                    if b not in best or w > best[b][0]:
+                        best[b] = (w, path + [(b, kind)])
+                    if b not in next_frontier or w > next_frontier[b][0]:
+                        next_frontier[b] = (w, path + [(b, kind)])
+                visited.update(next_frontier)
+                frontier = next_frontier
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            names = self._names(conn, {step for key, _ in ranked for step, _ in best[key][1]})
+
+        return [
+            {
+                "name": names.get(key, key),
+                "score": score,
+                "hops": len(best[key][1]) - 1,
+                "via": [(names.get(k, k), kind) for k, kind in best[key][1]],
+            }
+            for key, score in ranked
+        ]
+
+    @staticmethod
+    def _edge_weight(kind: str, count: int) -> float:
+        base = ARTIST_GRAPH_EDGE_WEIGHTS.get(kind, 0.5)
+        if kind == "collab":
+            # Repeat collaborations approach the full weight: 1x = 50%, 2x = 75%...
+            return base * (1 - 0.5 ** count)
+        return base
+
+    @staticmethod
+    def _names(conn: sqlite3.Connection, keys: set) -> Dict[str, str]:
+        keys = list(keys)
+        names = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = conn.execute(f"SELECT key, name FROM artist_nodes WHERE key IN ({placeholders})", chunk)
+            names.update(cursor.fetchall())
+        return names
@@ -0,0 +1,220 @@
+"""
+SQLite-backed checkpoints for long-running history backfills.
+
+A backfill (e.g. !musicbackfill over a year of a channel) can take far
+longer than the bot stays up between deploys. Each run is a job row; each
+channel it covers has a cursor — the timestamp of the newest message whose
+links are fully dealt with — so a restarted job rescans only what's left.
+Chunks whose processing failed are kept with their items so a resume can
+retry them without rescanning their stretch of history.
+
+Jobs are per server and tagged with a kind ("music"), so other batch jobs
+can checkpoint the same way. Operational state, not user data: no backup
+support.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillStore:
+    """SQLite-based job, per-channel cursor and chunk records for backfills."""
+
+    def __init__(self, db_path: str = './data/gepetto.db'):
+        parent = os.path.dirname(db_path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create tables if they do not exist."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    server_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    since TIMESTAMP NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    stats_json TEXT NOT NULL DEFAULT '{}',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_channels (
+                    job_id INTEGER NOT NULL,
+                    channel_id TEXT NOT NULL,
+                    cursor TIMESTAMP,
+                    done INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (job_id, channel_id)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_chunks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id INTEGER NOT NULL,
+                    channel_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    items_json TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection."""
+        return sqlite3.connect(self.db_path)
+
+    def start_job(self, server_id: str, kind: str, since: datetime, channel_ids: List[str]) -> int:
+        """
+        Create a running job covering the given channels. Any earlier
+        unfinished job of the same kind for the server is marked superseded.
+        Returns the new job ID.
+        """
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE backfill_jobs SET status = 'superseded', updated_at = ?
+                WHERE server_id = ? AND kind = ? AND status = 'running'
+                """,
+                (datetime.now().isoformat(), server_id, kind)
+            )
+            cursor = conn.execute(
+                "INSERT INTO backfill_jobs (server_id, kind, since) VALUES (?, ?, ?)",
+                (server_id, kind, since.isoformat())
+            )
+            job_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO backfill_channels (job_id, channel_id) VALUES (?, ?)",
+                [(job_id, channel_id) for channel_id in channel_ids]
+            )
+            conn.commit()
+        return job_id
+
+    def get_resumable_job(self, server_id: str, kind: str) -> Optional[dict]:
+        """
+        The newest unfinished job of this kind, or None.
+
+        Returns {"id", "since", "stats", "channels": {channel_id: {"cursor", "done"}}}.
+        """
+        with self._get_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT id, since, stats_json FROM backfill_jobs
+                WHERE server_id = ? AND kind = ? AND status = 'running'
+                ORDER BY id DESC LIMIT 1
+                """,
+                (server_id, kind)
+            ).fetchone()
+            if not row:
+                return None
+            job_id, since, stats_json = row
+            channels = conn.execute(
+                "SELECT channel_id, cursor, done FROM backfill_channels WHERE job_id = ?",
+                (job_id,)
+            ).fetchall()
+
+        return {
+            "id": job_id,
+            "since": datetime.fromisoformat(since),
+            "stats": json.loads(stats_json),
+            "channels": {
+                channel_id: {
+                    "cursor": datetime.fromisoformat(cursor) if cursor else None,
+                    "done": bool(done),
+                }
+                for channel_id, cursor, done in channels
+            },
+        }
+
+    def checkpoint(self, job_id: int, channel_id: str, cursor: Optional[datetime] = None,
+                   done: bool = False, stats: Optional[dict] = None) -> None:
+        """
+        Advance a channel's cursor (and/or mark it done), adding any stats
+        deltas to the job's running totals, in one transaction.
+        """
+        now = datetime.now().isoformat()
+        with self._get_connection() as conn:
+            if cursor is not None:
+                conn.execute(
+                    "UPDATE backfill_channels SET cursor = ? WHERE job_id = ? AND channel_id = ?",
+                    (cursor.isoformat(), job_id, channel_id)
+                )
+            if done:
+                conn.execute(
+                    "UPDATE backfill_channels SET done = 1 WHERE job_id = ? AND channel_id = ?",
+                    (job_id, channel_id)
+                )
+            if stats:
+                self._add_stats(conn, job_id, stats)
+            conn.execute("UPDATE backfill_jobs SET updated_at = ? WHERE id = ?", (now, job_id))
+            conn.commit()
+
+    def record_failed_chunk(self, job_id: int, channel_id: str, items: List[Any]) -> int:
+        """Keep a chunk that failed processing so a resume can retry it. Returns its ID."""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO backfill_chunks (job_id, channel_id, status, items_json) VALUES (?, ?, 'failed', ?)",
+                (job_id, channel_id, json.dumps(items))
+            )
+            conn.commit()
+            return cursor.lastrowid
+
+    def failed_chunks(self, job_id: int) -> List[dict]:
+        """Failed chunks for a job: [{"id", "channel_id", "items"}], oldest first."""
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, channel_id, items_json FROM backfill_chunks
+                WHERE job_id = ? AND status = 'failed' ORDER BY id
+                """,
+                (job_id,)
+            ).fetchall()
+        return [{"id": chunk_id, "channel_id": channel_id, "items": json.loads(items_json)}
+                for chunk_id, channel_id, items_json in rows]
+
+    def mark_chunk_done(self, chunk_id: int, stats: Optional[dict] = None) -> None:
+        """Mark a previously failed chunk as processed, adding any stats deltas."""
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT job_id FROM backfill_chunks WHERE id = ?", (chunk_id,)).fetchone()
+            conn.execute(
+                "UPDATE backfill_chunks SET status = 'done', items_json = '[]', updated_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), chunk_id)
+            )
+            if row and stats:
+                self._add_stats(conn, row[0], stats)
+            conn.commit()
+
+    def stats(self, job_id: int) -> dict:
+        """A job's running totals."""
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT stats_json FROM backfill_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def finish_job(self, job_id: int) -> None:
+        """Mark a job finished; it can no longer be resumed."""
+        with self._get_connection() as conn:
+            conn.execute(
+                "UPDATE backfill_jobs SET status = 'done', updated_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), job_id)
+            )
+            conn.commit()
+
+    @staticmethod
+    def _add_stats(conn: sqlite3.Connection, job_id: int, deltas: dict) -> None:
+        row = conn.execute("SELECT stats_json FROM backfill_jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row:
+            return
+        stats = json.loads(row[0])
+        for key, delta in deltas.items():
+            stats[key] = stats.get(key, 0) + delta
+        conn.execute("UPDATE backfill_jobs SET stats_json = ? WHERE id = ?", (json.dumps(stats), job_id))
@@ -0,0 +1,70 @@
+"""
+SQLite-backed daily counters, shared by every process using the database.
+
+Budgets such as MAX_DAILY_IMAGES used to be counted in memory, so with
+BOT_ROLE=gateway each worker process kept its own count and the budget was
+multiplied by BOT_WORKERS. A counter here is one row per (name, day),
+bumped atomically, so it needs no reset job: a new day starts a new row
+(a few hundred tiny rows a year, so they are kept). Operational data: no
+backup support.
+"""
+
+import logging
+import os
+import sqlite3
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+
+class DailyCounterStore:
+    """SQLite-based storage for per-day counters."""
+
+    def __init__(self, db_path: str = './data/gepetto.db'):
+        parent = os.path.dirname(db_path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create table if it does not exist."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS daily_counters (
+                    name TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (name, day)
+                )
+            """)
+            conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection."""
+        return sqlite3.connect(self.db_path)
+
+    def increment(self, name: str, day: date) -> int:
+        """Add one to a counter for the day. Returns the new count."""
+        with self._get_connection() as conn:
+            (count,) = conn.execute(
+                """
+                INSERT INTO daily_counters (name, day, count) VALUES (?, ?, 1)
+                ON CONFLICT(name, day) DO UPDATE SET count = count + 1
+                RETURNING count
+                """,
+                (name, day.isoformat())
+            ).fetchone()
+            conn.commit()
+        return count
+
+    def get(self, name: str, day: date) -> int:
+        """A counter's value for the day (0 if never bumped)."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT count FROM daily_counters WHERE name = ? AND day = ?",
+                (name, day.isoformat())
+            ).fetchone()
+        return row[0] if row else 0
+
@@ -0,0 +1,217 @@
+"""
+SQLite-backed rolling digests of channel chat, for instant catch-ups.
+
+A background task summarises each channel's chat as it ages into short
+digests (a few bullets per hour of chat). A "catch me up" then composes its
+answer from the stored digests plus a live tail of newer messages, instead
+of re-reading and re-summarising the same hours for every person who asks.
+
+Each channel has a coverage range [covered_from, through]: every message in
+it is reflected in some digest. Messages after `through` are the live tail.
+As blocks of hours end, their digests are rolled up into one per channel
+(see rollup_groups()/roll_up()), so a long catch-up reads a handful of
+coarse digests rather than one per hour.
+Derived from chat history and cheap to rebuild: no backup support.
+"""
+
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _iso(dt: datetime) -> str:
+    """Sortable UTC text, whole seconds; naive values are taken as local time."""
+    return dt.astimezone(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def _digest_from_row(row) -> dict:
+    digest_id, channel_id, channel_name, period_start, period_end, message_count, digest = row
+    return {
+        "id": digest_id,
+        "channel_id": channel_id,
+        "channel_name": channel_name,
+        "period_start": datetime.fromisoformat(period_start),
+        "period_end": datetime.fromisoformat(period_end),
+        "message_count": message_count,
+        "digest": digest,
+    }
+
+
+class DigestStore:
+    """SQLite-based per-channel chat digests with coverage watermarks."""
+
+    def __init__(self, db_path: str = './data/gepetto.db'):
+        parent = os.path.dirname(db_path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create tables if they do not exist."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS channel_digests (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    server_id TEXT NOT NULL,
+                    channel_id TEXT NOT NULL,
+                    channel_name TEXT NOT NULL,
+                    period_start TEXT NOT NULL,
+                    period_end TEXT NOT NULL,
+                    message_count INTEGER NOT NULL,
+                    digest TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_channel_digests_server_end
+                ON channel_digests(server_id, period_end)
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS digest_coverage (
+                    channel_id TEXT PRIMARY KEY,
+                    server_id TEXT NOT NULL,
+                    covered_from TEXT NOT NULL,
+                    through TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection."""
+        return sqlite3.connect(self.db_path)
+
+    def save(self, server_id: str, channel_id: str, channel_name: str, digests: List[dict],
+             since: datetime, through: datetime) -> None:
+        """
+        Store a channel's digests for (since, through] and extend its coverage,
+        in one transaction. Each digest is {"period_start", "period_end",
+        "message_count", "digest"}. If `since` is after the current coverage
+        ends (the bot was away too long to catch up), coverage restarts there.
+        """
+        since_iso, through_iso = _iso(since), _iso(through)
+        with self._get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO channel_digests
+                    (server_id, channel_id, channel_name, period_start, period_end, message_count, digest)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(server_id, channel_id, channel_name, _iso(d["period_start"]), _iso(d["period_end"]),
+                  d["message_count"], d["digest"]) for d in digests]
+            )
+            row = conn.execute(
+                "SELECT through FROM digest_coverage WHERE channel_id = ?", (channel_id,)
+            ).fetchone()
+            if row and since_iso <= row[0]:
+                conn.execute(
+                    "UPDATE digest_coverage SET through = MAX(through, ?) WHERE channel_id = ?",
+                    (through_iso, channel_id)
+                )
+            else:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO digest_coverage (channel_id, server_id, covered_from, through)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (channel_id, server_id, since_iso, through_iso)
+                )
+            conn.commit()
+
+    def coverage(self, server_id: str) -> Dict[str, dict]:
+        """{channel_id: {"covered_from", "through"}} for the server's channels, as aware UTC datetimes."""
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                "SELECT channel_id, covered_from, through FROM digest_coverage WHERE server_id = ?",
+                (server_id,)
+            ).fetchall()
+        return {
+            channel_id: {"covered_from": datetime.fromisoformat(covered_from),
+                         "through": datetime.fromisoformat(through)}
+            for channel_id, covered_from, through in rows
+        }
+
+    def digests(self, server_id: str, channel_ids: List[str], since: datetime) -> List[dict]:
+        """
+        Digests for these channels whose period ends after `since`, oldest
+        first: [{"id", "channel_id", "channel_name", "period_start",
+        "period_end", "message_count", "digest"}].
+        """
+        if not channel_ids:
+            return []
+        placeholders = ",".join("?" * len(channel_ids))
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT id, channel_id, channel_name, period_start, period_end, message_count, digest
+                FROM channel_digests
+                WHERE server_id = ? AND period_end > ? AND channel_id IN ({placeholders})
+                ORDER BY period_start
+                """,
+                (server_id, _iso(since), *channel_ids)
+            ).fetchall()
+        return [_digest_from_row(row) for row in rows]
+
+    def rollup_groups(self, server_id: str, block_hours: int, before: datetime) -> List[List[dict]]:
+        """
+        The server's digests grouped per channel into block_hours blocks
+        (aligned to UTC midnight) by when they start, keeping only blocks
+        that ended by `before` and still hold more than one digest: the
+        groups roll_up() can merge. Digests are as from digests().
+        """
+        block = timedelta(hours=block_hours)
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, channel_id, channel_name, period_start, period_end, message_count, digest
+                FROM channel_digests
+                WHERE server_id = ? AND period_start < ?
+                ORDER BY channel_id, period_start
+                """,
+                (server_id, _iso(before))
+            ).fetchall()
+        groups: Dict[tuple, List[dict]] = {}
+        for row in rows:
+            digest = _digest_from_row(row)
+            block_start = EPOCH + (digest["period_start"] - EPOCH) // block * block
+            if block_start + block <= before:
+                groups.setdefault((digest["channel_id"], block_start), []).append(digest)
+        return [group for group in groups.values() if len(group) > 1]
+
+    def roll_up(self, server_id: str, digests: List[dict], merged: dict) -> None:
+        """Replace one channel's digests (a group from rollup_groups()) with
+        a single merged digest, in one transaction."""
+        first = digests[0]
+        with self._get_connection() as conn:
+            conn.executemany("DELETE FROM channel_digests WHERE id = ?", [(d["id"],) for d in digests])
+            conn.execute(
+                """
+                INSERT INTO channel_digests
+                    (server_id, channel_id, channel_name, period_start, period_end, message_count, digest)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (server_id, first["channel_id"], first["channel_name"], _iso(merged["period_start"]),
+                 _iso(merged["period_end"]), merged["message_count"], merged["digest"])
+            )
+            conn.commit()
+
+    def prune(self, older_than: datetime) -> int:
+        """Delete digests that ended before `older_than`, moving coverage up. Returns rows deleted."""
+        horizon = _iso(older_than)
+        with self._get_connection() as conn:
+            deleted = conn.execute(
+                "DELETE FROM channel_digests WHERE period_end < ?", (horizon,)
+            ).rowcount
+            conn.execute(
+                "UPDATE digest_coverage SET covered_from = ? WHERE covered_from < ?", (horizon, horizon)
+            )
+            conn.commit()
+        if deleted:
+            logger.info(f"Pruned {deleted} channel digests")
+        return deleted
@@ -0,0 +1,128 @@
+"""
+SQLite-backed cache of Discogs artist data.
+
+Discogs lookups are slow (explore_artist lazy-loads ~30 releases, each a
+separate request) and rate-limited, while the answers barely change: a band's
+members and back catalogue are the same next week. So each piece of an
+artist's data is cached separately, with its own TTL:
+
+- "resolve":  search query -> {"id", "name"} (which artist a name means)
+- "profile":  artist id -> bio text
+- "members":  artist id -> [{"id", "name"}] (people in a band)
+- "groups":   artist id -> [{"id", "name"}] (bands a person is in)
+- "releases": artist id -> {"genres", "styles", "notable"}
+- "genres":   artist name -> music.artist_genres() result
+- "miss":     search query -> true (a cached "no such artist")
+
+Global (server-agnostic) like the news cache — Discogs facts are the same for
+everyone. No backup support: it's a cache, it refills itself.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+from src.utils.constants import DISCOGS_CACHE_TTL_DAYS
+
+logger = logging.getLogger(__name__)
+
+
+class DiscogsStore:
+    """SQLite-based cache of Discogs artist lookups, one row per (kind, key)."""
+
+    def __init__(self, db_path: str = './data/gepetto.db'):
+        parent = os.path.dirname(db_path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create table if it does not exist."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS discogs_cache (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value_json TEXT NOT NULL,
+                    fetched_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )
+            """)
+            conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection."""
+        return sqlite3.connect(self.db_path)
+
+    def get(self, kind: str, key: str, max_age_days: Optional[float] = None) -> Optional[Any]:
+        """
+        Return the cached value for (kind, key), or None if absent or stale.
+
+        max_age_days defaults to the kind's entry in DISCOGS_CACHE_TTL_DAYS.
+        """
+        if max_age_days is None:
+            max_age_days = DISCOGS_CACHE_TTL_DAYS[kind]
+
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT value_json, fetched_at FROM discogs_cache WHERE kind = ? AND key = ?",
+                (kind, key)
+            )
+            row = cursor.fetchone()
+
+        if not row:
+            return None
+        value_json, fetched_at = row
+        try:
+            fetched_at = datetime.fromisoformat(fetched_at)
+            value = json.loads(value_json)
+        except (TypeError, ValueError):
+            logger.warning(f"[discogs_cache] unreadable {kind} entry for {key!r} - treating as miss")
+            return None
+
+        if datetime.now() - fetched_at > timedelta(days=max_age_days):
+            return None
+        return value
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        """Store a value for (kind, key), replacing any previous one."""
+        with self._get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO discogs_cache (kind, key, value_json, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(value), datetime.now().isoformat())
+            )
+            conn.commit()
+
+    def items(self, kind: str) -> List[Tuple[str, Any]]:
+        """Every (key, value) cached for a kind, stale or not, skipping unreadable rows."""
+        with self._get_connection() as conn:
+            cursor = conn.execute("SELECT key, value_json FROM discogs_cache WHERE kind = ?", (kind,))
+            rows = cursor.fetchall()
+
+        result = []
+        for key, value_json in rows:
+            try:
+                result.append((key, json.loads(value_json)))
+            except (TypeError, ValueError):
+                continue
+        return result
+
+    def prune(self) -> int:
+        """Delete entries older than their kind's TTL. Returns count deleted."""
+        deleted = 0
+        with self._get_connection() as conn:
+            for kind, days in DISCOGS_CACHE_TTL_DAYS.items():
+                cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+                cursor = conn.execute(
+                    "DELETE FROM discogs_cache WHERE kind = ? AND fetched_at < ?",
+                    (kind, cutoff)
+                )
+                deleted += cursor.rowcount
+            conn.commit()
+        return deleted
@@ -0,0 +1,156 @@
+"""
+SQLite-backed job queue shared by the gateway and worker processes.
+
+In the split deployment (BOT_ROLE=gateway / BOT_ROLE=worker) the gateway
+enqueues messages to answer on the "inbound" queue and workers enqueue the
+replies they produce on the "outbound" queue. Jobs are claimed atomically
+with a lease: a job whose worker died mid-run becomes claimable again once
+its lease runs out, up to max_attempts claims. Finished jobs are deleted;
+jobs that used up their attempts are kept as 'failed' until pruned.
+Operational data, not chat history: no backup support.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from src.utils.constants import JOB_QUEUE_LEASE_SECONDS, JOB_QUEUE_MAX_ATTEMPTS
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueStore:
+    """SQLite-based durable job queue."""
+
+    def __init__(self, db_path: str = './data/gepetto.db'):
+        parent = os.path.dirname(db_path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create table and index if they do not exist."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    queue TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    claimed_by TEXT,
+                    claimed_at TIMESTAMP,
+                    error TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_job_queue_next
+                ON job_queue(queue, status, id)
+            """)
+            conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection."""
+        return sqlite3.connect(self.db_path)
+
+    def enqueue(self, queue: str, payload: dict) -> int:
+        """Add a job to the back of a queue and return its id."""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO job_queue (queue, payload, created_at) VALUES (?, ?, ?)",
+                (queue, json.dumps(payload), datetime.now())
+            )
+            conn.commit()
+            return cursor.lastrowid or 0
+
+    def claim(self, queue: str, worker_id: str, lease_seconds: int = JOB_QUEUE_LEASE_SECONDS,
+              max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS) -> Optional[Tuple[int, dict]]:
+        """Claim the oldest available job in a queue: (id, payload), or None if there is none.
+
+        Available means pending, or claimed by a worker whose lease has run out.
+        """
+        now = datetime.now()
+        with self._get_connection() as conn:
+            # One statement, so two processes can't claim the same job
+            row = conn.execute(
+                """
+                UPDATE job_queue
+                SET status = 'claimed', claimed_by = ?, claimed_at = ?, attempts = attempts + 1
+                WHERE id = (
+                    SELECT id FROM job_queue
+                    WHERE queue = ? AND attempts < ?
+                      AND (status = 'pending' OR (status = 'claimed' AND claimed_at < ?))
+                    ORDER BY id LIMIT 1
+                )
+                RETURNING id, payload
+                """,
+                (worker_id, now, queue, max_attempts, now - timedelta(seconds=lease_seconds))
+            ).fetchone()
+            conn.commit()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def complete(self, job_id: int) -> None:
+        """Remove a finished job."""
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM job_queue WHERE id = ?", (job_id,))
+            conn.commit()
+
+    def fail(self, job_id: int, error: str, retry: bool = False,
+             max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS) -> None:
+        """Record a failed run; with retry, put the job back unless it has used up its attempts."""
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE job_queue
+                SET status = CASE WHEN ? AND attempts < ? THEN 'pending' ELSE 'failed' END,
+                    claimed_by = NULL, error = ?
+                WHERE id = ?
+                """,
+                (int(retry), max_attempts, error[:1000], job_id)
+            )
+            conn.commit()
+
+    def is_open(self, job_id: int, lease_seconds: int = JOB_QUEUE_LEASE_SECONDS,
+                max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS) -> bool:
+        """Whether a job may still run: pending, being run, or claimable again.
+        False once it has completed or failed for good."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT 1 FROM job_queue
+                WHERE id = ? AND (status = 'pending'
+                                  OR (status = 'claimed' AND (claimed_at >= ? OR attempts < ?)))
+                """,
+                (job_id, datetime.now() - timedelta(seconds=lease_seconds), max_attempts)
+            ).fetchone()
+        return row is not None
+
+    def depth(self, queue: str) -> int:
+        """Jobs waiting or running in a queue."""
+        with self._get_connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM job_queue WHERE queue = ? AND status IN ('pending', 'claimed')",
+                (queue,)
+            ).fetchone()[0]
+
+    def prune(self, hours: int = 24, max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS) -> int:
+        """Delete failed jobs (and claimed ones that can never be retried) older than this."""
+        cutoff = datetime.now() - timedelta(hours=hours)
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                """
+                DELETE FROM job_queue
+                WHERE created_at < ? AND (status = 'failed' OR (status = 'claimed' AND attempts >= ?))
+                """,
+                (cutoff, max_attempts)
+            )
+            conn.commit()
+            return cursor.rowcount
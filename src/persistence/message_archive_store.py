@@ -0,0 +1,286 @@
+"""
+SQLite-backed archive of chat messages, for batch jobs to read locally.
+
+Every daily job (memories, URLs, music, catch-up, chat image) used to
+re-read its window of history over REST, capped at a few hundred messages.
+With the archive enabled the bot records each message it sees, and a gap
+filler re-reads only what was missed while it was offline.
+
+Each channel has a coverage range [low_water, high_water]: the archive
+holds *every* message in the channel between those times. The gap filler
+extends it; live messages only advance high_water once the channel has
+been filled this session (before that they may sit after a gap). Pruning
+raises low_water past whatever it deletes. Readers check covers() before
+trusting a window.
+
+Batch jobs keep per-channel cursors here too, so each run picks up where
+the last one stopped rather than re-reading a fixed 24 hours.
+
+A derived copy of platform history: no backup support.
+"""
+
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_TS_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def _ts(dt: datetime) -> str:
+    """Sortable UTC text for a datetime; naive values are taken as local time."""
+    return dt.astimezone(timezone.utc).strftime(_TS_FORMAT)
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.strptime(value, _TS_FORMAT).replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class ArchivedMessage:
+    """A stored message; carries the ChatMessage fields batch jobs read."""
+    id: str
+    server_id: str
+    channel_id: str
+    author_id: str
+    author_name: str
+    author_display_name: str
+    author_is_bot: bool
+    content: str
+    created_at: datetime
+
+
+class MessageArchiveStore:
+    """SQLite-based per-channel message archive with coverage watermarks."""
+
+    def __init__(self, db_path: str = './data/gepetto.db'):
+        parent = os.path.dirname(db_path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create tables if they do not exist."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archived_messages (
+                    channel_id TEXT NOT NULL,
+                    message_id TEXT NOT NULL,
+                    server_id TEXT NOT NULL,
+                    author_id TEXT NOT NULL,
+                    author_name TEXT NOT NULL,
+                    author_display_name TEXT NOT NULL,
+                    author_is_bot INTEGER NOT NULL DEFAULT 0,
+                    content TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (channel_id, message_id)
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_archived_messages_channel_time
+                ON archived_messages(channel_id, created_at)
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archive_coverage (
+                    channel_id TEXT PRIMARY KEY,
+                    server_id TEXT NOT NULL,
+                    low_water TEXT NOT NULL,
+                    high_water TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archive_job_cursors (
+                    job TEXT NOT NULL,
+                    channel_id TEXT NOT NULL,
+                    cursor TEXT NOT NULL,
+                    PRIMARY KEY (job, channel_id)
+                )
+            """)
+            conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection."""
+        return sqlite3.connect(self.db_path)
+
+    def record(self, message, advance: bool = False) -> None:
+        """
+        Store one live message. With `advance`, also move the channel's
+        high_water up to it — only safe once the channel has been gap-filled
+        since the bot (re)connected.
+        """
+        with self._get_connection() as conn:
+            self._insert(conn, [message])
+            if advance:
+                conn.execute(
+                    "UPDATE archive_coverage SET high_water = MAX(high_water, ?) WHERE channel_id = ?",
+                    (_ts(message.created_at), message.channel_id)
+                )
+            conn.commit()
+
+    def record_many(self, messages: Iterable) -> int:
+        """Store a batch of messages (already-archived ones are skipped). Returns rows inserted."""
+        with self._get_connection() as conn:
+            inserted = self._insert(conn, messages)
+            conn.commit()
+        return inserted
+
+    def mark_filled(self, channel_id: str, server_id: str, since: datetime, through: datetime) -> None:
+        """
+        Record that every message in the channel from `since` to `through`
+        is archived. A range that overlaps the existing coverage extends it;
+        one that leaves a gap after it starts coverage afresh from `since`.
+        """
+        since_ts, through_ts = _ts(since), _ts(through)
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT low_water, high_water FROM archive_coverage WHERE channel_id = ?",
+                (channel_id,)
+            ).fetchone()
+            if row and since_ts <= row[1]:
+                conn.execute(
+                    """
+                    UPDATE archive_coverage SET low_water = MIN(low_water, ?), high_water = MAX(high_water, ?)
+                    WHERE channel_id = ?
+                    """,
+                    (since_ts, through_ts, channel_id)
+                )
+            else:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO archive_coverage (channel_id, server_id, low_water, high_water)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (channel_id, server_id, since_ts, through_ts)
+                )
+            conn.commit()
+
+    def coverage(self, channel_id: str) -> Optional[dict]:
+        """The channel's {"low_water", "high_water"} as aware UTC datetimes, or None."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT low_water, high_water FROM archive_coverage WHERE channel_id = ?",
+                (channel_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"low_water": _parse_ts(row[0]), "high_water": _parse_ts(row[1])}
+
+    def covers(self, channel_id: str, after: datetime) -> bool:
+        """True if every message in the channel after `after` (up to high_water) is archived."""
+        coverage = self.coverage(channel_id)
+        return coverage is not None and coverage["low_water"] <= after.astimezone(timezone.utc)
+
+    def messages(self, channel_id: str, after: Optional[datetime] = None, before: Optional[datetime] = None,
+                 limit: Optional[int] = None, oldest_first: bool = True) -> List[ArchivedMessage]:
+        """Archived messages in (after, before), oldest or newest first."""
+        query = """
+            SELECT message_id, server_id, channel_id, author_id, author_name, author_display_name,
+                   author_is_bot, content, created_at
+            FROM archived_messages WHERE channel_id = ?
+        """
+        params: list = [channel_id]
+        if after is not None:
+            query += " AND created_at > ?"
+            params.append(_ts(after))
+        if before is not None:
+            query += " AND created_at < ?"
+            params.append(_ts(before))
+        query += " ORDER BY created_at" + ("" if oldest_first else " DESC")
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            ArchivedMessage(
+                id=row[0], server_id=row[1], channel_id=row[2], author_id=row[3],
+                author_name=row[4], author_display_name=row[5], author_is_bot=bool(row[6]),
+                content=row[7], created_at=_parse_ts(row[8]),
+            )
+            for row in rows
+        ]
+
+    def job_cursor(self, job: str, channel_id: str) -> Optional[datetime]:
+        """Where a batch job's last run over this channel stopped, or None."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT cursor FROM archive_job_cursors WHERE job = ? AND channel_id = ?",
+                (job, channel_id)
+            ).fetchone()
+        return _parse_ts(row[0]) if row else None
+
+    def set_job_cursor(self, job: str, channel_id: str, cursor: datetime) -> None:
+        """Record that a batch job has dealt with the channel up to `cursor`."""
+        with self._get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO archive_job_cursors (job, channel_id, cursor) VALUES (?, ?, ?)",
+                (job, channel_id, _ts(cursor))
+            )
+            conn.commit()
+
+    def prune(self, retention_days: float, max_per_channel: int) -> int:
+        """
+        Delete messages older than retention_days and all but the newest
+        max_per_channel per channel, raising each channel's low_water past
+        what was deleted. Returns rows deleted.
+        """
+        horizon = _ts(datetime.now(timezone.utc) - timedelta(days=retention_days))
+        deleted = 0
+        with self._get_connection() as conn:
+            deleted += conn.execute(
+                "DELETE FROM archived_messages WHERE created_at < ?", (horizon,)
+            ).rowcount
+            conn.execute(
+                "UPDATE archive_coverage SET low_water = ? WHERE low_water < ?", (horizon, horizon)
+            )
+            for (channel_id,) in conn.execute(
+                "SELECT channel_id FROM archived_messages GROUP BY channel_id HAVING COUNT(*) > ?",
+                (max_per_channel,)
+            ).fetchall():
+                # created_at of the newest message over the cap
+                (cutoff,) = conn.execute(
+                    """
+                    SELECT created_at FROM archived_messages WHERE channel_id = ?
+                    ORDER BY created_at DESC LIMIT 1 OFFSET ?
+                    """,
+                    (channel_id, max_per_channel)
+                ).fetchone()
+                deleted += conn.execute(
+                    "DELETE FROM archived_messages WHERE channel_id = ? AND created_at <= ?",
+                    (channel_id, cutoff)
+                ).rowcount
+                conn.execute(
+                    "UPDATE archive_coverage SET low_water = MAX(low_water, ?) WHERE channel_id = ?",
+                    (cutoff, channel_id)
+                )
+            conn.commit()
+        if deleted:
+            logger.info(f"Pruned {deleted} archived messages")
+        return deleted
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, messages: Iterable) -> int:
+        cursor = conn.executemany(
+            """
+            INSERT OR IGNORE INTO archived_messages
+                (channel_id, message_id, server_id, author_id, author_name, author_display_name,
+                 author_is_bot, content, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (m.channel_id, m.id or f"{_ts(m.created_at)}:{m.author_id}", m.server_id, m.author_id,
+                 m.author_name, m.author_display_name, int(bool(m.author_is_bot)), m.content,
+                 _ts(m.created_at))
+                for m in messages
+            ]
+        )
+        return cursor.rowcount
@@ -8,6 +8,12 @@ without them every run would re-classify the same film trailers.
 
 Deliberately no pruning (unlike url_store's 500-row cap): taste profiles
 need long memory and the rows are tiny.
+
+Per-user artist/genre/style tallies are kept materialised in
+music_profile_counts, bumped in the same transaction as each music row is
+saved (save() or save_many()), so a profile lookup is one indexed range
+scan however long the history is. rebuild_profile_counts() recomputes them
+from music_history.
 """
 
 import json
@@ -17,7 +23,9 @@ import sqlite3
 from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from src.persistence.sqlite_helpers import select_existing
 
 logger = logging.getLogger(__name__)
 
@@ -55,8 +63,11 @@ class MusicStore:
         self._init_db()
 
     def _init_db(self) -> None:
-        """Create table and indexes if they do not exist."""
+        """Create tables and indexes if they do not exist."""
         with self._get_connection() as conn:
+            had_counts = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'music_profile_counts'"
+            ).fetchone() is not None
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS music_history (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -85,8 +96,31 @@ class MusicStore:
                 CREATE INDEX IF NOT EXISTS idx_music_history_user
                 ON music_history(server_id, posted_by_id)
             """)
+            # URLs oEmbed rejected outright (deleted/private videos). Global,
+            # not per server — a dead video is dead everywhere.
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS music_dead_links (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS music_profile_counts (
+                    server_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (server_id, user_id, kind, value)
+                )
+            """)
             conn.commit()
 
+        if not had_counts:
+            # Existing database from before the aggregates: backfill them once
+            self.rebuild_profile_counts()
+
     def _get_connection(self) -> sqlite3.Connection:
         """Get a database connection."""
         return sqlite3.connect(self.db_path)
@@ -119,26 +153,59 @@ class MusicStore:
         Returns the ID of the inserted record, or None if duplicate.
         """
         with self._get_connection() as conn:
-            try:
-                cursor = conn.execute(
-                    """
-                    INSERT INTO music_history
-                    (server_id, channel_id, url, video_title, video_channel,
-                     artist, collaborators, track, genres, styles, is_music,
-                     posted_by_id, posted_by_name, posted_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (server_id, channel_id, url, video_title, video_channel,
-                     artist, json.dumps(collaborators or []), track,
-                     json.dumps(genres or []), json.dumps(styles or []),
-                     1 if is_music else 0,
-                     posted_by_id, posted_by_name, posted_at)
-                )
-                conn.commit()
-                return cursor.lastrowid
-            except sqlite3.IntegrityError:
-                # Duplicate URL
-                return None
+            inserted_id = self._insert(conn, dict(
+                server_id=server_id, channel_id=channel_id, url=url,
+                video_title=video_title, video_channel=video_channel,
+                posted_by_id=posted_by_id, posted_by_name=posted_by_name,
+                posted_at=posted_at, artist=artist, collaborators=collaborators,
+                track=track, genres=genres, styles=styles, is_music=is_music,
+            ))
+            conn.commit()
+            return inserted_id
+
+    def save_many(self, records: List[dict]) -> Dict[str, int]:
+        """
+        Save many entries, music and non-music alike, in one transaction.
+        Each record takes save()'s keyword arguments; duplicates are skipped.
+
+        Returns {"inserted": n, "inserted_music": n, "skipped": n}.
+        """
+        inserted = inserted_music = 0
+        with self._get_connection() as conn:
+            for record in records:
+                if self._insert(conn, record) is not None:
+                    inserted += 1
+                    inserted_music += bool(record.get("is_music", True))
+            conn.commit()
+        return {"inserted": inserted, "inserted_music": inserted_music, "skipped": len(records) - inserted}
+
+    def _insert(self, conn: sqlite3.Connection, record: dict) -> Optional[int]:
+        """INSERT OR IGNORE one record (and its profile counts) inside the
+        caller's transaction. Returns the new row ID, or None if duplicate."""
+        is_music = record.get("is_music", True)
+        cursor = conn.execute(
+            """
+            INSERT OR IGNORE INTO music_history
+            (server_id, channel_id, url, video_title, video_channel,
+             artist, collaborators, track, genres, styles, is_music,
+             posted_by_id, posted_by_name, posted_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (record["server_id"], record["channel_id"], record["url"],
+             record["video_title"], record["video_channel"],
+             record.get("artist"), json.dumps(record.get("collaborators") or []),
+             record.get("track"),
+             json.dumps(record.get("genres") or []), json.dumps(record.get("styles") or []),
+             1 if is_music else 0,
+             record["posted_by_id"], record["posted_by_name"], record["posted_at"])
+        )
+        if cursor.rowcount == 0:
+            return None
+        if is_music:
+            self._bump_profile_counts(conn, record["server_id"], record["posted_by_id"],
+                                      record.get("artist"), record.get("genres") or [],
+                                      record.get("styles") or [])
+        return cursor.lastrowid
 
     def url_exists(self, server_id: str, url: str) -> bool:
         """Check if a URL already exists for this server."""
@@ -153,6 +220,27 @@ class MusicStore:
             )
             return cursor.fetchone() is not None
 
+    def urls_exist(self, server_id: str, urls: List[str]) -> set:
+        """Return the subset of urls already stored for this server."""
+        with self._get_connection() as conn:
+            return select_existing(
+                conn, "SELECT url FROM music_history WHERE server_id = ? AND url IN ({})", (server_id,), urls
+            )
+
+    def mark_dead_link(self, url: str, status: int) -> None:
+        """Record that oEmbed rejected a URL so it is never fetched again."""
+        with self._get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO music_dead_links (url, status) VALUES (?, ?)",
+                (url, status)
+            )
+            conn.commit()
+
+    def dead_links(self, urls: List[str]) -> set:
+        """Return the subset of urls previously marked dead."""
+        with self._get_connection() as conn:
+            return select_existing(conn, "SELECT url FROM music_dead_links WHERE url IN ({})", (), urls)
+
     _SELECT_FIELDS = """
         SELECT id, server_id, channel_id, url, video_title, video_channel,
                artist, collaborators, track, genres, styles, is_music,
@@ -188,37 +276,140 @@ class MusicStore:
             rows = cursor.fetchall()
         return [self._row_to_entry(row) for row in rows]
 
-    def profile_counts(self, server_id: str, user_id: str) -> Dict[str, Counter]:
-        """
-        Tally one user's artists, genres and styles across their music rows.
+    @staticmethod
+    def _profile_values(artist: Optional[str], genres: List[str], styles: List[str]) -> List[tuple]:
+        """(kind, value) pairs one music row contributes to its poster's profile.
 
         Drops the literal Discogs genre "Non-Music" (DVDs and compilations
         get tagged with it and it pollutes profiles).
         """
-        artists: Counter = Counter()
-        genres: Counter = Counter()
-        styles: Counter = Counter()
+        values = []
+        if artist:
+            values.append(("artists", artist))
+        values.extend(("genres", g) for g in genres if g != "Non-Music")
+        values.extend(("styles", s) for s in styles)
+        return values
+
+    def _bump_profile_counts(self, conn: sqlite3.Connection, server_id: str, user_id: str,
+                             artist: Optional[str], genres: List[str], styles: List[str]) -> None:
+        """Add one row's contribution to the aggregates, inside the caller's transaction."""
+        conn.executemany(
+            """
+            INSERT INTO music_profile_counts (server_id, user_id, kind, value, count)
+            VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT (server_id, user_id, kind, value) DO UPDATE SET count = count + 1
+            """,
+            [(server_id, user_id, kind, value)
+             for kind, value in self._profile_values(artist, genres, styles)]
+        )
+
+    def profile_counts(self, server_id: str, user_id: str) -> Dict[str, Counter]:
+        """Tally one user's artists, genres and styles across their music rows."""
+        counts = {"artists": Counter(), "genres": Counter(), "styles": Counter()}
 
         with self._get_connection() as conn:
             cursor = conn.execute(
                 """
-                SELECT artist, genres, styles FROM music_history
-                WHERE server_id = ? AND posted_by_id = ? AND is_music = 1
+                SELECT kind, value, count FROM music_profile_counts
+                WHERE server_id = ? AND user_id = ?
                 """,
                 (server_id, user_id)
             )
-            rows = cursor.fetchall()
+            for kind, value, count in cursor.fetchall():
+                counts[kind][value] = count
 
-        for artist, genres_json, styles_json in rows:
-            if artist:
-                artists[artist] += 1
-            for genre in self._parse_json_list(genres_json):
-                if genre != "Non-Music":
-                    genres[genre] += 1
-            for style in self._parse_json_list(styles_json):
-                styles[style] += 1
+        return counts
 
-        return {"artists": artists, "genres": genres, "styles": styles}
+    def profile_signatures(self, server_id: str) -> Dict[str, tuple]:
+        """
+        Per-user (music row count, highest row id) for a server. Cheap change
+        detection for caches built on the aggregates: a user's signature only
+        moves when they gain music rows.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT posted_by_id, COUNT(*), MAX(id) FROM music_history
+                WHERE server_id = ? AND is_music = 1
+                GROUP BY posted_by_id
+                """,
+                (server_id,)
+            )
+            return {user_id: (rows, max_id) for user_id, rows, max_id in cursor.fetchall()}
+
+    def profile_counts_many(self, server_id: str, user_ids: List[str]) -> Dict[str, Dict[str, Counter]]:
+        """profile_counts() for several users in one query."""
+        result = {user_id: {"artists": Counter(), "genres": Counter(), "styles": Counter()}
+                  for user_id in user_ids}
+        if not user_ids:
+            return result
+        with self._get_connection() as conn:
+            for start in range(0, len(user_ids), 500):
+                chunk = user_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"""
+                    SELECT user_id, kind, value, count FROM music_profile_counts
+                    WHERE server_id = ? AND user_id IN ({placeholders})
+                    """,
+                    (server_id, *chunk)
+                )
+                for user_id, kind, value, count in cursor.fetchall():
+                    result[user_id][kind][value] = count
+        return result
+
+    def user_names(self, server_id: str) -> Dict[str, str]:
+        """Latest display name for every user who has posted music."""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT posted_by_id, posted_by_name FROM music_history
+                WHERE server_id = ? AND is_music = 1
+                ORDER BY posted_at
+                """,
+                (server_id,)
+            )
+            return dict(cursor.fetchall())
+
+    def all_credits(self) -> List[Tuple[str, List[str]]]:
+        """(artist, collaborators) for every music row with collaborators, all servers."""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT artist, collaborators FROM music_history
+                WHERE is_music = 1 AND artist IS NOT NULL AND collaborators != '[]'
+                """
+            )
+            return [(artist, self._parse_json_list(collaborators_json))
+                    for artist, collaborators_json in cursor.fetchall()]
+
+    def rebuild_profile_counts(self, server_id: Optional[str] = None) -> int:
+        """
+        Recompute the profile aggregates from music_history, for one server
+        or all of them. Returns the number of music rows tallied.
+        """
+        where = "WHERE is_music = 1" + (" AND server_id = ?" if server_id else "")
+        params = (server_id,) if server_id else ()
+
+        with self._get_connection() as conn:
+            conn.execute(
+                "DELETE FROM music_profile_counts" + (" WHERE server_id = ?" if server_id else ""),
+                params
+            )
+            cursor = conn.execute(
+                f"SELECT server_id, posted_by_id, artist, genres, styles FROM music_history {where}",
+                params
+            )
+            rows = cursor.fetchall()
+            for row_server_id, user_id, artist, genres_json, styles_json in rows:
+                self._bump_profile_counts(
+                    conn, row_server_id, user_id, artist,
+                    self._parse_json_list(genres_json), self._parse_json_list(styles_json),
+                )
+            conn.commit()
+
+        logger.info(f"Rebuilt music profile counts from {len(rows)} rows")
+        return len(rows)
 
     def resolve_user_name(self, server_id: str, name: str) -> Optional[str]:
         """
@@ -272,12 +463,8 @@ class MusicStore:
 
     def import_server(self, server_id: str, data: dict) -> dict:
         """Import music history for a server. Skips duplicate URLs via unique constraint."""
-        records = data.get("music", [])
-        imported = 0
-        skipped = 0
-
-        for record in records:
-            result = self.save(
+        records = [
+            dict(
                 server_id=server_id,
                 channel_id=record["channel_id"],
                 url=record["url"],
@@ -293,12 +480,10 @@ class MusicStore:
                 styles=record.get("styles"),
                 is_music=record.get("is_music", True),
             )
-            if result is None:
-                skipped += 1
-            else:
-                imported += 1
-
-        return {"music": {"imported": imported, "skipped": skipped}}
+            for record in data.get("music", [])
+        ]
+        result = self.save_many(records)
+        return {"music": {"imported": result["inserted"], "skipped": result["skipped"]}}
 
     @staticmethod
     def _parse_json_list(value) -> List[str]:
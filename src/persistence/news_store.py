@@ -7,6 +7,14 @@ hours before refreshing.
 
 Single-row table, INSERT OR REPLACE on every save. No history; we don't
 care about old news. See ait gepetto-discord-bot-YHETx.
+
+Alongside it, one row per RSS feed holding the ETag/Last-Modified validators
+and the items from the last successful fetch, so a refresh can send a
+conditional GET and reuse the stored items on a 304.
+
+The cached bulletins also carry a fingerprint of the headline set they were
+synthesised from. A refresh that produces (nearly) the same set just
+re-stamps fetched_at via extend_validity() rather than re-synthesising.
 """
 
 import json
@@ -35,7 +43,25 @@ class NewsStore:
                 CREATE TABLE IF NOT EXISTS news_cache (
                     id INTEGER PRIMARY KEY CHECK (id = 1),
                     fetched_at TIMESTAMP NOT NULL,
-                    bulletins_json TEXT NOT NULL
+                    bulletins_json TEXT NOT NULL,
+                    fingerprint TEXT
+                )
+            """)
+
+            # Migration: add fingerprint column if it doesn't exist
+            cursor = conn.execute("PRAGMA table_info(news_cache)")
+            columns = [row[1] for row in cursor.fetchall()]
+            if 'fingerprint' not in columns:
+                conn.execute("ALTER TABLE news_cache ADD COLUMN fingerprint TEXT")
+                logger.info("Added fingerprint column to news_cache table")
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS news_feed_state (
+                    feed TEXT PRIMARY KEY,
+                    etag TEXT,
+                    modified TEXT,
+                    items_json TEXT NOT NULL,
+                    fetched_at TIMESTAMP NOT NULL
                 )
             """)
             conn.commit()
@@ -43,15 +69,47 @@ class NewsStore:
     def _get_connection(self) -> sqlite3.Connection:
         return sqlite3.connect(self.db_path)
 
-    def save_bulletins(self, bulletins) -> None:
+    def save_bulletins(self, bulletins, fingerprint: Optional[list] = None) -> None:
         """Replace the cached row with the given bulletins. Stamps fetched_at
-        to now. `bulletins` is a list of src.content.news.Bulletin objects."""
+        to now. `bulletins` is a list of src.content.news.Bulletin objects;
+        `fingerprint` identifies the headline set they were built from."""
         payload = json.dumps([_bulletin_to_dict(b) for b in bulletins])
+        fingerprint_json = json.dumps(fingerprint) if fingerprint is not None else None
         with self._get_connection() as conn:
             conn.execute(
-                "INSERT OR REPLACE INTO news_cache (id, fetched_at, bulletins_json) "
-                "VALUES (1, ?, ?)",
-                (datetime.now().isoformat(), payload),
+                "INSERT OR REPLACE INTO news_cache (id, fetched_at, bulletins_json, fingerprint) "
+                "VALUES (1, ?, ?, ?)",
+                (datetime.now().isoformat(), payload, fingerprint_json),
+            )
+            conn.commit()
+
+    def get_fingerprinted_bulletins(self):
+        """Return (bulletins, fingerprint) for the cached row regardless of
+        age, or None when there is no row or it has no usable fingerprint."""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT bulletins_json, fingerprint FROM news_cache WHERE id = 1"
+            )
+            row = cursor.fetchone()
+
+        if not row or not row[1]:
+            return None
+        try:
+            bulletins = [_bulletin_from_dict(d) for d in json.loads(row[0])]
+            fingerprint = json.loads(row[1])
+        except json.JSONDecodeError:
+            logger.warning("[news_cache] cached row was not valid JSON — no fingerprint match possible")
+            return None
+        if not isinstance(fingerprint, list):
+            return None
+        return bulletins, fingerprint
+
+    def extend_validity(self) -> None:
+        """Re-stamp the cached bulletins' fetched_at to now, restarting the TTL."""
+        with self._get_connection() as conn:
+            conn.execute(
+                "UPDATE news_cache SET fetched_at = ? WHERE id = 1",
+                (datetime.now().isoformat(),),
             )
             conn.commit()
 
@@ -98,20 +156,69 @@ class NewsStore:
         )
         return bulletins
 
+    def save_feed_state(self, feed: str, etag: Optional[str], modified: Optional[str], items) -> None:
+        """Remember one feed's validators and items. `items` is a list of
+        src.content.news.Item objects."""
+        payload = json.dumps([_item_to_dict(i) for i in items])
+        with self._get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO news_feed_state "
+                "(feed, etag, modified, items_json, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (feed, etag, modified, payload, datetime.now().isoformat()),
+            )
+            conn.commit()
+
+    def get_feed_state(self, feed: str) -> Optional[dict]:
+        """Return {"etag", "modified", "items"} for a feed, or None if it has
+        never been fetched (or its stored items are unreadable)."""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT etag, modified, items_json FROM news_feed_state WHERE feed = ?",
+                (feed,),
+            )
+            row = cursor.fetchone()
+
+        if not row:
+            return None
+        etag, modified, items_json = row
+        try:
+            data = json.loads(items_json)
+        except json.JSONDecodeError:
+            logger.warning("[news_cache] stored items for feed %r were not valid JSON — ignoring", feed)
+            return None
+        return {
+            "etag": etag,
+            "modified": modified,
+            "items": [_item_from_dict(d) for d in data],
+        }
+
+
+def _item_to_dict(item) -> dict:
+    return {
+        "feed": item.feed,
+        "title": item.title,
+        "summary": item.summary,
+        "categories": list(item.categories),
+    }
+
+
+def _item_from_dict(d: dict):
+    """Build an Item from a cached dict. Lazy import — see _bulletin_from_dict."""
+    from src.content.news import Item
+
+    return Item(
+        feed=d.get("feed", ""),
+        title=d.get("title", ""),
+        summary=d.get("summary", ""),
+        categories=list(d.get("categories", [])),
+    )
+
 
 def _bulletin_to_dict(bulletin) -> dict:
     return {
         "heading": bulletin.heading,
         "body": bulletin.body,
-        "sources": [
-            {
-                "feed": s.feed,
-                "title": s.title,
-                "summary": s.summary,
-                "categories": list(s.categories),
-            }
-            for s in bulletin.sources
-        ],
+        "sources": [_item_to_dict(s) for s in bulletin.sources],
     }
 
 
@@ -122,17 +229,9 @@ def _bulletin_from_dict(d: dict):
     and importing news here at module load would create that loop. Lazy import
     keeps the persistence layer free of content-layer dependencies at startup.
     """
-    from src.content.news import Bulletin, Item
-
-    sources = [
-        Item(
-            feed=s.get("feed", ""),
-            title=s.get("title", ""),
-            summary=s.get("summary", ""),
-            categories=list(s.get("categories", [])),
-        )
-        for s in d.get("sources", [])
-    ]
+    from src.content.news import Bulletin
+
+    sources = [_item_from_dict(s) for s in d.get("sources", [])]
     return Bulletin(
         heading=d.get("heading", ""),
         body=d.get("body", ""),
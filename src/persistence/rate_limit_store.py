@@ -0,0 +1,83 @@
+"""
+SQLite-backed hits for BotGuard's rate limiters (src/utils/guard.py).
+
+Each counted mention is appended as (scope, key, at), so a restart can
+reload the hits still inside the window instead of handing every user a
+fresh allowance. BotGuard prefixes the scope with the bot's name, so bots
+sharing the database keep separate counts. Rows older than the window are
+pruned. Operational data: no backup support.
+"""
+
+import logging
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _iso(value: datetime) -> str:
+    """UTC ISO string, so stored times compare correctly as text."""
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+class RateLimitStore:
+    """SQLite-based storage for recent rate-limited hits.
+
+    Times are timezone-aware and stored as ISO strings in UTC.
+    """
+
+    def __init__(self, db_path: str = './data/gepetto.db'):
+        parent = os.path.dirname(db_path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create table and index if they do not exist."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limit_hits (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scope TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_rate_limit_hits_scope
+                ON rate_limit_hits(scope, at)
+            """)
+            conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection."""
+        return sqlite3.connect(self.db_path)
+
+    def record(self, scope: str, key: str, at: datetime) -> None:
+        """Append one hit."""
+        with self._get_connection() as conn:
+            conn.execute(
+                "INSERT INTO rate_limit_hits (scope, key, at) VALUES (?, ?, ?)",
+                (scope, key, _iso(at))
+            )
+            conn.commit()
+
+    def load(self, scope: str, since: datetime) -> List[Tuple[str, datetime]]:
+        """A scope's (key, at) hits from `since` on, oldest first."""
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                "SELECT key, at FROM rate_limit_hits WHERE scope = ? AND at >= ? ORDER BY at, id",
+                (scope, _iso(since))
+            ).fetchall()
+        return [(key, datetime.fromisoformat(at)) for key, at in rows]
+
+    def prune(self, before: datetime) -> int:
+        """Delete hits older than `before`. Returns number of rows deleted."""
+        with self._get_connection() as conn:
+            cursor = conn.execute("DELETE FROM rate_limit_hits WHERE at < ?", (_iso(before),))
+            conn.commit()
+            return cursor.rowcount
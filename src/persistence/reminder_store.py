@@ -59,6 +59,11 @@ class ReminderStore:
                 CREATE INDEX IF NOT EXISTS idx_reminders_due
                 ON reminders(remind_at) WHERE reminded_at IS NULL
             """)
+            # Serves get_pending(), the reminder timer's reload query
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_reminders_pending
+                ON reminders(server_id, remind_at) WHERE reminded_at IS NULL
+            """)
 
             # Migration: add created_by column if it doesn't exist
             cursor = conn.execute("PRAGMA table_info(reminders)")
@@ -187,6 +192,44 @@ class ReminderStore:
 
         return [self._row_to_reminder(row) for row in rows]
 
+    def get_pending(self, server_id: str, bot_name: Optional[str] = None) -> List[Reminder]:
+        """Get all unsent reminders for a server, soonest first.
+
+        If bot_name is provided, only returns reminders created by that bot.
+        """
+        query = """
+            SELECT id, server_id, user_id, user_name, channel_id,
+                   reminder_text, created_at, remind_at, reminded_at, created_by
+            FROM reminders
+            WHERE server_id = ? AND reminded_at IS NULL
+        """
+        params: list = [server_id]
+
+        if bot_name:
+            query += " AND created_by = ?"
+            params.append(bot_name)
+
+        with self._get_connection() as conn:
+            cursor = conn.execute(query + " ORDER BY remind_at ASC", params)
+            rows = cursor.fetchall()
+
+        return [self._row_to_reminder(row) for row in rows]
+
+    def get(self, reminder_id: int) -> Optional[Reminder]:
+        """Get a reminder by id, or None if it doesn't exist."""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT id, server_id, user_id, user_name, channel_id,
+                       reminder_text, created_at, remind_at, reminded_at, created_by
+                FROM reminders WHERE id = ?
+                """,
+                (reminder_id,)
+            )
+            row = cursor.fetchone()
+
+        return self._row_to_reminder(row) if row else None
+
     def mark_reminded(self, reminder_id: int) -> None:
         """Mark a reminder as sent."""
         with self._get_connection() as conn:
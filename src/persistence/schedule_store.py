@@ -0,0 +1,171 @@
+"""
+SQLite-backed state for the job scheduler (src/platforms/scheduler.py).
+
+One row per scheduled job holds when it should next run, a lease while a run
+is in progress (so two processes sharing the database never run the same job
+at once) and the outcome of its last run. Each finished run is also appended
+to schedule_runs, pruned by age. Operational data: no backup support.
+"""
+
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _iso(value: datetime) -> str:
+    """UTC ISO string, so stored times compare correctly as text."""
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _parse(value) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+@dataclass
+class ScheduleState:
+    """What the scheduler knows about one job."""
+    name: str
+    next_run_at: Optional[datetime]
+    last_started_at: Optional[datetime] = None
+    last_duration_s: Optional[float] = None
+    last_error: Optional[str] = None
+    run_count: int = 0
+
+
+@dataclass
+class ScheduleRun:
+    """One finished run of a job."""
+    name: str
+    started_at: datetime
+    duration_s: float
+    error: Optional[str]
+
+
+class ScheduleStore:
+    """SQLite-based storage for scheduled job state and run history.
+
+    Times are timezone-aware and stored as ISO strings in UTC.
+    """
+
+    def __init__(self, db_path: str = './data/gepetto.db'):
+        parent = os.path.dirname(db_path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create tables and index if they do not exist."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schedules (
+                    name TEXT PRIMARY KEY,
+                    next_run_at TEXT,
+                    running_by TEXT,
+                    running_until TEXT,
+                    last_started_at TEXT,
+                    last_duration_s REAL,
+                    last_error TEXT,
+                    run_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schedule_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    started_at TEXT NOT NULL,
+                    duration_s REAL NOT NULL,
+                    error TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_schedule_runs_name
+                ON schedule_runs(name, started_at)
+            """)
+            conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection."""
+        return sqlite3.connect(self.db_path)
+
+    def get(self, name: str) -> Optional[ScheduleState]:
+        """A job's state, or None if it has never been scheduled."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT name, next_run_at, last_started_at, last_duration_s, last_error, run_count "
+                "FROM schedules WHERE name = ?",
+                (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        name, next_run_at, last_started_at, last_duration_s, last_error, run_count = row
+        return ScheduleState(name, _parse(next_run_at), _parse(last_started_at), last_duration_s,
+                             last_error, run_count)
+
+    def set_next_run(self, name: str, next_run_at: datetime) -> None:
+        """Set when a job should next run (creating its row if needed)."""
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO schedules (name, next_run_at) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET next_run_at = excluded.next_run_at
+                """,
+                (name, _iso(next_run_at))
+            )
+            conn.commit()
+
+    def try_start(self, name: str, owner: str, now: datetime, lease: timedelta) -> bool:
+        """Take the run lease for a job that is due. False if it isn't due or another run holds the lease."""
+        with self._get_connection() as conn:
+            claimed = conn.execute(
+                """
+                UPDATE schedules SET running_by = ?, running_until = ?
+                WHERE name = ? AND (next_run_at IS NULL OR next_run_at <= ?)
+                  AND (running_by IS NULL OR running_until < ?)
+                """,
+                (owner, _iso(now + lease), name, _iso(now), _iso(now))
+            ).rowcount
+            conn.commit()
+        return claimed > 0
+
+    def finish(self, name: str, started_at: datetime, duration_s: float, next_run_at: datetime,
+               error: Optional[str] = None) -> None:
+        """Record a finished run, release the lease and set the next run time."""
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE schedules
+                SET running_by = NULL, running_until = NULL, next_run_at = ?,
+                    last_started_at = ?, last_duration_s = ?, last_error = ?, run_count = run_count + 1
+                WHERE name = ?
+                """,
+                (_iso(next_run_at), _iso(started_at), duration_s, error, name)
+            )
+            conn.execute(
+                "INSERT INTO schedule_runs (name, started_at, duration_s, error) VALUES (?, ?, ?, ?)",
+                (name, _iso(started_at), duration_s, error)
+            )
+            conn.commit()
+
+    def recent_runs(self, name: str, limit: int = 10) -> List[ScheduleRun]:
+        """A job's latest finished runs, newest first."""
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                "SELECT name, started_at, duration_s, error FROM schedule_runs "
+                "WHERE name = ? ORDER BY started_at DESC, id DESC LIMIT ?",
+                (name, limit)
+            ).fetchall()
+        return [ScheduleRun(name, _parse(started_at), duration_s, error) for name, started_at, duration_s, error in rows]
+
+    def prune_runs(self, before: datetime) -> int:
+        """Delete run history older than `before`. Returns number of rows deleted."""
+        with self._get_connection() as conn:
+            cursor = conn.execute("DELETE FROM schedule_runs WHERE started_at < ?", (_iso(before),))
+            conn.commit()
+            return cursor.rowcount
@@ -0,0 +1,125 @@
+"""
+SQLite-backed per-server configuration, for running one bot in several servers.
+
+The server named by DISCORD_SERVER_ID is configured from the environment as
+before. Any other server the bot should serve gets a row here with its own
+bot channel and history channels; a row for the env server overrides the
+env settings. Operational config, not chat data: no backup support.
+"""
+
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _split_ids(value: str) -> List[str]:
+    """Parse a comma-separated channel ID list (quotes and spaces tolerated)."""
+    return [ch.strip().strip('"\'') for ch in (value or "").strip('"\'').split(",") if ch.strip().strip('"\'')]
+
+
+@dataclass
+class ServerConfig:
+    """Where the bot posts and which channels its batch jobs read, for one server."""
+    server_id: str
+    bot_channel_id: str = ""
+    url_history_channels: List[str] = field(default_factory=list)
+    music_history_channels: List[str] = field(default_factory=list)
+    enabled: bool = True
+
+    @classmethod
+    def from_env(cls, server_id: str, bot_channel_id: str = "", url_history_channels: str = "",
+                 music_history_channels: str = "") -> "ServerConfig":
+        """Build a config from env-style values (comma-separated channel lists)."""
+        return cls(
+            server_id=server_id,
+            bot_channel_id=bot_channel_id.strip(),
+            url_history_channels=_split_ids(url_history_channels),
+            music_history_channels=_split_ids(music_history_channels),
+        )
+
+
+class ServerConfigStore:
+    """SQLite-based storage for per-server configuration."""
+
+    def __init__(self, db_path: str = './data/gepetto.db'):
+        parent = os.path.dirname(db_path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create table if it does not exist."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS server_config (
+                    server_id TEXT PRIMARY KEY,
+                    bot_channel_id TEXT NOT NULL DEFAULT '',
+                    url_history_channels TEXT NOT NULL DEFAULT '',
+                    music_history_channels TEXT NOT NULL DEFAULT '',
+                    enabled INTEGER NOT NULL DEFAULT 1,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.commit()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection."""
+        return sqlite3.connect(self.db_path)
+
+    def save(self, config: ServerConfig) -> None:
+        """Insert or replace a server's config."""
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO server_config
+                    (server_id, bot_channel_id, url_history_channels, music_history_channels, enabled, updated_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                """,
+                (config.server_id, config.bot_channel_id, ",".join(config.url_history_channels),
+                 ",".join(config.music_history_channels), int(config.enabled))
+            )
+            conn.commit()
+
+    def get(self, server_id: str) -> Optional[ServerConfig]:
+        """A server's config, or None if it has no row."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT server_id, bot_channel_id, url_history_channels, music_history_channels, enabled "
+                "FROM server_config WHERE server_id = ?",
+                (server_id,)
+            ).fetchone()
+        return self._row_to_config(row) if row else None
+
+    def get_all(self, include_disabled: bool = False) -> List[ServerConfig]:
+        """Every configured server (enabled ones only, by default)."""
+        query = ("SELECT server_id, bot_channel_id, url_history_channels, music_history_channels, enabled "
+                 "FROM server_config")
+        if not include_disabled:
+            query += " WHERE enabled = 1"
+        with self._get_connection() as conn:
+            rows = conn.execute(query + " ORDER BY server_id").fetchall()
+        return [self._row_to_config(row) for row in rows]
+
+    def delete(self, server_id: str) -> bool:
+        """Remove a server's config. Returns True if there was one."""
+        with self._get_connection() as conn:
+            deleted = conn.execute("DELETE FROM server_config WHERE server_id = ?", (server_id,)).rowcount
+            conn.commit()
+        return deleted > 0
+
+    @staticmethod
+    def _row_to_config(row: tuple) -> ServerConfig:
+        server_id, bot_channel_id, url_channels, music_channels, enabled = row
+        return ServerConfig(
+            server_id=server_id,
+            bot_channel_id=bot_channel_id,
+            url_history_channels=_split_ids(url_channels),
+            music_history_channels=_split_ids(music_channels),
+            enabled=bool(enabled),
+        )
@@ -0,0 +1,24 @@
+"""
+Query helpers shared by the SQLite stores.
+"""
+
+import sqlite3
+from typing import Iterable
+
+# Stays well under SQLite's bound-parameter limit (999 on older builds)
+IN_CHUNK_SIZE = 500
+
+
+def select_existing(conn: sqlite3.Connection, sql: str, params: tuple, values: Iterable[str]) -> set:
+    """
+    Run a `... IN ({})` lookup over values in chunks, returning the first
+    column of every matching row. sql has one `{}` where the placeholders
+    go, after the fixed params.
+    """
+    values = list(dict.fromkeys(values))
+    found = set()
+    for start in range(0, len(values), IN_CHUNK_SIZE):
+        chunk = values[start:start + IN_CHUNK_SIZE]
+        cursor = conn.execute(sql.format(",".join("?" * len(chunk))), params + tuple(chunk))
+        found.update(row[0] for row in cursor.fetchall())
+    return found
@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
 
+from src.persistence.sqlite_helpers import select_existing
 from src.utils.constants import SEMANTIC_SEARCH_MIN_SIMILARITY
 
 logger = logging.getLogger(__name__)
@@ -163,12 +164,8 @@ class UrlStore:
 
     def import_server(self, server_id: str, data: dict) -> dict:
         """Import URL history for a server. Skips duplicate URLs via unique constraint."""
-        records = data.get("urls", [])
-        imported = 0
-        skipped = 0
-
-        for record in records:
-            result = self.save(
+        records = [
+            dict(
                 server_id=server_id,
                 channel_id=record["channel_id"],
                 url=record["url"],
@@ -179,12 +176,10 @@ class UrlStore:
                 posted_at=datetime.fromisoformat(record["posted_at"]),
                 embedding=record.get("embedding"),
             )
-            if result is None:
-                skipped += 1
-            else:
-                imported += 1
-
-        return {"urls": {"imported": imported, "skipped": skipped}}
+            for record in data.get("urls", [])
+        ]
+        result = self.save_many(records)
+        return {"urls": {"imported": result["inserted"], "skipped": result["skipped"]}}
 
     def url_exists(self, server_id: str, url: str) -> bool:
         """Check if a URL already exists for this server."""
@@ -199,6 +194,13 @@ class UrlStore:
             )
             return cursor.fetchone() is not None
 
+    def urls_exist(self, server_id: str, urls: List[str]) -> set:
+        """Return the subset of urls already stored for this server."""
+        with self._get_connection() as conn:
+            return select_existing(
+                conn, "SELECT url FROM url_history WHERE server_id = ? AND url IN ({})", (server_id,), urls
+            )
+
     def save(
         self,
         server_id: str,
@@ -216,30 +218,59 @@ class UrlStore:
 
         Returns the ID of the inserted record, or None if duplicate.
         """
-        embedding_json = json.dumps(embedding) if embedding is not None else None
+        with self._get_connection() as conn:
+            inserted_id = self._insert(conn, dict(
+                server_id=server_id, channel_id=channel_id, url=url,
+                summary=summary, keywords=keywords, posted_by_id=posted_by_id,
+                posted_by_name=posted_by_name, posted_at=posted_at, embedding=embedding,
+            ))
+            conn.commit()
+
+        if inserted_id is not None:
+            # Prune old entries after insert
+            self._prune(server_id)
+
+        return inserted_id
 
+    def save_many(self, records: List[dict]) -> dict:
+        """
+        Save many entries in one transaction, pruning once at the end. Each
+        record takes save()'s keyword arguments; duplicates are skipped.
+
+        Returns {"inserted": n, "skipped": n}.
+        """
+        inserted_servers = set()
+        inserted = 0
         with self._get_connection() as conn:
-            try:
-                cursor = conn.execute(
-                    """
-                    INSERT INTO url_history
-                    (server_id, channel_id, url, summary, keywords,
-                     posted_by_id, posted_by_name, posted_at, embedding)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (server_id, channel_id, url, summary, keywords,
-                     posted_by_id, posted_by_name, posted_at, embedding_json)
-                )
-                conn.commit()
-                inserted_id = cursor.lastrowid
+            for record in records:
+                if self._insert(conn, record) is not None:
+                    inserted += 1
+                    inserted_servers.add(record["server_id"])
+            conn.commit()
 
-                # Prune old entries after insert
-                self._prune(server_id)
+        for server_id in inserted_servers:
+            self._prune(server_id)
 
-                return inserted_id
-            except sqlite3.IntegrityError:
-                # Duplicate URL
-                return None
+        return {"inserted": inserted, "skipped": len(records) - inserted}
+
+    def _insert(self, conn: sqlite3.Connection, record: dict) -> Optional[int]:
+        """INSERT OR IGNORE one record inside the caller's transaction.
+        Returns the new row ID, or None if duplicate."""
+        embedding = record.get("embedding")
+        embedding_json = json.dumps(embedding) if embedding is not None else None
+        cursor = conn.execute(
+            """
+            INSERT OR IGNORE INTO url_history
+            (server_id, channel_id, url, summary, keywords,
+             posted_by_id, posted_by_name, posted_at, embedding)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (record["server_id"], record["channel_id"], record["url"],
+             record["summary"], record["keywords"],
+             record["posted_by_id"], record["posted_by_name"], record["posted_at"],
+             embedding_json)
+        )
+        return cursor.lastrowid if cursor.rowcount else None
 
     def _prune(self, server_id: str, keep: int = MAX_ENTRIES_PER_SERVER) -> None:
         """Delete all but the most recent entries for server_id."""
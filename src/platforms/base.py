@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Protocol, runtime_checkable
+from typing import AsyncIterator, Protocol, runtime_checkable
 
 
 @dataclass
@@ -20,6 +20,8 @@ class ChatMessage:
     # reply carries NO mention text in content, so this is the only way the
     # guard can tell a reply-to-the-bot from ambient chat.
     reply_to_author_id: str = ""
+    # Platform message id (Discord snowflake, Matrix event id); empty if unknown
+    id: str = ""
 
     async def reply(self, text: str, mention_author: bool = True) -> None:
         """Reply to this message. Implemented by platform adapter."""
@@ -34,8 +36,17 @@ class Channel(Protocol):
     async def send(self, text: str, **kwargs) -> None: ...
     async def send_file(self, text: str, file_path: str, filename: str) -> None: ...
     async def history(self, limit: int, after=None, before=None, oldest_first=None) -> list[ChatMessage]: ...
+    # Like history(), but yields messages as each page arrives: constant
+    # memory however long the window, and callers can start work at once.
+    # limit=None means no cap. Ordering follows discord.py: oldest first
+    # when `after` is given (unless oldest_first says otherwise).
+    def iter_history(self, limit: int | None = None, after=None, before=None,
+                     oldest_first=None) -> AsyncIterator[ChatMessage]: ...
     def typing(self): ...
     def bot_can_read_history(self) -> bool: ...
+    # When the channel's newest message was posted, if the platform knows
+    # without a request (None otherwise) — lets callers skip quiet channels.
+    def last_message_at(self) -> datetime | None: ...
 
 
 @runtime_checkable
@@ -46,6 +57,7 @@ class Platform(Protocol):
     def get_channel(self, channel_id: str) -> Channel | None: ...
     async def fetch_user_mention(self, user_id: str) -> str: ...
     async def get_readable_channels(self, server_id: str) -> list[Channel]: ...
+    def has_server(self, server_id: str) -> bool: ...
     def on_message(self, callback) -> None: ...
     def on_ready(self, callback) -> None: ...
     def schedule_daily(self, name: str, callback, hour: int, minute: int = 0, tz=None) -> None: ...
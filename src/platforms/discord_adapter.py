@@ -1,12 +1,17 @@
-import io
+import asyncio
 import logging
-from datetime import time
+import os
+from datetime import datetime, timedelta, timezone
 
 import discord
-import requests
-from discord.ext import commands, tasks
+from discord.ext import commands
+
+from src.utils.constants import DISCORD_DEFAULT_UPLOAD_LIMIT_BYTES, HISTORY_HOURS, MESSAGE_CACHE_MAX_MESSAGES
 
 from .base import ChatMessage
+from .media import MediaTooLarge, open_media
+from .message_cache import MessageCache
+from .scheduler import Scheduler
 
 logger = logging.getLogger('discord')
 
@@ -33,6 +38,7 @@ def _wrap_message(msg: discord.Message) -> ChatMessage:
         created_at=msg.created_at,
         raw=msg,
         reply_to_author_id=reply_to_author_id,
+        id=str(msg.id),
     )
 
     async def reply(text: str, mention_author: bool = True) -> None:
@@ -45,9 +51,11 @@ def _wrap_message(msg: discord.Message) -> ChatMessage:
 class DiscordChannel:
     """Wraps a discord.TextChannel behind the Channel protocol."""
 
-    def __init__(self, channel: discord.TextChannel, bot_member: discord.Member | None):
+    def __init__(self, channel: discord.TextChannel, bot_member: discord.Member | None,
+                 cache: MessageCache | None = None):
         self._channel = channel
         self._bot_member = bot_member
+        self._cache = cache
         self.id = str(channel.id)
         self.name = channel.name
 
@@ -55,24 +63,36 @@ class DiscordChannel:
         await self._channel.send(text, **kwargs)
 
     async def send_file(self, text: str, file_path: str, filename: str) -> None:
-        if file_path.startswith(("http://", "https://")):
-            data = requests.get(file_path).content
-        else:
-            with open(file_path, "rb") as f:
-                data = f.read()
-        discord_file = discord.File(io.BytesIO(data), filename=filename)
-        await self._channel.send(text, file=discord_file)
+        guild = getattr(self._channel, "guild", None)
+        limit = guild.filesize_limit if guild else DISCORD_DEFAULT_UPLOAD_LIMIT_BYTES
+        try:
+            async with open_media(file_path, max_bytes=limit) as (f, _, _):
+                await self._channel.send(text, file=discord.File(f, filename=filename))
+        except MediaTooLarge as e:
+            # Too big to attach: a remote file can still be linked
+            logger.warning("Not uploading %s: %s", filename, e)
+            if file_path.startswith(("http://", "https://")):
+                await self._channel.send(f"{text}\n{file_path}")
+            else:
+                await self._channel.send(f"{text}\n_(file too large to upload)_")
 
     async def history(self, limit: int, after=None, before=None, oldest_first=None) -> list[ChatMessage]:
-        messages = []
+        return [msg async for msg in self.iter_history(limit, after, before, oldest_first)]
+
+    async def iter_history(self, limit: int | None = None, after=None, before=None, oldest_first=None):
+        cached = self._cache.get(self.id, limit, after, before, oldest_first) if self._cache else None
+        if cached is not None:
+            for msg in cached:
+                yield msg
+            return
+        # discord.py already pages (100 messages per request); wrap as we go
         async for msg in self._channel.history(
             limit=limit,
             after=after,
             before=before,
             oldest_first=oldest_first,
         ):
-            messages.append(_wrap_message(msg))
-        return messages
+            yield _wrap_message(msg)
 
     def typing(self):
         return self._channel.typing()
@@ -83,18 +103,58 @@ class DiscordChannel:
         permissions = self._channel.permissions_for(self._bot_member)
         return permissions.read_message_history
 
+    def last_message_at(self) -> datetime | None:
+        # The gateway keeps last_message_id current; a snowflake encodes its time
+        last_id = self._channel.last_message_id
+        return discord.utils.snowflake_time(last_id) if last_id else None
+
+
+def parse_shard_ids(value: str) -> list[int] | None:
+    """Parse DISCORD_SHARD_IDS: "0-3", "0,2,4" or a mix like "0-1,4". Empty means all."""
+    shard_ids = []
+    for part in value.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            shard_ids.extend(range(int(first), int(last) + 1))
+        else:
+            shard_ids.append(int(part))
+    return sorted(set(shard_ids)) or None
+
 
 class DiscordPlatform:
-    """Wraps discord.py behind the Platform protocol."""
+    """Wraps discord.py behind the Platform protocol.
+
+    One process can serve many guilds. Sharding is opt-in: DISCORD_AUTO_SHARD
+    lets discord.py pick the shard count, DISCORD_SHARD_COUNT fixes it, and
+    DISCORD_SHARD_IDS (with a shard count) runs just that range of shards, so
+    several processes can split a large bot between them.
+    """
 
     def __init__(self):
         intents = discord.Intents.default()
         intents.members = True
         intents.message_content = True
-        self._bot = commands.Bot(command_prefix='!', intents=intents)
-        self._schedules: list[tasks.Loop] = []
+        shard_count = int(os.getenv("DISCORD_SHARD_COUNT", "0")) or None
+        shard_ids = parse_shard_ids(os.getenv("DISCORD_SHARD_IDS", ""))
+        if shard_ids and not shard_count:
+            raise ValueError("DISCORD_SHARD_IDS needs DISCORD_SHARD_COUNT")
+        if shard_count or os.getenv("DISCORD_AUTO_SHARD", "false").lower() == "true":
+            logger.info(f"Sharding: {shard_count or 'auto'} shards, running {shard_ids or 'all'}")
+            self._bot = commands.AutoShardedBot(command_prefix='!', intents=intents,
+                                                shard_count=shard_count, shard_ids=shard_ids)
+        else:
+            self._bot = commands.Bot(command_prefix='!', intents=intents)
+        self.scheduler = Scheduler()
         self.bot_user_id: str = ""
         self.bot_user_name: str = ""
+        self.message_cache = MessageCache()
+        self._prime_task: asyncio.Task | None = None
+        # Worker processes (connect_rest) have no gateway cache: channels
+        # they fetch over REST are kept here
+        self._rest_only = False
+        self._fetched_channels: dict[str, DiscordChannel] = {}
 
     @property
     def bot(self) -> commands.Bot:
@@ -104,22 +164,58 @@ class DiscordPlatform:
     def get_channel(self, channel_id: str) -> DiscordChannel | None:
         channel = self._bot.get_channel(int(channel_id))
         if channel is None:
-            return None
+            return self._fetched_channels.get(channel_id)
         guild = channel.guild if hasattr(channel, 'guild') else None
         bot_member = guild.me if guild else None
-        return DiscordChannel(channel, bot_member)
+        return DiscordChannel(channel, bot_member, self.message_cache)
+
+    async def fetch_channel(self, channel_id: str) -> DiscordChannel | None:
+        """Like get_channel(), falling back to a REST fetch for channels not in the cache."""
+        channel = self.get_channel(channel_id)
+        if channel is not None:
+            return channel
+        try:
+            fetched = await self._bot.fetch_channel(int(channel_id))
+        except discord.HTTPException as e:
+            logger.warning(f"Could not fetch channel {channel_id}: {e}")
+            return None
+        channel = DiscordChannel(fetched, None, self.message_cache)
+        self._fetched_channels[channel_id] = channel
+        return channel
+
+    def has_server(self, server_id: str) -> bool:
+        """Whether this process's connection covers the guild (with sharding,
+        guilds on other processes' shards aren't in the cache)."""
+        return server_id.isdigit() and self._bot.get_guild(int(server_id)) is not None
 
     async def get_readable_channels(self, server_id: str) -> list[DiscordChannel]:
         guild = self._bot.get_guild(int(server_id))
         if guild is None:
+            if self._rest_only:
+                return await self._fetch_readable_channels(server_id)
             return []
         bot_member = guild.me
         channels = []
         for channel in guild.text_channels:
             if channel.permissions_for(bot_member).read_message_history:
-                channels.append(DiscordChannel(channel, bot_member))
+                channels.append(DiscordChannel(channel, bot_member, self.message_cache))
         return channels
 
+    async def _fetch_readable_channels(self, server_id: str) -> list[DiscordChannel]:
+        """get_readable_channels() over REST, for worker processes without a guild cache."""
+        try:
+            guild = await self._bot.fetch_guild(int(server_id))
+            bot_member = await guild.fetch_member(self._bot.user.id)
+            fetched = await guild.fetch_channels()
+        except discord.HTTPException as e:
+            logger.warning(f"Could not fetch channels for server {server_id}: {e}")
+            return []
+        return [
+            DiscordChannel(channel, bot_member, self.message_cache)
+            for channel in fetched
+            if isinstance(channel, discord.TextChannel) and channel.permissions_for(bot_member).read_message_history
+        ]
+
     async def fetch_user_mention(self, user_id: str) -> str:
         user = await self._bot.fetch_user(int(user_id))
         return user.mention
@@ -128,6 +224,7 @@ class DiscordPlatform:
         @self._bot.event
         async def on_message(message: discord.Message):
             wrapped = _wrap_message(message)
+            self.message_cache.add(wrapped)
             await callback(wrapped)
 
     def on_ready(self, callback) -> None:
@@ -135,29 +232,48 @@ class DiscordPlatform:
         async def on_ready():
             self.bot_user_id = str(self._bot.user.id)
             self.bot_user_name = self._bot.user.name
+            # Fires again after a full reconnect: events may have been missed
+            self.message_cache.mark_connected()
+            if self._prime_task is None or self._prime_task.done():
+                self._prime_task = asyncio.create_task(self._prime_message_cache())
             await callback()
 
-    def schedule_daily(self, name: str, callback, hour: int, minute: int = 0, tz=None) -> None:
-        run_time = time(hour=hour, minute=minute, tzinfo=tz)
+    async def _prime_message_cache(self) -> None:
+        """Backfill the message cache for every readable channel, once per connect."""
+        since = datetime.now(timezone.utc) - timedelta(hours=HISTORY_HOURS)
+        for guild in self._bot.guilds:
+            for channel in await self.get_readable_channels(str(guild.id)):
+                try:
+                    messages = [
+                        _wrap_message(msg) async for msg in channel._channel.history(
+                            limit=MESSAGE_CACHE_MAX_MESSAGES, after=since, oldest_first=False
+                        )
+                    ]
+                except Exception as e:
+                    logger.warning(f"Could not backfill message cache for #{channel.name}: {e}")
+                    continue
+                self.message_cache.prime(channel.id, messages, since, limit=MESSAGE_CACHE_MAX_MESSAGES)
+        logger.info("Message cache primed")
 
-        @tasks.loop(time=run_time)
-        async def task():
-            await callback()
-
-        task.__name__ = name
-        self._schedules.append(task)
+    def schedule_daily(self, name: str, callback, hour: int, minute: int = 0, tz=None) -> None:
+        self.scheduler.add_daily(name, callback, hour, minute, tz)
 
     def schedule_interval(self, name: str, callback, minutes: int = 60) -> None:
-        @tasks.loop(minutes=minutes)
-        async def task():
-            await callback()
-
-        task.__name__ = name
-        self._schedules.append(task)
+        self.scheduler.add_interval(name, callback, minutes)
 
     def start_schedules(self) -> None:
-        for task in self._schedules:
-            task.start()
+        self.scheduler.start()
 
     def run(self, token: str) -> None:
         self._bot.run(token)
+
+    async def connect_rest(self, token: str) -> None:
+        """Log in for REST calls only, without a gateway connection (worker processes)."""
+        discord.utils.setup_logging()
+        self._rest_only = True
+        await self._bot.login(token)
+        self.bot_user_id = str(self._bot.user.id)
+        self.bot_user_name = self._bot.user.name
+
+    async def close(self) -> None:
+        await self._bot.close()
@@ -0,0 +1,182 @@
+"""
+Inbound work dispatcher: bounded, fair scheduling of message handling.
+
+The platform adapters await the message callback once per event, and each
+event runs as its own task, so a burst of mentions used to start as many
+history fetches and LLM calls as there were messages. The cheap per-message
+bookkeeping still runs inline; the expensive part (answering a mention, a
+random chime-in) is submitted here instead:
+
+- at most INBOUND_MAX_CONCURRENT jobs run at once;
+- each user has one job running at a time and a queue of at most
+  INBOUND_MAX_QUEUED_PER_USER; ready users are served round-robin, so one
+  person spamming can't starve everyone else;
+- each channel holds at most INBOUND_MAX_QUEUED_PER_CHANNEL waiting jobs;
+- when a queue overflows, its oldest waiting job is dropped. With the
+  "collapse" policy a new message from a user also replaces one they already
+  have waiting in the same channel, so a burst gets one answer, to the latest;
+- jobs with a collapse_key always replace a waiting job with the same key.
+
+snapshot() reports queue depth, running jobs, drop counts and queue wait
+times for the metrics log.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional
+
+from src.utils.constants import (
+    INBOUND_MAX_CONCURRENT, INBOUND_MAX_QUEUED_PER_USER, INBOUND_MAX_QUEUED_PER_CHANNEL, INBOUND_QUEUE_POLICY,
+)
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+COLLAPSE = "collapse"
+
+
+class _Job:
+    __slots__ = ("user_id", "channel_id", "handler", "collapse_key", "enqueued_at")
+
+    def __init__(self, user_id, channel_id, handler, collapse_key, enqueued_at):
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.handler = handler
+        self.collapse_key = collapse_key
+        self.enqueued_at = enqueued_at
+
+
+class InboundDispatcher:
+    """Global concurrency cap with per-user and per-channel bounded queues."""
+
+    def __init__(self, max_concurrent: int = INBOUND_MAX_CONCURRENT,
+                 max_per_user: int = INBOUND_MAX_QUEUED_PER_USER,
+                 max_per_channel: int = INBOUND_MAX_QUEUED_PER_CHANNEL,
+                 policy: str = INBOUND_QUEUE_POLICY, clock=time.monotonic):
+        if policy not in (DROP_OLDEST, COLLAPSE):
+            raise ValueError(f"Unknown inbound queue policy: {policy}")
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_per_channel = max_per_channel
+        self.policy = policy
+        self._clock = clock
+        self._user_queues: Dict[str, Deque[_Job]] = {}
+        self._channel_queues: Dict[str, Deque[_Job]] = {}
+        self._collapsible: Dict[Hashable, _Job] = {}
+        self._ready: Deque[str] = deque()
+        self._busy_users: set = set()
+        self._tasks: set = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._counts = {"submitted": 0, "started": 0, "dropped": 0, "collapsed": 0, "failed": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_count = 0
+
+    def submit(self, user_id: str, channel_id: str, handler: Callable[[], Awaitable[Any]],
+               collapse_key: Optional[Hashable] = None) -> None:
+        """Queue handler() to run on behalf of user_id in channel_id. Returns at once."""
+        self._counts["submitted"] += 1
+        if collapse_key is None and self.policy == COLLAPSE:
+            collapse_key = (user_id, channel_id)
+        if collapse_key is not None:
+            waiting = self._collapsible.get(collapse_key)
+            if waiting is not None:
+                # Keep its place in the queues, answer the newer message
+                waiting.handler = handler
+                self._counts["collapsed"] += 1
+                return
+
+        job = _Job(user_id, channel_id, handler, collapse_key, self._clock())
+        if collapse_key is not None:
+            self._collapsible[collapse_key] = job
+
+        user_queue = self._user_queues.setdefault(user_id, deque())
+        user_queue.append(job)
+        channel_queue = self._channel_queues.setdefault(channel_id, deque())
+        channel_queue.append(job)
+        if len(user_queue) > self.max_per_user:
+            self._drop(user_queue[0])
+        if len(channel_queue) > self.max_per_channel:
+            self._drop(channel_queue[0])
+
+        if user_id not in self._busy_users and user_id not in self._ready:
+            self._ready.append(user_id)
+        self._idle.clear()
+        self._start_ready()
+
+    def queue_depth(self, channel_id: Optional[str] = None) -> int:
+        """Jobs waiting to start, overall or in one channel."""
+        if channel_id is not None:
+            return len(self._channel_queues.get(channel_id, ()))
+        return sum(len(q) for q in self._user_queues.values())
+
+    def snapshot(self) -> dict:
+        """Current depth and counters, plus queue waits since the last snapshot."""
+        stats = {
+            "queued": self.queue_depth(),
+            "running": len(self._tasks),
+            **self._counts,
+            "wait_avg_s": self._wait_total / self._wait_count if self._wait_count else 0.0,
+            "wait_max_s": self._wait_max,
+        }
+        self._wait_total = self._wait_max = 0.0
+        self._wait_count = 0
+        return stats
+
+    async def join(self) -> None:
+        """Wait until nothing is queued or running."""
+        await self._idle.wait()
+
+    def _drop(self, job: _Job) -> None:
+        self._dequeue(job)
+        self._counts["dropped"] += 1
+        logger.info(f"Inbound queue full: dropped a waiting job from {job.user_id} in {job.channel_id}")
+
+    def _dequeue(self, job: _Job) -> None:
+        """Take a waiting job out of its user and channel queues."""
+        for queues, key in ((self._user_queues, job.user_id), (self._channel_queues, job.channel_id)):
+            queue = queues[key]
+            queue.remove(job)
+            if not queue:
+                del queues[key]
+        if job.collapse_key is not None and self._collapsible.get(job.collapse_key) is job:
+            del self._collapsible[job.collapse_key]
+
+    def _start_ready(self) -> None:
+        while self._ready and len(self._tasks) < self.max_concurrent:
+            user_id = self._ready.popleft()
+            user_queue = self._user_queues.get(user_id)
+            if not user_queue:
+                continue
+            job = user_queue[0]
+            self._dequeue(job)
+
+            waited = self._clock() - job.enqueued_at
+            self._wait_total += waited
+            self._wait_count += 1
+            self._wait_max = max(self._wait_max, waited)
+            self._counts["started"] += 1
+
+            self._busy_users.add(user_id)
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(lambda t, user_id=user_id: self._finished(t, user_id))
+
+    async def _run(self, job: _Job) -> None:
+        try:
+            await job.handler()
+        except Exception:
+            self._counts["failed"] += 1
+            logger.exception(f"Inbound job for {job.user_id} in {job.channel_id} failed")
+
+    def _finished(self, task: asyncio.Task, user_id: str) -> None:
+        self._tasks.discard(task)
+        self._busy_users.discard(user_id)
+        if user_id in self._user_queues:
+            self._ready.append(user_id)
+        self._start_ready()
+        if not self._tasks and not self._user_queues:
+            self._idle.set()
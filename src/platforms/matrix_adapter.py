@@ -4,13 +4,20 @@ import os
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 
-import aiohttp
 import nio
 
+from src.utils.constants import HISTORY_HOURS, MESSAGE_CACHE_MAX_MESSAGES
+
 from .base import ChatMessage
+from .media import MediaTooLarge, close_session, open_media
+from .message_cache import MessageCache
+from .scheduler import Scheduler
 
 logger = logging.getLogger("matrix")
 
+# Events per /messages request when paging through room history
+MATRIX_HISTORY_PAGE_SIZE = 100
+
 
 def _wrap_message(room: nio.MatrixRoom, event: nio.RoomMessageText, client: nio.AsyncClient) -> ChatMessage:
     """Convert a matrix-nio RoomMessageText event into a platform-agnostic ChatMessage."""
@@ -28,6 +35,7 @@ def _wrap_message(room: nio.MatrixRoom, event: nio.RoomMessageText, client: nio.
         server_id=room.room_id,  # Matrix rooms don't belong to a single server
         created_at=datetime.fromtimestamp(event.server_timestamp / 1000, tz=timezone.utc),
         raw=event,
+        id=event.event_id,
     )
 
     async def reply(text: str, mention_author: bool = True) -> None:
@@ -51,9 +59,10 @@ def _wrap_message(room: nio.MatrixRoom, event: nio.RoomMessageText, client: nio.
 class MatrixChannel:
     """Wraps a Matrix room behind the Channel protocol."""
 
-    def __init__(self, room: nio.MatrixRoom, client: nio.AsyncClient):
+    def __init__(self, room: nio.MatrixRoom, client: nio.AsyncClient, cache: MessageCache | None = None):
         self._room = room
         self._client = client
+        self._cache = cache
         self.id = room.room_id
         self.name = room.display_name or room.room_id
 
@@ -63,22 +72,19 @@ class MatrixChannel:
 
     async def send_file(self, text: str, file_path: str, filename: str) -> None:
         # Source can be a remote URL (Replicate/FAL) or a local path (OpenAI direct)
-        if file_path.startswith(("http://", "https://")):
-            async with aiohttp.ClientSession() as session:
-                async with session.get(file_path) as resp:
-                    data = await resp.read()
-                    content_type = resp.content_type or "application/octet-stream"
-        else:
-            with open(file_path, "rb") as f:
-                data = f.read()
-            ext = os.path.splitext(file_path)[1].lstrip(".").lower()
-            content_type = f"image/{ext}" if ext else "application/octet-stream"
-
-        upload_resp, _ = await self._client.upload(
-            data,
-            content_type=content_type,
-            filename=filename,
-        )
+        try:
+            async with open_media(file_path, max_bytes=await self._upload_limit()) as (f, content_type, size):
+                upload_resp, _ = await self._client.upload(
+                    f,
+                    content_type=content_type,
+                    filename=filename,
+                    filesize=size,
+                )
+        except MediaTooLarge as e:
+            logger.warning("Not uploading %s: %s", filename, e)
+            link = file_path if file_path.startswith(("http://", "https://")) else "_(file too large to upload)_"
+            await self.send(f"{text}\n{link}")
+            return
         if not isinstance(upload_resp, nio.UploadResponse):
             logger.error("Failed to upload file to Matrix: %s", upload_resp)
             return
@@ -95,46 +101,105 @@ class MatrixChannel:
             "msgtype": msgtype,
             "body": text or filename,
             "url": upload_resp.content_uri,
-            "info": {"mimetype": content_type},
+            "info": {"mimetype": content_type, "size": size},
         }
         await self._client.room_send(self._room.room_id, "m.room.message", content)
 
+    async def _upload_limit(self) -> int | None:
+        """The homeserver's m.upload.size, if it will say."""
+        resp = await self._client.content_repository_config()
+        if isinstance(resp, nio.ContentRepositoryConfigResponse):
+            return resp.upload_size
+        return None
+
     async def history(self, limit: int, after=None, before=None, oldest_first=None) -> list[ChatMessage]:
-        messages = []
-        start_token = ""
+        return [msg async for msg in self.iter_history(limit, after, before, oldest_first)]
+
+    async def iter_history(self, limit: int | None = None, after=None, before=None, oldest_first=None):
+        """
+        Yield text messages a page of events at a time.
+
+        Ordering follows discord.py: oldest first when `after` is given
+        (unless oldest_first says otherwise), newest first otherwise. Matrix
+        paginates with tokens from "now", so oldest-first walks back to
+        `after` holding only the current page, then pages forward from there.
+        """
+        cached = self._cache.get(self.id, limit, after, before, oldest_first) if self._cache else None
+        if cached is not None:
+            for msg in cached:
+                yield msg
+            return
 
-        # Convert 'after' datetime to a token by getting the room's message history
-        # and filtering by timestamp. Matrix uses pagination tokens, not datetimes.
+        if oldest_first is None:
+            oldest_first = after is not None
         after_ts = int(after.timestamp() * 1000) if after else 0
         before_ts = int(before.timestamp() * 1000) if before else 0
 
-        while len(messages) < limit:
+        if oldest_first:
+            events = self._events(await self._token_before(after_ts), nio.MessageDirection.front)
+        else:
+            events = self._events("", nio.MessageDirection.back)
+
+        count = 0
+        try:
+            async for event in events:
+                if not isinstance(event, nio.RoomMessageText):
+                    continue
+                ts = event.server_timestamp
+                if oldest_first:
+                    if after_ts and ts < after_ts:
+                        continue
+                    if before_ts and ts >= before_ts:
+                        return
+                else:
+                    if before_ts and ts >= before_ts:
+                        continue
+                    if after_ts and ts < after_ts:
+                        return
+                yield _wrap_message(self._room, event, self._client)
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+        finally:
+            await events.aclose()
+
+    async def _events(self, start: str, direction):
+        """Every room event from a pagination token in one direction, page by page."""
+        token = start
+        while True:
             resp = await self._client.room_messages(
                 self._room.room_id,
-                start=start_token or "",
-                limit=min(limit - len(messages), 100),
-                direction=nio.MessageDirection.back if not start_token else nio.MessageDirection.back,
+                start=token,
+                limit=MATRIX_HISTORY_PAGE_SIZE,
+                direction=direction,
             )
             if not isinstance(resp, nio.RoomMessagesResponse):
-                break
-
-            if not start_token:
-                start_token = resp.end
-
+                logger.warning("Matrix history request failed: %s", resp)
+                return
             for event in resp.chunk:
-                if not isinstance(event, nio.RoomMessageText):
-                    continue
-                if before_ts and event.server_timestamp >= before_ts:
-                    continue
-                if after_ts and event.server_timestamp < after_ts:
-                    return list(reversed(messages)) if oldest_first else messages
-                messages.append(_wrap_message(self._room, event, self._client))
-
-            if not resp.chunk or resp.end == start_token:
-                break
-            start_token = resp.end
+                yield event
+            if not resp.chunk or not resp.end or resp.end == token:
+                return
+            token = resp.end
 
-        return list(reversed(messages)) if oldest_first else messages
+    async def _token_before(self, ts: int) -> str:
+        """A pagination token just before the first event older than ts (or
+        the room's start), found by paging backwards from now."""
+        token = ""
+        while True:
+            resp = await self._client.room_messages(
+                self._room.room_id,
+                start=token,
+                limit=MATRIX_HISTORY_PAGE_SIZE,
+                direction=nio.MessageDirection.back,
+            )
+            if not isinstance(resp, nio.RoomMessagesResponse) or not resp.chunk or not resp.end:
+                return token
+            if ts and resp.chunk[-1].server_timestamp < ts:
+                return resp.end
+            if resp.end == token:
+                return token
+            token = resp.end
 
     @asynccontextmanager
     async def typing(self):
@@ -149,6 +214,10 @@ class MatrixChannel:
         # Power level checks could be added here if needed
         return True
 
+    def last_message_at(self) -> datetime | None:
+        # nio's room state doesn't track the latest event time
+        return None
+
 
 class MatrixPlatform:
     """Wraps matrix-nio behind the Platform protocol."""
@@ -159,23 +228,26 @@ class MatrixPlatform:
         self._client = nio.AsyncClient(homeserver, user_id)
         self._message_callback = None
         self._ready_callback = None
-        self._daily_tasks: list[dict] = []
-        self._interval_tasks: list[dict] = []
+        self.scheduler = Scheduler()
         self.bot_user_id: str = user_id
         self.bot_user_name: str = os.getenv("BOT_NAME", "Bot")
+        self.message_cache = MessageCache()
 
     def get_channel(self, channel_id: str) -> MatrixChannel | None:
         room = self._client.rooms.get(channel_id)
         if room is None:
             return None
-        return MatrixChannel(room, self._client)
+        return MatrixChannel(room, self._client, self.message_cache)
 
     async def get_readable_channels(self, server_id: str) -> list[MatrixChannel]:
         channels = []
         for room_id, room in self._client.rooms.items():
-            channels.append(MatrixChannel(room, self._client))
+            channels.append(MatrixChannel(room, self._client, self.message_cache))
         return channels
 
+    def has_server(self, server_id: str) -> bool:
+        return True  # one connection sees every joined room; there is no sharding
+
     async def fetch_user_mention(self, user_id: str) -> str:
         return user_id  # Matrix user IDs are already readable (@user:server)
 
@@ -186,51 +258,13 @@ class MatrixPlatform:
         self._ready_callback = callback
 
     def schedule_daily(self, name: str, callback, hour: int, minute: int = 0, tz=None) -> None:
-        self._daily_tasks.append({
-            "name": name,
-            "callback": callback,
-            "hour": hour,
-            "minute": minute,
-            "tz": tz,
-        })
+        self.scheduler.add_daily(name, callback, hour, minute, tz)
 
     def schedule_interval(self, name: str, callback, minutes: int = 60) -> None:
-        self._interval_tasks.append({
-            "name": name,
-            "callback": callback,
-            "minutes": minutes,
-        })
+        self.scheduler.add_interval(name, callback, minutes)
 
     def start_schedules(self) -> None:
-        for task in self._daily_tasks:
-            asyncio.create_task(self._run_daily(task))
-        for task in self._interval_tasks:
-            asyncio.create_task(self._run_interval(task))
-
-    async def _run_daily(self, task: dict) -> None:
-        """Sleep until the target time each day, then run the callback."""
-        tz = task["tz"] or timezone.utc
-        while True:
-            now = datetime.now(tz)
-            target = now.replace(hour=task["hour"], minute=task["minute"], second=0, microsecond=0)
-            if target <= now:
-                target += timedelta(days=1)
-            delay = (target - now).total_seconds()
-            logger.info("Scheduled '%s' in %.0f seconds", task["name"], delay)
-            await asyncio.sleep(delay)
-            try:
-                await task["callback"]()
-            except Exception:
-                logger.exception("Error in scheduled task '%s'", task["name"])
-
-    async def _run_interval(self, task: dict) -> None:
-        """Run a callback at regular intervals."""
-        while True:
-            await asyncio.sleep(task["minutes"] * 60)
-            try:
-                await task["callback"]()
-            except Exception:
-                logger.exception("Error in interval task '%s'", task["name"])
+        self.scheduler.start()
 
     def run(self, token: str) -> None:
         asyncio.run(self._async_run(token))
@@ -250,15 +284,18 @@ class MatrixPlatform:
         # Register message callback
         if self._message_callback:
             async def _on_message(room: nio.MatrixRoom, event: nio.RoomMessageText):
+                wrapped = _wrap_message(room, event, self._client)
+                self.message_cache.add(wrapped)  # own messages too: they're chat context
                 if event.sender == self._client.user_id:
                     return  # Ignore own messages
-                wrapped = _wrap_message(room, event, self._client)
                 await self._message_callback(wrapped)
 
             self._client.add_event_callback(_on_message, nio.RoomMessageText)
 
         # Do an initial sync to populate room state
+        self.message_cache.mark_connected()
         await self._client.sync(timeout=30000)
+        prime_task = asyncio.create_task(self._prime_message_cache())
 
         # Fire ready callback
         if self._ready_callback:
@@ -268,4 +305,23 @@ class MatrixPlatform:
         self.start_schedules()
 
         # Sync forever
-        await self._client.sync_forever(timeout=30000)
+        try:
+            await self._client.sync_forever(timeout=30000)
+        finally:
+            prime_task.cancel()
+            await close_session()
+
+    async def _prime_message_cache(self) -> None:
+        """Backfill the message cache for every joined room."""
+        since = datetime.now(timezone.utc) - timedelta(hours=HISTORY_HOURS)
+        for room in list(self._client.rooms.values()):
+            channel = MatrixChannel(room, self._client)  # uncached, so it goes to the server
+            try:
+                messages = [msg async for msg in channel.iter_history(
+                    limit=MESSAGE_CACHE_MAX_MESSAGES, after=since, oldest_first=False
+                )]
+            except Exception as e:
+                logger.warning("Could not backfill message cache for %s: %s", channel.name, e)
+                continue
+            self.message_cache.prime(channel.id, messages, since, limit=MESSAGE_CACHE_MAX_MESSAGES)
+        logger.info("Message cache primed")
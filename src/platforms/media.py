@@ -0,0 +1,85 @@
+"""
+Fetching generated media for upload, shared by the platform adapters.
+
+Image and video providers hand back either a URL or a local path. Remote
+files are streamed through one shared aiohttp session into a spooled
+temporary file: small ones stay in memory, big ones (Sora videos) go to
+disk, and the event loop never blocks on the download. The platform's
+upload limit is checked against Content-Length before any body is read,
+and again while streaming in case the server didn't send one.
+"""
+
+import logging
+import mimetypes
+import os
+import tempfile
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+from src.utils.constants import MEDIA_DOWNLOAD_CHUNK_BYTES, MEDIA_SPOOL_MAX_MEMORY_BYTES
+
+logger = logging.getLogger(__name__)
+
+_session: aiohttp.ClientSession | None = None
+
+
+class MediaTooLarge(Exception):
+    """The file is bigger than the platform will accept."""
+
+    def __init__(self, size: int, limit: int):
+        super().__init__(f"{size} bytes exceeds the {limit} byte upload limit")
+        self.size = size
+        self.limit = limit
+
+
+def get_session() -> aiohttp.ClientSession:
+    """The shared HTTP session, created on first use inside the running loop."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession()
+    return _session
+
+
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+@asynccontextmanager
+async def open_media(source: str, max_bytes: int | None = None):
+    """
+    Open a URL or local path for upload. Yields (file, content_type, size);
+    the file is a binary file object positioned at the start, closed on exit.
+
+    Raises MediaTooLarge if the file is over max_bytes.
+    """
+    if source.startswith(("http://", "https://")):
+        async with get_session().get(source) as resp:
+            resp.raise_for_status()
+            if max_bytes is not None and resp.content_length is not None and resp.content_length > max_bytes:
+                raise MediaTooLarge(resp.content_length, max_bytes)
+            content_type = resp.content_type or "application/octet-stream"
+            spool = tempfile.SpooledTemporaryFile(max_size=MEDIA_SPOOL_MAX_MEMORY_BYTES)
+            try:
+                size = 0
+                async for chunk in resp.content.iter_chunked(MEDIA_DOWNLOAD_CHUNK_BYTES):
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise MediaTooLarge(size, max_bytes)
+                    spool.write(chunk)
+                spool.seek(0)
+            except BaseException:
+                spool.close()
+                raise
+        with spool:
+            yield spool, content_type, size
+    else:
+        size = os.path.getsize(source)
+        if max_bytes is not None and size > max_bytes:
+            raise MediaTooLarge(size, max_bytes)
+        content_type = mimetypes.guess_type(source)[0] or "application/octet-stream"
+        with open(source, "rb") as f:
+            yield f, content_type, size
@@ -0,0 +1,161 @@
+"""
+In-memory ring buffer of recent messages, per channel.
+
+The bot already sees every message through its gateway/sync connection, yet
+each mention used to re-read the last few messages over REST before the LLM
+was even called. Platforms feed this cache from their message events and
+backfill each channel once on startup; Channel.history()/iter_history()
+answer from it when it can and fall back to REST otherwise.
+
+Each channel keeps at most MESSAGE_CACHE_MAX_MESSAGES messages no older than
+MESSAGE_CACHE_MAX_AGE_HOURS, plus a `covered_since` time: the cache holds
+*every* message in the channel after that point. A read is served only when
+the answer is provably complete:
+
+- the window starts at or after covered_since, or
+- it's a newest-first read whose `limit` is filled from cached messages.
+
+Anything else is a miss (None) and the caller goes to REST. Edits and
+deletions aren't tracked; a cached message shows its content as first seen.
+"""
+
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from src.utils.constants import MESSAGE_CACHE_MAX_AGE_HOURS, MESSAGE_CACHE_MAX_MESSAGES
+
+from .base import ChatMessage
+
+logger = logging.getLogger('discord')
+
+
+def _utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """Aware UTC datetime; naive values are taken as local time (as discord.py does)."""
+    if dt is None:
+        return None
+    return dt.astimezone(timezone.utc)
+
+
+def _key(message: ChatMessage):
+    return message.id or (message.created_at, message.author_id, message.content)
+
+
+class _ChannelBuffer:
+    __slots__ = ("messages", "keys", "covered_since")
+
+    def __init__(self, covered_since: Optional[datetime]):
+        self.messages: deque = deque()
+        self.keys: set = set()
+        self.covered_since = covered_since
+
+
+class MessageCache:
+    """Bounded per-channel ring buffers with a completeness watermark."""
+
+    def __init__(self, max_messages: int = MESSAGE_CACHE_MAX_MESSAGES,
+                 max_age_hours: float = MESSAGE_CACHE_MAX_AGE_HOURS, clock=None):
+        self.max_messages = max_messages
+        self.max_age = timedelta(hours=max_age_hours)
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._buffers: Dict[str, _ChannelBuffer] = {}
+        self._connected_at: Optional[datetime] = None
+        self.hits = 0
+        self.misses = 0
+
+    def mark_connected(self) -> None:
+        """
+        Call when the live connection (re)starts. Anything cached may have
+        gaps from while we were away, so every channel starts over: complete
+        from now on, with older history only after prime().
+        """
+        self._connected_at = self._clock()
+        self._buffers.clear()
+
+    def add(self, message: ChatMessage) -> None:
+        """Record a live message event."""
+        buffer = self._buffers.get(message.channel_id)
+        if buffer is None:
+            buffer = self._buffers[message.channel_id] = _ChannelBuffer(self._connected_at)
+        key = _key(message)
+        if key in buffer.keys:
+            return
+        if buffer.messages and _utc(message.created_at) < _utc(buffer.messages[-1].created_at):
+            self._insert_sorted(buffer, [message])
+        else:
+            buffer.messages.append(message)
+            buffer.keys.add(key)
+        self._trim(buffer)
+
+    def prime(self, channel_id: str, messages: Iterable[ChatMessage], since: datetime,
+              limit: Optional[int] = None) -> None:
+        """
+        Merge a REST backfill of the channel covering [since, now].
+
+        If the backfill was cut short by `limit`, the cache is only complete
+        from its oldest message onwards.
+        """
+        messages = list(messages)
+        buffer = self._buffers.get(channel_id)
+        if buffer is None:
+            buffer = self._buffers[channel_id] = _ChannelBuffer(self._connected_at)
+        self._insert_sorted(buffer, [m for m in messages if _key(m) not in buffer.keys])
+
+        since = _utc(since)
+        if limit is not None and len(messages) >= limit:
+            since = min(_utc(m.created_at) for m in messages)
+        if buffer.covered_since is None or since < buffer.covered_since:
+            buffer.covered_since = since
+        self._trim(buffer)
+
+    def get(self, channel_id: str, limit: Optional[int], after=None, before=None,
+            oldest_first=None) -> Optional[List[ChatMessage]]:
+        """
+        Messages in (after, before), ordered like discord.py's history()
+        (oldest first when `after` is given unless oldest_first says
+        otherwise), or None if the cache can't answer completely.
+        """
+        buffer = self._buffers.get(channel_id)
+        if buffer is None or buffer.covered_since is None:
+            self.misses += 1
+            return None
+        self._trim(buffer)
+        after, before = _utc(after), _utc(before)
+        if oldest_first is None:
+            oldest_first = after is not None
+
+        window = [
+            m for m in buffer.messages
+            if (after is None or _utc(m.created_at) > after)
+            and (before is None or _utc(m.created_at) < before)
+        ]
+        complete = after is not None and after >= buffer.covered_since
+        if not oldest_first:
+            window.reverse()
+            complete = complete or (limit is not None and len(window) >= limit)
+        if not complete:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return window[:limit] if limit is not None else window
+
+    def _insert_sorted(self, buffer: _ChannelBuffer, messages: List[ChatMessage]) -> None:
+        merged = sorted([*buffer.messages, *messages], key=lambda m: _utc(m.created_at))
+        buffer.messages = deque(merged)
+        buffer.keys = {_key(m) for m in merged}
+
+    def _trim(self, buffer: _ChannelBuffer) -> None:
+        """Drop messages over the count or age cap, moving covered_since up past them."""
+        horizon = self._clock() - self.max_age
+        while buffer.messages and (
+            len(buffer.messages) > self.max_messages
+            or _utc(buffer.messages[0].created_at) < horizon
+        ):
+            dropped = buffer.messages.popleft()
+            buffer.keys.discard(_key(dropped))
+            dropped_at = _utc(dropped.created_at)
+            if buffer.covered_since is None or dropped_at > buffer.covered_since:
+                buffer.covered_since = dropped_at
+        if buffer.covered_since is not None and buffer.covered_since < horizon:
+            buffer.covered_since = horizon
@@ -0,0 +1,182 @@
+"""
+Outbound message dispatcher: per-channel send queues with rate limiting.
+
+Replies, scheduled posts, reminders and random chat used to call
+channel.send()/message.reply() directly, leaving the library's 429 handling
+to serialise them however it happened to. Everything now goes through one
+queue per channel:
+
+- each channel has a token bucket (OUTBOUND_BUCKET_CAPACITY messages per
+  OUTBOUND_BUCKET_SECONDS, Discord's per-channel message limit), so sends
+  are paced before the platform has to push back;
+- interactive replies jump ahead of scheduled posts queued in the same
+  channel;
+- small consecutive sends to the same place are coalesced into one message
+  while they fit in DISCORD_MESSAGE_LIMIT;
+- if a send fails with a rate-limit error carrying retry_after, the channel
+  pauses for that long and the send is retried.
+
+Callers await send()/reply() as before; they return once the message has
+gone out and raise whatever the send raised.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from src.utils.constants import (
+    DISCORD_MESSAGE_LIMIT, OUTBOUND_BUCKET_CAPACITY, OUTBOUND_BUCKET_SECONDS, OUTBOUND_MAX_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Priorities: lower goes first
+INTERACTIVE = 0
+SCHEDULED = 1
+
+
+class _TokenBucket:
+    """Allows `capacity` sends per `per_seconds`, refilled continuously."""
+
+    def __init__(self, capacity: int, per_seconds: float, clock):
+        self.capacity = capacity
+        self.rate = capacity / per_seconds
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a send may go; 0 means now (and the token is taken)."""
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """The platform said to back off: no sends for `seconds`, then one at a time as the bucket refills."""
+        self._paused_until = self._clock() + seconds
+        self._tokens = 1.0
+        self._updated = self._paused_until
+
+
+class _Outgoing:
+    __slots__ = ("priority", "seq", "target", "is_reply", "text", "kwargs", "futures", "attempts")
+
+    def __init__(self, priority, seq, target, is_reply, text, kwargs, future):
+        self.priority = priority
+        self.seq = seq
+        self.target = target
+        self.is_reply = is_reply
+        self.text = text
+        self.kwargs = kwargs
+        self.futures = [future]
+        self.attempts = 0
+
+    def __lt__(self, other: "_Outgoing") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def can_absorb(self, other: "_Outgoing", limit: int) -> bool:
+        return (not self.kwargs and not other.kwargs
+                and self.is_reply == other.is_reply
+                and self.target is other.target
+                and len(self.text) + 1 + len(other.text) <= limit)
+
+
+class OutboundDispatcher:
+    """Per-channel prioritised, paced and coalescing send queues."""
+
+    def __init__(self, capacity: int = OUTBOUND_BUCKET_CAPACITY, per_seconds: float = OUTBOUND_BUCKET_SECONDS,
+                 coalesce_limit: int = DISCORD_MESSAGE_LIMIT, clock=time.monotonic, sleep=asyncio.sleep):
+        self.capacity = capacity
+        self.per_seconds = per_seconds
+        self.coalesce_limit = coalesce_limit
+        self._clock = clock
+        self._sleep = sleep
+        self._queues: Dict[str, List[_Outgoing]] = {}
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._seq = itertools.count()
+        self.sent = 0
+        self.coalesced = 0
+
+    async def send(self, channel, text: str, priority: int = SCHEDULED, **kwargs) -> None:
+        """Queue channel.send(text, **kwargs) and wait until it has gone out."""
+        await self._enqueue(channel.id, channel, False, text, kwargs, priority)
+
+    async def reply(self, message, text: str, priority: int = INTERACTIVE, **kwargs) -> None:
+        """Queue message.reply(text, **kwargs) and wait until it has gone out."""
+        await self._enqueue(message.channel_id, message, True, text, kwargs, priority)
+
+    def queue_depth(self, channel_id: str) -> int:
+        return len(self._queues.get(channel_id, ()))
+
+    async def _enqueue(self, channel_id: str, target: Any, is_reply: bool, text: str,
+                       kwargs: dict, priority: int) -> None:
+        future = asyncio.get_running_loop().create_future()
+        item = _Outgoing(priority, next(self._seq), target, is_reply, text, kwargs, future)
+        heapq.heappush(self._queues.setdefault(channel_id, []), item)
+        worker = self._workers.get(channel_id)
+        if worker is None or worker.done():
+            self._workers[channel_id] = asyncio.create_task(self._drain(channel_id))
+        await future
+
+    async def _drain(self, channel_id: str) -> None:
+        queue = self._queues[channel_id]
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = _TokenBucket(self.capacity, self.per_seconds, self._clock)
+        while queue:
+            while (delay := bucket.wait_time()) > 0:
+                await self._sleep(delay)
+            item = self._take(queue)
+            try:
+                if item.is_reply:
+                    await item.target.reply(item.text, **item.kwargs)
+                else:
+                    await item.target.send(item.text, **item.kwargs)
+            except Exception as e:
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after is not None and item.attempts < OUTBOUND_MAX_RETRIES:
+                    logger.warning(f"Rate limited in channel {channel_id}; retrying in {retry_after:.1f}s")
+                    item.attempts += 1
+                    bucket.pause(retry_after)
+                    heapq.heappush(queue, item)
+                    continue
+                self._settle(item, error=e)
+                continue
+            self.sent += 1
+            self._settle(item)
+
+    def _take(self, queue: List[_Outgoing]) -> _Outgoing:
+        """Pop the next send, folding in any small ones queued right behind it for the same place."""
+        item = heapq.heappop(queue)
+        while queue and item.can_absorb(queue[0], self.coalesce_limit):
+            following = heapq.heappop(queue)
+            item.text = f"{item.text}\n{following.text}"
+            item.futures.extend(following.futures)
+            self.coalesced += 1
+        return item
+
+    @staticmethod
+    def _settle(item: _Outgoing, error: Optional[BaseException] = None) -> None:
+        for future in item.futures:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
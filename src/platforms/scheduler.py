@@ -0,0 +1,193 @@
+"""
+Job scheduler shared by the platform adapters.
+
+schedule_daily()/schedule_interval() on either adapter register jobs here,
+and start_schedules() starts one loop per job. Compared with the adapters'
+old in-memory timers:
+
+- with a ScheduleStore attached, each job's next run time is kept in SQLite.
+  A daily run missed while the bot was down (a restart at 18:05 skipping the
+  18:00 image) runs on startup if it is less than SCHEDULER_CATCH_UP_HOURS
+  late; an overdue interval job runs at once;
+- a run holds a lease in the store, so processes sharing the database (shards
+  on one host) never run the same job twice or at once. Within a process each
+  job has one loop, so a slow run delays the next one instead of overlapping;
+- daily jobs start a random delay of up to SCHEDULER_DAILY_JITTER_MINUTES
+  after their hour, so the nightly batch jobs don't all hit the LLM together;
+- every run's start and duration (and error, if it failed) is recorded.
+
+Registering a job again under the same name (handle_ready runs on every
+reconnect) replaces its callback rather than starting a second loop.
+
+Several bots can share one database (run.sh mounts the same data/gepetto.db
+into every container): each Scheduler stores its jobs under its namespace,
+the bot's name, so bots never share run times or leases, only processes of
+the same bot do.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.utils.constants import (
+    SCHEDULER_DAILY_JITTER_MINUTES, SCHEDULER_CATCH_UP_HOURS, SCHEDULER_RUN_LEASE_HOURS,
+    SCHEDULER_HISTORY_DAYS, SCHEDULER_BUSY_RECHECK_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def next_daily_run(now: datetime, hour: int, minute: int = 0, tz=None) -> datetime:
+    """The first hour:minute wall-clock time in tz strictly after now."""
+    tz = tz or timezone.utc
+    today = now.astimezone(tz).date()
+    for days in range(3):
+        naive = datetime.combine(today + timedelta(days=days), time(hour, minute))
+        # pytz zones need localize() to pick the right UTC offset for that date
+        target = tz.localize(naive) if hasattr(tz, "localize") else naive.replace(tzinfo=tz)
+        if target > now:
+            return target
+    raise ValueError(f"No run time found after {now}")
+
+
+@dataclass
+class ScheduledJob:
+    """A registered job: daily at hour:minute in tz, or every `minutes`."""
+    name: str
+    callback: Callable[[], Awaitable]
+    hour: Optional[int] = None
+    minute: int = 0
+    tz: object = None
+    minutes: Optional[int] = None
+
+    @property
+    def daily(self) -> bool:
+        return self.minutes is None
+
+
+class Scheduler:
+    """Runs registered jobs on time, optionally persisting their state in a ScheduleStore."""
+
+    def __init__(self, store=None, jitter_minutes: float = SCHEDULER_DAILY_JITTER_MINUTES,
+                 catch_up_hours: float = SCHEDULER_CATCH_UP_HOURS, clock=_utcnow, sleep=asyncio.sleep,
+                 rand=random.random, namespace: str = ""):
+        self.store = store
+        self.namespace = namespace
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self.jitter = timedelta(minutes=jitter_minutes)
+        self.catch_up = timedelta(hours=catch_up_hours)
+        self._clock = clock
+        self._sleep = sleep
+        self._rand = rand
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._next_runs: Dict[str, datetime] = {}  # used when there is no store
+        self._owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    def add_daily(self, name: str, callback, hour: int, minute: int = 0, tz=None) -> None:
+        self.jobs[name] = ScheduledJob(name, callback, hour=hour, minute=minute, tz=tz)
+
+    def add_interval(self, name: str, callback, minutes: int = 60) -> None:
+        self.jobs[name] = ScheduledJob(name, callback, minutes=minutes)
+
+    def start(self) -> None:
+        """Start a loop for every job that hasn't got one running."""
+        now = self._clock()
+        if self.store is not None:
+            self.store.prune_runs(now - timedelta(days=SCHEDULER_HISTORY_DAYS))
+        for name in self.jobs:
+            task = self._tasks.get(name)
+            if task is None or task.done():
+                self._set_next_run(name, self._first_run(self.jobs[name], now))
+                self._tasks[name] = asyncio.create_task(self._loop(name))
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    def next_run_after(self, job: ScheduledJob, after: datetime) -> datetime:
+        """When a job should next run, given it last finished at `after`."""
+        if not job.daily:
+            return after + timedelta(minutes=job.minutes)
+        return next_daily_run(after, job.hour, job.minute, job.tz) + self._rand() * self.jitter
+
+    def _first_run(self, job: ScheduledJob, now: datetime) -> datetime:
+        """When a job should first run after startup, catching up a missed run if it's recent enough."""
+        stored = self._get_next_run(job.name)
+        if stored is None:
+            # Never run before: interval jobs start now, daily jobs at their next time
+            return now if not job.daily else self.next_run_after(job, now)
+        if stored > now:
+            # Scheduled for later; reschedule if the job's timing has since changed
+            latest = now + (timedelta(minutes=job.minutes) if not job.daily else timedelta(days=1) + self.jitter)
+            return stored if stored <= latest else self.next_run_after(job, now)
+        if job.daily and now - stored > self.catch_up:
+            logger.info(f"Skipping missed run of '{job.name}' due at {stored:%Y-%m-%d %H:%M %Z}: too late to catch up")
+            return self.next_run_after(job, now)
+        logger.info(f"Catching up missed run of '{job.name}' due at {stored:%Y-%m-%d %H:%M %Z}")
+        return stored
+
+    def _key(self, name: str) -> str:
+        """A job's name in the store."""
+        return f"{self.namespace}:{name}" if self.namespace else name
+
+    def _get_next_run(self, name: str) -> Optional[datetime]:
+        if self.store is None:
+            return self._next_runs.get(name)
+        state = self.store.get(self._key(name))
+        return state.next_run_at if state else None
+
+    def _set_next_run(self, name: str, when: datetime) -> None:
+        if self.store is None:
+            self._next_runs[name] = when
+        else:
+            self.store.set_next_run(self._key(name), when)
+
+    async def _loop(self, name: str) -> None:
+        while True:
+            now = self._clock()
+            # Read back each time: another process may have run the job meanwhile
+            due = self._get_next_run(name)
+            if due is not None and due > now:
+                await self._sleep((due - now).total_seconds())
+                continue
+            if self.store is not None and not self.store.try_start(
+                    self._key(name), self._owner, now, timedelta(hours=SCHEDULER_RUN_LEASE_HOURS)):
+                # Someone else is running it; they'll set the next run time
+                await self._sleep(SCHEDULER_BUSY_RECHECK_SECONDS)
+                continue
+            await self._run(self.jobs[name], due or now)
+
+    async def _run(self, job: ScheduledJob, due: datetime) -> None:
+        started = self._clock()
+        error = None
+        try:
+            await job.callback()
+        except Exception as e:
+            logger.exception(f"Error in scheduled job '{job.name}'")
+            error = repr(e)
+        finished = self._clock()
+        duration = (finished - started).total_seconds()
+        if job.daily:
+            next_run = self.next_run_after(job, finished)
+        else:
+            # Keep to the interval grid, skipping slots a long run overlapped
+            next_run = self.next_run_after(job, due)
+            while next_run <= finished:
+                next_run = self.next_run_after(job, next_run)
+        if self.store is None:
+            self._next_runs[job.name] = next_run
+        else:
+            self.store.finish(self._key(job.name), started, duration, next_run, error)
+        logger.info(f"Scheduled job '{job.name}' {'failed' if error else 'finished'} in {duration:.1f}s; "
+                    f"next run {next_run:%Y-%m-%d %H:%M %Z}")
@@ -0,0 +1,306 @@
+"""
+Gateway/worker split: answer messages in separate processes.
+
+With BOT_ROLE=all (the default) one process does everything. With
+BOT_ROLE=gateway the process holding the platform connection keeps the cheap
+per-message work (archive, activity, guard) and the scheduled jobs. Messages
+to answer still go through its InboundDispatcher (fairness, queue bounds,
+collapsing), but the dispatcher's job enqueues the message on the SQLite job
+queue and waits for a worker to finish it (wait_for_job()). BOT_ROLE=worker processes (the gateway starts BOT_WORKERS of them itself,
+or run them separately) claim those jobs, answer them with the same code,
+and read history over the platform's REST API, so slow LLM and media calls
+use other cores and never hold up gateway heartbeats.
+
+Replies from workers don't go to the platform directly: they are enqueued on
+the outbound queue, and the gateway relays them through its
+OutboundDispatcher, so per-channel pacing still covers every worker.
+
+Workers also tell the gateway about state it keeps in memory (a reminder
+saved, say) with notify(): an event on the same outbound queue, handled by
+the relay as soon as it is claimed rather than waiting for a reload.
+
+Every bot sharing the database has its own pair of queues (bot_queue()), so
+one bot's workers never answer another bot's messages.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import socket
+import subprocess
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.utils.constants import (
+    INBOUND_MAX_CONCURRENT, JOB_QUEUE_POLL_SECONDS, JOB_QUEUE_RETRY_SECONDS, RELAY_RECENT_MESSAGES,
+)
+
+from .base import ChatMessage
+from .outbound import INTERACTIVE, SCHEDULED
+
+logger = logging.getLogger(__name__)
+
+INBOUND_QUEUE = "inbound"
+OUTBOUND_QUEUE = "outbound"
+
+
+def bot_queue(queue: str, bot_name: str) -> str:
+    """The name of one bot's inbound or outbound queue."""
+    return f"{queue}:{bot_name}"
+
+
+def worker_id() -> str:
+    """Identifies this process in the job queue's claimed_by column."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def message_to_payload(message: ChatMessage) -> dict:
+    """A ChatMessage as JSON-safe data (the platform's raw object is left behind)."""
+    return {
+        "content": message.content,
+        "author_id": message.author_id,
+        "author_name": message.author_name,
+        "author_display_name": message.author_display_name,
+        "author_is_bot": message.author_is_bot,
+        "author_mention": message.author_mention,
+        "channel_id": message.channel_id,
+        "server_id": message.server_id,
+        "created_at": message.created_at.isoformat(),
+        "reply_to_author_id": message.reply_to_author_id,
+        "id": message.id,
+    }
+
+
+def message_from_payload(payload: dict) -> ChatMessage:
+    return ChatMessage(**{**payload, "created_at": datetime.fromisoformat(payload["created_at"])})
+
+
+async def wait_for_job(store, job_id: int, poll_seconds: float = JOB_QUEUE_POLL_SECONDS) -> None:
+    """Wait until a worker has finished a job, or it has failed for good."""
+    while store.is_open(job_id):
+        await asyncio.sleep(poll_seconds)
+
+
+class QueuedOutbound:
+    """Worker-side stand-in for OutboundDispatcher: each send becomes an outbound job."""
+
+    def __init__(self, store, bot_name: str):
+        self._store = store
+        self._queue = bot_queue(OUTBOUND_QUEUE, bot_name)
+
+    async def send(self, channel, text: str, priority: int = SCHEDULED, **kwargs) -> None:
+        self._store.enqueue(self._queue, {
+            "channel_id": channel.id, "text": text, "priority": priority,
+        })
+
+    async def reply(self, message: ChatMessage, text: str, priority: int = INTERACTIVE,
+                    mention_author: bool = True, **kwargs) -> None:
+        self._store.enqueue(self._queue, {
+            "channel_id": message.channel_id, "text": text, "priority": priority,
+            "reply_to": message.id, "mention_author": mention_author,
+        })
+
+    def notify(self, event: str, **data) -> None:
+        """Queue an event for the gateway's OutboxRelay to handle."""
+        self._store.enqueue(self._queue, {"event": event, **data})
+
+    def attach(self, message: ChatMessage) -> None:
+        """Route message.reply() through the outbound queue too."""
+        async def reply(text: str, mention_author: bool = True) -> None:
+            await self.reply(message, text, mention_author=mention_author)
+
+        message.reply = reply
+
+
+class OutboxRelay:
+    """Gateway side: delivers workers' outbound jobs through the real dispatcher.
+
+    events maps the name of a notify() event to a callable taking its payload.
+    """
+
+    def __init__(self, store, platform, outbound, bot_name: str,
+                 events: Optional[Dict[str, Callable[[dict], None]]] = None,
+                 poll_seconds: float = JOB_QUEUE_POLL_SECONDS, recent_limit: int = RELAY_RECENT_MESSAGES,
+                 retry_seconds: float = JOB_QUEUE_RETRY_SECONDS):
+        self._store = store
+        self._events = events or {}
+        self._queue = bot_queue(OUTBOUND_QUEUE, bot_name)
+        self._platform = platform
+        self._outbound = outbound
+        self._poll_seconds = poll_seconds
+        self._retry_seconds = retry_seconds
+        self._recent_limit = recent_limit
+        self._recent: "OrderedDict[str, ChatMessage]" = OrderedDict()
+        self._tasks: set = set()
+        self._worker_id = worker_id()
+
+    def remember(self, message: ChatMessage) -> None:
+        """Keep a message handed to a worker, so its answer can be a real reply."""
+        if not message.id:
+            return
+        self._recent[message.id] = message
+        self._recent.move_to_end(message.id)
+        while len(self._recent) > self._recent_limit:
+            self._recent.popitem(last=False)
+
+    async def run(self) -> None:
+        """Relay outbound jobs forever. A failed claim is logged and retried
+        rather than ending the relay, and the loop yields between claims so
+        a backlog never holds up the gateway's event loop."""
+        while True:
+            try:
+                claimed = self.step()
+            except Exception:
+                logger.exception("Claiming outbound jobs failed")
+                await asyncio.sleep(self._retry_seconds)
+                continue
+            await asyncio.sleep(0 if claimed else self._poll_seconds)
+
+    def step(self) -> bool:
+        """Start delivering one outbound job. False if there was none."""
+        claimed = self._store.claim(self._queue, self._worker_id)
+        if claimed is None:
+            return False
+        # Each send waits on its channel's pacing: don't let one busy
+        # channel hold up the rest
+        task = asyncio.create_task(self._deliver(*claimed))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def join(self) -> None:
+        """Wait for deliveries in flight."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def _deliver(self, job_id: int, payload: dict) -> None:
+        if "event" in payload:
+            self._handle_event(job_id, payload)
+            return
+        priority = payload.get("priority", SCHEDULED)
+        try:
+            target = self._recent.get(payload.get("reply_to") or "")
+            if target is not None:
+                await self._outbound.reply(target, payload["text"], priority=priority,
+                                           mention_author=payload.get("mention_author", True))
+            else:
+                channel = self._platform.get_channel(payload["channel_id"])
+                if channel is None:
+                    self._store.fail(job_id, f"Unknown channel {payload['channel_id']}")
+                    return
+                await self._outbound.send(channel, payload["text"], priority=priority)
+        except Exception as e:
+            logger.warning(f"Relaying outbound job {job_id} failed: {e}")
+            self._store.fail(job_id, repr(e), retry=True)
+            return
+        self._store.complete(job_id)
+
+    def _handle_event(self, job_id: int, payload: dict) -> None:
+        handler = self._events.get(payload["event"])
+        if handler is None:
+            self._store.fail(job_id, f"Unknown event {payload['event']}")
+            return
+        try:
+            handler(payload)
+        except Exception as e:
+            logger.exception(f"Handling event {payload['event']} (job {job_id}) failed")
+            self._store.fail(job_id, repr(e))
+            return
+        self._store.complete(job_id)
+
+
+class JobWorker:
+    """Worker side: claims inbound jobs and runs them, up to `concurrency` at once.
+
+    handlers maps a job's "kind" to an async callable taking the message and
+    the job payload; prepare, if given, is awaited with the message first
+    (to fetch its channel, say).
+    """
+
+    def __init__(self, store, handlers: Dict[str, Callable[[ChatMessage, dict], Awaitable]],
+                 outbound: QueuedOutbound, bot_name: str,
+                 prepare: Optional[Callable[[ChatMessage], Awaitable]] = None,
+                 concurrency: int = INBOUND_MAX_CONCURRENT, poll_seconds: float = JOB_QUEUE_POLL_SECONDS,
+                 retry_seconds: float = JOB_QUEUE_RETRY_SECONDS):
+        self._store = store
+        self._queue = bot_queue(INBOUND_QUEUE, bot_name)
+        self._handlers = handlers
+        self._outbound = outbound
+        self._prepare = prepare
+        self._slots = asyncio.Semaphore(concurrency)
+        self._poll_seconds = poll_seconds
+        self._retry_seconds = retry_seconds
+        self._tasks: set = set()
+        self._worker_id = worker_id()
+
+    async def run(self) -> None:
+        """Claim and run jobs forever. A failed claim is logged and retried
+        rather than ending the worker."""
+        while True:
+            await self._slots.acquire()
+            try:
+                started = self._start_next()
+            except Exception:
+                logger.exception("Claiming inbound jobs failed")
+                self._slots.release()
+                await asyncio.sleep(self._retry_seconds)
+                continue
+            if not started:
+                self._slots.release()
+            await asyncio.sleep(0 if started else self._poll_seconds)
+
+    async def run_pending(self) -> None:
+        """Run every job currently queued, then return."""
+        while True:
+            await self._slots.acquire()
+            if not self._start_next():
+                self._slots.release()
+                break
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    def _start_next(self) -> bool:
+        claimed = self._store.claim(self._queue, self._worker_id)
+        if claimed is None:
+            return False
+        task = asyncio.create_task(self._run(*claimed))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _run(self, job_id: int, payload: dict) -> None:
+        try:
+            message = message_from_payload(payload["message"])
+            self._outbound.attach(message)
+            handler = self._handlers[payload["kind"]]
+            if self._prepare is not None:
+                await self._prepare(message)
+            await handler(message, payload)
+        except Exception as e:
+            # Not retried: the job may already have posted part of its answer
+            logger.exception(f"Inbound job {job_id} failed")
+            self._store.fail(job_id, repr(e))
+        else:
+            self._store.complete(job_id)
+        finally:
+            self._slots.release()
+
+
+def spawn_workers(count: int, script: str) -> list:
+    """Start `count` worker processes running `script`; they are stopped when this process exits."""
+    processes = [
+        subprocess.Popen([sys.executable, script], env={**os.environ, "BOT_ROLE": "worker"})
+        for _ in range(count)
+    ]
+
+    def stop():
+        for process in processes:
+            process.terminate()
+
+    if processes:
+        atexit.register(stop)
+        logger.info(f"Started {count} worker process(es)")
+    return processes
@@ -11,7 +11,7 @@ def get_today_formatted():
     month_name = today.strftime("%B")
     return f"the {day}{suffix} of {month_name}"
 
-async def get_birthday_message(platform, chatbot):
+async def get_birthday_message(platform, chatbot, outbound=None):
     birthdays = os.getenv('DISCORD_BOT_BIRTHDAYS', "").split(",")
     # each birthday will be formatted as "discord_username:dd/mm"
     if len(birthdays) == 0:
@@ -44,4 +44,8 @@ async def get_birthday_message(platform, chatbot):
             message = message.replace("Sure! ", '')
             message = message.replace("Here's a random fact for you: ", '')
             message = message.replace("Certainly! ", '')
-            await channel.send(f"Happy birthday {mention}! {message}")
+            text = f"Happy birthday {mention}! {message}"
+            if outbound is not None:
+                await outbound.send(channel, text)
+            else:
+                await channel.send(text)
@@ -0,0 +1,219 @@
+"""
+Catch-up summaries of chat history.
+
+A long absence can cover thousands of messages across many channels, far
+more than one prompt should hold. Small volumes are summarised in one call.
+Larger ones are split per channel into time-window chunks, which are
+summarised concurrently (map). The partial summaries are then combined,
+in rounds of at most CATCH_UP_REDUCE_FAN_IN, into one Discord-sized reply
+(reduce). Latency is about one chunk call per CATCH_UP_SUMMARY_CONCURRENCY
+chunks plus one call per reduce round, so it stays roughly flat as the
+chat gets busier.
+
+digest_channel() runs the same chunk step ahead of time, in the background,
+so a catch-up can start from stored digests and only summarise the tail.
+merge_digests() rolls a channel's older digests up into coarser ones, so
+even a week's catch-up fits the stored notes into the final call.
+"""
+import asyncio
+import logging
+from datetime import timedelta, timezone
+from typing import Any, List, Optional, Tuple
+
+from src.utils.constants import (
+    CATCH_UP_BUSY_THRESHOLD, CATCH_UP_DIRECT_MESSAGES, CATCH_UP_CHUNK_HOURS,
+    CATCH_UP_CHUNK_MESSAGES, CATCH_UP_SUMMARY_CONCURRENCY, CATCH_UP_REDUCE_FAN_IN, CATCH_UP_DIGEST_HOURS,
+    CATCH_UP_DIGEST_FINAL_NOTES,
+)
+
+logger = logging.getLogger(__name__)
+
+QUIET_PROMPT = """Summarise what happened in this Discord chat. Keep it to ONE Discord message (~1500 characters max).
+Use brief bullet points. Mention key topics, decisions, interesting links, and who was involved.
+Messages come from multiple channels (shown as #channel-name). Cover the full timespan.
+Wrap any URLs in angle brackets like <https://example.com> to prevent Discord previews.
+Keep your personality - if the chat was mundane, say so dismissively. If it was dramatic, be appropriately sardonic."""
+
+BUSY_PROMPT = """Summarise what happened in this Discord chat. There were {message_count} messages.
+Your ENTIRE summary MUST fit in one Discord message (~1500 characters). This is a hard limit — be ruthless.
+Group by theme, NOT by channel. Use terse bullet points.
+Routine chat (meetings, greetings, banter, work moaning) gets ONE bullet max. Don't quote messages or list every URL.
+Only expand on things that are genuinely unusual, funny, or surprising.
+Mention who was involved. Wrap any URLs in angle brackets like <https://example.com>.
+Keep your personality - if the chat was mundane, say so dismissively. If it was dramatic, be appropriately sardonic."""
+
+CHUNK_PROMPT = """You are condensing one stretch of a Discord channel so it can be merged with others into a catch-up summary.
+Write 2-6 terse bullet points: topics, decisions, plans, notable links and anything funny or surprising.
+Always say who was involved. Skip greetings and filler. No preamble, no personality — just the facts."""
+
+MERGE_PROMPT = """These are notes on different stretches of a Discord server's chat, labelled by channel and time.
+Merge them into one set of at most 10 terse bullet points, grouped by theme, keeping who was involved
+and anything genuinely notable. Drop routine chat. No preamble, no personality — just the facts."""
+
+Entry = Tuple[str, Any]  # (channel_name, message)
+
+
+def final_prompt(message_count: int) -> str:
+    """The volume-adaptive system prompt for the reply itself."""
+    if message_count <= CATCH_UP_BUSY_THRESHOLD:
+        return QUIET_PROMPT
+    return BUSY_PROMPT.format(message_count=message_count)
+
+
+def format_line(channel_name: str, msg) -> str:
+    """One message as a prompt line."""
+    return f"[#{channel_name} {msg.created_at.strftime('%H:%M')}] {msg.author_name}: {msg.content[:300]}"
+
+
+def chunk_messages(messages: List[Entry], window_hours: Optional[float] = None,
+                   max_messages: Optional[int] = None) -> List[List[Entry]]:
+    """
+    Split chronological (channel_name, msg) pairs into per-channel chunks,
+    each spanning at most window_hours (default CATCH_UP_CHUNK_HOURS) and
+    holding at most max_messages (default CATCH_UP_CHUNK_MESSAGES). Chunks
+    come back in order of their first message.
+    """
+    window = timedelta(hours=window_hours or CATCH_UP_CHUNK_HOURS)
+    max_messages = max_messages or CATCH_UP_CHUNK_MESSAGES
+    open_chunks = {}
+    chunks = []
+    for entry in messages:
+        channel_name, msg = entry
+        chunk = open_chunks.get(channel_name)
+        if chunk is None or len(chunk) >= max_messages or msg.created_at - chunk[0][1].created_at >= window:
+            chunk = open_chunks[channel_name] = []
+            chunks.append(chunk)
+        chunk.append(entry)
+    return chunks
+
+
+def _chunk_label(chunk: List[Entry]) -> str:
+    first, last = chunk[0][1].created_at, chunk[-1][1].created_at
+    return _period_label(chunk[0][0], first, last, len(chunk))
+
+
+def _period_label(channel_name: str, start, end, message_count: int) -> str:
+    return f"#{channel_name} {start.strftime('%a %H:%M')}–{end.strftime('%H:%M')} ({message_count} messages)"
+
+
+def _digest_notes(digest: dict) -> str:
+    label = _period_label(digest["channel_name"], digest["period_start"], digest["period_end"], digest["message_count"])
+    return f"{label}:\n{digest['digest']}"
+
+
+async def _chunk_notes(chatbot, chunk: List[Entry], semaphore: asyncio.Semaphore) -> str:
+    """A few bullets on one chunk of a channel."""
+    label = _chunk_label(chunk)
+    chat_text = "\n".join(format_line(name, msg) for name, msg in chunk)
+    async with semaphore:
+        return await _ask(chatbot, CHUNK_PROMPT, f"{label}:\n\n{chat_text}")
+
+
+async def digest_channel(chatbot, channel_name: str, messages: List[Any]) -> List[dict]:
+    """
+    Digests of one channel's chronological messages, one per chunk of at
+    most CATCH_UP_DIGEST_HOURS: [{"period_start", "period_end",
+    "message_count", "digest"}]. Raises if any summary call fails, so the
+    caller can retry the whole stretch later.
+    """
+    chunks = chunk_messages([(channel_name, msg) for msg in messages], window_hours=CATCH_UP_DIGEST_HOURS)
+    semaphore = asyncio.Semaphore(CATCH_UP_SUMMARY_CONCURRENCY)
+    notes = await asyncio.gather(*(_chunk_notes(chatbot, chunk, semaphore) for chunk in chunks))
+    return [
+        {
+            "period_start": chunk[0][1].created_at,
+            "period_end": chunk[-1][1].created_at,
+            "message_count": len(chunk),
+            "digest": digest,
+        }
+        for chunk, digest in zip(chunks, notes)
+    ]
+
+
+async def merge_digests(chatbot, digests: List[dict]) -> dict:
+    """
+    One digest in place of several of a channel's stored digests (oldest
+    first), spanning all of them. Raises if the summary call fails.
+    """
+    merged = await _ask(chatbot, MERGE_PROMPT, "\n\n".join(_digest_notes(d) for d in digests))
+    return {
+        "period_start": digests[0]["period_start"],
+        "period_end": max(d["period_end"] for d in digests),
+        "message_count": sum(d["message_count"] for d in digests),
+        "digest": merged,
+    }
+
+
+async def summarise(chatbot, messages: List[Entry], reader_name: str, digests: List[dict] = ()) -> str:
+    """
+    Summarise chronological (channel_name, msg) pairs for reader_name in one
+    Discord-sized message.
+
+    `digests` (from DigestStore) stand in for older stretches of chat that
+    were already summarised; `messages` is then just the live tail, passed
+    to the final call as-is when it's small.
+    """
+    message_count = len(messages) + sum(d["message_count"] for d in digests)
+    if not digests and len(messages) <= CATCH_UP_DIRECT_MESSAGES:
+        chat_text = "\n".join(format_line(name, msg) for name, msg in messages)
+        return await _ask(chatbot, final_prompt(message_count),
+                          f"Summarise this chat for {reader_name}:\n\n{chat_text}")
+
+    semaphore = asyncio.Semaphore(CATCH_UP_SUMMARY_CONCURRENCY)
+
+    async def summarise_chunk(chunk: List[Entry]) -> Tuple[Any, str]:
+        notes = await _chunk_notes(chatbot, chunk, semaphore)
+        return chunk[0][1].created_at, f"{_chunk_label(chunk)}:\n{notes}"
+
+    async def merge(group: List[str]) -> str:
+        async with semaphore:
+            return await _ask(chatbot, MERGE_PROMPT, "\n\n".join(group))
+
+    # (start time, notes) for every stretch of chat, so they can be put in order
+    partials = [(d["period_start"], _digest_notes(d)) for d in digests]
+    if len(messages) <= CATCH_UP_DIRECT_MESSAGES:
+        if messages:
+            tail = "\n".join(format_line(name, msg) for name, msg in messages)
+            partials.append((messages[0][1].created_at, f"Latest messages:\n{tail}"))
+    else:
+        chunks = chunk_messages(messages)
+        logger.info(f"Catch-up: {len(messages)} messages in {len(chunks)} chunks")
+        partials.extend(await _gather_ok(summarise_chunk(chunk) for chunk in chunks))
+    partials = [notes for _, notes in sorted(partials, key=lambda p: _utc(p[0]))]
+
+    # Stored digests are already condensed and rolled up as they age, so a
+    # digest-backed catch-up sends them straight to the final call
+    limit = CATCH_UP_DIGEST_FINAL_NOTES if digests else CATCH_UP_REDUCE_FAN_IN
+    while len(partials) > limit:
+        groups = [partials[i:i + CATCH_UP_REDUCE_FAN_IN] for i in range(0, len(partials), CATCH_UP_REDUCE_FAN_IN)]
+        partials = await _gather_ok(merge(group) for group in groups)
+
+    notes = "\n\n".join(partials)
+    return await _ask(chatbot, final_prompt(message_count),
+                      f"Summarise this chat for {reader_name}. These are notes on "
+                      f"{message_count} messages, in time order:\n\n{notes}")
+
+
+def _utc(dt):
+    return dt.astimezone(timezone.utc)
+
+
+async def _ask(chatbot, system_prompt: str, user_text: str) -> str:
+    response = await chatbot.chat([
+        {'role': 'system', 'content': system_prompt},
+        {'role': 'user', 'content': user_text},
+    ], tools=[])
+    return response.message.strip()
+
+
+async def _gather_ok(coros) -> List[str]:
+    """Run summary calls concurrently, dropping (and logging) any that fail.
+    Raises the first error if every one failed."""
+    results = await asyncio.gather(*coros, return_exceptions=True)
+    ok = [r for r in results if not isinstance(r, BaseException)]
+    failed = [r for r in results if isinstance(r, BaseException)]
+    for error in failed:
+        logger.warning(f"Catch-up summary call failed: {error}")
+    if failed and not ok:
+        raise failed[0]
+    return ok
@@ -0,0 +1,117 @@
+"""
+In-memory reminder timer: deliver each reminder when it falls due.
+
+Reminders used to wait for a check every REMINDER_FREQUENCY minutes, each of
+which scanned the table, so they were late by up to that long while the
+database was polled all day. The timer keeps pending reminders in a min-heap
+keyed on remind_at, loaded once from ReminderStore (and again on reconnect),
+and sleeps exactly until the soonest one. add() wakes it when a new reminder
+would be due earlier (reminders saved by BOT_ROLE=worker processes reach the
+gateway's add() as outbox events); discard() drops one. Before delivering, a reminder is
+re-read from the store, so one deleted or already sent elsewhere is skipped.
+A delivery that fails is tried again REMINDER_TIMER_RETRY_SECONDS later.
+"""
+
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Iterable, List, Optional, Set, Tuple
+
+from src.utils.constants import REMINDER_TIMER_MAX_SLEEP_SECONDS, REMINDER_TIMER_RETRY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderTimer:
+    """Min-heap of (remind_at, reminder id), fired in order by one background task.
+
+    deliver is awaited with each due Reminder and is responsible for sending
+    it and marking it reminded.
+    """
+
+    def __init__(self, store, deliver: Callable[[object], Awaitable], bot_name: Optional[str] = None,
+                 clock=datetime.now):
+        self._store = store
+        self._deliver = deliver
+        self.bot_name = bot_name
+        self._clock = clock
+        self._heap: List[Tuple[datetime, int]] = []
+        self._discarded: Set[int] = set()
+        self._loaded = False
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def load(self, server_ids: Iterable[str]) -> int:
+        """(Re)build the heap from every pending reminder in these servers. Returns how many."""
+        heap = []
+        for server_id in server_ids:
+            heap.extend((r.remind_at, r.id) for r in self._store.get_pending(server_id, bot_name=self.bot_name))
+        heapq.heapify(heap)
+        self._heap = heap
+        self._discarded.clear()
+        self._loaded = True
+        self._wake.set()
+        return len(heap)
+
+    def add(self, reminder_id: int, remind_at: datetime) -> None:
+        """Track a newly saved reminder (ignored until load(): the store is read then)."""
+        if not self._loaded:
+            return
+        heapq.heappush(self._heap, (remind_at, reminder_id))
+        if self._heap[0][1] == reminder_id:
+            self._wake.set()
+
+    def discard(self, reminder_id: int) -> None:
+        """Stop tracking a deleted reminder; it is dropped when it reaches the top of the heap."""
+        self._discarded.add(reminder_id)
+
+    def next_due(self) -> Optional[datetime]:
+        return self._heap[0][0] if self._heap else None
+
+    def start(self) -> None:
+        """Start the background task, unless it is already running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            if not self._heap:
+                await self._wake.wait()
+                continue
+            remind_at, reminder_id = self._heap[0]
+            delay = (remind_at - self._clock()).total_seconds()
+            if delay > 0:
+                # Capped so the wall clock is re-read now and then; add() or
+                # load() wake us early
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=min(delay, REMINDER_TIMER_MAX_SLEEP_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            await self._fire(reminder_id)
+
+    async def _fire(self, reminder_id: int) -> None:
+        if reminder_id in self._discarded:
+            self._discarded.discard(reminder_id)
+            return
+        try:
+            reminder = self._store.get(reminder_id)
+            if reminder is None or reminder.reminded_at is not None:
+                return
+            await self._deliver(reminder)
+        except Exception:
+            logger.exception(f"Error sending reminder {reminder_id}")
+            retry_at = self._clock() + timedelta(seconds=REMINDER_TIMER_RETRY_SECONDS)
+            heapq.heappush(self._heap, (retry_at, reminder_id))
@@ -184,6 +184,26 @@ get_music_profile_tool = {
     }
 }
 
+# Tool for server-wide taste similarity - conditionally added based on MUSIC_HISTORY_CHANNELS
+compare_music_taste_tool = {
+    "type": "function",
+    "function": {
+        "name": "compare_music_taste",
+        "description": "Compares music taste across the server using everyone's music channel history. With one user (or none, meaning the requesting user) it finds the people whose taste is closest to theirs; with several users it describes what the group has in common and who fits it best. Use this for questions like 'who here has taste like mine?', 'do @alice and @bob like the same stuff?' or before building a playlist for several people at once.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "user_names": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Display names of the users to compare, as mentioned in chat. Omit for just the requesting user."
+                }
+            },
+            "required": []
+        }
+    }
+}
+
 # Tool for searching URL history - conditionally added based on ENABLE_URL_HISTORY
 search_url_history_tool = {
     "type": "function",
@@ -31,6 +31,117 @@ ART_CRITIC_PROBABILITY = 0.25
 # and reuse it across all servers for this many hours before refreshing. See
 # ait gepetto-discord-bot-YHETx.
 NEWS_CACHE_TTL_HOURS = 3
+# When a refresh's culled headline set overlaps the cached one by at least this
+# much (Jaccard on normalised titles), the cached bulletins are re-stamped
+# instead of paying for another synthesis call. One new story in ten still
+# counts as "the same news".
+NEWS_RESYNTH_SIMILARITY = 0.8
+
+# Discogs artist cache TTLs, per field. Which artist a name resolves to and
+# who's in a band almost never change; discographies grow, so releases (and
+# the genre mix derived from them) refresh sooner. "miss" covers cached
+# not-found answers so a typo doesn't get re-searched on every call, but a
+# newly listed artist still turns up within the day.
+DISCOGS_CACHE_TTL_DAYS = {
+    "resolve": 90,
+    "profile": 30,
+    "members": 30,
+    "groups": 30,
+    "releases": 14,
+    "genres": 14,
+    "miss": 1,
+}
+# Discogs allows 60 authenticated requests per moving minute (the limiter
+# re-reads the real figure from response headers). Backfill stops taking
+# requests while this many remain, keeping headroom for interactive tool calls.
+DISCOGS_RATE_LIMIT_PER_MINUTE = 60
+DISCOGS_BACKGROUND_RESERVE = 10
+# Concurrent oEmbed lookups while enriching music links. YouTube's endpoint
+# is free and fast; this just keeps a big backfill from opening hundreds of
+# sockets at once.
+MUSIC_OEMBED_CONCURRENCY = 8
+# Artist graph scoring. A shared band membership is a stronger link than one
+# co-credited track (repeat collaborations climb towards the full weight);
+# each hop beyond the first multiplies a path's weight by the decay, so a
+# friend-of-a-friend counts for half a direct neighbour and a third hop for a
+# quarter.
+ARTIST_GRAPH_EDGE_WEIGHTS = {"member": 1.0, "collab": 0.8}
+ARTIST_GRAPH_HOP_DECAY = 0.5
+ARTIST_GRAPH_MAX_HOPS = 2
+# Each poster's top artists explored on Discogs by the nightly music scan, so
+# the graph has their members/groups without anyone exploring them by hand
+ARTIST_GRAPH_EXPLORE_TOP_ARTISTS = 2
+
+# In-memory recent-message cache (src/platforms/message_cache.py). Each
+# channel keeps at most this many messages from the last day; on startup each
+# readable channel is backfilled over the chat-context window (HISTORY_HOURS).
+MESSAGE_CACHE_MAX_MESSAGES = 1000
+MESSAGE_CACHE_MAX_AGE_HOURS = 24
+
+# Media uploads (src/platforms/media.py). Downloads are streamed in chunks
+# into a temp file that stays in memory up to SPOOL_MAX_MEMORY, then moves to
+# disk. Discord channels outside a guild (DMs) get the default upload limit.
+MEDIA_DOWNLOAD_CHUNK_BYTES = 64 * 1024
+MEDIA_SPOOL_MAX_MEMORY_BYTES = 1024 * 1024
+DISCORD_DEFAULT_UPLOAD_LIMIT_BYTES = 10 * 1024 * 1024
+
+# Outbound send queues (src/platforms/outbound.py). Each channel may send
+# BUCKET_CAPACITY messages per BUCKET_SECONDS (Discord's per-channel limit).
+# A send rejected with retry_after is retried up to MAX_RETRIES times.
+OUTBOUND_BUCKET_CAPACITY = 5
+OUTBOUND_BUCKET_SECONDS = 5
+OUTBOUND_MAX_RETRIES = 3
+
+# Inbound work queue (src/platforms/inbound.py). At most MAX_CONCURRENT
+# mentions/chime-ins are handled at once; each user may have QUEUED_PER_USER
+# and each channel QUEUED_PER_CHANNEL waiting, oldest dropped beyond that.
+# QUEUE_POLICY "collapse" keeps only a user's latest waiting message per
+# channel; "drop_oldest" keeps them all up to the limits. Queue metrics are
+# logged every METRICS_MINUTES.
+INBOUND_MAX_CONCURRENT = 8
+INBOUND_MAX_QUEUED_PER_USER = 3
+INBOUND_MAX_QUEUED_PER_CHANNEL = 10
+INBOUND_QUEUE_POLICY = "drop_oldest"
+INBOUND_METRICS_MINUTES = 15
+
+# Gateway/worker split (BOT_ROLE, src/platforms/workers.py). Workers and the
+# gateway's reply relay poll the SQLite job queue every POLL_SECONDS. A job
+# whose process hasn't finished it within LEASE_SECONDS may be claimed again,
+# up to MAX_ATTEMPTS claims in all; failed jobs are kept KEEP_HOURS. If
+# claiming fails (the database locked by another process, say), the poller
+# logs it and tries again after RETRY_SECONDS. The gateway remembers the last RELAY_RECENT_MESSAGES messages it handed out so
+# worker replies can be sent as real replies.
+JOB_QUEUE_POLL_SECONDS = 0.25
+JOB_QUEUE_LEASE_SECONDS = 600
+JOB_QUEUE_MAX_ATTEMPTS = 3
+JOB_QUEUE_KEEP_HOURS = 24
+JOB_QUEUE_RETRY_SECONDS = 5
+RELAY_RECENT_MESSAGES = 1000
+
+# Job scheduler (src/platforms/scheduler.py). Daily jobs start up to
+# DAILY_JITTER_MINUTES after their hour. A daily run missed while the bot was
+# down is caught up on startup if it is at most CATCH_UP_HOURS late. A run
+# holds its lease for at most RUN_LEASE_HOURS (a process that dies mid-run
+# blocks the job that long); a process finding another one mid-run checks
+# again every BUSY_RECHECK_SECONDS. Run history is kept HISTORY_DAYS.
+SCHEDULER_DAILY_JITTER_MINUTES = 10
+SCHEDULER_CATCH_UP_HOURS = 6
+SCHEDULER_RUN_LEASE_HOURS = 3
+SCHEDULER_BUSY_RECHECK_SECONDS = 60
+SCHEDULER_HISTORY_DAYS = 30
+
+# Opt-in SQLite message archive (src/persistence/message_archive_store.py).
+# Messages are kept for RETENTION_DAYS, at most MAX_PER_CHANNEL per channel.
+# A channel the archive hasn't seen before is backfilled BACKFILL_DAYS; the
+# gap filler re-runs every FILL_MINUTES and saves FILL_BATCH messages at a
+# time. Batch jobs resume from their cursors but never look back further
+# than JOB_MAX_LOOKBACK_DAYS.
+MESSAGE_ARCHIVE_RETENTION_DAYS = 90
+MESSAGE_ARCHIVE_MAX_PER_CHANNEL = 50000
+MESSAGE_ARCHIVE_BACKFILL_DAYS = 7
+MESSAGE_ARCHIVE_FILL_MINUTES = 60
+MESSAGE_ARCHIVE_FILL_BATCH = 500
+MESSAGE_ARCHIVE_JOB_MAX_LOOKBACK_DAYS = 7
 
 # Minimum messages required
 MIN_MESSAGES_FOR_RANDOM_CHAT = 5
@@ -83,6 +194,30 @@ MIN_TEXT_LENGTH_FOR_SUMMARY = 100  # Minimum chars of extracted text to consider
 CATCH_UP_MAX_HOURS = 168  # Maximum lookback window (7 days)
 CATCH_UP_MAX_MESSAGES = 500  # Per channel limit
 CATCH_UP_BUSY_THRESHOLD = 50  # Messages above this = "busy" summary style
+# Channels read at once. History rate limits are per channel, under a global
+# cap of 50 requests/second; this keeps well inside it
+CATCH_UP_FETCH_CONCURRENCY = 8
+# Summarising (src/tasks/catch_up.py): up to DIRECT_MESSAGES go to the LLM in
+# one call; beyond that, per-channel chunks of at most CHUNK_HOURS /
+# CHUNK_MESSAGES are summarised SUMMARY_CONCURRENCY at a time, then merged
+# REDUCE_FAN_IN partial summaries per call until one call can finish
+CATCH_UP_DIRECT_MESSAGES = 100
+CATCH_UP_CHUNK_HOURS = 3
+CATCH_UP_CHUNK_MESSAGES = 150
+CATCH_UP_SUMMARY_CONCURRENCY = 6
+CATCH_UP_REDUCE_FAN_IN = 12
+# Rolling digests (ENABLE_CATCH_UP_DIGESTS): every DIGEST_MINUTES each
+# channel's chat up to the last whole hour is digested in chunks of at most
+# DIGEST_HOURS. A channel with no digests yet starts DIGEST_BACKFILL_HOURS back;
+# digests older than CATCH_UP_MAX_HOURS are dropped. Once a ROLLUP_HOURS block
+# (aligned to UTC midnight) is over, its digests are merged into one per
+# channel: hourly into 6-hourly, those into daily. A catch-up can then put up
+# to DIGEST_FINAL_NOTES digests plus the tail straight into the final call
+CATCH_UP_DIGEST_HOURS = 1
+CATCH_UP_DIGEST_MINUTES = 60
+CATCH_UP_DIGEST_BACKFILL_HOURS = 24
+CATCH_UP_DIGEST_ROLLUP_HOURS = (6, 24)
+CATCH_UP_DIGEST_FINAL_NOTES = 60
 
 # Semantic search
 SEMANTIC_SEARCH_MIN_SIMILARITY = 0.3  # Cosine similarity threshold for text-embedding-3-small
@@ -98,6 +233,19 @@ URL_SEARCH_RECENCY_DAYS = {
 # Progressive widening order for recency search
 URL_SEARCH_RECENCY_TIERS = ["this_week", "this_month", "this_year", "all_time"]
 
-# Reminders
+# Reminders (src/tasks/reminders.py). The timer sleeps until the next reminder
+# is due, but re-reads the clock at least every MAX_SLEEP_SECONDS; a failed
+# delivery is retried after RETRY_SECONDS. Sent reminders are pruned daily
+# once older than PRUNE_DAYS.
 MAX_REMINDERS_PER_USER = 10
 REMINDER_PRUNE_DAYS = 30
+REMINDER_TIMER_MAX_SLEEP_SECONDS = 3600
+REMINDER_TIMER_RETRY_SECONDS = 300
+
+# Mention rate limits (src/utils/guard.py), each over a sliding window of
+# GUARD_WINDOW_MINUTES: mentions per user, answers per channel and answers
+# overall. 0 turns a limit off
+GUARD_WINDOW_MINUTES = 60
+GUARD_MAX_USER_MENTIONS = 10
+GUARD_MAX_CHANNEL_MENTIONS = 40
+GUARD_MAX_GLOBAL_MENTIONS = 200
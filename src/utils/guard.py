@@ -1,8 +1,21 @@
+import logging
 import re
-from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Collection, Deque
 
 from src.platforms.base import ChatMessage
+from src.utils.constants import (
+    GUARD_WINDOW_MINUTES, GUARD_MAX_USER_MENTIONS, GUARD_MAX_CHANNEL_MENTIONS, GUARD_MAX_GLOBAL_MENTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_KEY = "*"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
 
 
 def extract_question(content: str, bot_user_id: str) -> str:
@@ -19,20 +32,116 @@ def extract_question(content: str, bot_user_id: str) -> str:
     return content.strip()[:500].replace('\r', ' ').replace('\n', ' ')
 
 
+class SlidingWindowLimiter:
+    """Counts hits per key over a sliding window, in bounded memory.
+
+    Each key keeps a deque of at most limit + 1 hit times, which is all it
+    takes to tell whether more than `limit` fell inside the window; expired
+    times fall off the left. Keys are ordered by their latest hit, so keys
+    that have gone quiet for a whole window are evicted from the front. Both
+    are amortised O(1) per hit.
+    """
+
+    def __init__(self, limit: int, window: timedelta):
+        self.limit = limit
+        self.window = window
+        self._hits: "OrderedDict[str, Deque[datetime]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def add(self, key: str, now: datetime) -> None:
+        """Record a hit for key at now."""
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque(maxlen=self.limit + 1)
+        else:
+            self._hits.move_to_end(key)
+        hits.append(now)
+
+    def count(self, key: str, now: datetime) -> int:
+        """Hits for key inside the window ending at now (at most limit + 1)."""
+        self._evict_idle(now)
+        hits = self._hits.get(key)
+        if not hits:
+            return 0
+        cutoff = now - self.window
+        while hits and hits[0] < cutoff:
+            hits.popleft()
+        return len(hits)
+
+    def _evict_idle(self, now: datetime) -> None:
+        cutoff = now - self.window
+        while self._hits:
+            key, hits = next(iter(self._hits.items()))
+            if hits and hits[-1] >= cutoff:
+                break
+            del self._hits[key]
+
+
 class BotGuard:
-    def __init__(self, max_mentions=10, mention_window=timedelta(hours=1)):
-        self.mention_counts = defaultdict(list)
+    """Decides which messages the bot answers, and rate limits the rest.
+
+    Mentions are limited per user (max_mentions, counting every attempt, so
+    someone who keeps going stays blocked), and answers per channel and
+    overall (each counting only messages that get through), all over the same
+    sliding window. A limit of 0 turns it off. Given a RateLimitStore, hits
+    are written through to it and the ones still inside the window are
+    reloaded on startup, so a restart doesn't reset the limits. Hits are
+    stored under namespace (the bot's name), so bots sharing the database
+    don't count against each other's limits.
+    """
+
+    def __init__(self, max_mentions=GUARD_MAX_USER_MENTIONS, mention_window=timedelta(minutes=GUARD_WINDOW_MINUTES),
+                 max_channel_mentions=GUARD_MAX_CHANNEL_MENTIONS, max_global_mentions=GUARD_MAX_GLOBAL_MENTIONS,
+                 store=None, namespace: str = "", clock=_utcnow):
         self.max_mentions = max_mentions
         self.mention_window = mention_window
+        self.store = store
+        self.namespace = namespace
+        self._clock = clock
+        self.limiters = {
+            scope: SlidingWindowLimiter(limit, mention_window)
+            for scope, limit in (("user", max_mentions), ("channel", max_channel_mentions),
+                                 ("global", max_global_mentions))
+            if limit > 0
+        }
+        if store is not None:
+            self._load()
+
+    def _load(self) -> None:
+        since = self._clock() - self.mention_window
+        self.store.prune(since)
+        for scope, limiter in self.limiters.items():
+            for key, at in self.store.load(self._stored_scope(scope), since):
+                limiter.add(key, at)
+
+    def prune(self) -> int:
+        """Drop stored hits that have left the window. Returns number of rows deleted."""
+        if self.store is None:
+            return 0
+        return self.store.prune(self._clock() - self.mention_window)
+
+    def _stored_scope(self, scope: str) -> str:
+        return f"{self.namespace}:{scope}" if self.namespace else scope
 
-    def should_block(self, message: ChatMessage, bot_user_id: str, server_id: str, chatbot=None) -> tuple[bool, bool]:
+    def _add(self, scope: str, key: str, now: datetime) -> None:
+        self.limiters[scope].add(key, now)
+        if self.store is not None:
+            self.store.record(self._stored_scope(scope), key, now)
+
+    def _full(self, scope: str, key: str, now: datetime) -> bool:
+        limiter = self.limiters.get(scope)
+        return limiter is not None and limiter.count(key, now) >= limiter.limit
+
+    def should_block(self, message: ChatMessage, bot_user_id: str, server_ids: Collection[str], chatbot=None) -> tuple[bool, bool]:
         """
         Check if a message should be blocked.
 
         Args:
             message: The platform-agnostic message to check.
             bot_user_id: The bot's user ID.
-            server_id: The ID of the server the bot is running on.
+            server_ids: The IDs of the servers the bot serves.
 
         Returns:
             bool: True if the message should be blocked, False otherwise.
@@ -41,8 +150,8 @@ class BotGuard:
         # ignore DM's
         if not message.server_id:
             return True, False
-        # ignore messages not from our server
-        if message.server_id != server_id:
+        # ignore messages not from our servers
+        if message.server_id not in server_ids:
             return True, False
         # ignore messages from the bot itself
         if message.author_id == bot_user_id:
@@ -65,20 +174,27 @@ class BotGuard:
         if not question:
             return True, True
 
-        # keep track of how many times a user has mentioned the bot recently
-        user_id = message.author_id
-        now = datetime.utcnow()
-        self.mention_counts[user_id].append(now)
-        self.mention_counts[user_id] = [time for time in self.mention_counts[user_id]
-                                        if now - time <= self.mention_window]
-
-        # ignore when the user has mentioned the bot too many times recently
-        if len(self.mention_counts[user_id]) > self.max_mentions:
-            return True, True
+        # keep track of how many times a user has mentioned the bot recently,
+        # and ignore them when it's too many
+        now = self._clock()
+        if "user" in self.limiters:
+            self._add("user", message.author_id, now)
+            if self.limiters["user"].count(message.author_id, now) > self.max_mentions:
+                return True, True
 
         # ignore when the message doesn't contain regular text (ie only contains mentions, emojis, spaces, etc)
         if not any(char.isalpha() for char in question):
             return True, True
 
+        # ignore, quietly, when the channel or the bot as a whole has answered
+        # too much recently
+        for scope, key in (("channel", message.channel_id), ("global", GLOBAL_KEY)):
+            if self._full(scope, key, now):
+                logger.info(f"Rate limited: {scope} limit reached for {key}")
+                return True, False
+        for scope, key in (("channel", message.channel_id), ("global", GLOBAL_KEY)):
+            if scope in self.limiters:
+                self._add(scope, key, now)
+
         # all good, allow the message
         return False, False
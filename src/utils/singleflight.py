@@ -0,0 +1,65 @@
+"""
+Single-flight coalescing for expensive async calls.
+
+When several coroutines ask for the same thing at once — a cold news cache hit
+by the daily image and two tool calls, say — only the first actually does the
+work. Everyone else awaits the same in-flight task and gets the same result
+(or the same exception). Nothing is cached once the call finishes; that's the
+job of the stores. This only collapses the overlap.
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger('discord')
+
+
+class SingleFlight:
+    """Shares one in-flight task between concurrent callers with the same key."""
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """True if a call for `key` is currently running."""
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` unless a call for `key` is already running,
+        in which case wait for that one instead.
+
+        The shared task is shielded, so a caller that gets cancelled (a timed-
+        out tool call, say) doesn't take the other waiters down with it.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        else:
+            logger.info(f"[{self.name}] joining in-flight call for {key!r}")
+        return await asyncio.shield(task)
+
+
+def single_flight(key: Callable[..., Hashable] | None = None, name: str | None = None):
+    """Decorator form of SingleFlight for async functions.
+
+    `key` maps the call's arguments to its identity; it defaults to the
+    positional and keyword arguments themselves, which must then be hashable.
+    The wrapper exposes its SingleFlight as `.flight` for tests and logging.
+    """
+    def decorator(fn):
+        flight = SingleFlight(name or fn.__qualname__)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            call_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            return await flight.do(call_key, fn, *args, **kwargs)
+
+        wrapper.flight = flight
+        return wrapper
+
+    return decorator
@@ -0,0 +1,109 @@
+"""Tests for src/persistence/artist_graph_store.py."""
+
+import math
+import os
+from datetime import datetime
+
+import pytest
+
+from src.persistence.artist_graph_store import ArtistGraphStore, artist_key, clean_artist_name
+from src.persistence.discogs_store import DiscogsStore
+from src.persistence.music_store import MusicStore
+
+
+@pytest.fixture
+def graph(temp_dir):
+    return ArtistGraphStore(os.path.join(temp_dir, "test.db"))
+
+
+def names(neighbours):
+    return [n["name"] for n in neighbours]
+
+
+class TestNames:
+
+    def test_disambiguation_suffix_stripped(self):
+        assert clean_artist_name(" Low (3) ") == "Low"
+        assert artist_key("Low (3)") == "low"
+        assert clean_artist_name("Sunn O)))") == "Sunn O)))"
+
+
+class TestArtistGraphStore:
+
+    def test_empty_graph(self, graph):
+        assert graph.neighbourhood({"Low": 1.0}) == []
+        assert graph.neighbourhood({}) == []
+
+    def test_edges_are_undirected_and_case_insensitive(self, graph):
+        graph.add_memberships([("Low", "Alan Sparhawk")])
+        assert names(graph.neighbourhood({"alan sparhawk": 1.0})) == ["Low"]
+        assert names(graph.neighbourhood({"LOW": 1.0})) == ["Alan Sparhawk"]
+
+    def test_two_hop_path_and_decay(self, graph):
+        graph.add_memberships([("Low", "Alan Sparhawk"), ("Retribution Gospel Choir", "Alan Sparhawk")])
+        result = {n["name"]: n for n in graph.neighbourhood({"Low": 1.0})}
+        assert math.isclose(result["Alan Sparhawk"]["score"], 1.0)
+        assert math.isclose(result["Retribution Gospel Choir"]["score"], 0.5)
+        assert result["Retribution Gospel Choir"]["hops"] == 2
+        assert result["Retribution Gospel Choir"]["via"] == [
+            ("Low", "seed"), ("Alan Sparhawk", "member"), ("Retribution Gospel Choir", "member"),
+        ]
+
+    def test_decay_is_applied_once_per_hop(self, graph):
+        graph.add_memberships([("Low", "A"), ("B", "A"), ("B", "C")])
+        result = {n["name"]: n for n in graph.neighbourhood({"Low": 1.0}, max_hops=3)}
+        assert math.isclose(result["A"]["score"], 1.0)
+        assert math.isclose(result["B"]["score"], 0.5)
+        assert math.isclose(result["C"]["score"], 0.25)
+
+    def test_walk_does_not_rescore_earlier_hops(self, graph):
+        graph.add_memberships([("Low", "A"), ("Low", "B"), ("A", "B")])
+        result = {n["name"]: n for n in graph.neighbourhood({"Low": 1.0}, max_hops=2)}
+        assert math.isclose(result["A"]["score"], 1.0)
+        assert math.isclose(result["B"]["score"], 1.0)
+
+    def test_max_hops_limits_walk(self, graph):
+        graph.add_memberships([("Low", "Alan Sparhawk"), ("Retribution Gospel Choir", "Alan Sparhawk")])
+        assert names(graph.neighbourhood({"Low": 1.0}, max_hops=1)) == ["Alan Sparhawk"]
+
+    def test_repeat_collaborations_strengthen_edge(self, graph):
+        graph.add_collaborations([("Low", ["Dirty Three"]), ("Low", ["Nick Cave"]), ("Low", ["Dirty Three"])])
+        assert names(graph.neighbourhood({"Low": 1.0})) == ["Dirty Three", "Nick Cave"]
+
+    def test_collaborators_linked_to_each_other(self, graph):
+        graph.add_collaborations([("Low", ["Dirty Three", "Nick Cave"])])
+        assert "Nick Cave" in names(graph.neighbourhood({"Dirty Three": 1.0}, max_hops=1))
+
+    def test_artist_near_several_seeds_ranks_first(self, graph):
+        graph.add_memberships([("Low", "Shared Member"), ("Codeine", "Shared Member"), ("Low", "Other Member")])
+        result = graph.neighbourhood({"Low": 1.0, "Codeine": 1.0}, max_hops=1)
+        assert result[0]["name"] == "Shared Member"
+        assert "Codeine" not in names(result)  # seeds are never candidates
+
+    def test_seed_importance_scales_scores(self, graph):
+        graph.add_memberships([("Low", "A"), ("Codeine", "B")])
+        assert names(graph.neighbourhood({"Low": 0.2, "Codeine": 1.0})) == ["B", "A"]
+
+    def test_sync_from_discogs(self, graph, temp_dir):
+        discogs_store = DiscogsStore(os.path.join(temp_dir, "test.db"))
+        discogs_store.put("resolve", "low", {"id": 1, "name": "Low (3)"})
+        discogs_store.put("members", "1", [{"id": 2, "name": "Mimi Parker"}])
+        discogs_store.put("resolve", "mimi parker", {"id": 2, "name": "Mimi Parker"})
+        discogs_store.put("groups", "2", [{"id": 1, "name": "Low (3)"}])
+        discogs_store.put("members", "99", [{"id": 3, "name": "Unresolved"}])
+        assert graph.sync_from_discogs(discogs_store) == 2
+        assert names(graph.neighbourhood({"Low": 1.0})) == ["Mimi Parker"]
+        graph.sync_from_discogs(discogs_store)  # idempotent
+        assert math.isclose(graph.neighbourhood({"Low": 1.0})[0]["score"], 1.0)
+
+    def test_rebuild_from_music_history(self, graph, temp_dir):
+        music_store = MusicStore(os.path.join(temp_dir, "test.db"))
+        music_store.save(
+            server_id="s1", channel_id="c", url="https://youtu.be/1", video_title="t",
+            video_channel="c", posted_by_id="u", posted_by_name="U", posted_at=datetime.now(),
+            artist="Low", collaborators=["Dirty Three"],
+        )
+        graph.add_memberships([("Stale", "Edge")])
+        assert graph.rebuild(music_store) == {"collab": 1, "member": 0}
+        assert names(graph.neighbourhood({"Stale": 1.0})) == []
+        assert names(graph.neighbourhood({"Low": 1.0})) == ["Dirty Three"]
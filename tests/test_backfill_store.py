@@ -0,0 +1,64 @@
+"""Tests for src/persistence/backfill_store.py."""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.persistence.backfill_store import BackfillStore
+
+
+@pytest.fixture
+def store(temp_dir):
+    return BackfillStore(os.path.join(temp_dir, "test.db"))
+
+
+SINCE = datetime(2025, 1, 1)
+
+
+class TestBackfillStore:
+
+    def test_new_job_is_resumable(self, store):
+        job_id = store.start_job("s1", "music", SINCE, ["c1", "c2"])
+        job = store.get_resumable_job("s1", "music")
+        assert job["id"] == job_id
+        assert job["since"] == SINCE
+        assert job["channels"] == {"c1": {"cursor": None, "done": False},
+                                   "c2": {"cursor": None, "done": False}}
+
+    def test_scoped_by_server_and_kind(self, store):
+        store.start_job("s1", "music", SINCE, ["c1"])
+        assert store.get_resumable_job("s2", "music") is None
+        assert store.get_resumable_job("s1", "urls") is None
+
+    def test_checkpoint_moves_cursor_and_adds_stats(self, store):
+        job_id = store.start_job("s1", "music", SINCE, ["c1"])
+        cursor = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+        store.checkpoint(job_id, "c1", cursor=cursor, stats={"found": 3, "music": 2})
+        store.checkpoint(job_id, "c1", cursor=cursor + timedelta(hours=1), stats={"found": 1, "music": 1})
+        job = store.get_resumable_job("s1", "music")
+        assert job["channels"]["c1"]["cursor"] == cursor + timedelta(hours=1)
+        assert store.stats(job_id) == {"found": 4, "music": 3}
+
+        store.checkpoint(job_id, "c1", done=True)
+        assert store.get_resumable_job("s1", "music")["channels"]["c1"]["done"] is True
+
+    def test_failed_chunks_round_trip(self, store):
+        job_id = store.start_job("s1", "music", SINCE, ["c1"])
+        chunk_id = store.record_failed_chunk(job_id, "c1", [{"url": "u1"}])
+        store.checkpoint(job_id, "c1", stats={"failed": 1})
+        assert store.failed_chunks(job_id) == [{"id": chunk_id, "channel_id": "c1", "items": [{"url": "u1"}]}]
+
+        store.mark_chunk_done(chunk_id, {"failed": -1, "music": 1})
+        assert store.failed_chunks(job_id) == []
+        assert store.stats(job_id) == {"failed": 0, "music": 1}
+
+    def test_finished_job_not_resumable(self, store):
+        job_id = store.start_job("s1", "music", SINCE, ["c1"])
+        store.finish_job(job_id)
+        assert store.get_resumable_job("s1", "music") is None
+
+    def test_new_job_supersedes_unfinished_one(self, store):
+        store.start_job("s1", "music", SINCE, ["c1"])
+        second = store.start_job("s1", "music", SINCE, ["c1"])
+        assert store.get_resumable_job("s1", "music")["id"] == second
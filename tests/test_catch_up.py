@@ -6,6 +6,7 @@ Note: handle_catch_up lives in main.py which has heavy module-level side effects
 - Tool definition structure
 - Constants
 - Time window calculation logic (replicated from handle_catch_up)
+- Chunking and map-reduce summarising (src/tasks/catch_up.py)
 """
 
 import pytest
@@ -156,3 +157,147 @@ class TestCatchUpPromptSelection:
     def test_threshold_is_reasonable(self):
         """Threshold should be between 10 and 200 messages."""
         assert 10 <= CATCH_UP_BUSY_THRESHOLD <= 200
+
+
+class FakeMsg:
+    def __init__(self, created_at, author_name="alice", content="hello"):
+        self.created_at = created_at
+        self.author_name = author_name
+        self.content = content
+
+
+class FakeChatbot:
+    """Records calls; answers each with a short fixed reply."""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.fail_on = fail_on
+
+    async def chat(self, messages, tools=None):
+        import asyncio
+        self.calls.append(messages)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0)
+            if self.fail_on and self.fail_on in messages[1]['content']:
+                raise RuntimeError("LLM down")
+            return type("Resp", (), {"message": f" summary {len(self.calls)} "})()
+        finally:
+            self.active -= 1
+
+
+def entries(count, channels=("general",), minutes_apart=1):
+    start = datetime(2026, 3, 1, 9, 0)
+    return [(channels[i % len(channels)], FakeMsg(start + timedelta(minutes=i * minutes_apart), content=f"m{i}"))
+            for i in range(count)]
+
+
+class TestChunkMessages:
+
+    def test_splits_by_channel_window_and_size(self):
+        from src.tasks.catch_up import chunk_messages
+        messages = entries(10, channels=("a", "b"), minutes_apart=30)
+        chunks = chunk_messages(messages, window_hours=2, max_messages=100)
+        # each channel posts hourly; a 2 hour window holds two of its messages
+        assert [[m.content for _, m in chunk] for chunk in chunks] == [
+            ["m0", "m2"], ["m1", "m3"], ["m4", "m6"], ["m5", "m7"], ["m8"], ["m9"],
+        ]
+        assert all(len({name for name, _ in chunk}) == 1 for chunk in chunks)
+
+        chunks = chunk_messages(entries(5), window_hours=24, max_messages=2)
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+
+class TestSummarise:
+
+    async def test_small_volume_is_one_call_with_every_message(self):
+        from src.tasks import catch_up
+        chatbot = FakeChatbot()
+        result = await catch_up.summarise(chatbot, entries(CATCH_UP_BUSY_THRESHOLD + 1), "Bob")
+        assert result == "summary 1"
+        assert len(chatbot.calls) == 1
+        prompt = chatbot.calls[0][1]['content']
+        assert "for Bob" in prompt and "m0" in prompt and f"m{CATCH_UP_BUSY_THRESHOLD}" in prompt
+
+    async def test_large_volume_maps_then_reduces(self, monkeypatch):
+        from src.tasks import catch_up
+        monkeypatch.setattr(catch_up, "CATCH_UP_DIRECT_MESSAGES", 10)
+        monkeypatch.setattr(catch_up, "CATCH_UP_CHUNK_MESSAGES", 10)
+        monkeypatch.setattr(catch_up, "CATCH_UP_REDUCE_FAN_IN", 4)
+        monkeypatch.setattr(catch_up, "CATCH_UP_SUMMARY_CONCURRENCY", 3)
+        chatbot = FakeChatbot()
+
+        await catch_up.summarise(chatbot, entries(100), "Bob")
+        system_prompts = [call[0]['content'] for call in chatbot.calls]
+        # 10 chunks -> 3 merges -> final reply; nothing dropped
+        assert system_prompts.count(catch_up.CHUNK_PROMPT) == 10
+        assert system_prompts.count(catch_up.MERGE_PROMPT) == 3
+        assert system_prompts[-1] == catch_up.final_prompt(100)
+        assert "100 messages" in chatbot.calls[-1][1]['content']
+        assert chatbot.peak <= 3
+
+    async def test_failed_chunk_is_dropped_not_fatal(self, monkeypatch):
+        from src.tasks import catch_up
+        monkeypatch.setattr(catch_up, "CATCH_UP_DIRECT_MESSAGES", 10)
+        monkeypatch.setattr(catch_up, "CATCH_UP_CHUNK_MESSAGES", 10)
+        chatbot = FakeChatbot(fail_on="m0\n")
+
+        result = await catch_up.summarise(chatbot, entries(30), "Bob")
+        assert result.startswith("summary")
+        final_notes = chatbot.calls[-1][1]['content']
+        assert final_notes.count("messages):") == 2
+
+    async def test_digests_and_small_tail_need_one_call(self):
+        from src.tasks import catch_up
+        chatbot = FakeChatbot()
+        start = datetime(2026, 3, 1, 9, 0)
+        digests = [{"channel_id": "c1", "channel_name": "general", "period_start": start,
+                    "period_end": start + timedelta(minutes=50), "message_count": 400,
+                    "digest": "- alice planned a gig"}]
+        tail = [("general", FakeMsg(start + timedelta(hours=2), content="late news"))]
+
+        await catch_up.summarise(chatbot, tail, "Bob", digests=digests)
+        assert len(chatbot.calls) == 1
+        notes = chatbot.calls[0][1]['content']
+        assert "401 messages" in notes
+        assert notes.index("alice planned a gig") < notes.index("late news")
+
+    async def test_many_digests_go_straight_to_the_final_call(self):
+        from src.tasks import catch_up
+        chatbot = FakeChatbot()
+        start = datetime(2026, 3, 1, 9, 0)
+        digests = [{"channel_id": "c1", "channel_name": f"ch{i % 5}", "period_start": start + timedelta(hours=i),
+                    "period_end": start + timedelta(hours=i, minutes=50), "message_count": 10,
+                    "digest": f"- note {i}"} for i in range(40)]
+
+        await catch_up.summarise(chatbot, [], "Bob", digests=digests)
+        assert len(chatbot.calls) == 1
+        assert "note 39" in chatbot.calls[0][1]['content']
+
+    async def test_merge_digests_spans_the_group(self):
+        from src.tasks import catch_up
+        chatbot = FakeChatbot()
+        start = datetime(2026, 3, 1, 9, 0)
+        digests = [{"channel_id": "c1", "channel_name": "general", "period_start": start + timedelta(hours=i),
+                    "period_end": start + timedelta(hours=i, minutes=50), "message_count": 3,
+                    "digest": f"- note {i}"} for i in range(3)]
+
+        merged = await catch_up.merge_digests(chatbot, digests)
+        assert merged == {"period_start": start, "period_end": start + timedelta(hours=2, minutes=50),
+                          "message_count": 9, "digest": "summary 1"}
+        assert chatbot.calls[0][0]['content'] == catch_up.MERGE_PROMPT
+        assert "note 0" in chatbot.calls[0][1]['content'] and "note 2" in chatbot.calls[0][1]['content']
+
+    async def test_digest_channel_chunks_by_window(self, monkeypatch):
+        from src.tasks import catch_up
+        chatbot = FakeChatbot()
+        messages = [msg for _, msg in entries(5, minutes_apart=40)]
+        digests = await catch_up.digest_channel(chatbot, "general", messages)
+        # 40-minute gaps with a one-hour window: two messages per digest
+        assert [d["message_count"] for d in digests] == [2, 2, 1]
+        assert digests[0]["period_start"] == messages[0].created_at
+        assert digests[0]["period_end"] == messages[1].created_at
+        assert digests[0]["digest"].startswith("summary")
@@ -0,0 +1,216 @@
+"""
+Tests for handle_catch_up's history gathering in main.py.
+
+Imports main (precedent: tests/test_music_task.py) and drives
+_fetch_catch_up_messages() with fake channels.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import main
+from src.persistence.digest_store import DigestStore
+
+NOW = datetime.now(timezone.utc)
+SINCE = NOW - timedelta(hours=6)
+
+
+class FakeMessage:
+    def __init__(self, content, minutes_ago, is_bot=False):
+        self.content = content
+        self.created_at = NOW - timedelta(minutes=minutes_ago)
+        self.author_is_bot = is_bot
+        self.author_name = "alice"
+
+
+class FakeChannel:
+    def __init__(self, name, messages, last_message_at=None, tracker=None):
+        self.id = name
+        self.name = name
+        self._messages = messages
+        self._last = last_message_at
+        self._tracker = tracker
+        self.read = False
+        self.reads = []
+
+    def last_message_at(self):
+        return self._last
+
+    async def iter_history(self, limit=None, after=None, before=None, **kwargs):
+        self.read = True
+        self.reads.append((after, before))
+        if self._tracker is not None:
+            self._tracker["active"] += 1
+            self._tracker["peak"] = max(self._tracker["peak"], self._tracker["active"])
+        try:
+            for m in self._messages:
+                await asyncio.sleep(0)
+                if m.created_at > after.astimezone(timezone.utc) and (before is None or m.created_at < before):
+                    yield m
+        finally:
+            if self._tracker is not None:
+                self._tracker["active"] -= 1
+
+
+@pytest.fixture
+def platform_mock(monkeypatch):
+    mock = MagicMock()
+    monkeypatch.setattr(main, "platform", mock)
+    monkeypatch.setattr(main, "ENABLE_MESSAGE_ARCHIVE", False)
+    return mock
+
+
+class TestFetchCatchUpMessages:
+
+    async def test_merges_channels_chronologically_without_bots(self, platform_mock):
+        general = FakeChannel("general", [FakeMessage("g1", 50), FakeMessage("bot", 40, is_bot=True),
+                                          FakeMessage("g2", 10)])
+        music = FakeChannel("music", [FakeMessage("m1", 45), FakeMessage("m2", 5)])
+        platform_mock.get_readable_channels = AsyncMock(return_value=[general, music])
+
+        result = await main._fetch_catch_up_messages("s1", SINCE)
+        assert [(name, m.content) for name, m in result] == [
+            ("general", "g1"), ("music", "m1"), ("general", "g2"), ("music", "m2"),
+        ]
+
+    async def test_skips_channels_quiet_since_then(self, platform_mock):
+        quiet = FakeChannel("quiet", [], last_message_at=NOW - timedelta(days=2))
+        busy = FakeChannel("busy", [FakeMessage("b1", 5)], last_message_at=NOW - timedelta(minutes=5))
+        unknown = FakeChannel("unknown", [FakeMessage("u1", 3)])
+        platform_mock.get_readable_channels = AsyncMock(return_value=[quiet, busy, unknown])
+
+        # naive `since` is local time, as handle_catch_up passes it
+        naive_since = SINCE.astimezone().replace(tzinfo=None)
+        result = await main._fetch_catch_up_messages("s1", naive_since)
+        assert [m.content for _, m in result] == ["b1", "u1"]
+        assert not quiet.read
+
+    async def test_reads_channels_concurrently_within_limit(self, platform_mock, monkeypatch):
+        monkeypatch.setattr(main, "CATCH_UP_FETCH_CONCURRENCY", 3)
+        tracker = {"active": 0, "peak": 0}
+        channels = [FakeChannel(f"c{i}", [FakeMessage(f"m{i}", i + 1)], tracker=tracker) for i in range(8)]
+        platform_mock.get_readable_channels = AsyncMock(return_value=channels)
+
+        result = await main._fetch_catch_up_messages("s1", SINCE)
+        assert len(result) == 8
+        assert tracker["peak"] == 3
+
+    async def test_failing_channel_is_skipped(self, platform_mock):
+        broken = FakeChannel("broken", [])
+
+        async def boom(**kwargs):
+            raise RuntimeError("403")
+            yield
+
+        broken.iter_history = boom
+        ok = FakeChannel("ok", [FakeMessage("fine", 1)])
+        platform_mock.get_readable_channels = AsyncMock(return_value=[broken, ok])
+
+        result = await main._fetch_catch_up_messages("s1", SINCE)
+        assert [m.content for _, m in result] == ["fine"]
+
+
+class FakeChatbot:
+    def __init__(self):
+        self.calls = []
+
+    async def chat(self, messages, tools=None):
+        self.calls.append(messages)
+        return type("Resp", (), {"message": f"summary {len(self.calls)}"})()
+
+
+class FakeRequest:
+    """The catch_up tool's triggering message."""
+    author_id = "u9"
+    author_name = "bob"
+    server_id = "s1"
+    channel_id = "bot-channel"
+    author_mention = "@bob"
+
+    def __init__(self):
+        self.replies = []
+
+    async def reply(self, text, **kwargs):
+        self.replies.append(text)
+
+
+@pytest.fixture
+def digest_env(platform_mock, temp_dir, monkeypatch):
+    store = DigestStore(os.path.join(temp_dir, "test.db"))
+    chatbot = FakeChatbot()
+    monkeypatch.setattr(main, "digest_store", store)
+    monkeypatch.setattr(main, "chatbot", chatbot)
+    monkeypatch.setattr(main, "server_id", "s1")
+    monkeypatch.setattr(main, "ENABLE_CATCH_UP_DIGESTS", True)
+
+    @asynccontextmanager
+    async def typing():
+        yield
+
+    platform_mock.get_channel.return_value = MagicMock(typing=typing)
+    return type("Ctx", (), {"store": store, "chatbot": chatbot, "platform": platform_mock})
+
+
+class TestCatchUpDigests:
+
+    async def test_catch_up_reuses_digests_and_reads_only_the_tail(self, digest_env):
+        hour = NOW.replace(minute=0, second=0, microsecond=0)
+        minutes_into_hour = (NOW - hour).total_seconds() / 60
+        old = [FakeMessage(f"old{i}", minutes_into_hour + 90 - i) for i in range(3)]
+        fresh = FakeMessage("fresh", 0)
+        fresh.created_at = hour + timedelta(seconds=1)
+        general = FakeChannel("general", old + [fresh])
+        digest_env.platform.get_readable_channels = AsyncMock(return_value=[general])
+
+        await main.build_channel_digests()
+        coverage = digest_env.store.coverage("s1")["general"]
+        assert coverage["through"] == hour
+        assert len(digest_env.chatbot.calls) == 1  # one chunk: the three old messages
+
+        general.reads.clear()
+        digest_env.chatbot.calls.clear()
+        request = FakeRequest()
+        await main.handle_catch_up(request, hours=6)
+
+        # only the stretch after the digests was read from the channel
+        assert [after for after, _ in general.reads] == [hour]
+        assert len(digest_env.chatbot.calls) == 1
+        notes = digest_env.chatbot.calls[0][1]["content"]
+        assert "4 messages" in notes and "summary 1" in notes and "fresh" in notes
+        assert request.replies
+
+    async def test_per_server_run_digests_only_that_server(self, digest_env):
+        general = FakeChannel("general", [FakeMessage("old", 120)])
+        digest_env.platform.get_readable_channels = AsyncMock(return_value=[general])
+
+        await main.build_channel_digests(main.ServerConfig("s2", "200"))
+        digest_env.platform.get_readable_channels.assert_awaited_once_with("s2")
+        assert digest_env.store.coverage("s1") == {}
+        assert "general" in digest_env.store.coverage("s2")
+
+    async def test_finished_blocks_are_rolled_up(self, digest_env):
+        block = NOW.replace(minute=0, second=0, microsecond=0) - timedelta(hours=30)
+        block = block.replace(hour=block.hour - block.hour % 6)
+        hourly = [{"period_start": block + timedelta(hours=h), "period_end": block + timedelta(hours=h, minutes=50),
+                   "message_count": 2, "digest": f"- hour {h}"} for h in range(3)]
+        digest_env.store.save("s1", "general", "general", hourly, since=block, through=block + timedelta(hours=6))
+        digest_env.platform.get_readable_channels = AsyncMock(return_value=[])
+
+        await main.build_channel_digests()
+        [rolled] = digest_env.store.digests("s1", ["general"], since=block)
+        assert rolled["message_count"] == 6
+        assert rolled["period_start"] == block
+        assert len(digest_env.chatbot.calls) == 1
+
+    async def test_failed_digest_leaves_channel_for_next_run(self, digest_env):
+        general = FakeChannel("general", [FakeMessage("old", 120)])
+        digest_env.platform.get_readable_channels = AsyncMock(return_value=[general])
+        digest_env.chatbot.chat = AsyncMock(side_effect=RuntimeError("LLM down"))
+
+        await main.build_channel_digests()
+        assert digest_env.store.coverage("s1") == {}
@@ -0,0 +1,31 @@
+"""Tests for DailyCounterStore."""
+
+import os
+from datetime import date
+
+import pytest
+
+from src.persistence.daily_counter_store import DailyCounterStore
+
+TODAY = date(2024, 5, 1)
+
+
+@pytest.fixture
+def store(temp_dir):
+    return DailyCounterStore(os.path.join(temp_dir, 'test.db'))
+
+
+class TestDailyCounterStore:
+
+    def test_increment_counts_per_name_and_day(self, store):
+        assert store.get("images:gepetto", TODAY) == 0
+        assert store.increment("images:gepetto", TODAY) == 1
+        assert store.increment("images:gepetto", TODAY) == 2
+        assert store.increment("images:minxie", TODAY) == 1
+        assert store.increment("images:gepetto", date(2024, 5, 2)) == 1
+        assert store.get("images:gepetto", TODAY) == 2
+
+    def test_shared_between_store_instances(self, store):
+        other = DailyCounterStore(store.db_path)
+        store.increment("images:gepetto", TODAY)
+        assert other.increment("images:gepetto", TODAY) == 2
@@ -0,0 +1,83 @@
+"""Tests for src/persistence/digest_store.py."""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.persistence.digest_store import DigestStore
+
+HOUR = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store(temp_dir):
+    return DigestStore(os.path.join(temp_dir, "test.db"))
+
+
+def digest(start_minutes, end_minutes, text="- stuff", count=3):
+    return {"period_start": HOUR + timedelta(minutes=start_minutes),
+            "period_end": HOUR + timedelta(minutes=end_minutes),
+            "message_count": count, "digest": text}
+
+
+class TestDigestStore:
+
+    def test_save_and_read_back(self, store):
+        store.save("s1", "c1", "general", [digest(5, 50, "- first")], since=HOUR, through=HOUR + timedelta(hours=1))
+        store.save("s1", "c1", "general", [digest(65, 70, "- second")],
+                   since=HOUR + timedelta(hours=1), through=HOUR + timedelta(hours=2))
+        assert store.coverage("s1") == {"c1": {"covered_from": HOUR, "through": HOUR + timedelta(hours=2)}}
+
+        digests = store.digests("s1", ["c1"], since=HOUR + timedelta(minutes=30))
+        assert [d["digest"] for d in digests] == ["- first", "- second"]
+        assert digests[0]["channel_name"] == "general"
+        assert digests[0]["period_end"] == HOUR + timedelta(minutes=50)
+        assert store.digests("s1", ["c1"], since=HOUR + timedelta(minutes=55))[0]["digest"] == "- second"
+
+    def test_empty_stretch_still_moves_coverage(self, store):
+        store.save("s1", "c1", "general", [], since=HOUR, through=HOUR + timedelta(hours=3))
+        assert store.coverage("s1")["c1"]["through"] == HOUR + timedelta(hours=3)
+
+    def test_gap_restarts_coverage(self, store):
+        store.save("s1", "c1", "general", [], since=HOUR, through=HOUR + timedelta(hours=1))
+        store.save("s1", "c1", "general", [], since=HOUR + timedelta(hours=5), through=HOUR + timedelta(hours=6))
+        assert store.coverage("s1")["c1"] == {"covered_from": HOUR + timedelta(hours=5),
+                                              "through": HOUR + timedelta(hours=6)}
+
+    def test_scoped_to_server_and_channels(self, store):
+        store.save("s1", "c1", "general", [digest(5, 10)], since=HOUR, through=HOUR + timedelta(hours=1))
+        store.save("s1", "c2", "music", [digest(5, 10)], since=HOUR, through=HOUR + timedelta(hours=1))
+        assert [d["channel_id"] for d in store.digests("s1", ["c2"], since=HOUR)] == ["c2"]
+        assert store.digests("s2", ["c1"], since=HOUR) == []
+        assert store.digests("s1", [], since=HOUR) == []
+
+    def test_prune_moves_covered_from(self, store):
+        store.save("s1", "c1", "general", [digest(5, 10), digest(125, 130)],
+                   since=HOUR, through=HOUR + timedelta(hours=3))
+        assert store.prune(HOUR + timedelta(hours=1)) == 1
+        assert store.coverage("s1")["c1"]["covered_from"] == HOUR + timedelta(hours=1)
+        assert len(store.digests("s1", ["c1"], since=HOUR)) == 1
+
+    def test_rollup_groups_finished_blocks_per_channel(self, store):
+        # HOUR is 12:00 UTC: 12:00-18:00 is one six-hour block
+        store.save("s1", "c1", "general", [digest(5, 50), digest(65, 110), digest(365, 370)],
+                   since=HOUR, through=HOUR + timedelta(hours=7))
+        store.save("s1", "c2", "music", [digest(5, 50)], since=HOUR, through=HOUR + timedelta(hours=7))
+
+        assert store.rollup_groups("s1", 6, before=HOUR + timedelta(hours=5)) == []  # block not over yet
+        groups = store.rollup_groups("s1", 6, before=HOUR + timedelta(hours=7))
+        assert [[d["period_start"] for d in group] for group in groups] == [
+            [HOUR + timedelta(minutes=5), HOUR + timedelta(minutes=65)],
+        ]
+
+    def test_roll_up_replaces_group_with_one_digest(self, store):
+        store.save("s1", "c1", "general", [digest(5, 50), digest(65, 110)],
+                   since=HOUR, through=HOUR + timedelta(hours=6))
+        [group] = store.rollup_groups("s1", 6, before=HOUR + timedelta(hours=6))
+        store.roll_up("s1", group, digest(5, 110, "- merged", count=6))
+
+        digests = store.digests("s1", ["c1"], since=HOUR)
+        assert [(d["digest"], d["message_count"], d["channel_name"]) for d in digests] == [("- merged", 6, "general")]
+        assert store.rollup_groups("s1", 6, before=HOUR + timedelta(hours=6)) == []
+
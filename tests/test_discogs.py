@@ -2,6 +2,9 @@
 Tests for src/content/discogs.py
 """
 
+import os
+import sqlite3
+
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -253,6 +256,209 @@ class TestExploreArtistSync:
         assert "..." in result
 
 
+class TestExploreArtistCache:
+    """_explore_artist_sync with a DiscogsStore: cached fields skip the API."""
+
+    @pytest.fixture
+    def store(self, temp_dir):
+        from src.persistence.discogs_store import DiscogsStore
+        return DiscogsStore(os.path.join(temp_dir, "test.db"))
+
+    def _client_for(self, artist):
+        search_hit = MagicMock()
+        search_hit.id = artist.id
+        results = MagicMock()
+        results.count = 1
+        results.__getitem__ = lambda self, key: search_hit
+        client = MagicMock()
+        client.search.return_value = results
+        client.artist.return_value = artist
+        return client
+
+    @patch("src.content.discogs._get_client")
+    def test_second_call_served_from_cache(self, mock_get_client, store):
+        from src.content.discogs import _explore_artist_sync
+
+        artist = TestExploreArtistSync()._make_mock_artist()
+        client = self._client_for(artist)
+        mock_get_client.return_value = client
+
+        first = _explore_artist_sync("Radiohead", discogs_store=store)
+        client.reset_mock()
+        second = _explore_artist_sync("  radiohead ", discogs_store=store)
+
+        assert second == first
+        client.search.assert_not_called()
+        client.artist.assert_not_called()
+
+    @patch("src.content.discogs._get_client")
+    def test_only_stale_field_refetched(self, mock_get_client, store):
+        from src.content.discogs import _explore_artist_sync
+
+        artist = TestExploreArtistSync()._make_mock_artist()
+        client = self._client_for(artist)
+        mock_get_client.return_value = client
+        _explore_artist_sync("Radiohead", discogs_store=store)
+
+        with sqlite3.connect(store.db_path) as conn:
+            conn.execute("UPDATE discogs_cache SET fetched_at = '2000-01-01T00:00:00' WHERE kind = 'releases'")
+            conn.commit()
+        client.reset_mock()
+        result = _explore_artist_sync("Radiohead", discogs_store=store)
+
+        client.search.assert_not_called()
+        client.artist.assert_called_once_with(123)
+        assert "Rock" in result  # releases re-read from the API
+        assert "Thom Yorke" in result  # members still from the cache
+
+    @patch("src.content.discogs._get_client")
+    def test_not_found_cached_as_miss(self, mock_get_client, store):
+        from src.content.discogs import _explore_artist_sync
+
+        results = MagicMock()
+        results.count = 0
+        client = MagicMock()
+        client.search.return_value = results
+        mock_get_client.return_value = client
+
+        _explore_artist_sync("xyznonexistent", discogs_store=store)
+        client.reset_mock()
+        result = _explore_artist_sync("xyznonexistent", discogs_store=store)
+
+        assert "No artist found" in result
+        client.search.assert_not_called()
+
+    @patch("src.content.discogs._get_client")
+    def test_search_error_not_cached(self, mock_get_client, store):
+        from src.content.discogs import _explore_artist_sync
+
+        client = MagicMock()
+        client.search.side_effect = Exception("rate limited")
+        mock_get_client.return_value = client
+
+        assert "failed" in _explore_artist_sync("Radiohead", discogs_store=store)
+        assert store.get("miss", "radiohead") is None
+        assert store.get("resolve", "radiohead") is None
+
+    @patch("src.content.discogs._get_client")
+    def test_failed_members_fetch_not_cached(self, mock_get_client, store):
+        from src.content.discogs import _explore_artist_sync
+
+        artist = TestExploreArtistSync()._make_mock_artist()
+        type(artist).members = property(lambda self: (_ for _ in ()).throw(Exception("503")))
+        mock_get_client.return_value = self._client_for(artist)
+
+        _explore_artist_sync("Radiohead", discogs_store=store)
+        assert store.get("members", "123") is None
+        assert store.get("releases", "123") is not None
+
+    @patch("src.content.discogs._get_client")
+    def test_failed_profile_fetch_not_cached(self, mock_get_client, store):
+        from src.content.discogs import _explore_artist_sync
+
+        artist = TestExploreArtistSync()._make_mock_artist()
+        type(artist).profile = property(lambda self: (_ for _ in ()).throw(Exception("429")))
+        mock_get_client.return_value = self._client_for(artist)
+
+        result = _explore_artist_sync("Radiohead", discogs_store=store)
+        assert "Thom Yorke" in result
+        assert store.get("profile", "123") is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestDiscogsRateLimiter:
+    """The process-wide token bucket all Discogs requests go through."""
+
+    def make(self, per_minute=60, reserve=10):
+        from src.content.discogs import DiscogsRateLimiter
+        clock = FakeClock()
+        return DiscogsRateLimiter(per_minute=per_minute, background_reserve=reserve,
+                                  clock=clock, sleep=clock.sleep), clock
+
+    def test_burst_then_paced(self):
+        limiter, clock = self.make(per_minute=60, reserve=0)
+        for _ in range(60):
+            limiter.acquire()
+        assert clock.sleeps == []
+        limiter.acquire()
+        assert clock.sleeps == [pytest.approx(1.0)]
+
+    def test_background_leaves_reserve_for_interactive(self):
+        from src.content.discogs import BACKGROUND, INTERACTIVE
+        limiter, clock = self.make(per_minute=60, reserve=10)
+        for _ in range(50):
+            assert limiter.try_acquire(BACKGROUND) == 0
+        assert limiter.try_acquire(BACKGROUND) > 0
+        for _ in range(10):
+            assert limiter.try_acquire(INTERACTIVE) == 0
+
+    def test_observe_clamps_to_server_remaining(self):
+        limiter, clock = self.make(reserve=0)
+        limiter.observe("60", "2")
+        assert limiter.try_acquire() == 0
+        assert limiter.try_acquire() == 0
+        assert limiter.try_acquire() > 0
+
+    def test_observe_adopts_server_limit(self):
+        limiter, clock = self.make(per_minute=60)
+        limiter.observe("25", None)
+        assert limiter.capacity == 25
+        assert limiter.rate == pytest.approx(25 / 60)
+
+    def test_observe_ignores_garbage_headers(self):
+        limiter, clock = self.make(reserve=0)
+        limiter.observe("lots", "some")
+        assert limiter.try_acquire() == 0
+
+    def test_throttled_fetcher_acquires_and_observes(self):
+        from src.content.discogs import _ThrottledFetcher, background_priority
+        limiter = MagicMock()
+        inner = MagicMock()
+        inner.fetch.return_value = ("{}", 200)
+        inner.rate_limit = "60"
+        inner.rate_limit_remaining = "41"
+        fetcher = _ThrottledFetcher(inner, limiter)
+
+        assert fetcher.fetch(None, "GET", "https://api.discogs.com/x") == ("{}", 200)
+        with background_priority():
+            fetcher.fetch(None, "GET", "https://api.discogs.com/y")
+
+        assert [c.args[0] for c in limiter.acquire.call_args_list] == ["interactive", "background"]
+        limiter.observe.assert_called_with("60", "41")
+
+    def test_throttled_fetcher_proxies_settings(self):
+        from src.content.discogs import _ThrottledFetcher
+        inner = MagicMock()
+        fetcher = _ThrottledFetcher(inner, MagicMock())
+        fetcher.backoff_enabled = False
+        assert inner.backoff_enabled is False
+
+    @patch.dict(os.environ, {"DISCOGS_TOKEN": "t"})
+    def test_client_requests_go_through_limiter(self):
+        from src.content.discogs import _ThrottledFetcher, _get_client
+        client = _get_client()
+        assert isinstance(client._fetcher, _ThrottledFetcher)
+
+    async def test_priority_reaches_worker_thread(self):
+        import asyncio
+        from src.content.discogs import BACKGROUND, _priority, background_priority
+        with background_priority():
+            seen = await asyncio.to_thread(_priority.get)
+        assert seen == BACKGROUND
+
+
 class TestToolDefinitions:
     """Tests for Discogs tool definitions."""
 
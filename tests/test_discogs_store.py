@@ -0,0 +1,75 @@
+"""Tests for src/persistence/discogs_store.py — the Discogs artist cache."""
+
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.persistence.discogs_store import DiscogsStore
+
+
+@pytest.fixture
+def store(temp_dir):
+    return DiscogsStore(os.path.join(temp_dir, "test.db"))
+
+
+def _age(store, kind, key, days):
+    """Backdate an entry by `days`."""
+    stamp = (datetime.now() - timedelta(days=days)).isoformat()
+    with sqlite3.connect(store.db_path) as conn:
+        conn.execute(
+            "UPDATE discogs_cache SET fetched_at = ? WHERE kind = ? AND key = ?",
+            (stamp, kind, key)
+        )
+        conn.commit()
+
+
+class TestDiscogsStore:
+    def test_init_creates_parent_directory(self, temp_dir):
+        db_path = os.path.join(temp_dir, "nested", "dir", "test.db")
+        DiscogsStore(db_path)
+        assert os.path.exists(db_path)
+
+    def test_get_missing_returns_none(self, store):
+        assert store.get("resolve", "low") is None
+
+    def test_put_get_round_trip(self, store):
+        store.put("members", "123", [{"id": 100, "name": "Thom Yorke"}])
+        assert store.get("members", "123") == [{"id": 100, "name": "Thom Yorke"}]
+
+    def test_put_replaces(self, store):
+        store.put("profile", "1", "old")
+        store.put("profile", "1", "new")
+        assert store.get("profile", "1") == "new"
+
+    def test_kinds_are_separate(self, store):
+        store.put("members", "1", [{"id": 2, "name": "A"}])
+        assert store.get("groups", "1") is None
+
+    def test_falsy_values_are_hits(self, store):
+        """An artist with no members is an answer, not a miss."""
+        store.put("members", "1", [])
+        store.put("profile", "1", "")
+        assert store.get("members", "1") == []
+        assert store.get("profile", "1") == ""
+
+    def test_per_kind_ttl(self, store):
+        store.put("resolve", "low", {"id": 1, "name": "Low"})
+        store.put("releases", "1", {"genres": [], "styles": [], "notable": []})
+        _age(store, "resolve", "low", 20)
+        _age(store, "releases", "1", 20)
+        assert store.get("resolve", "low") is not None  # 90 day TTL
+        assert store.get("releases", "1") is None  # 14 day TTL
+
+    def test_explicit_max_age_overrides_ttl(self, store):
+        store.put("resolve", "low", {"id": 1, "name": "Low"})
+        _age(store, "resolve", "low", 2)
+        assert store.get("resolve", "low", max_age_days=1) is None
+
+    def test_prune_removes_only_stale(self, store):
+        store.put("miss", "typo", True)
+        store.put("resolve", "low", {"id": 1, "name": "Low"})
+        _age(store, "miss", "typo", 2)
+        assert store.prune() == 1
+        assert store.get("resolve", "low") is not None
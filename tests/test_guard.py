@@ -0,0 +1,134 @@
+"""Tests for BotGuard's sliding-window rate limits."""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.persistence.rate_limit_store import RateLimitStore
+from src.platforms.base import ChatMessage
+from src.utils.guard import BotGuard, SlidingWindowLimiter
+
+BOT_ID = "BOT123"
+SERVERS = {"SERVER1"}
+HOUR = timedelta(hours=1)
+START = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self, now: datetime = START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def mention(author_id="USER1", channel_id="CH1", text="hello there") -> ChatMessage:
+    return ChatMessage(
+        content=f"<@{BOT_ID}> {text}",
+        author_id=author_id,
+        author_name=author_id,
+        author_display_name=author_id,
+        author_is_bot=False,
+        author_mention=f"<@{author_id}>",
+        channel_id=channel_id,
+        server_id="SERVER1",
+        created_at=START,
+    )
+
+
+@pytest.fixture
+def store(temp_dir):
+    return RateLimitStore(os.path.join(temp_dir, 'test.db'))
+
+
+class TestSlidingWindowLimiter:
+
+    def test_counts_hits_inside_the_window(self):
+        limiter = SlidingWindowLimiter(3, HOUR)
+        limiter.add("a", START)
+        limiter.add("a", START + timedelta(minutes=30))
+        assert limiter.count("a", START + timedelta(minutes=45)) == 2
+        assert limiter.count("a", START + timedelta(minutes=61)) == 1
+
+    def test_memory_per_key_is_bounded(self):
+        limiter = SlidingWindowLimiter(3, HOUR)
+        for i in range(100):
+            limiter.add("a", START + timedelta(seconds=i))
+        assert limiter.count("a", START + timedelta(seconds=100)) == 4
+
+    def test_idle_keys_are_evicted(self):
+        limiter = SlidingWindowLimiter(3, HOUR)
+        limiter.add("quiet", START)
+        limiter.add("chatty", START + timedelta(minutes=50))
+        assert limiter.count("chatty", START + timedelta(minutes=70)) == 1
+        assert len(limiter) == 1
+
+
+class TestBotGuardLimits:
+
+    def test_user_limit_uses_a_sliding_window(self):
+        clock = FakeClock()
+        guard = BotGuard(max_mentions=2, mention_window=HOUR, clock=clock)
+        assert guard.should_block(mention(), BOT_ID, SERVERS) == (False, False)
+        clock.now += timedelta(minutes=40)
+        assert guard.should_block(mention(), BOT_ID, SERVERS) == (False, False)
+        assert guard.should_block(mention(), BOT_ID, SERVERS) == (True, True)
+        clock.now += timedelta(minutes=21)
+        assert guard.should_block(mention(), BOT_ID, SERVERS) == (True, True)
+        clock.now += timedelta(minutes=60)
+        assert guard.should_block(mention(), BOT_ID, SERVERS) == (False, False)
+
+    def test_channel_limit_blocks_quietly_and_spares_other_channels(self):
+        guard = BotGuard(max_mentions=10, max_channel_mentions=2, max_global_mentions=0, clock=FakeClock())
+        assert guard.should_block(mention("A"), BOT_ID, SERVERS) == (False, False)
+        assert guard.should_block(mention("B"), BOT_ID, SERVERS) == (False, False)
+        assert guard.should_block(mention("C"), BOT_ID, SERVERS) == (True, False)
+        assert guard.should_block(mention("C", channel_id="CH2"), BOT_ID, SERVERS) == (False, False)
+
+    def test_global_limit_counts_only_answered_messages(self):
+        guard = BotGuard(max_mentions=1, max_channel_mentions=0, max_global_mentions=2, clock=FakeClock())
+        assert guard.should_block(mention("A"), BOT_ID, SERVERS) == (False, False)
+        assert guard.should_block(mention("A"), BOT_ID, SERVERS) == (True, True)
+        assert guard.should_block(mention("B", text="!!!"), BOT_ID, SERVERS) == (True, True)
+        assert guard.should_block(mention("C", channel_id="CH2"), BOT_ID, SERVERS) == (False, False)
+        assert guard.should_block(mention("D", channel_id="CH3"), BOT_ID, SERVERS) == (True, False)
+
+    def test_zero_turns_limits_off(self):
+        guard = BotGuard(max_mentions=0, max_channel_mentions=0, max_global_mentions=0, clock=FakeClock())
+        for _ in range(50):
+            assert guard.should_block(mention(), BOT_ID, SERVERS) == (False, False)
+        assert guard.limiters == {}
+
+
+class TestBotGuardPersistence:
+
+    def test_limits_survive_a_restart(self, store):
+        clock = FakeClock()
+        guard = BotGuard(max_mentions=2, max_channel_mentions=3, store=store, clock=clock)
+        guard.should_block(mention("A"), BOT_ID, SERVERS)
+        guard.should_block(mention("A"), BOT_ID, SERVERS)
+        guard.should_block(mention("B"), BOT_ID, SERVERS)
+
+        clock.now += timedelta(minutes=10)
+        restarted = BotGuard(max_mentions=2, max_channel_mentions=3, store=store, clock=clock)
+        assert restarted.should_block(mention("A"), BOT_ID, SERVERS) == (True, True)
+        assert restarted.should_block(mention("C"), BOT_ID, SERVERS) == (True, False)
+
+    def test_bots_sharing_a_store_keep_their_own_limits(self, store):
+        clock = FakeClock()
+        gepetto = BotGuard(max_mentions=1, max_global_mentions=1, store=store, namespace="gepetto", clock=clock)
+        gepetto.should_block(mention("A"), BOT_ID, SERVERS)
+
+        minxie = BotGuard(max_mentions=1, max_global_mentions=1, store=store, namespace="minxie", clock=clock)
+        assert minxie.should_block(mention("A"), BOT_ID, SERVERS) == (False, False)
+        restarted = BotGuard(max_mentions=1, max_global_mentions=1, store=store, namespace="gepetto", clock=clock)
+        assert restarted.should_block(mention("B"), BOT_ID, SERVERS) == (True, False)
+
+    def test_expired_hits_are_pruned(self, store):
+        clock = FakeClock()
+        guard = BotGuard(max_mentions=2, store=store, clock=clock)
+        guard.should_block(mention("A"), BOT_ID, SERVERS)
+        clock.now += timedelta(minutes=61)
+        assert guard.prune() == 3
+        assert BotGuard(max_mentions=2, store=store, clock=clock).limiters["user"].count("A", clock.now) == 0
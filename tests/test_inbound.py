@@ -0,0 +1,134 @@
+"""Tests for src/platforms/inbound.py."""
+
+import asyncio
+
+import pytest
+
+from src.platforms.inbound import InboundDispatcher, COLLAPSE
+
+
+class Recorder:
+    """Jobs that log when they start and block until released."""
+
+    def __init__(self):
+        self.started = []
+        self.running = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+
+    def job(self, name):
+        async def run():
+            self.started.append(name)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            await self.release.wait()
+            self.running -= 1
+        return run
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestInboundDispatcher:
+
+    async def test_global_concurrency_cap(self):
+        rec = Recorder()
+        inbound = InboundDispatcher(max_concurrent=2, max_per_user=5, max_per_channel=10)
+        for i in range(5):
+            inbound.submit(f"u{i}", "c1", rec.job(i))
+        await settle()
+        assert rec.started == [0, 1]
+        assert inbound.queue_depth() == 3
+        rec.release.set()
+        await inbound.join()
+        assert rec.started == [0, 1, 2, 3, 4]
+        assert rec.peak == 2
+
+    async def test_one_job_per_user_round_robin(self):
+        rec = Recorder()
+        inbound = InboundDispatcher(max_concurrent=1, max_per_user=5, max_per_channel=10)
+        inbound.submit("spammer", "c1", rec.job("s1"))
+        inbound.submit("spammer", "c1", rec.job("s2"))
+        inbound.submit("spammer", "c1", rec.job("s3"))
+        inbound.submit("other", "c1", rec.job("o1"))
+        rec.release.set()
+        await inbound.join()
+        assert rec.started == ["s1", "o1", "s2", "s3"]
+
+    async def test_per_user_overflow_drops_oldest(self):
+        rec = Recorder()
+        inbound = InboundDispatcher(max_concurrent=1, max_per_user=2, max_per_channel=10)
+        for i in range(5):
+            inbound.submit("u", "c1", rec.job(i))
+        rec.release.set()
+        await inbound.join()
+        assert rec.started == [0, 3, 4]
+        assert inbound.snapshot()["dropped"] == 2
+
+    async def test_per_channel_overflow_drops_oldest(self):
+        rec = Recorder()
+        inbound = InboundDispatcher(max_concurrent=1, max_per_user=5, max_per_channel=2)
+        inbound.submit("busy", "other", rec.job("first"))
+        for i in range(4):
+            inbound.submit(f"u{i}", "c1", rec.job(i))
+        assert inbound.queue_depth("c1") == 2
+        rec.release.set()
+        await inbound.join()
+        assert rec.started == ["first", 2, 3]
+
+    async def test_collapse_policy_answers_latest(self):
+        rec = Recorder()
+        inbound = InboundDispatcher(max_concurrent=1, max_per_user=5, max_per_channel=10, policy=COLLAPSE)
+        for i in range(4):
+            inbound.submit("u", "c1", rec.job(i))
+        rec.release.set()
+        await inbound.join()
+        assert rec.started == [0, 3]
+        assert inbound.snapshot()["collapsed"] == 2
+
+    async def test_collapse_key(self):
+        rec = Recorder()
+        inbound = InboundDispatcher(max_concurrent=1, max_per_user=5, max_per_channel=10)
+        inbound.submit("busy", "c0", rec.job("busy"))
+        inbound.submit("a", "c1", rec.job("chime a"), collapse_key=("random_chat", "c1"))
+        inbound.submit("b", "c1", rec.job("chime b"), collapse_key=("random_chat", "c1"))
+        rec.release.set()
+        await inbound.join()
+        assert rec.started == ["busy", "chime b"]
+
+    async def test_failures_are_counted_and_do_not_block(self):
+        async def boom():
+            raise RuntimeError("nope")
+
+        done = []
+
+        async def ok():
+            done.append(True)
+
+        inbound = InboundDispatcher(max_concurrent=1)
+        inbound.submit("u", "c1", boom)
+        inbound.submit("u", "c1", ok)
+        await inbound.join()
+        assert done == [True]
+        assert inbound.snapshot()["failed"] == 1
+
+    async def test_snapshot_wait_times(self):
+        now = [0.0]
+        rec = Recorder()
+        inbound = InboundDispatcher(max_concurrent=1, clock=lambda: now[0])
+        inbound.submit("a", "c1", rec.job("a"))
+        inbound.submit("b", "c1", rec.job("b"))
+        now[0] = 4.0
+        rec.release.set()
+        await inbound.join()
+        stats = inbound.snapshot()
+        assert (stats["queued"], stats["running"], stats["started"]) == (0, 0, 2)
+        assert stats["wait_max_s"] == 4.0
+        assert stats["wait_avg_s"] == 2.0
+        assert inbound.snapshot()["wait_max_s"] == 0.0
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            InboundDispatcher(policy="lifo")
@@ -0,0 +1,83 @@
+"""Tests for JobQueueStore."""
+
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.persistence.job_queue_store import JobQueueStore
+
+
+@pytest.fixture
+def store(temp_dir):
+    return JobQueueStore(os.path.join(temp_dir, 'test.db'))
+
+
+def backdate(store, job_id, **columns):
+    with sqlite3.connect(store.db_path) as conn:
+        for column, value in columns.items():
+            conn.execute(f"UPDATE job_queue SET {column} = ? WHERE id = ?", (value, job_id))
+
+
+class TestJobQueueStore:
+
+    def test_claims_oldest_first_per_queue(self, store):
+        first = store.enqueue("inbound", {"n": 1})
+        store.enqueue("outbound", {"n": 2})
+        store.enqueue("inbound", {"n": 3})
+        assert store.claim("inbound", "w1") == (first, {"n": 1})
+        assert store.claim("inbound", "w2")[1] == {"n": 3}
+        assert store.claim("inbound", "w1") is None
+        assert store.depth("inbound") == 2
+        assert store.depth("outbound") == 1
+
+    def test_complete_removes_job(self, store):
+        job_id = store.enqueue("inbound", {})
+        store.claim("inbound", "w1")
+        store.complete(job_id)
+        assert store.depth("inbound") == 0
+
+    def test_expired_lease_is_claimable_again(self, store):
+        job_id = store.enqueue("inbound", {})
+        store.claim("inbound", "w1", lease_seconds=60)
+        assert store.claim("inbound", "w2", lease_seconds=60) is None
+        backdate(store, job_id, claimed_at=datetime.now() - timedelta(seconds=61))
+        assert store.claim("inbound", "w2", lease_seconds=60) == (job_id, {})
+
+    def test_fail_with_retry_until_attempts_run_out(self, store):
+        job_id = store.enqueue("outbound", {})
+        for _ in range(2):
+            store.claim("outbound", "w1")
+            store.fail(job_id, "429", retry=True, max_attempts=2)
+        assert store.claim("outbound", "w1", max_attempts=2) is None
+        assert store.depth("outbound") == 0
+
+    def test_fail_without_retry(self, store):
+        job_id = store.enqueue("inbound", {})
+        store.claim("inbound", "w1")
+        store.fail(job_id, "boom")
+        assert store.claim("inbound", "w1") is None
+
+    def test_is_open_until_done_or_out_of_attempts(self, store):
+        job_id = store.enqueue("inbound", {})
+        assert store.is_open(job_id)
+        store.claim("inbound", "w1", lease_seconds=60)
+        assert store.is_open(job_id, lease_seconds=60, max_attempts=1)
+        backdate(store, job_id, claimed_at=datetime.now() - timedelta(seconds=61))
+        assert store.is_open(job_id, lease_seconds=60, max_attempts=2)  # another worker may claim it
+        assert not store.is_open(job_id, lease_seconds=60, max_attempts=1)
+        store.complete(job_id)
+        assert not store.is_open(job_id)
+
+    def test_prune_old_failed_jobs(self, store):
+        old = store.enqueue("inbound", {})
+        recent = store.enqueue("inbound", {})
+        pending = store.enqueue("inbound", {})
+        for job_id in (old, recent):
+            store.claim("inbound", "w1")
+            store.fail(job_id, "boom")
+        backdate(store, old, created_at=datetime.now() - timedelta(hours=25))
+        backdate(store, pending, created_at=datetime.now() - timedelta(hours=25))
+        assert store.prune(hours=24) == 1
+        assert store.depth("inbound") == 1
@@ -28,6 +28,24 @@ def _mock_event(sender="@user:example.com", body="hello", event_id="$evt1", serv
     return event
 
 
+def fake_session(body: bytes, content_type: str, content_length=None):
+    """A stand-in aiohttp session whose get() streams `body` in two chunks."""
+    async def iter_chunked(size):
+        yield body[:len(body) // 2]
+        yield body[len(body) // 2:]
+
+    resp = MagicMock()
+    resp.content_type = content_type
+    resp.content_length = content_length
+    resp.content.iter_chunked = iter_chunked
+    get_ctx = MagicMock()
+    get_ctx.__aenter__ = AsyncMock(return_value=resp)
+    get_ctx.__aexit__ = AsyncMock(return_value=False)
+    session = MagicMock()
+    session.get = MagicMock(return_value=get_ctx)
+    return session
+
+
 def _mock_client(user_id="@bot:example.com"):
     client = MagicMock(spec=nio.AsyncClient)
     client.user_id = user_id
@@ -35,6 +53,7 @@ def _mock_client(user_id="@bot:example.com"):
     client.room_send = AsyncMock()
     client.room_typing = AsyncMock()
     client.upload = AsyncMock()
+    client.content_repository_config = AsyncMock(return_value=MagicMock())
     client.room_messages = AsyncMock()
     return client
 
@@ -154,22 +173,7 @@ class TestMatrixChannel:
         client.upload.return_value = (upload_resp, None)
         channel = MatrixChannel(room, client)
 
-        # Mock aiohttp response and session using proper async context managers
-        mock_resp = MagicMock()
-        mock_resp.read = AsyncMock(return_value=b"image-data")
-        mock_resp.content_type = "image/png"
-
-        mock_get_ctx = AsyncMock()
-        mock_get_ctx.__aenter__ = AsyncMock(return_value=mock_resp)
-        mock_get_ctx.__aexit__ = AsyncMock(return_value=False)
-
-        mock_session = MagicMock()
-        mock_session.get = MagicMock(return_value=mock_get_ctx)
-        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session.__aexit__ = AsyncMock(return_value=False)
-
-        with patch("src.platforms.matrix_adapter.aiohttp") as mock_aiohttp:
-            mock_aiohttp.ClientSession = MagicMock(return_value=mock_session)
+        with patch("src.platforms.media.get_session", return_value=fake_session(b"image-data", "image/png")):
             await channel.send_file("a cat", "https://example.com/cat.png", "cat.png")
 
         client.upload.assert_called_once()
@@ -177,6 +181,90 @@ class TestMatrixChannel:
         content = client.room_send.call_args[0][2]
         assert content["msgtype"] == "m.image"
         assert content["url"] == "mxc://example.com/abc123"
+        assert content["info"] == {"mimetype": "image/png", "size": 10}
+        assert client.upload.call_args.kwargs["filesize"] == 10
+
+    @pytest.mark.asyncio
+    async def test_send_file_over_server_limit_sends_link(self):
+        room = _mock_room()
+        client = _mock_client()
+        limits = MagicMock(spec=nio.ContentRepositoryConfigResponse)
+        limits.upload_size = 4
+        client.content_repository_config.return_value = limits
+        channel = MatrixChannel(room, client)
+
+        with patch("src.platforms.media.get_session", return_value=fake_session(b"image-data", "image/png")):
+            await channel.send_file("a cat", "https://example.com/cat.png", "cat.png")
+
+        client.upload.assert_not_called()
+        assert client.room_send.call_args[0][2]["body"] == "a cat\nhttps://example.com/cat.png"
+
+
+def _timeline_client(timestamps, page_size=2):
+    """A client whose room_messages pages through events at the given
+    timestamps (oldest first). Tokens are string indices; "" means now."""
+    events = [_mock_event(body=f"m{i}", event_id=f"$e{i}", server_timestamp=ts)
+              for i, ts in enumerate(timestamps)]
+    client = _mock_client()
+    calls = []
+
+    async def room_messages(room_id, start, limit, direction):
+        calls.append((start, direction))
+        position = len(events) if start == "" else int(start)
+        resp = MagicMock(spec=nio.RoomMessagesResponse)
+        if direction == nio.MessageDirection.back:
+            first = max(0, position - page_size)
+            resp.chunk = list(reversed(events[first:position]))
+            resp.end = str(first)
+        else:
+            resp.chunk = events[position:position + page_size]
+            resp.end = str(min(len(events), position + page_size))
+        return resp
+
+    client.room_messages = AsyncMock(side_effect=room_messages)
+    return client, calls
+
+
+class TestMatrixIterHistory:
+
+    @pytest.mark.asyncio
+    async def test_newest_first_without_after(self):
+        client, _ = _timeline_client([1000, 2000, 3000, 4000, 5000])
+        channel = MatrixChannel(_mock_room(), client)
+        bodies = [m.content async for m in channel.iter_history(limit=3)]
+        assert bodies == ["m4", "m3", "m2"]
+
+    @pytest.mark.asyncio
+    async def test_oldest_first_after_pages_forward(self):
+        client, calls = _timeline_client([1000, 2000, 3000, 4000, 5000])
+        channel = MatrixChannel(_mock_room(), client)
+        after = datetime.fromtimestamp(2.5, tz=timezone.utc)
+        bodies = [m.content async for m in channel.iter_history(after=after)]
+        assert bodies == ["m2", "m3", "m4"]
+        assert any(direction == nio.MessageDirection.front for _, direction in calls)
+
+    @pytest.mark.asyncio
+    async def test_before_and_newest_first(self):
+        client, _ = _timeline_client([1000, 2000, 3000, 4000, 5000])
+        channel = MatrixChannel(_mock_room(), client)
+        after = datetime.fromtimestamp(1.5, tz=timezone.utc)
+        before = datetime.fromtimestamp(4.5, tz=timezone.utc)
+        bodies = [m.content async for m in channel.iter_history(after=after, before=before, oldest_first=False)]
+        assert bodies == ["m3", "m2", "m1"]
+
+    @pytest.mark.asyncio
+    async def test_stops_paging_once_limit_reached(self):
+        client, calls = _timeline_client(list(range(1000, 21000, 1000)))
+        channel = MatrixChannel(_mock_room(), client)
+        assert len([m async for m in channel.iter_history(limit=2)]) == 2
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_history_collects_iter_history(self):
+        client, _ = _timeline_client([1000, 2000, 3000])
+        channel = MatrixChannel(_mock_room(), client)
+        after = datetime.fromtimestamp(0.5, tz=timezone.utc)
+        assert [m.content for m in await channel.history(limit=10, after=after)] == ["m0", "m1", "m2"]
 
 
 class TestMatrixPlatform:
@@ -225,19 +313,20 @@ class TestMatrixPlatform:
         platform = MatrixPlatform()
         callback = MagicMock()
         platform.schedule_daily("test_task", callback, hour=10, minute=30)
-        assert len(platform._daily_tasks) == 1
-        assert platform._daily_tasks[0]["name"] == "test_task"
-        assert platform._daily_tasks[0]["hour"] == 10
-        assert platform._daily_tasks[0]["minute"] == 30
+        job = platform.scheduler.jobs["test_task"]
+        assert job.daily
+        assert job.callback is callback
+        assert job.hour == 10
+        assert job.minute == 30
 
     @patch.dict(os.environ, {"MATRIX_HOMESERVER": "https://matrix.example.com", "MATRIX_USER_ID": "@bot:example.com"})
     def test_schedule_interval_stores_task(self):
         platform = MatrixPlatform()
         callback = MagicMock()
         platform.schedule_interval("check_stuff", callback, minutes=15)
-        assert len(platform._interval_tasks) == 1
-        assert platform._interval_tasks[0]["name"] == "check_stuff"
-        assert platform._interval_tasks[0]["minutes"] == 15
+        job = platform.scheduler.jobs["check_stuff"]
+        assert not job.daily
+        assert job.minutes == 15
 
     @patch.dict(os.environ, {"MATRIX_HOMESERVER": "https://matrix.example.com", "MATRIX_USER_ID": "@bot:example.com"})
     def test_get_readable_channels(self):
@@ -0,0 +1,91 @@
+"""Tests for src/platforms/media.py and the adapters' send_file."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.platforms.media import MediaTooLarge, open_media
+
+
+def fake_session(body: bytes, content_type="image/png", content_length=None):
+    """A stand-in aiohttp session whose get() streams `body` in 4-byte chunks."""
+    streamed = []
+
+    async def iter_chunked(size):
+        for i in range(0, len(body), 4):
+            streamed.append(body[i:i + 4])
+            yield body[i:i + 4]
+
+    resp = MagicMock()
+    resp.content_type = content_type
+    resp.content_length = content_length
+    resp.content.iter_chunked = iter_chunked
+    get_ctx = MagicMock()
+    get_ctx.__aenter__ = AsyncMock(return_value=resp)
+    get_ctx.__aexit__ = AsyncMock(return_value=False)
+    session = MagicMock()
+    session.get = MagicMock(return_value=get_ctx)
+    session.streamed = streamed
+    return session
+
+
+class TestOpenMedia:
+
+    async def test_streams_url_into_file(self):
+        with patch("src.platforms.media.get_session", return_value=fake_session(b"0123456789")):
+            async with open_media("https://example.com/a.png", max_bytes=100) as (f, content_type, size):
+                assert f.read() == b"0123456789"
+                assert (content_type, size) == ("image/png", 10)
+        assert f.closed
+
+    async def test_content_length_over_limit_reads_nothing(self):
+        session = fake_session(b"0123456789", content_length=10)
+        with patch("src.platforms.media.get_session", return_value=session):
+            with pytest.raises(MediaTooLarge):
+                async with open_media("https://example.com/a.png", max_bytes=5):
+                    pass
+        assert session.streamed == []
+
+    async def test_stream_over_limit_stops_early(self):
+        session = fake_session(b"0123456789abcdef")
+        with patch("src.platforms.media.get_session", return_value=session):
+            with pytest.raises(MediaTooLarge):
+                async with open_media("https://example.com/a.png", max_bytes=6):
+                    pass
+        assert len(session.streamed) == 2
+
+    async def test_local_file(self, temp_dir):
+        path = f"{temp_dir}/clip.mp4"
+        with open(path, "wb") as out:
+            out.write(b"video")
+        async with open_media(path, max_bytes=100) as (f, content_type, size):
+            assert (f.read(), content_type, size) == (b"video", "video/mp4", 5)
+        with pytest.raises(MediaTooLarge):
+            async with open_media(path, max_bytes=2):
+                pass
+
+
+class TestDiscordSendFile:
+
+    def _channel(self, filesize_limit):
+        from src.platforms.discord_adapter import DiscordChannel
+        raw = MagicMock()
+        raw.id = 1
+        raw.name = "general"
+        raw.guild.filesize_limit = filesize_limit
+        raw.send = AsyncMock()
+        return DiscordChannel(raw, bot_member=None), raw
+
+    async def test_uploads_streamed_file(self):
+        channel, raw = self._channel(filesize_limit=100)
+        with patch("src.platforms.media.get_session", return_value=fake_session(b"0123456789")):
+            await channel.send_file("look", "https://example.com/a.png", "a.png")
+        sent = raw.send.call_args
+        assert sent.args == ("look",)
+        assert sent.kwargs["file"].filename == "a.png"
+
+    async def test_too_large_links_instead(self):
+        channel, raw = self._channel(filesize_limit=5)
+        with patch("src.platforms.media.get_session", return_value=fake_session(b"0123456789", content_length=10)):
+            await channel.send_file("look", "https://example.com/a.png", "a.png")
+        raw.send.assert_awaited_once_with("look\nhttps://example.com/a.png")
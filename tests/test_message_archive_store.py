@@ -0,0 +1,160 @@
+"""Tests for src/persistence/message_archive_store.py and main.py's archive helpers."""
+
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import main
+from src.persistence.message_archive_store import MessageArchiveStore
+from src.platforms.base import ChatMessage
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def msg(minutes_ago, channel_id="c1", msg_id=None, is_bot=False):
+    return ChatMessage(
+        content=f"m{minutes_ago}", author_id="u1", author_name="user",
+        author_display_name="User", author_is_bot=is_bot, author_mention="<@u1>",
+        channel_id=channel_id, server_id="s1", created_at=NOW - timedelta(minutes=minutes_ago),
+        id=msg_id or f"id{minutes_ago}",
+    )
+
+
+def contents(messages):
+    return [m.content for m in messages]
+
+
+@pytest.fixture
+def store(temp_dir):
+    return MessageArchiveStore(os.path.join(temp_dir, "test.db"))
+
+
+class TestMessageArchiveStore:
+
+    def test_record_many_dedupes_and_orders(self, store):
+        assert store.record_many([msg(10), msg(30), msg(20)]) == 3
+        assert store.record_many([msg(10)]) == 0
+        assert contents(store.messages("c1")) == ["m30", "m20", "m10"]
+        assert contents(store.messages("c1", limit=2, oldest_first=False)) == ["m10", "m20"]
+
+    def test_window_bounds(self, store):
+        store.record_many([msg(30), msg(20), msg(10)])
+        window = store.messages("c1", after=NOW - timedelta(minutes=25), before=NOW - timedelta(minutes=10))
+        assert contents(window) == ["m20"]
+        assert window[0].created_at == NOW - timedelta(minutes=20)
+
+    def test_naive_datetimes_are_local_time(self, store):
+        store.record_many([msg(30)])
+        naive_after = (NOW - timedelta(hours=1)).astimezone().replace(tzinfo=None)
+        assert contents(store.messages("c1", after=naive_after)) == ["m30"]
+
+    def test_coverage_extends_or_restarts(self, store):
+        store.mark_filled("c1", "s1", NOW - timedelta(hours=3), NOW - timedelta(hours=2))
+        store.mark_filled("c1", "s1", NOW - timedelta(hours=2), NOW - timedelta(hours=1))
+        assert store.coverage("c1") == {"low_water": NOW - timedelta(hours=3),
+                                        "high_water": NOW - timedelta(hours=1)}
+        assert store.covers("c1", NOW - timedelta(hours=3))
+        assert not store.covers("c1", NOW - timedelta(hours=4))
+
+        # a fill that starts after high_water leaves a gap: coverage restarts
+        store.mark_filled("c1", "s1", NOW - timedelta(minutes=30), NOW)
+        assert not store.covers("c1", NOW - timedelta(hours=3))
+        assert store.covers("c1", NOW - timedelta(minutes=30))
+
+    def test_live_record_advances_only_when_asked(self, store):
+        store.mark_filled("c1", "s1", NOW - timedelta(hours=1), NOW - timedelta(minutes=30))
+        store.record(msg(20))
+        assert store.coverage("c1")["high_water"] == NOW - timedelta(minutes=30)
+        store.record(msg(10), advance=True)
+        assert store.coverage("c1")["high_water"] == NOW - timedelta(minutes=10)
+        assert contents(store.messages("c1")) == ["m20", "m10"]
+
+    def test_prune_by_age_and_count_raises_low_water(self, store):
+        store.record_many([msg(60 * 24 * 10), msg(30), msg(20), msg(10)])
+        store.mark_filled("c1", "s1", NOW - timedelta(days=20), NOW)
+        assert store.prune(retention_days=7, max_per_channel=2) == 2
+        assert contents(store.messages("c1")) == ["m20", "m10"]
+        assert store.coverage("c1")["low_water"] == NOW - timedelta(minutes=30)
+
+    def test_job_cursors(self, store):
+        assert store.job_cursor("memories", "c1") is None
+        store.set_job_cursor("memories", "c1", NOW)
+        assert store.job_cursor("memories", "c1") == NOW
+        assert store.job_cursor("url_history", "c1") is None
+
+
+class FakeChannel:
+    def __init__(self, channel_id, messages):
+        self.id = channel_id
+        self.name = channel_id
+        self._messages = messages
+        self.rest_calls = 0
+
+    async def iter_history(self, limit=None, after=None, before=None, oldest_first=None):
+        self.rest_calls += 1
+        for m in self._messages:
+            if after is None or m.created_at > after:
+                yield m
+
+
+@pytest.fixture
+def archive_env(store, monkeypatch):
+    platform_mock = MagicMock()
+    monkeypatch.setattr(main, "message_archive", store)
+    monkeypatch.setattr(main, "ENABLE_MESSAGE_ARCHIVE", True)
+    monkeypatch.setattr(main, "archive_synced_channels", set())
+    monkeypatch.setattr(main, "platform", platform_mock)
+    monkeypatch.setattr(main, "server_id", "s1")
+    return platform_mock
+
+
+class TestArchiveHelpers:
+
+    async def test_fill_then_serve_locally(self, archive_env, store):
+        channel = FakeChannel("c1", [msg(30), msg(20)])
+        archive_env.get_readable_channels = AsyncMock(return_value=[channel])
+
+        await main.fill_message_archive()
+        assert "c1" in main.archive_synced_channels
+        assert contents(store.messages("c1")) == ["m30", "m20"]
+
+        # live messages after the fill extend coverage
+        store.record(msg(5), advance="c1" in main.archive_synced_channels)
+
+        channel.rest_calls = 0
+        served = [m async for m in main.iter_channel_history(channel, after=NOW - timedelta(hours=1))]
+        assert contents(served) == ["m30", "m20", "m5"]
+        assert channel.rest_calls == 0
+
+    async def test_falls_back_to_platform_outside_coverage(self, archive_env, store):
+        channel = FakeChannel("c1", [msg(30)])
+        archive_env.get_readable_channels = AsyncMock(return_value=[channel])
+        await main.fill_message_archive()
+
+        channel.rest_calls = 0
+        too_old = NOW - timedelta(days=main.MESSAGE_ARCHIVE_BACKFILL_DAYS + 1)
+        served = [m async for m in main.iter_channel_history(channel, after=too_old)]
+        assert contents(served) == ["m30"]
+        assert channel.rest_calls == 1
+
+    async def test_refill_picks_up_from_high_water(self, archive_env, store):
+        channel = FakeChannel("c1", [msg(30)])
+        archive_env.get_readable_channels = AsyncMock(return_value=[channel])
+        await main.fill_message_archive()
+
+        # reconnect after downtime: messages arrived while we were away
+        main.archive_synced_channels.clear()
+        channel._messages.append(msg(-1))
+        await main.fill_message_archive()
+        assert contents(store.messages("c1")) == ["m30", "m-1"]
+        assert store.covers("c1", NOW - timedelta(days=main.MESSAGE_ARCHIVE_BACKFILL_DAYS) + timedelta(minutes=1))
+
+    def test_job_window_resumes_from_cursor(self, archive_env, store):
+        default = NOW - timedelta(days=1)
+        assert main._job_window_start("memories", "c1", default) == default
+        main._advance_job_cursor("memories", "c1", NOW - timedelta(days=3))
+        assert main._job_window_start("memories", "c1", default) == NOW - timedelta(days=3)
+        main._advance_job_cursor("memories", "c1", NOW - timedelta(days=30))
+        assert main._job_window_start("memories", "c1", default) > NOW - timedelta(days=30)
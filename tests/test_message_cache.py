@@ -0,0 +1,147 @@
+"""Tests for src/platforms/message_cache.py — the per-channel ring buffer."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.platforms.base import ChatMessage
+from src.platforms.message_cache import MessageCache
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class Clock:
+    def __init__(self):
+        self.now = NOW
+
+    def __call__(self):
+        return self.now
+
+
+def msg(minutes_ago, content=None, channel_id="c1", msg_id=None):
+    created = NOW - timedelta(minutes=minutes_ago)
+    return ChatMessage(
+        content=content or f"m{minutes_ago}", author_id="u1", author_name="user",
+        author_display_name="User", author_is_bot=False, author_mention="<@u1>",
+        channel_id=channel_id, server_id="s1", created_at=created,
+        id=msg_id or f"id{minutes_ago}",
+    )
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(clock):
+    cache = MessageCache(max_messages=5, max_age_hours=24, clock=clock)
+    return cache
+
+
+def contents(messages):
+    return [m.content for m in messages]
+
+
+class TestMessageCache:
+
+    def test_miss_before_connect(self, cache):
+        cache.add(msg(1))
+        assert cache.get("c1", limit=1) is None
+
+    def test_live_messages_served_after_connect(self, cache, clock):
+        clock.now = NOW - timedelta(minutes=10)
+        cache.mark_connected()
+        clock.now = NOW
+        for minutes in (5, 3, 1):
+            cache.add(msg(minutes))
+        # window starts after connect: complete
+        assert contents(cache.get("c1", limit=None, after=NOW - timedelta(minutes=10))) == ["m5", "m3", "m1"]
+        # newest-first limited read filled from the cache: complete
+        assert contents(cache.get("c1", limit=2, oldest_first=False)) == ["m1", "m3"]
+        # reaches back before connect with too few messages cached: miss
+        assert cache.get("c1", limit=10, after=NOW - timedelta(hours=8), oldest_first=False) is None
+
+    def test_prime_extends_coverage_and_dedupes(self, cache, clock):
+        cache.mark_connected()
+        cache.add(msg(0))
+        cache.prime("c1", [msg(30), msg(20), msg(0)], since=NOW - timedelta(hours=8))
+        result = cache.get("c1", limit=10, after=NOW - timedelta(hours=8), oldest_first=False)
+        assert contents(result) == ["m0", "m20", "m30"]
+
+    def test_before_bound(self, cache):
+        cache.mark_connected()
+        cache.prime("c1", [msg(30), msg(20), msg(10)], since=NOW - timedelta(hours=1))
+        result = cache.get("c1", limit=10, after=NOW - timedelta(hours=1), before=NOW - timedelta(minutes=15),
+                           oldest_first=False)
+        assert contents(result) == ["m20", "m30"]
+
+    def test_truncated_prime_only_covers_from_oldest_fetched(self, cache):
+        cache.mark_connected()
+        cache.prime("c1", [msg(30), msg(20)], since=NOW - timedelta(hours=8), limit=2)
+        assert cache.get("c1", limit=None, after=NOW - timedelta(hours=8)) is None
+        assert contents(cache.get("c1", limit=None, after=NOW - timedelta(minutes=30))) == ["m20"]
+
+    def test_count_cap_evicts_oldest_and_moves_coverage(self, cache):
+        cache.mark_connected()
+        cache.prime("c1", [msg(m) for m in range(60, 0, -10)], since=NOW - timedelta(hours=2))
+        # six messages, cap five: m60 evicted
+        assert cache.get("c1", limit=None, after=NOW - timedelta(hours=2)) is None
+        assert contents(cache.get("c1", limit=None, after=NOW - timedelta(minutes=60))) == ["m50", "m40", "m30", "m20", "m10"]
+
+    def test_age_cap(self, cache, clock):
+        cache.mark_connected()
+        cache.prime("c1", [msg(60)], since=NOW - timedelta(hours=2))
+        clock.now = NOW + timedelta(hours=24)
+        assert cache.get("c1", limit=None, after=NOW - timedelta(hours=2)) is None
+        assert cache.get("c1", limit=None, after=clock.now - timedelta(hours=1)) == []
+
+    def test_reconnect_discards_coverage(self, cache):
+        cache.mark_connected()
+        cache.prime("c1", [msg(30)], since=NOW - timedelta(hours=1))
+        cache.mark_connected()
+        assert cache.get("c1", limit=1, after=NOW - timedelta(hours=1)) is None
+
+    def test_naive_datetimes_are_local_time(self, cache):
+        cache.mark_connected()
+        cache.prime("c1", [msg(30)], since=NOW - timedelta(hours=1))
+        naive_after = (NOW - timedelta(hours=1)).astimezone().replace(tzinfo=None)
+        assert contents(cache.get("c1", limit=None, after=naive_after)) == ["m30"]
+
+    def test_channels_are_separate(self, cache):
+        cache.mark_connected()
+        cache.add(msg(1, channel_id="c2"))
+        assert cache.get("c1", limit=1) is None
+        assert contents(cache.get("c2", limit=1)) == ["m1"]
+
+
+class TestDiscordChannelUsesCache:
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_rest_and_miss_falls_back(self, cache):
+        from src.platforms.discord_adapter import DiscordChannel
+        raw_channel = MagicMock()
+        raw_channel.id = "c1"
+        raw_channel.name = "general"
+        rest_calls = []
+
+        def history(**kwargs):
+            rest_calls.append(kwargs)
+
+            async def gen():
+                return
+                yield
+            return gen()
+
+        raw_channel.history = history
+        channel = DiscordChannel(raw_channel, bot_member=None, cache=cache)
+        cache.mark_connected()
+        cache.prime("c1", [msg(30), msg(20)], since=NOW - timedelta(hours=1))
+
+        hit = await channel.history(limit=10, after=NOW - timedelta(hours=1), oldest_first=False)
+        assert contents(hit) == ["m20", "m30"]
+        assert rest_calls == []
+
+        await channel.history(limit=10, after=NOW - timedelta(days=2))
+        assert len(rest_calls) == 1
@@ -7,12 +7,16 @@ returns a truthy MagicMock and the genre-reading loop would silently do
 nothing while appearing to pass.
 """
 
+import asyncio
 import json
+import os
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from src.content import discogs
+from src.content import music as music_module
 from src.content.music import (
     MusicParseError,
     YOUTUBE_URL_RE,
@@ -20,7 +24,9 @@ from src.content.music import (
     enrich_links,
     fetch_oembed,
     parse_titles,
+    resolve_links,
 )
+from src.persistence.music_store import MusicStore
 
 
 class StubChatbot:
@@ -67,26 +73,75 @@ class TestYoutubeUrlRe:
 
 class TestFetchOembed:
 
-    @patch("src.content.music.requests.get")
-    async def test_returns_title_and_channel_on_200(self, mock_get):
-        mock_get.return_value = MagicMock(
+    @patch("src.content.music._oembed_session")
+    async def test_returns_title_and_channel_on_200(self, mock_session):
+        mock_session.return_value.get.return_value = MagicMock(
             status_code=200,
             json=lambda: {"title": "Low - Quorum", "author_name": "Sub Pop"},
         )
         result = await fetch_oembed("https://youtu.be/abc")
         assert result == {"title": "Low - Quorum", "channel": "Sub Pop"}
 
-    @patch("src.content.music.requests.get")
-    async def test_returns_none_on_400(self, mock_get):
-        mock_get.return_value = MagicMock(status_code=400)
+    @patch("src.content.music._oembed_session")
+    async def test_returns_none_on_400(self, mock_session):
+        mock_session.return_value.get.return_value = MagicMock(status_code=400)
         assert await fetch_oembed("https://youtu.be/dead") is None
 
-    @patch("src.content.music.requests.get")
-    async def test_returns_none_on_request_exception(self, mock_get):
+    @patch("src.content.music._oembed_session")
+    async def test_returns_none_on_request_exception(self, mock_session):
         import requests as requests_lib
-        mock_get.side_effect = requests_lib.ConnectionError("boom")
+        mock_session.return_value.get.side_effect = requests_lib.ConnectionError("boom")
         assert await fetch_oembed("https://youtu.be/abc") is None
 
+    @patch("src.content.music._oembed_session")
+    async def test_dead_video_recorded_in_store(self, mock_session, temp_dir):
+        mock_session.return_value.get.return_value = MagicMock(status_code=400)
+        store = MusicStore(os.path.join(temp_dir, "test.db"))
+        await fetch_oembed("https://youtu.be/dead", music_store=store)
+        assert store.dead_links(["https://youtu.be/dead"]) == {"https://youtu.be/dead"}
+
+    @patch("src.content.music._oembed_session")
+    async def test_network_error_not_recorded_as_dead(self, mock_session, temp_dir):
+        import requests as requests_lib
+        mock_session.return_value.get.side_effect = requests_lib.Timeout("slow")
+        store = MusicStore(os.path.join(temp_dir, "test.db"))
+        await fetch_oembed("https://youtu.be/abc", music_store=store)
+        assert store.dead_links(["https://youtu.be/abc"]) == set()
+
+    def test_session_is_shared_and_pooled(self):
+        session = music_module._oembed_session()
+        assert session is music_module._oembed_session()
+        assert session.get_adapter("https://www.youtube.com")._pool_maxsize == music_module.MUSIC_OEMBED_CONCURRENCY
+
+
+class TestResolveLinks:
+
+    async def test_bounded_concurrency_and_order_kept(self):
+        active = {"now": 0, "peak": 0}
+
+        async def fake(url, **kwargs):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+            return None if "dead" in url else {"title": url, "channel": "c"}
+
+        links = [{"url": f"https://youtu.be/{i}"} for i in range(10)] + [{"url": "https://youtu.be/dead"}]
+        with patch("src.content.music.fetch_oembed", side_effect=fake):
+            await resolve_links(links, concurrency=3)
+
+        assert active["peak"] == 3
+        assert [l["title"] for l in links] == [f"https://youtu.be/{i}" for i in range(10)]
+
+    async def test_already_resolved_links_not_refetched(self):
+        fake = AsyncMock(return_value={"title": "new", "channel": "c"})
+        links = [{"url": "https://youtu.be/a", "title": "known", "channel": "c"}, {"url": "https://youtu.be/b"}]
+        with patch("src.content.music.fetch_oembed", fake):
+            await resolve_links(links)
+        fake.assert_awaited_once()
+        assert links[0]["title"] == "known"
+        assert links[1]["title"] == "new"
+
 
 class TestParseTitles:
 
@@ -194,17 +249,65 @@ class TestArtistGenres:
         assert result["genres"] == []
 
 
+class TestArtistGenresCache:
+
+    @pytest.fixture
+    def store(self, temp_dir):
+        from src.persistence.discogs_store import DiscogsStore
+        return DiscogsStore(os.path.join(temp_dir, "test.db"))
+
+    @patch("src.content.music._get_client")
+    async def test_hit_skips_discogs(self, mock_get_client, store):
+        client = MagicMock()
+        client.search.return_value = [RecordingRelease({"genre": ["Rock"], "style": ["Slowcore"]})]
+        mock_get_client.return_value = client
+
+        first = await artist_genres("Low", discogs_store=store)
+        second = await artist_genres("low ", discogs_store=store)
+
+        client.search.assert_called_once()
+        assert second["genres"] == first["genres"] == ["Rock"]
+        assert second["cached"] is True
+
+    @patch("src.content.music._get_client")
+    async def test_errors_not_cached(self, mock_get_client, store):
+        client = MagicMock()
+        client.search.side_effect = RuntimeError("api down")
+        mock_get_client.return_value = client
+
+        await artist_genres("Low", discogs_store=store)
+        await artist_genres("Low", discogs_store=store)
+        assert client.search.call_count == 2
+
+    @patch("src.content.music.fetch_oembed")
+    @patch("src.content.music._get_client")
+    async def test_enrich_uses_cached_genres(self, mock_get_client, mock_oembed, store):
+        store.put("genres", "low", {"found": True, "genres": ["Rock"], "styles": ["Slowcore"]})
+        async def fake_oembed(url, **kwargs):
+            return {"title": "Low - Quorum", "channel": "Sub Pop"}
+        mock_oembed.side_effect = fake_oembed
+        chatbot = StubChatbot(parse_reply([
+            {"index": 1, "is_music": True, "artist": "Low", "collaborators": [], "track": "Quorum"},
+        ]))
+        links = [{"url": "https://youtu.be/a"}]
+
+        await enrich_links(links, chatbot, discogs_store=store)
+
+        mock_get_client.assert_not_called()
+        assert links[0]["styles"] == ["Slowcore"]
+
+
 class TestEnrichLinks:
 
     def oembed_side_effect(self, mapping):
-        async def fake(url):
+        async def fake(url, **kwargs):
             return mapping.get(url)
         return fake
 
     @patch("src.content.music.asyncio.sleep", new_callable=AsyncMock)
     @patch("src.content.music.artist_genres", new_callable=AsyncMock)
     @patch("src.content.music.fetch_oembed")
-    async def test_full_pipeline_with_artist_dedupe_and_throttle(
+    async def test_full_pipeline_with_artist_dedupe_and_background_priority(
             self, mock_oembed, mock_genres, mock_sleep):
         links = [
             {"url": "https://youtu.be/a", "poster": "someposter"},
@@ -219,15 +322,23 @@ class TestEnrichLinks:
             {"index": 1, "is_music": True, "artist": "Low", "collaborators": [], "track": "Quorum"},
             {"index": 2, "is_music": True, "artist": "Low", "collaborators": [], "track": "Always Trying"},
         ]))
-        mock_genres.return_value = {"found": True, "genres": ["Rock"], "styles": ["Slowcore"]}
+        priorities = []
+
+        async def fake_genres(artist, discogs_store=None):
+            priorities.append(discogs._priority.get())
+            return {"found": True, "genres": ["Rock"], "styles": ["Slowcore"]}
+        mock_genres.side_effect = fake_genres
 
         await enrich_links(links, chatbot)
 
         # dead link dropped in place
         assert [l["url"] for l in links] == ["https://youtu.be/a", "https://youtu.be/b"]
-        # same artist twice = one lookup, one throttle sleep
-        mock_genres.assert_called_once_with("Low")
-        assert mock_sleep.await_count == 1
+        # same artist twice = one lookup, paced by the shared limiter as
+        # background traffic rather than a fixed sleep
+        mock_genres.assert_called_once_with("Low", discogs_store=None)
+        assert priorities == [discogs.BACKGROUND]
+        mock_sleep.assert_not_awaited()
+        assert discogs._priority.get() == discogs.INTERACTIVE  # reset afterwards
         # both links got the genres
         assert links[0]["genres"] == ["Rock"]
         assert links[1]["styles"] == ["Slowcore"]
@@ -258,7 +369,7 @@ class TestEnrichLinks:
         assert links[1]["genres"] == []
         assert links[1]["styles"] == []
         # non-music link got no Discogs lookup
-        mock_genres.assert_called_once_with("Skilled Mechanics")
+        mock_genres.assert_called_once_with("Skilled Mechanics", discogs_store=None)
 
     @patch("src.content.music.fetch_oembed")
     async def test_all_dead_links_returns_early_without_llm_call(self, mock_oembed):
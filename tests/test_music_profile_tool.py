@@ -17,6 +17,7 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 
 import main
+from src.persistence.artist_graph_store import ArtistGraphStore
 from src.persistence.music_store import MusicStore
 from src.tools.definitions import get_music_profile_tool
 
@@ -41,6 +42,7 @@ class FakeChatMessage:
         self.author_display_name = author_name
         self.author_mention = f"<@{author_id}>"
         self.channel_id = "chan1"
+        self.server_id = "server1"
         self.replies = []
 
     async def reply(self, text, **kwargs):
@@ -88,7 +90,9 @@ def profile_env(temp_dir, monkeypatch):
     monkeypatch.setattr(main, "chatbot", chatbot)
     monkeypatch.setattr(main, "server_id", "server1")
     monkeypatch.setattr(main, "ENABLE_DISCOGS", False)
-    return type("Ctx", (), {"store": store, "chatbot": chatbot, "monkeypatch": monkeypatch})
+    graph = ArtistGraphStore(os.path.join(temp_dir, 'test.db'))
+    monkeypatch.setattr(main, "artist_graph", graph)
+    return type("Ctx", (), {"store": store, "graph": graph, "chatbot": chatbot, "monkeypatch": monkeypatch})
 
 
 def appended_tool_content(chatbot):
@@ -183,14 +187,51 @@ class TestHandleGetMusicProfile:
         await self.run_handler(profile_env, {"user_name": "<@42>"}, message=requester)
         assert "Low (2)" in appended_tool_content(profile_env.chatbot)
 
-    async def test_explore_data_included_for_top_two_artists(self, profile_env):
+    async def test_artist_network_comes_from_local_graph(self, profile_env):
         seed_store(profile_env.store)
+        profile_env.graph.add_memberships([("Low", "Alan Sparhawk")])
+        profile_env.graph.add_memberships([("Retribution Gospel Choir", "Alan Sparhawk")])
         profile_env.monkeypatch.setattr(main, "ENABLE_DISCOGS", True)
-        explore = AsyncMock(side_effect=lambda a: f"## {a}\nnetwork data")
+        explore = AsyncMock()
         profile_env.monkeypatch.setattr(main.discogs, "explore_artist", explore)
         await self.run_handler(profile_env, {})
         content = appended_tool_content(profile_env.chatbot)
-        assert "Artist network data" in content
-        assert explore.await_count == 2
-        explored = {call.args[0] for call in explore.await_args_list}
-        assert "Low" in explored  # top artist definitely included
+        assert "Artist network" in content
+        assert "Retribution Gospel Choir" in content
+        assert "Low → Alan Sparhawk (member) → Retribution Gospel Choir (member)" in content
+        explore.assert_not_awaited()  # no live Discogs calls
+
+    async def test_empty_graph_omits_network(self, profile_env):
+        seed_store(profile_env.store)
+        await self.run_handler(profile_env, {})
+        assert "Artist network" not in appended_tool_content(profile_env.chatbot)
+
+
+class TestCompareMusicTaste:
+
+    async def run_handler(self, env, arguments, message=None):
+        message = message or FakeChatMessage()
+        await main.handle_compare_music_taste(message, tool_call_stub(), arguments, [])
+        return message
+
+    def test_tool_definition(self):
+        from src.tools.definitions import compare_music_taste_tool
+        func = compare_music_taste_tool["function"]
+        assert func["name"] == "compare_music_taste"
+        assert func["parameters"]["properties"]["user_names"]["type"] == "array"
+        assert func["parameters"]["required"] == []
+
+    async def test_defaults_to_requester(self, profile_env):
+        seed_store(profile_env.store)
+        message = await self.run_handler(profile_env, {})
+        content = appended_tool_content(profile_env.chatbot)
+        assert "Closest music taste to SomePoster" in content
+        assert message.replies
+
+    async def test_group_by_name_and_unknown_user(self, profile_env):
+        seed_store(profile_env.store)
+        await self.run_handler(profile_env, {"user_names": ["SomePoster", "@OtherUser", "Nobody"]})
+        content = appended_tool_content(profile_env.chatbot)
+        assert "No music history found for: Nobody" in content
+        assert "Group taste for SomePoster, OtherUser" in content
+        assert profile_env.chatbot.calls[-1]["tools"] == []
@@ -3,6 +3,7 @@ Tests for src/persistence/music_store.py
 """
 
 import os
+import sqlite3
 from datetime import datetime, timedelta
 
 from src.persistence.music_store import MusicStore, MusicEntry
@@ -143,6 +144,119 @@ class TestMusicStore:
         entries = store.get_user_history('server1', 'user1', limit=1000)
         assert len(entries) == 600
 
+    def test_dead_links_round_trip(self, temp_dir):
+        store = make_store(temp_dir)
+        store.mark_dead_link('https://youtu.be/gone', 400)
+        store.mark_dead_link('https://youtu.be/gone', 404)  # re-marking is fine
+        assert store.dead_links(['https://youtu.be/gone', 'https://youtu.be/alive']) == {'https://youtu.be/gone'}
+        assert store.dead_links([]) == set()
+
+    def test_dead_links_large_batch(self, temp_dir):
+        store = make_store(temp_dir)
+        store.mark_dead_link('https://youtu.be/v1999', 400)
+        urls = [f'https://youtu.be/v{i}' for i in range(2000)]
+        assert store.dead_links(urls) == {'https://youtu.be/v1999'}
+
+
+class TestMusicStoreBatch:
+
+    def _record(self, url, is_music=True, artist='Low'):
+        return dict(
+            server_id='server1', channel_id='channel1', url=url,
+            video_title='t', video_channel='c', posted_by_id='user1',
+            posted_by_name='TestUser', posted_at=datetime.now(),
+            artist=artist, genres=['Rock'], styles=[], is_music=is_music,
+        )
+
+    def test_urls_exist_returns_known_subset(self, temp_dir):
+        store = make_store(temp_dir)
+        save_link(store, url='https://youtu.be/a')
+        save_link(store, url='https://youtu.be/b', server_id='server2')
+        found = store.urls_exist('server1', ['https://youtu.be/a', 'https://youtu.be/b', 'https://youtu.be/a'])
+        assert found == {'https://youtu.be/a'}
+
+    def test_urls_exist_large_batch(self, temp_dir):
+        store = make_store(temp_dir)
+        save_link(store, url='https://youtu.be/v4999')
+        urls = [f'https://youtu.be/v{i}' for i in range(5000)]
+        assert store.urls_exist('server1', urls) == {'https://youtu.be/v4999'}
+
+    def test_save_many_reports_inserted_and_skipped(self, temp_dir):
+        store = make_store(temp_dir)
+        save_link(store, url='https://youtu.be/a')
+        result = store.save_many([
+            self._record('https://youtu.be/a'),
+            self._record('https://youtu.be/b'),
+            self._record('https://youtu.be/t', is_music=False, artist=None),
+        ])
+        assert result == {"inserted": 2, "inserted_music": 1, "skipped": 1}
+        assert store.url_exists('server1', 'https://youtu.be/t')
+
+    def test_save_many_maintains_profile_counts(self, temp_dir):
+        store = make_store(temp_dir)
+        store.save_many([self._record('https://youtu.be/a'), self._record('https://youtu.be/a'),
+                         self._record('https://youtu.be/b', artist='Duster')])
+        counts = store.profile_counts('server1', 'user1')
+        assert counts['artists'] == {'Low': 1, 'Duster': 1}
+        assert counts['genres'] == {'Rock': 2}
+
+
+class TestMusicProfileCounts:
+
+    def test_counts_maintained_on_save(self, temp_dir):
+        store = make_store(temp_dir)
+        save_link(store, url='https://youtu.be/a', artist='Low', genres=['Rock'], styles=['Slowcore'])
+        save_link(store, url='https://youtu.be/b', artist='Low', genres=['Rock', 'Non-Music'], styles=[])
+        counts = store.profile_counts('server1', 'user1')
+        assert counts['artists']['Low'] == 2
+        assert counts['genres'] == {'Rock': 2}
+        assert counts['styles'] == {'Slowcore': 1}
+
+    def test_duplicate_and_non_music_rows_not_counted(self, temp_dir):
+        store = make_store(temp_dir)
+        save_link(store, url='https://youtu.be/a', artist='Low')
+        save_link(store, url='https://youtu.be/a', artist='Low')  # duplicate, ignored
+        save_link(store, url='https://youtu.be/t', artist='Trailer', is_music=False)
+        counts = store.profile_counts('server1', 'user1')
+        assert counts['artists'] == {'Low': 1}
+
+    def test_rebuild_matches_incremental(self, temp_dir):
+        store = make_store(temp_dir)
+        save_link(store, url='https://youtu.be/a', artist='Low', genres=['Rock'], styles=['Slowcore'])
+        save_link(store, url='https://youtu.be/b', artist='Duster', genres=['Rock'], styles=['Space Rock'])
+        before = store.profile_counts('server1', 'user1')
+        with sqlite3.connect(store.db_path) as conn:
+            conn.execute("UPDATE music_profile_counts SET count = 99")
+            conn.commit()
+        assert store.rebuild_profile_counts('server1') == 2
+        assert store.profile_counts('server1', 'user1') == before
+
+    def test_rebuild_is_scoped_to_server(self, temp_dir):
+        store = make_store(temp_dir)
+        save_link(store, url='https://youtu.be/a', artist='Low', server_id='server1')
+        save_link(store, url='https://youtu.be/a', artist='Low', server_id='server2')
+        with sqlite3.connect(store.db_path) as conn:
+            conn.execute("DELETE FROM music_profile_counts WHERE server_id = 'server2'")
+            conn.commit()
+        store.rebuild_profile_counts('server1')
+        assert store.profile_counts('server2', 'user1')['artists'] == {}
+
+    def test_existing_database_backfilled_on_upgrade(self, temp_dir):
+        store = make_store(temp_dir)
+        save_link(store, url='https://youtu.be/a', artist='Low', genres=['Rock'])
+        with sqlite3.connect(store.db_path) as conn:
+            conn.execute("DROP TABLE music_profile_counts")
+            conn.commit()
+        upgraded = MusicStore(store.db_path)
+        assert upgraded.profile_counts('server1', 'user1')['artists'] == {'Low': 1}
+
+    def test_import_maintains_counts(self, temp_dir):
+        source = make_store(temp_dir)
+        save_link(source, url='https://youtu.be/a', artist='Low', genres=['Rock'])
+        target = MusicStore(os.path.join(temp_dir, 'target.db'))
+        target.import_server('server1', source.export_server('server1'))
+        assert target.profile_counts('server1', 'user1')['genres'] == {'Rock': 1}
+
 
 class TestMusicStoreBackup:
 
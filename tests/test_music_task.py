@@ -7,6 +7,7 @@ extract_music_history() and backfill_music_history() with fake channels.
 music.enrich_links is replaced with a deterministic fake so no HTTP/LLM/Discogs.
 """
 
+import asyncio
 import os
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock
@@ -15,6 +16,9 @@ import pytest
 
 import main
 from src.content.music import MusicParseError
+from src.persistence.artist_graph_store import ArtistGraphStore
+from src.persistence.backfill_store import BackfillStore
+from src.persistence.discogs_store import DiscogsStore
 from src.persistence.music_store import MusicStore
 
 
@@ -26,6 +30,7 @@ class FakeChatMessage:
         self.author_id = author_id
         self.author_display_name = author_name
         self.created_at = created_at or datetime.now()
+        self.server_id = "server1"
         self.replies = []
 
     async def reply(self, text, **kwargs):
@@ -38,17 +43,32 @@ class FakeChannel:
         self.name = "music"
         self.history_calls = []
 
-    async def history(self, limit, after):
-        self.history_calls.append({"limit": limit, "after": after})
-        return self._messages
+        self.consumed = 0
 
+    async def history(self, limit, after=None, **kwargs):
+        return [m async for m in self.iter_history(limit, after, **kwargs)]
 
-def music_message(url, author_id="u1", author_name="PosterOne"):
+    async def iter_history(self, limit=None, after=None, **kwargs):
+        self.history_calls.append({"limit": limit, "after": after, **kwargs})
+        messages = [m for m in self._messages if after is None or m.created_at > after]
+        for message in messages[:limit]:
+            self.consumed += 1
+            yield message
+
+
+def music_message(url, author_id="u1", author_name="PosterOne", created_at=None):
     return FakeChatMessage(author_id=author_id, author_name=author_name,
-                           content=f"great track {url}")
+                           content=f"great track {url}", created_at=created_at)
+
 
+def dated_messages(count, prefix="music"):
+    """One link per message, a minute apart, oldest first."""
+    start = datetime.now() - timedelta(days=1)
+    return [music_message(f"https://youtu.be/{prefix}{i}", created_at=start + timedelta(minutes=i))
+            for i in range(count)]
 
-async def fake_enrich(links, chatbot, throttle_seconds=1.2):
+
+async def fake_enrich(links, chatbot, throttle_seconds=1.2, **kwargs):
     """Deterministic stand-in for music.enrich_links: urls containing 'music'
     are music by Low; urls containing 'dead' are dropped; others non-music."""
     kept = [l for l in links if "dead" not in l["url"]]
@@ -67,19 +87,30 @@ async def fake_enrich(links, chatbot, throttle_seconds=1.2):
         })
 
 
+async def fake_resolve(links, **kwargs):
+    """Stand-in for music.resolve_links: the oEmbed stage is folded into
+    fake_enrich, so prefetching is a no-op."""
+
+
 @pytest.fixture
 def music_env(temp_dir, monkeypatch):
     """Wire main.py's globals to fakes; returns a context object for tests."""
     store = MusicStore(os.path.join(temp_dir, 'test.db'))
     platform_mock = MagicMock()
+    graph = ArtistGraphStore(os.path.join(temp_dir, 'test.db'))
     monkeypatch.setattr(main, "music_store", store)
+    monkeypatch.setattr(main, "artist_graph", graph)
+    monkeypatch.setattr(main, "backfill_store", BackfillStore(os.path.join(temp_dir, 'test.db')))
+    monkeypatch.setattr(main, "discogs_store", DiscogsStore(os.path.join(temp_dir, 'test.db')))
     monkeypatch.setattr(main, "platform", platform_mock)
     monkeypatch.setattr(main, "server_id", "server1")
     monkeypatch.setattr(main, "ENABLE_MUSIC_PROFILE", True)
     monkeypatch.setattr(main, "MUSIC_HISTORY_CHANNELS", "chan1")
     monkeypatch.setattr(main, "chatbot", MagicMock())
     monkeypatch.setattr(main.music, "enrich_links", fake_enrich)
-    return type("Ctx", (), {"store": store, "platform": platform_mock, "monkeypatch": monkeypatch})
+    monkeypatch.setattr(main.music, "resolve_links", fake_resolve)
+    return type("Ctx", (), {"store": store, "graph": graph, "platform": platform_mock,
+                            "monkeypatch": monkeypatch})
 
 
 def set_channel(ctx, messages):
@@ -121,7 +152,7 @@ class TestExtractMusicHistory:
         set_channel(music_env, [music_message("https://youtu.be/music1")])
         enrich_calls = []
 
-        async def recording_enrich(links, chatbot, throttle_seconds=1.2):
+        async def recording_enrich(links, chatbot, throttle_seconds=1.2, **kwargs):
             enrich_calls.append(list(links))
             await fake_enrich(links, chatbot)
 
@@ -195,7 +226,7 @@ class TestBackfillMusicHistory:
         ])
         enrich_calls = []
 
-        async def recording_enrich(links, chatbot, throttle_seconds=1.2):
+        async def recording_enrich(links, chatbot, throttle_seconds=1.2, **kwargs):
             enrich_calls.append(len(links))
             await fake_enrich(links, chatbot)
 
@@ -212,7 +243,7 @@ class TestBackfillMusicHistory:
         ])
         calls = {"n": 0}
 
-        async def flaky_enrich(links, chatbot, throttle_seconds=1.2):
+        async def flaky_enrich(links, chatbot, throttle_seconds=1.2, **kwargs):
             calls["n"] += 1
             if calls["n"] == 1:
                 raise MusicParseError("bad JSON")
@@ -226,6 +257,133 @@ class TestBackfillMusicHistory:
         # failed chunk's links stay unsaved for a re-run
         assert not music_env.store.url_exists("server1", "https://youtu.be/music0")
 
+        retry = FakeChatMessage()
+        await main.backfill_music_history(retry, "!musicbackfill resume")
+        assert music_env.store.url_exists("server1", "https://youtu.be/music0")
+        assert "4 music" in retry.replies[-1]
+        assert "failed" not in retry.replies[-1]
+
+    async def test_next_chunk_resolved_while_current_parses(self, music_env):
+        music_env.monkeypatch.setattr(main, "MUSIC_BACKFILL_CHUNK_SIZE", 2)
+        set_channel(music_env, [
+            music_message(f"https://youtu.be/music{i}") for i in range(5)
+        ])
+        events = []
+
+        async def recording_resolve(links, **kwargs):
+            events.append(("resolve", links[0]["url"]))
+
+        async def recording_enrich(links, chatbot, **kwargs):
+            await asyncio.sleep(0)  # let the prefetch task start
+            events.append(("enrich", links[0]["url"]))
+            await fake_enrich(links, chatbot)
+
+        music_env.monkeypatch.setattr(main.music, "resolve_links", recording_resolve)
+        music_env.monkeypatch.setattr(main.music, "enrich_links", recording_enrich)
+        await main.backfill_music_history(FakeChatMessage(), "!musicbackfill")
+
+        assert events == [
+            ("resolve", "https://youtu.be/music0"),
+            ("resolve", "https://youtu.be/music2"),
+            ("enrich", "https://youtu.be/music0"),
+            ("resolve", "https://youtu.be/music4"),
+            ("enrich", "https://youtu.be/music2"),
+            ("enrich", "https://youtu.be/music4"),
+        ]
+
+    async def test_history_is_streamed(self, music_env):
+        music_env.monkeypatch.setattr(main, "MUSIC_BACKFILL_PAGE_SIZE", 3)
+        music_env.monkeypatch.setattr(main, "MUSIC_BACKFILL_CHUNK_SIZE", 2)
+        channel = set_channel(music_env, dated_messages(20))
+        consumed_at_first_parse = []
+
+        async def recording_enrich(links, chatbot, **kwargs):
+            consumed_at_first_parse.append(channel.consumed)
+            await fake_enrich(links, chatbot)
+
+        music_env.monkeypatch.setattr(main.music, "enrich_links", recording_enrich)
+        message = FakeChatMessage()
+        await main.backfill_music_history(message, "!musicbackfill")
+        assert channel.history_calls[0]["oldest_first"] is True
+        assert channel.history_calls[0]["limit"] is None
+        assert consumed_at_first_parse[0] < 20  # parsing began before the history ran out
+        assert "20 music" in message.replies[-1]
+
+    async def test_message_links_never_split_across_chunks(self, music_env):
+        music_env.monkeypatch.setattr(main, "MUSIC_BACKFILL_CHUNK_SIZE", 2)
+        set_channel(music_env, [
+            FakeChatMessage(content="https://youtu.be/music0 https://youtu.be/music1 https://youtu.be/music2"),
+            music_message("https://youtu.be/music3"),
+        ])
+        sizes = []
+
+        async def recording_enrich(links, chatbot, **kwargs):
+            sizes.append(len(links))
+            await fake_enrich(links, chatbot)
+
+        music_env.monkeypatch.setattr(main.music, "enrich_links", recording_enrich)
+        await main.backfill_music_history(FakeChatMessage(), "!musicbackfill")
+        assert sizes == [3, 1]
+
+    async def test_progress_reported_in_channel(self, music_env):
+        music_env.monkeypatch.setattr(main, "MUSIC_BACKFILL_CHUNK_SIZE", 1)
+        music_env.monkeypatch.setattr(main, "MUSIC_BACKFILL_PROGRESS_EVERY", 2)
+        set_channel(music_env, dated_messages(4))
+        message = FakeChatMessage()
+        await main.backfill_music_history(message, "!musicbackfill")
+        progress = [r for r in message.replies if r.startswith("Music backfill: ")]
+        assert len(progress) == 2
+        assert "4 links processed" in progress[-1]
+
+    async def test_resume_continues_from_cursor(self, music_env):
+        music_env.monkeypatch.setattr(main, "MUSIC_BACKFILL_CHUNK_SIZE", 2)
+        messages = dated_messages(6)
+        channel = set_channel(music_env, messages)
+        calls = {"n": 0}
+
+        async def crashing_enrich(links, chatbot, **kwargs):
+            calls["n"] += 1
+            if calls["n"] == 2:
+                raise RuntimeError("process died")
+            await fake_enrich(links, chatbot)
+
+        music_env.monkeypatch.setattr(main.music, "enrich_links", crashing_enrich)
+        await main.backfill_music_history(FakeChatMessage(), "!musicbackfill")  # first chunk saved, then "crash"
+
+        enriched = []
+
+        async def recording_enrich(links, chatbot, **kwargs):
+            enriched.extend(link["url"] for link in links)
+            await fake_enrich(links, chatbot)
+
+        music_env.monkeypatch.setattr(main.music, "enrich_links", recording_enrich)
+        channel.history_calls.clear()
+        message = FakeChatMessage()
+        await main.backfill_music_history(message, "!musicbackfill resume")
+        assert channel.history_calls[0]["after"] == messages[1].created_at
+        assert enriched == [f"https://youtu.be/music{i}" for i in range(2, 6)]
+        assert "6 new links found, 6 music" in message.replies[-1]
+
+        done = FakeChatMessage()
+        await main.backfill_music_history(done, "!musicbackfill resume")
+        assert "No interrupted music backfill" in done.replies[-1]
+
+    async def test_resume_without_job(self, music_env):
+        set_channel(music_env, [])
+        message = FakeChatMessage()
+        await main.backfill_music_history(message, "!musicbackfill resume")
+        assert "No interrupted music backfill" in message.replies[-1]
+
+    async def test_known_dead_links_not_collected(self, music_env):
+        music_env.store.mark_dead_link("https://youtu.be/music1", 400)
+        set_channel(music_env, [
+            music_message("https://youtu.be/music1"),
+            music_message("https://youtu.be/music2"),
+        ])
+        message = FakeChatMessage()
+        await main.backfill_music_history(message, "!musicbackfill")
+        assert "1 new links found" in message.replies[-1]
+
     async def test_dead_link_does_not_abort(self, music_env):
         set_channel(music_env, [
             music_message("https://youtu.be/dead1"),
@@ -235,3 +393,59 @@ class TestBackfillMusicHistory:
         await main.backfill_music_history(message, "!musicbackfill")
         assert "1 music" in message.replies[-1]
         assert not music_env.store.url_exists("server1", "https://youtu.be/dead1")
+
+
+class TestRebuildMusicProfiles:
+
+    async def test_rebuild_command_reports_rows(self, music_env):
+        music_env.store.save(
+            server_id="server1", channel_id="chan1", url="https://youtu.be/music1",
+            video_title="t", video_channel="c", posted_by_id="u1",
+            posted_by_name="PosterOne", posted_at=datetime.now(), artist="Low",
+        )
+        message = FakeChatMessage()
+        await main.rebuild_music_profiles(message)
+        assert "1 music links" in message.replies[-1]
+        assert music_env.store.profile_counts("server1", "u1")["artists"] == {"Low": 1}
+
+    async def test_rebuild_fills_artist_graph_from_collaborators(self, music_env):
+        music_env.store.save(
+            server_id="server1", channel_id="chan1", url="https://youtu.be/music1",
+            video_title="t", video_channel="c", posted_by_id="u1",
+            posted_by_name="PosterOne", posted_at=datetime.now(), artist="Low",
+            collaborators=["Dirty Three"],
+        )
+        message = FakeChatMessage()
+        await main.rebuild_music_profiles(message)
+        assert "1 collaboration" in message.replies[-1]
+        assert [n["name"] for n in music_env.graph.neighbourhood({"Low": 1.0})] == ["Dirty Three"]
+
+
+class TestArtistGraphFeed:
+
+    async def test_collaborators_recorded_on_save(self, music_env):
+        set_channel(music_env, [music_message("https://youtu.be/music1")])
+
+        async def collab_enrich(links, chatbot, **kwargs):
+            await fake_enrich(links, chatbot)
+            links[0]["collaborators"] = ["Dirty Three"]
+
+        music_env.monkeypatch.setattr(main.music, "enrich_links", collab_enrich)
+        await main.extract_music_history()
+        assert [n["name"] for n in music_env.graph.neighbourhood({"Low": 1.0})] == ["Dirty Three"]
+
+    async def test_top_artists_explored_in_background_for_memberships(self, music_env):
+        set_channel(music_env, [music_message("https://youtu.be/music1")])
+        explored = []
+
+        async def fake_explore(artist, discogs_store=None):
+            explored.append((artist, main.discogs._priority.get()))
+            discogs_store.put("resolve", artist.lower(), {"id": 1, "name": artist})
+            discogs_store.put("members", "1", [{"id": 2, "name": "Mimi Parker"}])
+            return ""
+
+        music_env.monkeypatch.setattr(main, "ENABLE_DISCOGS", True)
+        music_env.monkeypatch.setattr(main.discogs, "explore_artist", fake_explore)
+        await main.extract_music_history()
+        assert explored == [("Low", main.discogs.BACKGROUND)]
+        assert [n["name"] for n in music_env.graph.neighbourhood({"Low": 1.0})] == ["Mimi Parker"]
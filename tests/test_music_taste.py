@@ -0,0 +1,132 @@
+"""Tests for src/content/music_taste.py — the TF-IDF taste similarity matrix."""
+
+import math
+import os
+from datetime import datetime
+
+import pytest
+
+from src.content import music_taste
+from src.content.music_taste import TasteMatrix, format_taste_matches, get_taste_matrix
+from src.persistence.music_store import MusicStore
+
+
+@pytest.fixture
+def store(temp_dir):
+    return MusicStore(os.path.join(temp_dir, "test.db"))
+
+
+_n = 0
+
+
+def post(store, user_id, artist, genres=(), styles=(), name=None, server_id="server1"):
+    global _n
+    _n += 1
+    store.save(
+        server_id=server_id, channel_id="chan1", url=f"https://youtu.be/{_n}",
+        video_title=f"{artist} - Track", video_channel="c",
+        posted_by_id=user_id, posted_by_name=name or f"User{user_id}",
+        posted_at=datetime.now(), artist=artist, track="Track",
+        genres=list(genres), styles=list(styles),
+    )
+
+
+def seed(store):
+    post(store, "a", "Low", ["Rock"], ["Slowcore"])
+    post(store, "a", "Duster", ["Rock"], ["Slowcore", "Space Rock"])
+    post(store, "b", "Low", ["Rock"], ["Slowcore"])
+    post(store, "b", "Codeine", ["Rock"], ["Slowcore"])
+    post(store, "c", "Pendulum", ["Electronic"], ["Drum n Bass"])
+    post(store, "d", "Aphex Twin", ["Electronic"], ["IDM"])
+
+
+class TestTasteMatrix:
+
+    def test_vectors_are_unit_length(self, store):
+        seed(store)
+        matrix = TasteMatrix(store, "server1")
+        matrix.refresh()
+        for vector in matrix.vectors.values():
+            assert math.isclose(math.sqrt(sum(w * w for w in vector.values())), 1.0)
+
+    def test_similar_users_rank_first(self, store):
+        seed(store)
+        matrix = TasteMatrix(store, "server1")
+        matrix.refresh()
+        nearest = matrix.nearest(matrix.vectors["a"], exclude={"a"})
+        assert nearest[0][0] == "b"
+        assert matrix.similarity("a", "b") > matrix.similarity("a", "c")
+        assert matrix.similarity("a", "c") == 0.0
+        assert math.isclose(matrix.similarity("a", "a"), 1.0)
+
+    def test_idf_downweights_common_features(self, store):
+        seed(store)
+        post(store, "c", "Pendulum", ["Rock"], [])
+        post(store, "d", "Aphex Twin", ["Rock"], [])
+        matrix = TasteMatrix(store, "server1")
+        matrix.refresh()
+        # everyone has Rock; a and b's Slowcore is rarer, so it weighs more
+        assert matrix.vectors["a"]["style:Slowcore"] > matrix.vectors["a"]["genre:Rock"]
+
+    def test_refresh_only_rereads_changed_users(self, store, monkeypatch):
+        seed(store)
+        matrix = TasteMatrix(store, "server1")
+        assert matrix.refresh() == 4
+        assert matrix.refresh() == 0  # nothing new
+
+        post(store, "c", "Low", ["Rock"], ["Slowcore"])
+        requested = []
+        original = store.profile_counts_many
+        monkeypatch.setattr(store, "profile_counts_many",
+                            lambda server_id, user_ids: requested.append(user_ids) or original(server_id, user_ids))
+        assert matrix.refresh() == 1
+        assert requested == [["c"]]
+        assert matrix.similarity("a", "c") > 0
+
+    def test_group_centroid_and_shared_features(self, store):
+        seed(store)
+        matrix = TasteMatrix(store, "server1")
+        matrix.refresh()
+        shared = matrix.shared_features(["a", "b"])
+        assert set(shared) == {"artist:Low", "genre:Rock", "style:Slowcore"}
+        centroid = matrix.centroid(["a", "b"])
+        assert math.isclose(math.sqrt(sum(w * w for w in centroid.values())), 1.0)
+        assert matrix.nearest(centroid, exclude={"a", "b"}) == []
+
+    def test_servers_are_separate(self, store):
+        seed(store)
+        post(store, "z", "Low", ["Rock"], ["Slowcore"], server_id="server2")
+        matrix = TasteMatrix(store, "server1")
+        matrix.refresh()
+        assert "z" not in matrix.vectors
+
+    def test_get_taste_matrix_is_cached(self, store):
+        seed(store)
+        music_taste._matrices.clear()
+        first = get_taste_matrix(store, "server1")
+        assert get_taste_matrix(store, "server1") is first
+
+
+class TestFormatTasteMatches:
+
+    def test_single_user_lists_matches_with_shared(self, store):
+        seed(store)
+        matrix = get_taste_matrix(store, "server1")
+        text = format_taste_matches(matrix, ["a"])
+        assert "Closest music taste to Usera" in text
+        assert "Userb" in text
+        assert "artist:Low" in text
+        assert "Userc" not in text  # nothing in common
+
+    def test_group_summary(self, store):
+        seed(store)
+        matrix = get_taste_matrix(store, "server1")
+        text = format_taste_matches(matrix, ["a", "b", "c"])
+        assert "Group taste for Usera, Userb, Userc" in text
+        assert "Pairwise:" in text
+        assert "Shared by everyone: nothing in common" in text
+
+    def test_unknown_user_reported(self, store):
+        seed(store)
+        matrix = get_taste_matrix(store, "server1")
+        assert "No music history for: ghost" in format_taste_matches(matrix, ["ghost"])
@@ -8,6 +8,7 @@ import pytest
 from src.content import news
 from src.content.news import (
     Bulletin,
+    FeedFetch,
     Item,
     clean_summary,
     dedupe,
@@ -220,8 +221,8 @@ class TestGetNewsBulletins:
             ],
         }
 
-        def fake_fetch(name, url, *, per_feed):
-            return canned.get(name, [])
+        def fake_fetch(name, url, *, per_feed, **validators):
+            return FeedFetch(items=canned.get(name, []))
 
         monkeypatch.setattr(news, "fetch_feed", fake_fetch)
         monkeypatch.setattr(news, "FEEDS", {"uk": "u", "technology": "t"})
@@ -241,14 +242,14 @@ class TestGetNewsBulletins:
         assert "Eurovision" not in user
 
     async def test_unknown_feed_name_logged_and_skipped(self, monkeypatch, caplog):
-        monkeypatch.setattr(news, "fetch_feed", lambda *a, **kw: [])
+        monkeypatch.setattr(news, "fetch_feed", lambda *a, **kw: FeedFetch(items=[]))
         monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
         chatbot = FakeChat([{"bulletins": []}])
         result = await get_news_bulletins(chatbot, feeds=["uk", "does_not_exist"])
         assert result == []
 
     async def test_no_survivors_skips_llm_call(self, monkeypatch):
-        monkeypatch.setattr(news, "fetch_feed", lambda *a, **kw: [_item(title="A war story")])
+        monkeypatch.setattr(news, "fetch_feed", lambda *a, **kw: FeedFetch(items=[_item(title="A war story")]))
         monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
         chatbot = FakeChat([])  # would error if called
         result = await get_news_bulletins(chatbot, feeds=["uk"])
@@ -267,9 +268,9 @@ class TestGetNewsBulletinsWithCache:
     async def test_cache_hit_skips_fetch_and_synthesis(self, monkeypatch, tmp_path):
         fetch_calls = {"count": 0}
 
-        def fake_fetch(name, url, *, per_feed):
+        def fake_fetch(name, url, *, per_feed, **validators):
             fetch_calls["count"] += 1
-            return [_item(title="Burnham byelection")]
+            return FeedFetch(items=[_item(title="Burnham byelection")])
 
         monkeypatch.setattr(news, "fetch_feed", fake_fetch)
         monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
@@ -292,9 +293,9 @@ class TestGetNewsBulletinsWithCache:
         no implicit caching."""
         fetch_calls = {"count": 0}
 
-        def fake_fetch(name, url, *, per_feed):
+        def fake_fetch(name, url, *, per_feed, **validators):
             fetch_calls["count"] += 1
-            return [_item(title="A")]
+            return FeedFetch(items=[_item(title="A")])
 
         monkeypatch.setattr(news, "fetch_feed", fake_fetch)
         monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
@@ -312,7 +313,7 @@ class TestGetNewsBulletinsWithCache:
     async def test_empty_bulletins_not_cached(self, monkeypatch, tmp_path):
         """A transient miss (no survivors, empty LLM reply) shouldn't poison
         the cache — otherwise we'd serve [] for the rest of the TTL window."""
-        monkeypatch.setattr(news, "fetch_feed", lambda *a, **kw: [])
+        monkeypatch.setattr(news, "fetch_feed", lambda *a, **kw: FeedFetch(items=[]))
         monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
 
         store = self._store(tmp_path)
@@ -323,11 +324,12 @@ class TestGetNewsBulletinsWithCache:
 
     async def test_stale_cache_triggers_fresh_fetch(self, monkeypatch, tmp_path):
         """A cache older than max_age_hours is treated as a miss; the function
-        re-fetches and re-saves."""
+        re-fetches and, since the headlines changed, re-synthesises and re-saves."""
         from datetime import datetime, timedelta
         import sqlite3
 
-        monkeypatch.setattr(news, "fetch_feed", lambda *a, **kw: [_item(title="Fresh")])
+        titles = iter(["Before", "Fresh"])
+        monkeypatch.setattr(news, "fetch_feed", lambda *a, **kw: FeedFetch(items=[_item(title=next(titles))]))
         monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
         store = self._store(tmp_path)
         chatbot = FakeChat([
@@ -345,6 +347,216 @@ class TestGetNewsBulletinsWithCache:
         assert second[0].heading == "fresh"
 
 
+class TestChangeAwareResynthesis:
+    """A refresh whose culled headline set matches (or nearly matches) the
+    one the cached bulletins came from extends the cache instead of paying
+    for another synthesis call."""
+
+    def _store(self, tmp_path):
+        from src.persistence.news_store import NewsStore
+        return NewsStore(str(tmp_path / "news.db"))
+
+    def test_fingerprint_ignores_order_case_and_summary(self):
+        a = news.fingerprint_items([_item(title="Alpha", summary="x"), _item(title="Beta")])
+        b = news.fingerprint_items([_item(title="beta"), _item(title="ALPHA", summary="reworded")])
+        assert a == b
+
+    def test_similarity(self):
+        a = news.fingerprint_items([_item(title=t) for t in "ABCD"])
+        b = news.fingerprint_items([_item(title=t) for t in "ABCE"])
+        assert news.fingerprint_similarity(a, a) == 1.0
+        assert news.fingerprint_similarity(a, b) == pytest.approx(3 / 5)
+        assert news.fingerprint_similarity([], []) == 1.0
+
+    async def _run_twice(self, monkeypatch, store, first_titles, second_titles, replies):
+        batches = iter([first_titles, second_titles])
+
+        def fake_fetch(name, url, *, per_feed, **validators):
+            return FeedFetch(items=[_item(title=t) for t in next(batches)])
+
+        monkeypatch.setattr(news, "fetch_feed", fake_fetch)
+        monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
+        chatbot = FakeChat(replies)
+        await get_news_bulletins(chatbot, news_store=store)
+        second = await get_news_bulletins(chatbot, news_store=store, max_age_hours=0)
+        return chatbot, second
+
+    async def test_unchanged_headlines_skip_synthesis_and_extend_cache(self, monkeypatch, tmp_path):
+        store = self._store(tmp_path)
+        titles = [f"Story {n}" for n in range(5)]
+        chatbot, second = await self._run_twice(monkeypatch, store, titles, titles, [
+            {"bulletins": [{"heading": "H", "body": "Original.", "sources": [1]}]},
+        ])
+        assert len(chatbot.calls) == 1
+        assert [b.body for b in second] == ["Original."]
+        assert store.get_cached_bulletins(max_age_hours=3) is not None
+
+    async def test_nearly_identical_headlines_skip_synthesis(self, monkeypatch, tmp_path):
+        store = self._store(tmp_path)
+        first = [f"Story {n}" for n in range(10)]
+        second_titles = first + ["One late addition"]  # 10/11 overlap
+        chatbot, _ = await self._run_twice(monkeypatch, store, first, second_titles, [
+            {"bulletins": [{"heading": "H", "body": "Original.", "sources": [1]}]},
+        ])
+        assert len(chatbot.calls) == 1
+
+    async def test_changed_headlines_resynthesise(self, monkeypatch, tmp_path):
+        store = self._store(tmp_path)
+        chatbot, second = await self._run_twice(
+            monkeypatch, store, ["Old A", "Old B"], ["New A", "New B"], [
+                {"bulletins": [{"heading": "H", "body": "Old.", "sources": [1]}]},
+                {"bulletins": [{"heading": "H", "body": "New.", "sources": [1]}]},
+            ],
+        )
+        assert len(chatbot.calls) == 2
+        assert [b.body for b in second] == ["New."]
+
+
+class TestGetNewsBulletinsSingleFlight:
+    async def test_concurrent_callers_share_one_fetch_and_synthesis(self, monkeypatch):
+        """A cold cache hit by several callers at once must fetch and
+        synthesise once, with every caller getting the same bulletins."""
+        import asyncio
+
+        fetch_calls = {"count": 0}
+
+        def fake_fetch(name, url, *, per_feed, **validators):
+            fetch_calls["count"] += 1
+            return FeedFetch(items=[_item(title="Burnham byelection")])
+
+        monkeypatch.setattr(news, "fetch_feed", fake_fetch)
+        monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
+        chatbot = FakeChat([
+            {"bulletins": [{"heading": "UK politics", "body": "Burnham moves.", "sources": [1]}]},
+        ])  # one reply only — a second synthesis would error
+
+        results = await asyncio.gather(*(get_news_bulletins(chatbot) for _ in range(3)))
+        assert [[b.heading for b in r] for r in results] == [["UK politics"]] * 3
+        assert fetch_calls["count"] == 1
+        assert len(chatbot.calls) == 1
+
+
+class TestConditionalFeedFetch:
+    """Fetch stage: feeds run concurrently off-loop, validators round-trip
+    through the NewsStore, and a 304 reuses the stored items."""
+
+    def _store(self, tmp_path):
+        from src.persistence.news_store import NewsStore
+        return NewsStore(str(tmp_path / "news.db"))
+
+    def test_fetch_feed_reports_304(self, monkeypatch):
+        def fake_parse(url, etag=None, modified=None):
+            assert etag == "abc"
+            return {"status": 304, "etag": "abc", "entries": []}
+
+        monkeypatch.setattr(news.feedparser, "parse", fake_parse)
+        result = news.fetch_feed("uk", "u", per_feed=10, etag="abc")
+        assert result.not_modified
+        assert result.items == []
+        assert result.etag == "abc"
+
+    def test_fetch_feed_raises_when_feedparser_reports_a_failure(self, monkeypatch):
+        def fake_parse(url, etag=None, modified=None):
+            return {"bozo": 1, "bozo_exception": OSError("network down"), "entries": []}
+
+        monkeypatch.setattr(news.feedparser, "parse", fake_parse)
+        with pytest.raises(OSError):
+            news.fetch_feed("uk", "u", per_feed=10)
+
+    def test_fetch_feed_keeps_entries_of_a_malformed_feed(self, monkeypatch):
+        def fake_parse(url, etag=None, modified=None):
+            return news.feedparser.FeedParserDict(
+                bozo=1, bozo_exception=ValueError("bad xml"), entries=[{"title": "Still here"}])
+
+        monkeypatch.setattr(news.feedparser, "parse", fake_parse)
+        assert [i.title for i in news.fetch_feed("uk", "u", per_feed=10).items] == ["Still here"]
+
+    async def test_bozo_fetch_falls_back_to_stored_items(self, monkeypatch, tmp_path):
+        store = self._store(tmp_path)
+        store.save_feed_state("uk", etag="v1", modified=None, items=[_item(title="Stored story")])
+        monkeypatch.setattr(news.feedparser, "parse",
+                            lambda url, etag=None, modified=None: {"bozo": 1, "status": 503, "entries": []})
+        monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
+        chatbot = FakeChat([{"bulletins": [{"heading": "H", "body": "B.", "sources": [1]}]}])
+
+        await get_news_bulletins(chatbot, news_store=store)
+        assert "Stored story" in chatbot.calls[0]["messages"][1]["content"]
+
+    def test_fetch_feed_returns_items_and_validators(self, monkeypatch):
+        parsed = news.feedparser.FeedParserDict(
+            status=200,
+            etag="v1",
+            modified="Mon, 19 Oct 2026 10:00:00 GMT",
+            entries=[{"title": " Waymo creek ", "summary": "Robotaxi", "tags": [{"term": "tech"}]}],
+        )
+        monkeypatch.setattr(news.feedparser, "parse", lambda url, etag=None, modified=None: parsed)
+        result = news.fetch_feed("technology", "t", per_feed=10)
+        assert not result.not_modified
+        assert [i.title for i in result.items] == ["Waymo creek"]
+        assert result.items[0].categories == ["tech"]
+        assert result.etag == "v1"
+        assert result.modified == "Mon, 19 Oct 2026 10:00:00 GMT"
+
+    async def test_validators_sent_and_304_reuses_stored_items(self, monkeypatch, tmp_path):
+        calls = []
+
+        def fake_fetch(name, url, *, per_feed, etag=None, modified=None):
+            calls.append((etag, modified))
+            if etag == "v1":
+                return FeedFetch(items=[], etag="v1", not_modified=True)
+            return FeedFetch(items=[_item(title="Burnham byelection")], etag="v1", modified="m1")
+
+        monkeypatch.setattr(news, "fetch_feed", fake_fetch)
+        monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
+        store = self._store(tmp_path)
+        chatbot = FakeChat([
+            {"bulletins": [{"heading": "UK politics", "body": "Burnham moves.", "sources": [1]}]},
+        ])
+
+        await get_news_bulletins(chatbot, news_store=store)
+        # max_age_hours=0 forces past the bulletin cache to the fetch stage.
+        second = await get_news_bulletins(chatbot, news_store=store, max_age_hours=0)
+
+        assert calls == [(None, None), ("v1", "m1")]
+        # The 304 reused the stored items, so the headline set is unchanged
+        # and the cached bulletins are served without another synthesis.
+        assert [b.body for b in second] == ["Burnham moves."]
+        assert len(chatbot.calls) == 1
+
+    async def test_failed_fetch_falls_back_to_stored_items(self, monkeypatch, tmp_path):
+        store = self._store(tmp_path)
+        store.save_feed_state("uk", etag="v1", modified=None, items=[_item(title="Stored story")])
+
+        def broken_fetch(*args, **kwargs):
+            raise OSError("network down")
+
+        monkeypatch.setattr(news, "fetch_feed", broken_fetch)
+        monkeypatch.setattr(news, "FEEDS", {"uk": "u"})
+        chatbot = FakeChat([{"bulletins": [{"heading": "H", "body": "B.", "sources": [1]}]}])
+
+        await get_news_bulletins(chatbot, news_store=store)
+        assert "Stored story" in chatbot.calls[0]["messages"][1]["content"]
+
+    async def test_feeds_fetched_concurrently(self, monkeypatch):
+        """Every feed must be in flight at once — a barrier sized to the feed
+        count only releases if no fetch waits on another."""
+        import threading
+
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_fetch(name, url, *, per_feed, **validators):
+            barrier.wait()
+            return FeedFetch(items=[_item(title=f"{name} story", feed=name)])
+
+        monkeypatch.setattr(news, "fetch_feed", fake_fetch)
+        monkeypatch.setattr(news, "FEEDS", {"uk": "u", "politics": "p", "technology": "t"})
+        chatbot = FakeChat([{"bulletins": []}])
+
+        await get_news_bulletins(chatbot)
+        user = chatbot.calls[0]["messages"][1]["content"]
+        assert "uk story" in user and "politics story" in user and "technology story" in user
+
+
 class TestFormatBulletinsForDiscord:
     def _b(self, heading: str, body: str) -> Bulletin:
         return Bulletin(heading=heading, body=body, sources=[])
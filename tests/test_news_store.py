@@ -122,3 +122,59 @@ class TestNewsStore:
                 )
 
 
+
+    def test_feed_state_round_trip(self, temp_dir):
+        store = NewsStore(os.path.join(temp_dir, "test.db"))
+        assert store.get_feed_state("uk") is None
+        items = [Item(feed="uk", title="A headline", summary="A summary", categories=["politics"])]
+        store.save_feed_state("uk", etag='"abc"', modified="Mon, 19 Oct 2026 10:00:00 GMT", items=items)
+        state = store.get_feed_state("uk")
+        assert state["etag"] == '"abc"'
+        assert state["modified"] == "Mon, 19 Oct 2026 10:00:00 GMT"
+        assert state["items"] == items
+
+    def test_feed_state_replaces_per_feed(self, temp_dir):
+        store = NewsStore(os.path.join(temp_dir, "test.db"))
+        store.save_feed_state("uk", etag="v1", modified=None, items=[])
+        store.save_feed_state("uk", etag="v2", modified=None, items=[])
+        store.save_feed_state("technology", etag="t1", modified=None, items=[])
+        assert store.get_feed_state("uk")["etag"] == "v2"
+        assert store.get_feed_state("technology")["etag"] == "t1"
+
+    def test_fingerprint_round_trip(self, temp_dir):
+        store = NewsStore(os.path.join(temp_dir, "test.db"))
+        assert store.get_fingerprinted_bulletins() is None
+        store.save_bulletins([_bulletin()], fingerprint=["aa", "bb"])
+        bulletins, fingerprint = store.get_fingerprinted_bulletins()
+        assert fingerprint == ["aa", "bb"]
+        assert bulletins[0].heading == "UK politics"
+
+    def test_no_fingerprint_means_no_match(self, temp_dir):
+        """Rows saved without a fingerprint (or before the column existed)
+        can't be matched against — the next refresh re-synthesises."""
+        store = NewsStore(os.path.join(temp_dir, "test.db"))
+        store.save_bulletins([_bulletin()])
+        assert store.get_fingerprinted_bulletins() is None
+
+    def test_extend_validity_restamps_stale_cache(self, temp_dir):
+        store = NewsStore(os.path.join(temp_dir, "test.db"))
+        store.save_bulletins([_bulletin()], fingerprint=["aa"])
+        old_time = (datetime.now() - timedelta(hours=5)).isoformat()
+        with sqlite3.connect(store.db_path) as conn:
+            conn.execute("UPDATE news_cache SET fetched_at = ? WHERE id = 1", (old_time,))
+            conn.commit()
+        assert store.get_cached_bulletins(max_age_hours=3) is None
+        store.extend_validity()
+        assert store.get_cached_bulletins(max_age_hours=3) is not None
+
+    def test_migration_adds_fingerprint_column(self, temp_dir):
+        db_path = os.path.join(temp_dir, "test.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                "CREATE TABLE news_cache (id INTEGER PRIMARY KEY CHECK (id = 1), "
+                "fetched_at TIMESTAMP NOT NULL, bulletins_json TEXT NOT NULL)"
+            )
+            conn.commit()
+        store = NewsStore(db_path)
+        store.save_bulletins([_bulletin()], fingerprint=["aa"])
+        assert store.get_fingerprinted_bulletins()[1] == ["aa"]
@@ -0,0 +1,133 @@
+"""Tests for src/platforms/outbound.py."""
+
+import asyncio
+
+import pytest
+
+from src.platforms.outbound import OutboundDispatcher, SCHEDULED
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__("429")
+        self.retry_after = retry_after
+
+
+class FakeChannel:
+    def __init__(self, channel_id="c1", fail_with=()):
+        self.id = channel_id
+        self.sent = []
+        self._fail_with = list(fail_with)
+
+    async def send(self, text, **kwargs):
+        if self._fail_with:
+            raise self._fail_with.pop(0)
+        self.sent.append(text)
+
+
+class FakeMessage:
+    def __init__(self, channel_id="c1"):
+        self.channel_id = channel_id
+        self.replies = []
+
+    async def reply(self, text, **kwargs):
+        self.replies.append(text)
+
+
+def dispatcher(clock, **kwargs):
+    return OutboundDispatcher(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class TestOutboundDispatcher:
+
+    async def test_send_waits_for_delivery(self):
+        clock = FakeClock()
+        channel = FakeChannel()
+        await dispatcher(clock).send(channel, "hello")
+        assert channel.sent == ["hello"]
+
+    async def test_paces_sends_to_bucket(self):
+        clock = FakeClock()
+        out = dispatcher(clock, capacity=2, per_seconds=2, coalesce_limit=1)
+        channel = FakeChannel()
+        await asyncio.gather(*(out.send(channel, f"m{i}") for i in range(4)))
+        assert channel.sent == ["m0", "m1", "m2", "m3"]
+        assert sum(clock.slept) == pytest.approx(2.0)
+
+    async def test_channels_have_separate_buckets(self):
+        clock = FakeClock()
+        out = dispatcher(clock, capacity=1, per_seconds=10)
+        a, b = FakeChannel("a"), FakeChannel("b")
+        await asyncio.gather(out.send(a, "x"), out.send(b, "y"))
+        assert (a.sent, b.sent, clock.slept) == (["x"], ["y"], [])
+
+    async def test_interactive_jumps_queue(self):
+        clock = FakeClock()
+        out = dispatcher(clock, capacity=1, per_seconds=1, coalesce_limit=1)
+        channel = FakeChannel()
+        message = FakeMessage()
+        order = []
+        channel.send = lambda text, **kw: _record(order, text)
+        message.reply = lambda text, **kw: _record(order, text)
+        await asyncio.gather(
+            out.send(channel, "scheduled 1"),
+            out.send(channel, "scheduled 2"),
+            out.reply(message, "reply"),
+        )
+        assert order == ["reply", "scheduled 1", "scheduled 2"]
+
+    async def test_coalesces_small_consecutive_sends(self):
+        clock = FakeClock()
+        out = dispatcher(clock, capacity=1, per_seconds=1)
+        channel = FakeChannel()
+        await asyncio.gather(*(out.send(channel, f"line {i}") for i in range(3)))
+        assert channel.sent == ["line 0\nline 1\nline 2"]
+        assert out.coalesced == 2
+
+    async def test_does_not_coalesce_past_limit_or_across_targets(self):
+        clock = FakeClock()
+        out = dispatcher(clock, capacity=1, per_seconds=1, coalesce_limit=10)
+        channel = FakeChannel()
+        message = FakeMessage()
+        await asyncio.gather(
+            out.send(channel, "first"),
+            out.send(channel, "12345678"),
+            out.send(channel, "abc"),
+            out.reply(message, "r", priority=SCHEDULED),
+        )
+        assert channel.sent == ["first", "12345678", "abc"]
+        assert message.replies == ["r"]
+
+    async def test_retries_after_rate_limit(self):
+        clock = FakeClock()
+        channel = FakeChannel(fail_with=[RateLimited(3.0)])
+        await dispatcher(clock).send(channel, "hello")
+        assert channel.sent == ["hello"]
+        assert clock.slept == [3.0]
+
+    async def test_other_errors_reach_caller(self):
+        clock = FakeClock()
+        out = dispatcher(clock)
+        channel = FakeChannel(fail_with=[ValueError("nope")])
+        with pytest.raises(ValueError):
+            await out.send(channel, "hello")
+        await out.send(channel, "again")
+        assert channel.sent == ["again"]
+
+
+async def _record(order, text):
+    order.append(text)
@@ -109,11 +109,42 @@ class TestDiscordPlatform:
         assert platform._bot.intents.members is True
         assert platform._bot.intents.message_content is True
 
+    def test_unsharded_by_default(self, monkeypatch):
+        import discord.ext.commands as commands
+        from src.platforms.discord_adapter import DiscordPlatform
+        for var in ("DISCORD_SHARD_COUNT", "DISCORD_SHARD_IDS", "DISCORD_AUTO_SHARD"):
+            monkeypatch.delenv(var, raising=False)
+        assert not isinstance(DiscordPlatform()._bot, commands.AutoShardedBot)
+
+    def test_shard_range(self, monkeypatch):
+        import discord.ext.commands as commands
+        from src.platforms.discord_adapter import DiscordPlatform
+        monkeypatch.setenv("DISCORD_SHARD_COUNT", "8")
+        monkeypatch.setenv("DISCORD_SHARD_IDS", "0-1,4")
+        bot = DiscordPlatform()._bot
+        assert isinstance(bot, commands.AutoShardedBot)
+        assert (bot.shard_count, bot.shard_ids) == (8, [0, 1, 4])
+
+    def test_shard_ids_need_count(self, monkeypatch):
+        from src.platforms.discord_adapter import DiscordPlatform
+        monkeypatch.delenv("DISCORD_SHARD_COUNT", raising=False)
+        monkeypatch.setenv("DISCORD_SHARD_IDS", "0")
+        with pytest.raises(ValueError):
+            DiscordPlatform()
+
     def test_get_channel_returns_none_for_unknown(self):
         from src.platforms.discord_adapter import DiscordPlatform
         platform = DiscordPlatform()
         assert platform.get_channel("999999") is None
 
+    def test_has_server_only_for_cached_guilds(self):
+        from src.platforms.discord_adapter import DiscordPlatform
+        platform = DiscordPlatform()
+        platform._bot.get_guild = lambda guild_id: object() if guild_id == 111 else None
+        assert platform.has_server("111") is True
+        assert platform.has_server("222") is False
+        assert platform.has_server("") is False
+
     def test_bot_escape_hatch(self):
         from src.platforms.discord_adapter import DiscordPlatform
         platform = DiscordPlatform()
@@ -151,6 +182,47 @@ class TestDiscordChannel:
         assert channel.bot_can_read_history() is True
 
 
+class TestDiscordChannelHistory:
+    def _channel_with_history(self, raw_messages):
+        from src.platforms.discord_adapter import DiscordChannel
+        mock_channel = MagicMock()
+        mock_channel.id = 456
+        mock_channel.name = "general"
+
+        def history(**kwargs):
+            mock_channel.history_kwargs = kwargs
+
+            async def gen():
+                for raw in raw_messages:
+                    yield raw
+            return gen()
+
+        mock_channel.history = history
+        return DiscordChannel(mock_channel, bot_member=None), mock_channel
+
+    def _raw(self, content):
+        raw = MagicMock()
+        raw.content = content
+        raw.author.id = 1
+        raw.reference = None
+        raw.guild = None
+        return raw
+
+    @pytest.mark.asyncio
+    async def test_iter_history_yields_wrapped_messages(self):
+        channel, mock_channel = self._channel_with_history([self._raw("a"), self._raw("b")])
+        contents = [m.content async for m in channel.iter_history(after="t", oldest_first=True)]
+        assert contents == ["a", "b"]
+        assert mock_channel.history_kwargs == {"limit": None, "after": "t", "before": None, "oldest_first": True}
+
+    @pytest.mark.asyncio
+    async def test_history_collects_iter_history(self):
+        channel, mock_channel = self._channel_with_history([self._raw("a")])
+        messages = await channel.history(limit=5)
+        assert [m.content for m in messages] == ["a"]
+        assert mock_channel.history_kwargs["limit"] == 5
+
+
 class TestWrapMessage:
     def test_wraps_discord_message(self):
         from src.platforms.discord_adapter import _wrap_message
@@ -248,56 +320,62 @@ class TestBotGuardWithChatMessage:
     def test_blocks_dms(self):
         guard = BotGuard()
         msg = _make_message(server_id="")
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is True
         assert abusive is False
 
+    def test_allows_any_served_server(self):
+        guard = BotGuard()
+        msg = _make_message(server_id="SERVER2")
+        blocked, _ = guard.should_block(msg, BOT_ID, {SERVER_ID, "SERVER2"})
+        assert blocked is False
+
     def test_blocks_wrong_server(self):
         guard = BotGuard()
         msg = _make_message(server_id="OTHER_SERVER")
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is True
         assert abusive is False
 
     def test_blocks_bot_itself(self):
         guard = BotGuard()
         msg = _make_message(author_id=BOT_ID)
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is True
         assert abusive is False
 
     def test_blocks_other_bots(self):
         guard = BotGuard()
         msg = _make_message(author_is_bot=True)
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is True
         assert abusive is False
 
     def test_blocks_no_mention(self):
         guard = BotGuard()
         msg = _make_message(content="hello there, no mention here")
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is True
         assert abusive is False
 
     def test_blocks_mention_only_no_content(self):
         guard = BotGuard()
         msg = _make_message(content="<@BOT123>")
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is True
         assert abusive is True
 
     def test_blocks_non_alpha_content(self):
         guard = BotGuard()
         msg = _make_message(content="<@BOT123> 12345 !!! ???")
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is True
         assert abusive is True
 
     def test_allows_valid_mention(self):
         guard = BotGuard()
         msg = _make_message(content="<@BOT123> what is the weather?")
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is False
         assert abusive is False
 
@@ -305,11 +383,11 @@ class TestBotGuardWithChatMessage:
         guard = BotGuard(max_mentions=3, mention_window=timedelta(hours=1))
         for _ in range(3):
             msg = _make_message()
-            guard.should_block(msg, BOT_ID, SERVER_ID)
+            guard.should_block(msg, BOT_ID, {SERVER_ID})
 
         # 4th mention should be blocked
         msg = _make_message()
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is True
         assert abusive is True
 
@@ -320,7 +398,7 @@ class TestBotGuardWithChatMessage:
         the guard fell back to a content substring check."""
         guard = BotGuard()
         msg = _make_message(content="are you sure?", reply_to_author_id=BOT_ID)
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is False
         assert abusive is False
 
@@ -329,21 +407,21 @@ class TestBotGuardWithChatMessage:
         # and answered them with abuse.
         guard = BotGuard()
         msg = _make_message(content="why?", reply_to_author_id=BOT_ID)
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is False
         assert abusive is False
 
     def test_blocks_reply_to_someone_else_without_mention(self):
         guard = BotGuard()
         msg = _make_message(content="are you sure?", reply_to_author_id="USER999")
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is True
         assert abusive is False
 
     def test_blocks_emoji_only_reply_to_bot(self):
         guard = BotGuard()
         msg = _make_message(content="🤔", reply_to_author_id=BOT_ID)
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID})
         assert blocked is True
         assert abusive is True
 
@@ -353,7 +431,7 @@ class TestBotGuardWithChatMessage:
         chatbot.omnilistens = True
         chatbot.name = "Gepetto"
         msg = _make_message(content="hey gepetto what's up?")
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID, chatbot)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID}, chatbot)
         assert blocked is True
         assert abusive is False
 
@@ -363,6 +441,6 @@ class TestBotGuardWithChatMessage:
         chatbot.omnilistens = True
         chatbot.name = "Gepetto"
         msg = _make_message(content="<@BOT123> hello there friend")
-        blocked, abusive = guard.should_block(msg, BOT_ID, SERVER_ID, chatbot)
+        blocked, abusive = guard.should_block(msg, BOT_ID, {SERVER_ID}, chatbot)
         assert blocked is False
         assert abusive is False
@@ -0,0 +1,37 @@
+"""Tests for RateLimitStore."""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.persistence.rate_limit_store import RateLimitStore
+
+NOON = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store(temp_dir):
+    return RateLimitStore(os.path.join(temp_dir, 'test.db'))
+
+
+class TestRateLimitStore:
+
+    def test_load_returns_a_scopes_hits_since_oldest_first(self, store):
+        store.record("user", "b", NOON + timedelta(minutes=5))
+        store.record("user", "a", NOON)
+        store.record("user", "a", NOON - timedelta(hours=2))
+        store.record("channel", "c", NOON)
+        assert store.load("user", NOON - timedelta(hours=1)) == [
+            ("a", NOON), ("b", NOON + timedelta(minutes=5))]
+
+    def test_times_round_trip_as_utc(self, store):
+        bst = timezone(timedelta(hours=1))
+        store.record("user", "a", datetime(2024, 5, 1, 13, 0, tzinfo=bst))
+        assert store.load("user", NOON - timedelta(minutes=1)) == [("a", NOON)]
+
+    def test_prune(self, store):
+        store.record("user", "a", NOON - timedelta(hours=2))
+        store.record("user", "a", NOON)
+        assert store.prune(NOON - timedelta(hours=1)) == 1
+        assert len(store.load("user", NOON - timedelta(days=1))) == 1
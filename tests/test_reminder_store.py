@@ -242,3 +242,25 @@ class TestReminderStore:
         due = store.get_due_reminders('server1')
         assert due[0].created_by == 'Gepetto'
 
+
+    def test_get_pending_is_soonest_first_and_unsent_only(self, temp_dir):
+        """get_pending() should list a server's unsent reminders by remind_at, optionally per bot."""
+        store = ReminderStore(os.path.join(temp_dir, 'test.db'))
+        now = datetime.now()
+        later = store.save('server1', 'user1', 'User1', 'ch1', 'Later', now + timedelta(hours=2), created_by='Gepetto')
+        sooner = store.save('server1', 'user2', 'User2', 'ch1', 'Sooner', now + timedelta(hours=1), created_by='Gepetto')
+        sent = store.save('server1', 'user1', 'User1', 'ch1', 'Sent', now - timedelta(hours=1), created_by='Gepetto')
+        store.save('server1', 'user1', 'User1', 'ch1', 'Other bot', now, created_by='Other')
+        store.save('server2', 'user1', 'User1', 'ch2', 'Other server', now, created_by='Gepetto')
+        store.mark_reminded(sent)
+
+        assert [r.id for r in store.get_pending('server1', bot_name='Gepetto')] == [sooner, later]
+        assert len(store.get_pending('server1')) == 3
+
+    def test_get_by_id(self, temp_dir):
+        """get() should return one reminder, or None once deleted."""
+        store = ReminderStore(os.path.join(temp_dir, 'test.db'))
+        reminder_id = store.save('server1', 'user1', 'User1', 'ch1', 'Test', datetime.now())
+        assert store.get(reminder_id).reminder_text == 'Test'
+        store.delete_reminder(reminder_id, 'user1')
+        assert store.get(reminder_id) is None
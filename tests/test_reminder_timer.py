@@ -0,0 +1,137 @@
+"""Tests for src/tasks/reminders.py."""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.persistence.job_queue_store import JobQueueStore
+from src.persistence.reminder_store import ReminderStore
+from src.platforms.workers import OutboxRelay, QueuedOutbound
+from src.tasks.reminders import ReminderTimer
+
+
+@pytest.fixture
+def store(temp_dir):
+    return ReminderStore(os.path.join(temp_dir, 'test.db'))
+
+
+class Deliveries:
+    """Records each delivery (with when it happened) and marks the reminder sent."""
+
+    def __init__(self, store, fail_times=0):
+        self.store = store
+        self.delivered = []
+        self.fail_times = fail_times
+        self.arrived = asyncio.Event()
+
+    async def __call__(self, reminder):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("send failed")
+        self.delivered.append((reminder.reminder_text, datetime.now()))
+        self.store.mark_reminded(reminder.id)
+        self.arrived.set()
+
+
+def save(store, text, remind_at, server_id='server1'):
+    return store.save(server_id, 'user1', 'User1', 'ch1', text, remind_at, created_by='Gepetto')
+
+
+class TestReminderTimer:
+
+    async def test_load_fires_due_and_upcoming_in_order(self, store):
+        now = datetime.now()
+        save(store, 'second', now + timedelta(milliseconds=80))
+        save(store, 'overdue', now - timedelta(minutes=3))
+        save(store, 'elsewhere', now, server_id='server2')
+        deliveries = Deliveries(store)
+        timer = ReminderTimer(store, deliveries, bot_name='Gepetto')
+        assert timer.load(['server1']) == 2
+        timer.start()
+        await asyncio.sleep(0.3)
+        await timer.stop()
+        assert [text for text, _ in deliveries.delivered] == ['overdue', 'second']
+        fired_at = deliveries.delivered[1][1]
+        assert now + timedelta(milliseconds=80) <= fired_at < now + timedelta(milliseconds=250)
+
+    async def test_add_wakes_timer_for_sooner_reminder(self, store):
+        deliveries = Deliveries(store)
+        timer = ReminderTimer(store, deliveries)
+        save(store, 'tomorrow', datetime.now() + timedelta(days=1))
+        timer.load(['server1'])
+        timer.start()
+        await asyncio.sleep(0.01)
+        remind_at = datetime.now() + timedelta(milliseconds=50)
+        timer.add(save(store, 'soon', remind_at), remind_at)
+        await asyncio.wait_for(deliveries.arrived.wait(), timeout=1)
+        await timer.stop()
+        assert [text for text, _ in deliveries.delivered] == ['soon']
+        assert len(timer) == 1
+
+    async def test_add_before_load_is_ignored(self, store):
+        timer = ReminderTimer(store, Deliveries(store))
+        timer.add(1, datetime.now())
+        assert len(timer) == 0
+
+    async def test_deleted_and_discarded_reminders_are_skipped(self, store):
+        now = datetime.now()
+        deleted = save(store, 'deleted', now)
+        discarded = save(store, 'discarded', now)
+        save(store, 'kept', now)
+        deliveries = Deliveries(store)
+        timer = ReminderTimer(store, deliveries)
+        timer.load(['server1'])
+        store.delete_reminder(deleted, 'user1')
+        timer.discard(discarded)
+        timer.start()
+        await asyncio.wait_for(deliveries.arrived.wait(), timeout=1)
+        await timer.stop()
+        assert [text for text, _ in deliveries.delivered] == ['kept']
+
+    async def test_failed_delivery_is_retried_later(self, store):
+        now = datetime.now()
+        save(store, 'flaky', now)
+        timer = ReminderTimer(store, Deliveries(store, fail_times=1), clock=lambda: now)
+        timer.load(['server1'])
+        timer.start()
+        await asyncio.sleep(0.05)
+        await timer.stop()
+        assert timer.next_due() == now + timedelta(minutes=5)
+
+
+class TestSetReminder:
+
+    def _message(self):
+        return type("Msg", (), {"server_id": "server1", "author_id": "user1", "author_name": "User1",
+                                "channel_id": "ch1"})()
+
+    def test_process_set_reminder_adds_to_timer(self, store, monkeypatch):
+        import main
+        timer = ReminderTimer(store, Deliveries(store))
+        timer.load(['server1'])
+        monkeypatch.setattr(main, "reminder_store", store)
+        monkeypatch.setattr(main, "reminder_timer", timer)
+        remind_at = (datetime.now() + timedelta(hours=1)).replace(microsecond=0)
+        result = main.process_set_reminder(self._message(), "Check the deploy", remind_at.isoformat())
+        assert result.startswith("Reminder saved.")
+        assert timer.next_due() == remind_at
+
+    async def test_reminder_set_in_a_worker_reaches_the_gateway_timer(self, store, temp_dir, monkeypatch):
+        import main
+        job_queue = JobQueueStore(os.path.join(temp_dir, 'test.db'))
+        timer = ReminderTimer(store, Deliveries(store))
+        timer.load(['server1'])
+        monkeypatch.setattr(main, "reminder_store", store)
+        monkeypatch.setattr(main, "reminder_timer", timer)
+        monkeypatch.setattr(main, "BOT_ROLE", "worker")
+        monkeypatch.setattr(main, "outbound", QueuedOutbound(job_queue, "gepetto"))
+        remind_at = (datetime.now() + timedelta(hours=1)).replace(microsecond=0)
+        main.process_set_reminder(self._message(), "Check the deploy", remind_at.isoformat())
+        assert timer.next_due() is None
+
+        relay = OutboxRelay(job_queue, None, None, "gepetto", events={"reminder_added": main.reminder_added})
+        assert relay.step() is True
+        await relay.join()
+        assert timer.next_due() == remind_at
@@ -0,0 +1,56 @@
+"""Tests for ScheduleStore."""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.persistence.schedule_store import ScheduleStore
+
+NOON = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+LEASE = timedelta(hours=1)
+
+
+@pytest.fixture
+def store(temp_dir):
+    return ScheduleStore(os.path.join(temp_dir, 'test.db'))
+
+
+class TestScheduleStore:
+
+    def test_get_unknown(self, store):
+        assert store.get("nope") is None
+
+    def test_times_round_trip_as_utc(self, store):
+        bst = timezone(timedelta(hours=1))
+        store.set_next_run("job", datetime(2024, 5, 1, 19, 0, tzinfo=bst))
+        assert store.get("job").next_run_at == datetime(2024, 5, 1, 18, 0, tzinfo=timezone.utc)
+
+    def test_try_start_only_when_due(self, store):
+        store.set_next_run("job", NOON)
+        assert store.try_start("job", "a", NOON - timedelta(seconds=1), LEASE) is False
+        assert store.try_start("job", "a", NOON, LEASE) is True
+
+    def test_lease_blocks_others_until_it_expires(self, store):
+        store.set_next_run("job", NOON)
+        assert store.try_start("job", "a", NOON, LEASE) is True
+        assert store.try_start("job", "b", NOON + timedelta(minutes=30), LEASE) is False
+        assert store.try_start("job", "b", NOON + timedelta(minutes=61), LEASE) is True
+
+    def test_finish_records_run_and_releases(self, store):
+        store.set_next_run("job", NOON)
+        store.try_start("job", "a", NOON, LEASE)
+        store.finish("job", NOON, 12.5, NOON + timedelta(days=1), error="RuntimeError('x')")
+        state = store.get("job")
+        assert (state.next_run_at, state.last_duration_s, state.last_error, state.run_count) == (
+            NOON + timedelta(days=1), 12.5, "RuntimeError('x')", 1)
+        [run] = store.recent_runs("job")
+        assert (run.started_at, run.duration_s) == (NOON, 12.5)
+        assert store.try_start("job", "b", NOON + timedelta(days=1), LEASE) is True
+
+    def test_prune_runs(self, store):
+        store.set_next_run("job", NOON)
+        store.finish("job", NOON - timedelta(days=40), 1.0, NOON)
+        store.finish("job", NOON, 1.0, NOON)
+        assert store.prune_runs(NOON - timedelta(days=30)) == 1
+        assert len(store.recent_runs("job")) == 1
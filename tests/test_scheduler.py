@@ -0,0 +1,198 @@
+"""Tests for src/platforms/scheduler.py."""
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytz
+
+from src.persistence.schedule_store import ScheduleStore
+from src.platforms.scheduler import Scheduler, next_daily_run
+
+UTC = timezone.utc
+
+
+class FakeTime:
+    """A clock plus a sleep that advances it, parking sleepers past `until`."""
+
+    def __init__(self, now: datetime, until: datetime):
+        self.now = now
+        self.until = until
+        self._resumed = asyncio.Event()
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        while self.now + timedelta(seconds=seconds) > self.until:
+            await self._resumed.wait()
+        self.now += timedelta(seconds=seconds)
+        await asyncio.sleep(0)
+
+    def resume(self, until: datetime):
+        """Let parked sleepers carry on up to a later time."""
+        self.until = until
+        resumed, self._resumed = self._resumed, asyncio.Event()
+        resumed.set()
+
+
+async def settle():
+    for _ in range(50):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def store(temp_dir):
+    return ScheduleStore(os.path.join(temp_dir, 'test.db'))
+
+
+def make_scheduler(store, fake, **kwargs):
+    return Scheduler(store, jitter_minutes=10, catch_up_hours=6, clock=fake, sleep=fake.sleep,
+                     rand=lambda: 0.5, **kwargs)
+
+
+def recorder(fake, runs, name="job"):
+    async def callback():
+        runs.append((name, fake.now))
+    return callback
+
+
+class TestNextDailyRun:
+
+    def test_later_today_or_tomorrow(self):
+        now = datetime(2024, 5, 1, 12, 0, tzinfo=UTC)
+        assert next_daily_run(now, 18) == datetime(2024, 5, 1, 18, 0, tzinfo=UTC)
+        assert next_daily_run(now, 3) == datetime(2024, 5, 2, 3, 0, tzinfo=UTC)
+        assert next_daily_run(now, 12) == datetime(2024, 5, 2, 12, 0, tzinfo=UTC)
+
+    def test_pytz_across_clock_change(self):
+        london = pytz.timezone('Europe/London')
+        now = datetime(2024, 3, 30, 19, 0, tzinfo=UTC)
+        assert next_daily_run(now, 18, tz=london) == datetime(2024, 3, 31, 17, 0, tzinfo=UTC)
+
+
+class TestScheduler:
+
+    async def test_daily_job_runs_with_jitter_and_records_duration(self, store):
+        fake = FakeTime(datetime(2024, 5, 1, 12, 0, tzinfo=UTC), until=datetime(2024, 5, 1, 20, 0, tzinfo=UTC))
+        runs = []
+        scheduler = make_scheduler(store, fake)
+        scheduler.add_daily("chat_image", recorder(fake, runs), hour=18)
+        scheduler.start()
+        await settle()
+        assert runs == [("job", datetime(2024, 5, 1, 18, 5, tzinfo=UTC))]
+        state = store.get("chat_image")
+        assert state.next_run_at == datetime(2024, 5, 2, 18, 5, tzinfo=UTC)
+        assert state.run_count == 1
+        assert store.recent_runs("chat_image")[0].duration_s == 0.0
+        await scheduler.stop()
+
+    async def test_catches_up_recently_missed_run(self, store):
+        store.set_next_run("chat_image", datetime(2024, 5, 1, 18, 0, tzinfo=UTC))
+        fake = FakeTime(datetime(2024, 5, 1, 18, 5, tzinfo=UTC), until=datetime(2024, 5, 1, 20, 0, tzinfo=UTC))
+        runs = []
+        scheduler = make_scheduler(store, fake)
+        scheduler.add_daily("chat_image", recorder(fake, runs), hour=18)
+        scheduler.start()
+        await settle()
+        assert [when for _, when in runs] == [datetime(2024, 5, 1, 18, 5, tzinfo=UTC)]
+        await scheduler.stop()
+
+    async def test_skips_run_missed_long_ago(self, store):
+        store.set_next_run("chat_image", datetime(2024, 5, 1, 18, 0, tzinfo=UTC))
+        fake = FakeTime(datetime(2024, 5, 2, 9, 0, tzinfo=UTC), until=datetime(2024, 5, 2, 12, 0, tzinfo=UTC))
+        runs = []
+        scheduler = make_scheduler(store, fake)
+        scheduler.add_daily("chat_image", recorder(fake, runs), hour=18)
+        scheduler.start()
+        await settle()
+        assert runs == []
+        assert store.get("chat_image").next_run_at == datetime(2024, 5, 2, 18, 5, tzinfo=UTC)
+        await scheduler.stop()
+
+    async def test_interval_job_runs_at_once_then_every_interval(self, store):
+        fake = FakeTime(datetime(2024, 5, 1, 12, 0, tzinfo=UTC), until=datetime(2024, 5, 1, 12, 25, tzinfo=UTC))
+        runs = []
+        scheduler = make_scheduler(store, fake)
+        scheduler.add_interval("reminders", recorder(fake, runs), minutes=10)
+        scheduler.start()
+        await settle()
+        assert [when.minute for _, when in runs] == [0, 10, 20]
+        await scheduler.stop()
+
+    async def test_restart_waits_for_stored_next_run(self, store):
+        store.set_next_run("reminders", datetime(2024, 5, 1, 12, 7, tzinfo=UTC))
+        fake = FakeTime(datetime(2024, 5, 1, 12, 0, tzinfo=UTC), until=datetime(2024, 5, 1, 12, 10, tzinfo=UTC))
+        runs = []
+        scheduler = make_scheduler(store, fake)
+        scheduler.add_interval("reminders", recorder(fake, runs), minutes=10)
+        scheduler.start()
+        await settle()
+        assert [when.minute for _, when in runs] == [7]
+        await scheduler.stop()
+
+    async def test_failures_are_recorded(self, store):
+        async def boom():
+            raise RuntimeError("nope")
+
+        fake = FakeTime(datetime(2024, 5, 1, 12, 0, tzinfo=UTC), until=datetime(2024, 5, 1, 12, 5, tzinfo=UTC))
+        scheduler = make_scheduler(store, fake)
+        scheduler.add_interval("horror", boom, minutes=60)
+        scheduler.start()
+        await settle()
+        assert "nope" in store.get("horror").last_error
+        await scheduler.stop()
+
+    async def test_processes_sharing_a_store_run_a_job_once(self, store):
+        fake = FakeTime(datetime(2024, 5, 1, 12, 0, tzinfo=UTC), until=datetime(2024, 5, 1, 12, 30, tzinfo=UTC))
+        release = asyncio.Event()
+        runs = []
+
+        async def slow():
+            runs.append(fake.now)
+            await release.wait()
+
+        first = make_scheduler(store, fake)
+        second = make_scheduler(store, fake)
+        first.add_interval("digests", slow, minutes=60)
+        second.add_interval("digests", slow, minutes=60)
+        first.start()
+        await settle()
+        second.start()
+        await settle()
+        release.set()
+        await settle()
+        assert len(runs) == 1
+        await first.stop()
+        await second.stop()
+
+    async def test_bots_sharing_a_store_each_run_their_own_job(self, store):
+        fake = FakeTime(datetime(2024, 5, 1, 12, 0, tzinfo=UTC), until=datetime(2024, 5, 1, 12, 5, tzinfo=UTC))
+        runs = []
+        gepetto = make_scheduler(store, fake, namespace="gepetto")
+        minxie = make_scheduler(store, fake, namespace="minxie")
+        gepetto.add_interval("horror:1", recorder(fake, runs, "gepetto"), minutes=60)
+        minxie.add_interval("horror:1", recorder(fake, runs, "minxie"), minutes=60)
+        gepetto.start()
+        minxie.start()
+        await settle()
+        assert sorted(name for name, _ in runs) == ["gepetto", "minxie"]
+        assert store.get("gepetto:horror:1").run_count == 1
+        assert store.get("minxie:horror:1").run_count == 1
+        await gepetto.stop()
+        await minxie.stop()
+
+    async def test_registering_again_replaces_callback_without_a_second_loop(self):
+        fake = FakeTime(datetime(2024, 5, 1, 12, 0, tzinfo=UTC), until=datetime(2024, 5, 1, 12, 15, tzinfo=UTC))
+        runs = []
+        scheduler = make_scheduler(None, fake)
+        scheduler.add_interval("horror", recorder(fake, runs, "old"), minutes=10)
+        scheduler.start()
+        await settle()
+        scheduler.add_interval("horror", recorder(fake, runs, "new"), minutes=10)
+        scheduler.start()
+        fake.resume(datetime(2024, 5, 1, 12, 25, tzinfo=UTC))
+        await settle()
+        assert [name for name, _ in runs] == ["old", "old", "new"]
+        await scheduler.stop()
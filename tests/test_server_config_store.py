@@ -0,0 +1,147 @@
+"""Tests for ServerConfigStore and main.py's per-server config helpers."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.persistence.server_config_store import ServerConfigStore, ServerConfig
+
+
+@pytest.fixture
+def store(temp_dir):
+    return ServerConfigStore(os.path.join(temp_dir, 'test.db'))
+
+
+class TestServerConfig:
+
+    def test_from_env_parses_channel_lists(self):
+        config = ServerConfig.from_env("s1", " 10 ", '"1, 2,"', "")
+        assert config == ServerConfig("s1", "10", ["1", "2"], [], True)
+
+
+class TestServerConfigStore:
+
+    def test_save_and_get(self, store):
+        store.save(ServerConfig("s1", "10", ["1", "2"], ["3"]))
+        assert store.get("s1") == ServerConfig("s1", "10", ["1", "2"], ["3"], True)
+        assert store.get("missing") is None
+
+    def test_save_replaces(self, store):
+        store.save(ServerConfig("s1", "10"))
+        store.save(ServerConfig("s1", "11", enabled=False))
+        assert store.get("s1") == ServerConfig("s1", "11", [], [], False)
+
+    def test_get_all_skips_disabled(self, store):
+        store.save(ServerConfig("s2", "20"))
+        store.save(ServerConfig("s1", "10"))
+        store.save(ServerConfig("s3", "30", enabled=False))
+        assert [c.server_id for c in store.get_all()] == ["s1", "s2"]
+        assert [c.server_id for c in store.get_all(include_disabled=True)] == ["s1", "s2", "s3"]
+
+    def test_delete(self, store):
+        store.save(ServerConfig("s1", "10"))
+        assert store.delete("s1") is True
+        assert store.delete("s1") is False
+
+
+class TestServerFanOut:
+
+    @pytest.fixture
+    def servers(self, store, monkeypatch):
+        import main
+        monkeypatch.setattr(main, "server_config_store", store)
+        monkeypatch.setattr(main, "db_server_configs", {})  # restored after refresh_server_configs() replaces it
+        monkeypatch.setattr(main, "server_id", "home")
+        monkeypatch.setattr(main, "URL_HISTORY_CHANNELS", "")
+        monkeypatch.setattr(main, "MUSIC_HISTORY_CHANNELS", "m1")
+        monkeypatch.setenv("DISCORD_BOT_CHANNEL_ID", "100")
+        monkeypatch.setattr(main, "platform", MagicMock(has_server=lambda guild_id: True))
+        store.save(ServerConfig("other", "200"))
+        store.save(ServerConfig("off", "300", enabled=False))
+        main.refresh_server_configs()
+        return main
+
+    def test_env_server_and_db_servers_are_served(self, servers):
+        assert servers.served_server_ids() == {"home", "other"}
+        assert servers.server_config("home") == ServerConfig("home", "100", [], ["m1"], True)
+        assert servers.server_config("off") is None
+        assert servers.server_config("") is None
+
+    def test_db_row_overrides_env_server(self, servers, store):
+        store.save(ServerConfig("home", "999", enabled=False))
+        servers.refresh_server_configs()
+        assert servers.served_server_ids() == {"other"}
+
+    def _schedule(self, servers):
+        jobs = {}
+
+        def schedule(name, callback, **timing):
+            jobs[name] = (callback, timing)
+
+        return jobs, schedule
+
+    async def test_per_server_jobs_are_scheduled_separately(self, servers):
+        jobs, schedule = self._schedule(servers)
+        seen = []
+
+        async def make_chat_image(config):
+            seen.append(config.server_id)
+
+        servers.schedule_per_server(schedule, "chat_image", make_chat_image, hour=18)
+        assert sorted(jobs) == ["chat_image:home", "chat_image:other"]
+        assert jobs["chat_image:other"][1] == {"hour": 18}
+        await jobs["chat_image:other"][0]()
+        assert seen == ["other"]
+
+    async def test_jobs_skip_servers_on_other_shards(self, servers, monkeypatch):
+        monkeypatch.setattr(servers, "platform", MagicMock(has_server=lambda guild_id: guild_id == "other"))
+        jobs, schedule = self._schedule(servers)
+
+        async def job(config):
+            pass
+
+        servers.schedule_per_server(schedule, "horror", job, minutes=60)
+        assert list(jobs) == ["horror:other"]
+        assert servers.local_server_ids() == {"other"}
+        assert servers.served_server_ids() == {"home", "other"}
+
+    async def test_job_for_a_server_no_longer_served_does_nothing(self, servers, store):
+        jobs, schedule = self._schedule(servers)
+        seen = []
+
+        async def job(config):
+            seen.append(config.server_id)
+
+        servers.schedule_per_server(schedule, "horror", job, minutes=60)
+        store.save(ServerConfig("other", "200", enabled=False))
+        servers.refresh_server_configs()
+        await jobs["horror:other"][0]()
+        assert seen == []
+
+    async def test_servers_run_one_at_a_time(self, servers):
+        jobs, schedule = self._schedule(servers)
+        running = []
+        peak = []
+
+        async def job(config):
+            running.append(config.server_id)
+            peak.append(len(running))
+            await asyncio.sleep(0)
+            running.remove(config.server_id)
+
+        servers.schedule_per_server(schedule, "memories", job, hour=3)
+        await asyncio.gather(*(callback() for callback, _ in jobs.values()))
+        assert peak == [1, 1]
+
+    def test_process_jobs_are_named_per_shard_process(self, servers, monkeypatch):
+        assert servers.process_job("inbound_metrics") == "inbound_metrics"
+        monkeypatch.setenv("DISCORD_SHARD_IDS", "2-3")
+        assert servers.process_job("inbound_metrics") == "inbound_metrics:shards 2-3"
+
+    async def test_birthdays_only_run_where_the_home_server_is(self, servers, monkeypatch):
+        monkeypatch.setattr(servers, "platform", MagicMock(has_server=lambda guild_id: guild_id == "other"))
+        monkeypatch.setattr(servers.birthdays, "get_birthday_message", AsyncMock())
+        await servers.say_happy_birthday()
+        servers.birthdays.get_birthday_message.assert_not_called()
@@ -0,0 +1,119 @@
+"""Tests for src/utils/singleflight.py — coalescing concurrent identical calls."""
+
+import asyncio
+
+import pytest
+
+from src.utils.singleflight import SingleFlight, single_flight
+
+
+class TestSingleFlight:
+    async def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+        release = asyncio.Event()
+
+        async def work(x):
+            calls.append(x)
+            await release.wait()
+            return x * 2
+
+        tasks = [asyncio.create_task(flight.do("k", work, 21)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flight.in_flight("k")
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert results == [42] * 5
+        assert calls == [21]
+
+    async def test_different_keys_run_independently(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work(x):
+            calls.append(x)
+            await asyncio.sleep(0)
+            return x
+
+        results = await asyncio.gather(flight.do("a", work, 1), flight.do("b", work, 2))
+        assert results == [1, 2]
+        assert sorted(calls) == [1, 2]
+
+    async def test_key_released_after_completion(self):
+        """Nothing is cached — a later call for the same key runs again."""
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            return len(calls)
+
+        assert await flight.do("k", work) == 1
+        await asyncio.sleep(0)  # let the done-callback release the key
+        assert not flight.in_flight("k")
+        assert await flight.do("k", work) == 2
+
+    async def test_exception_shared_with_all_waiters(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def boom():
+            await release.wait()
+            raise ValueError("nope")
+
+        tasks = [asyncio.create_task(flight.do("k", boom)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+
+class TestSingleFlightDecorator:
+    async def test_custom_key_coalesces_equivalent_calls(self):
+        calls = []
+        release = asyncio.Event()
+
+        @single_flight(key=lambda q: q.strip().lower())
+        async def lookup(q):
+            calls.append(q)
+            await release.wait()
+            return q.upper()
+
+        tasks = [asyncio.create_task(lookup(q)) for q in ("Low", " low", "LOW ")]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert calls == ["Low"]
+        assert results == ["LOW"] * 3
+
+    async def test_default_key_uses_arguments(self):
+        calls = []
+
+        @single_flight()
+        async def lookup(a, b=0):
+            calls.append((a, b))
+            await asyncio.sleep(0)
+            return a + b
+
+        results = await asyncio.gather(lookup(1, b=2), lookup(1, b=2), lookup(1, b=3))
+        assert results == [3, 3, 4]
+        assert sorted(calls) == [(1, 2), (1, 3)]
+        assert hasattr(lookup, "flight")
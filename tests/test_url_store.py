@@ -292,6 +292,60 @@ class TestUrlStore:
         assert len(results) == 0
 
 
+class TestUrlStoreBatch:
+    """Tests for urls_exist() and save_many()."""
+
+    def _record(self, url, server_id='server1'):
+        return dict(
+            server_id=server_id,
+            channel_id='channel1',
+            url=url,
+            summary=f'Summary of {url}',
+            keywords='test',
+            posted_by_id='user1',
+            posted_by_name='User1',
+            posted_at=datetime.now(),
+        )
+
+    def test_urls_exist_returns_known_subset(self, temp_dir):
+        store = UrlStore(os.path.join(temp_dir, 'test.db'))
+        store.save(**self._record('https://example.com/a'))
+        store.save(**self._record('https://example.com/b', server_id='server2'))
+        found = store.urls_exist('server1', ['https://example.com/a', 'https://example.com/b', 'https://example.com/c'])
+        assert found == {'https://example.com/a'}
+
+    def test_urls_exist_handles_empty_and_large_batches(self, temp_dir):
+        store = UrlStore(os.path.join(temp_dir, 'test.db'))
+        store.save(**self._record('https://example.com/1499'))
+        assert store.urls_exist('server1', []) == set()
+        urls = [f'https://example.com/{i}' for i in range(1500)]
+        assert store.urls_exist('server1', urls) == {'https://example.com/1499'}
+
+    def test_save_many_reports_inserted_and_skipped(self, temp_dir):
+        store = UrlStore(os.path.join(temp_dir, 'test.db'))
+        store.save(**self._record('https://example.com/a'))
+        result = store.save_many([
+            self._record('https://example.com/a'),
+            self._record('https://example.com/b'),
+            self._record('https://example.com/b'),
+            self._record('https://example.com/c'),
+        ])
+        assert result == {"inserted": 2, "skipped": 2}
+        assert len(store.get_all('server1')) == 3
+
+    def test_save_many_stores_embeddings(self, temp_dir):
+        store = UrlStore(os.path.join(temp_dir, 'test.db'))
+        record = self._record('https://example.com/a')
+        record['embedding'] = [0.1, 0.2]
+        store.save_many([record])
+        assert store.get_all('server1')[0].embedding == [0.1, 0.2]
+
+    def test_save_many_prunes(self, temp_dir):
+        store = UrlStore(os.path.join(temp_dir, 'test.db'))
+        store.save_many([self._record(f'https://example.com/{i}') for i in range(510)])
+        assert len(store.get_all('server1')) == 500
+
+
 class TestUrlStoreSimilaritySearch:
     """Tests for embedding-based similarity search."""
 
@@ -0,0 +1,324 @@
+"""Tests for src/platforms/workers.py."""
+
+import asyncio
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from src.persistence.job_queue_store import JobQueueStore
+from src.platforms.base import ChatMessage
+from src.platforms.outbound import INTERACTIVE, SCHEDULED
+from src.platforms.workers import (
+    INBOUND_QUEUE, OUTBOUND_QUEUE, JobWorker, OutboxRelay, QueuedOutbound, bot_queue,
+    message_from_payload, message_to_payload, wait_for_job,
+)
+
+
+BOT = "gepetto"
+INBOX = bot_queue(INBOUND_QUEUE, BOT)
+OUTBOX = bot_queue(OUTBOUND_QUEUE, BOT)
+
+
+@pytest.fixture
+def store(temp_dir):
+    return JobQueueStore(os.path.join(temp_dir, 'test.db'))
+
+
+def make_message(**overrides):
+    fields = dict(
+        content="<@bot> hello", author_id="u1", author_name="alice", author_display_name="Alice",
+        author_is_bot=False, author_mention="<@u1>", channel_id="c1", server_id="s1",
+        created_at=datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc), raw=object(), id="m1",
+    )
+    fields.update(overrides)
+    return ChatMessage(**fields)
+
+
+class FakeChannel:
+    def __init__(self, channel_id="c1"):
+        self.id = channel_id
+        self.sent = []
+
+    async def send(self, text, **kwargs):
+        self.sent.append(text)
+
+
+class FakePlatform:
+    def __init__(self, *channels):
+        self.channels = {channel.id: channel for channel in channels}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+
+class RecordingOutbound:
+    """Stands in for the gateway's OutboundDispatcher."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def send(self, channel, text, priority=SCHEDULED, **kwargs):
+        self.calls.append(("send", channel.id, text, priority))
+
+    async def reply(self, message, text, priority=INTERACTIVE, **kwargs):
+        self.calls.append(("reply", message.id, text, priority, kwargs))
+
+
+class LockedOnce:
+    """Wraps a JobQueueStore whose first claim fails as if another process held the lock."""
+
+    def __init__(self, store):
+        self._store = store
+        self.claims = 0
+
+    def claim(self, queue, worker):
+        self.claims += 1
+        if self.claims == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return self._store.claim(queue, worker)
+
+    def __getattr__(self, name):
+        return getattr(self._store, name)
+
+
+async def wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition never met")
+
+
+class TestPayload:
+
+    def test_round_trip_drops_raw(self):
+        message = make_message(reply_to_author_id="bot")
+        restored = message_from_payload(message_to_payload(message))
+        assert restored == make_message(reply_to_author_id="bot", raw=None)
+
+
+class TestJobWorker:
+
+    async def test_runs_jobs_and_queues_replies(self, store):
+        seen = []
+
+        async def answer(message, job):
+            seen.append((message.content, job["question"]))
+            await message.reply("hi there", mention_author=False)
+
+        store.enqueue(INBOX, {"kind": "answer", "message": message_to_payload(make_message()),
+                                      "question": "hello"})
+        prepared = []
+
+        async def prepare(message):
+            prepared.append(message.channel_id)
+
+        worker = JobWorker(store, {"answer": answer}, QueuedOutbound(store, BOT), BOT, prepare=prepare)
+        await worker.run_pending()
+        assert seen == [("<@bot> hello", "hello")]
+        assert prepared == ["c1"]
+        assert store.depth(INBOX) == 0
+        _, reply = store.claim(OUTBOX, "gateway")
+        assert reply == {"channel_id": "c1", "text": "hi there", "priority": INTERACTIVE,
+                         "reply_to": "m1", "mention_author": False}
+
+    async def test_failed_job_is_not_retried(self, store):
+        async def boom(message, job):
+            raise RuntimeError("nope")
+
+        store.enqueue(INBOX, {"kind": "answer", "message": message_to_payload(make_message())})
+        worker = JobWorker(store, {"answer": boom}, QueuedOutbound(store, BOT), BOT)
+        await worker.run_pending()
+        assert store.claim(INBOX, "w") is None
+
+    async def test_concurrency_limit(self, store):
+        running = []
+        peak = []
+
+        async def answer(message, job):
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0)
+            running.pop()
+
+        for _ in range(5):
+            store.enqueue(INBOX, {"kind": "answer", "message": message_to_payload(make_message())})
+        worker = JobWorker(store, {"answer": answer}, QueuedOutbound(store, BOT), BOT, concurrency=2)
+        await worker.run_pending()
+        assert len(peak) == 5
+        assert max(peak) == 2
+
+    async def test_keeps_running_after_a_failed_claim(self, store):
+        seen = []
+
+        async def answer(message, payload):
+            seen.append(message.id)
+
+        store.enqueue(INBOX, {"kind": "answer", "message": message_to_payload(make_message())})
+        worker = JobWorker(LockedOnce(store), {"answer": answer}, QueuedOutbound(store, BOT), BOT,
+                           poll_seconds=0.01, retry_seconds=0.01)
+        task = asyncio.create_task(worker.run())
+        try:
+            await wait_for(lambda: seen)
+        finally:
+            task.cancel()
+        assert seen == ["m1"]
+
+    async def test_bots_sharing_a_database_keep_their_own_jobs(self, store):
+        seen = []
+
+        async def answer(message, job):
+            seen.append(job["bot"])
+
+        store.enqueue(INBOX, {"kind": "answer", "message": message_to_payload(make_message()), "bot": BOT})
+        store.enqueue(bot_queue(INBOUND_QUEUE, "minxie"),
+                      {"kind": "answer", "message": message_to_payload(make_message()), "bot": "minxie"})
+        await JobWorker(store, {"answer": answer}, QueuedOutbound(store, BOT), BOT).run_pending()
+        assert seen == [BOT]
+        assert store.depth(bot_queue(INBOUND_QUEUE, "minxie")) == 1
+
+
+class TestOutboxRelay:
+
+    async def test_replies_to_remembered_message(self, store):
+        outbound = RecordingOutbound()
+        relay = OutboxRelay(store, FakePlatform(FakeChannel()), outbound, BOT)
+        message = make_message()
+        relay.remember(message)
+        await QueuedOutbound(store, BOT).reply(message, "answer", mention_author=False)
+        assert relay.step() is True
+        await relay.join()
+        assert outbound.calls == [("reply", "m1", "answer", INTERACTIVE, {"mention_author": False})]
+        assert store.depth(OUTBOX) == 0
+
+    async def test_falls_back_to_channel_send(self, store):
+        outbound = RecordingOutbound()
+        relay = OutboxRelay(store, FakePlatform(FakeChannel()), outbound, BOT, recent_limit=1)
+        relay.remember(make_message(id="m1"))
+        relay.remember(make_message(id="m2"))
+        await QueuedOutbound(store, BOT).reply(make_message(id="m1"), "late answer")
+        await QueuedOutbound(store, BOT).send(FakeChannel(), "scheduled post")
+        relay.step()
+        relay.step()
+        await relay.join()
+        assert outbound.calls == [("send", "c1", "late answer", INTERACTIVE), ("send", "c1", "scheduled post", SCHEDULED)]
+        assert relay.step() is False
+
+    async def test_unknown_channel_fails_job(self, store):
+        relay = OutboxRelay(store, FakePlatform(), RecordingOutbound(), BOT)
+        await QueuedOutbound(store, BOT).send(FakeChannel("gone"), "hello")
+        relay.step()
+        await relay.join()
+        assert store.depth(OUTBOX) == 0
+
+    async def test_worker_events_are_handled_by_the_gateway(self, store):
+        added = []
+        relay = OutboxRelay(store, FakePlatform(), RecordingOutbound(), BOT,
+                            events={"reminder_added": added.append})
+        QueuedOutbound(store, BOT).notify("reminder_added", reminder_id=7, remind_at="2024-05-01T13:00:00")
+        QueuedOutbound(store, BOT).notify("mystery")
+        relay.step()
+        relay.step()
+        await relay.join()
+        assert added == [{"event": "reminder_added", "reminder_id": 7, "remind_at": "2024-05-01T13:00:00"}]
+        assert store.depth(OUTBOX) == 0
+
+
+    async def test_keeps_running_after_a_failed_claim(self, store):
+        outbound = RecordingOutbound()
+        relay = OutboxRelay(LockedOnce(store), FakePlatform(FakeChannel()), outbound, BOT,
+                            poll_seconds=0.01, retry_seconds=0.01)
+        await QueuedOutbound(store, BOT).send(FakeChannel(), "hello")
+        task = asyncio.create_task(relay.run())
+        try:
+            await wait_for(lambda: outbound.calls)
+        finally:
+            task.cancel()
+        assert outbound.calls == [("send", "c1", "hello", SCHEDULED)]
+
+    async def test_backlog_does_not_block_the_event_loop(self, store):
+        relay = OutboxRelay(store, FakePlatform(FakeChannel()), RecordingOutbound(), BOT)
+        for i in range(20):
+            await QueuedOutbound(store, BOT).send(FakeChannel(), f"post {i}")
+        depths = []
+
+        async def heartbeat():
+            while True:
+                depths.append(store.depth(OUTBOX))
+                await asyncio.sleep(0)
+
+        beat = asyncio.create_task(heartbeat())
+        task = asyncio.create_task(relay.run())
+        try:
+            await wait_for(lambda: store.depth(OUTBOX) == 0)
+        finally:
+            task.cancel()
+            beat.cancel()
+        # other tasks ran between claims, not only before and after the backlog
+        assert any(0 < depth < 20 for depth in depths)
+
+
+class TestGatewayRole:
+
+    async def test_gateway_queues_answers_for_workers(self, store, monkeypatch):
+        import main
+        from src.platforms.inbound import InboundDispatcher
+        monkeypatch.setattr(main, "BOT_ROLE", "gateway")
+        monkeypatch.setattr(main, "job_queue", store)
+        monkeypatch.setattr(main, "BOT_NAME", BOT)
+        monkeypatch.setattr(main, "inbound", InboundDispatcher())
+        relay = OutboxRelay(store, FakePlatform(), RecordingOutbound(), BOT)
+        monkeypatch.setattr(main, "outbox_relay", relay)
+        message = make_message()
+        main.queue_answer(message, "answer", handler=None, question="hello")
+        await wait_for(lambda: store.depth(INBOX))
+        job_id, job = store.claim(INBOX, "w1")
+        assert job == {"kind": "answer", "message": message_to_payload(message), "question": "hello"}
+        # the dispatcher holds the user's slot until the worker is done
+        assert main.inbound.snapshot()["running"] == 1
+        store.complete(job_id)
+        await asyncio.wait_for(main.inbound.join(), 5)
+
+    async def test_gateway_keeps_dispatcher_bounds(self, store, monkeypatch):
+        import main
+        from src.platforms.inbound import InboundDispatcher
+        monkeypatch.setattr(main, "BOT_ROLE", "gateway")
+        monkeypatch.setattr(main, "job_queue", store)
+        monkeypatch.setattr(main, "BOT_NAME", BOT)
+        monkeypatch.setattr(main, "inbound", InboundDispatcher(max_per_user=1))
+        monkeypatch.setattr(main, "outbox_relay", OutboxRelay(store, FakePlatform(), RecordingOutbound(), BOT))
+        for i in range(3):
+            main.queue_answer(make_message(id=f"m{i}"), "answer", handler=None, question=f"q{i}")
+        await wait_for(lambda: store.depth(INBOX))
+        # m0 went to a worker; m1 was dropped for m2, which waits its turn
+        stats = main.inbound.snapshot()
+        assert (stats["running"], stats["queued"], stats["dropped"]) == (1, 1, 1)
+        assert store.depth(INBOX) == 1
+        job_id, _ = store.claim(INBOX, "w1")
+        store.complete(job_id)
+        await wait_for(lambda: store.depth(INBOX))
+        job_id, job = store.claim(INBOX, "w1")
+        assert job["question"] == "q2"
+        store.complete(job_id)
+        await asyncio.wait_for(main.inbound.join(), 5)
+
+
+class TestWaitForJob:
+
+    async def test_returns_once_the_job_is_done_or_dead(self, store):
+        done = store.enqueue(INBOX, {})
+        store.claim(INBOX, "w1")
+        store.complete(done)
+        await asyncio.wait_for(wait_for_job(store, done), 1)
+
+        failed = store.enqueue(INBOX, {})
+        store.claim(INBOX, "w1")
+        store.fail(failed, "boom")
+        await asyncio.wait_for(wait_for_job(store, failed), 1)
+
+        running = store.enqueue(INBOX, {})
+        store.claim(INBOX, "w1")
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(wait_for_job(store, running, poll_seconds=0.01), 0.05)